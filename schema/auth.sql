@@ -0,0 +1,30 @@
+-- ==============================================================================
+-- Application users and login sessions (streamlit/auth)
+-- ==============================================================================
+-- password_hash holds an argon2id hash in PHC string format (parameters and
+-- salt included). A login issues a signed token whose id is stored in
+-- app_sessions; the app validates tokens from an in-memory cache and only
+-- reads app_sessions when a cache entry expires, so logout and deactivation
+-- take effect within AUTH_TOKEN_CACHE_TTL seconds.
+-- ==============================================================================
+
+CREATE TABLE IF NOT EXISTS app_users (
+    id              SERIAL PRIMARY KEY,
+    username        TEXT NOT NULL UNIQUE,
+    email           TEXT,
+    password_hash   TEXT NOT NULL,
+    is_active       BOOLEAN NOT NULL DEFAULT TRUE,
+    created_at      TIMESTAMPTZ NOT NULL DEFAULT now(),
+    last_login_at   TIMESTAMPTZ
+);
+
+CREATE TABLE IF NOT EXISTS app_sessions (
+    token_id        TEXT PRIMARY KEY,
+    username        TEXT NOT NULL REFERENCES app_users(username) ON DELETE CASCADE,
+    created_at      TIMESTAMPTZ NOT NULL DEFAULT now(),
+    expires_at      TIMESTAMPTZ NOT NULL,
+    revoked_at      TIMESTAMPTZ
+);
+
+CREATE INDEX IF NOT EXISTS idx_app_sessions_username
+    ON app_sessions(username);
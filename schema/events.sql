@@ -0,0 +1,23 @@
+-- ==============================================================================
+-- Application events (chat message logs, audit trail, usage accounting)
+-- ==============================================================================
+-- Written off the request path by the write-behind sink in streamlit/events:
+-- rows arrive in batches, so created_at is the time the event happened and
+-- inserted_at the time its batch landed.
+-- ==============================================================================
+
+CREATE TABLE IF NOT EXISTS app_events (
+    id              BIGSERIAL PRIMARY KEY,
+    event_type      TEXT NOT NULL,                      -- 'chat_message', 'login', 'logout', ...
+    username        TEXT,
+    session_id      TEXT,
+    payload         JSONB NOT NULL DEFAULT '{}'::jsonb,
+    created_at      TIMESTAMPTZ NOT NULL,
+    inserted_at     TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_app_events_type_created
+    ON app_events(event_type, created_at);
+
+CREATE INDEX IF NOT EXISTS idx_app_events_username_created
+    ON app_events(username, created_at) WHERE username IS NOT NULL;
@@ -0,0 +1,33 @@
+-- ==============================================================================
+-- Job queue for the Postgres-backed job runner (streamlit/jobs)
+-- ==============================================================================
+-- Workers claim rows with SELECT ... FOR UPDATE SKIP LOCKED, so any number of
+-- worker processes (on any host) can drain the queue without double-claiming.
+-- Outcomes are checkpointed into ingestion_log.
+-- ==============================================================================
+
+CREATE TABLE IF NOT EXISTS job_queue (
+    id              BIGSERIAL PRIMARY KEY,
+    job_type        TEXT NOT NULL,                      -- 'zillow_ingest', 'notion_sync', 'aggregate_metrics'
+    payload         JSONB NOT NULL DEFAULT '{}'::jsonb,
+    dedupe_key      TEXT UNIQUE,                        -- makes enqueue idempotent across reruns
+    status          TEXT NOT NULL DEFAULT 'queued',     -- 'queued', 'running', 'done', 'dead'
+    attempts        INT NOT NULL DEFAULT 0,
+    max_attempts    INT NOT NULL DEFAULT 5,
+    run_after       TIMESTAMPTZ NOT NULL DEFAULT now(), -- retry backoff
+    locked_by       TEXT,                               -- worker id holding the lease
+    locked_at       TIMESTAMPTZ,
+    last_error      TEXT,
+    result          JSONB,
+    created_at      TIMESTAMPTZ NOT NULL DEFAULT now(),
+    updated_at      TIMESTAMPTZ NOT NULL DEFAULT now(),
+    finished_at     TIMESTAMPTZ
+);
+
+-- Claim path: only queued rows, ordered by due time
+CREATE INDEX IF NOT EXISTS idx_job_queue_claim
+    ON job_queue(run_after, id) WHERE status = 'queued';
+
+-- Lease reaper path
+CREATE INDEX IF NOT EXISTS idx_job_queue_running
+    ON job_queue(locked_at) WHERE status = 'running';
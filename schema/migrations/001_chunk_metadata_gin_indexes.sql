@@ -0,0 +1,56 @@
+-- ==============================================================================
+-- 001: GIN indexes and full-text columns for chunk_metadata / document_chunks
+-- ==============================================================================
+-- Makes array, JSONB and full-text filters index-served instead of full scans
+-- with per-row JSONB decoding. Pair with rag/filters.py (ChunkFilter), which
+-- only emits the operators these indexes support:
+--   TEXT[]  -> && / @>      JSONB -> @>      tsvector -> @@
+-- Safe to re-run.
+-- ==============================================================================
+
+-- ------------------------------------------------------------------------------
+-- Full-text columns (generated once on write, never recomputed at query time)
+-- ------------------------------------------------------------------------------
+ALTER TABLE document_chunks
+    ADD COLUMN IF NOT EXISTS content_tsv tsvector
+    GENERATED ALWAYS AS (to_tsvector('english', content)) STORED;
+
+ALTER TABLE chunk_metadata
+    ADD COLUMN IF NOT EXISTS summary_tsv tsvector
+    GENERATED ALWAYS AS (to_tsvector('english', COALESCE(summary, ''))) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_document_chunks_content_tsv
+    ON document_chunks USING GIN (content_tsv);
+
+CREATE INDEX IF NOT EXISTS idx_chunk_metadata_summary_tsv
+    ON chunk_metadata USING GIN (summary_tsv);
+
+-- ------------------------------------------------------------------------------
+-- Array columns (default array_ops supports &&, @>, <@)
+-- ------------------------------------------------------------------------------
+CREATE INDEX IF NOT EXISTS idx_chunk_metadata_topics
+    ON chunk_metadata USING GIN (topics);
+
+CREATE INDEX IF NOT EXISTS idx_chunk_metadata_future_topics
+    ON chunk_metadata USING GIN (future_topics);
+
+-- ------------------------------------------------------------------------------
+-- JSONB columns (jsonb_path_ops: smaller and faster, supports @> only)
+-- ------------------------------------------------------------------------------
+CREATE INDEX IF NOT EXISTS idx_chunk_metadata_entities
+    ON chunk_metadata USING GIN (entities jsonb_path_ops);
+
+CREATE INDEX IF NOT EXISTS idx_chunk_metadata_custom_tags
+    ON chunk_metadata USING GIN (custom_tags jsonb_path_ops);
+
+CREATE INDEX IF NOT EXISTS idx_chunk_metadata_action_items
+    ON chunk_metadata USING GIN (action_items jsonb_path_ops);
+
+-- ------------------------------------------------------------------------------
+-- Enum columns used as equality filters
+-- ------------------------------------------------------------------------------
+CREATE INDEX IF NOT EXISTS idx_chunk_metadata_section_type
+    ON chunk_metadata(section_type);
+
+ANALYZE document_chunks;
+ANALYZE chunk_metadata;
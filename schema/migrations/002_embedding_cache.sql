@@ -0,0 +1,17 @@
+-- ==============================================================================
+-- 002: Content-addressed embedding cache
+-- ==============================================================================
+-- One vector per (model, normalized text hash). rag/embeddings.py looks
+-- vectors up here before calling the embedding API, so repeated text such as
+-- meeting boilerplate is embedded once per model.
+-- Safe to re-run.
+-- ==============================================================================
+
+CREATE TABLE IF NOT EXISTS embedding_cache (
+    model              TEXT NOT NULL,
+    text_hash          CHAR(64) NOT NULL,                -- sha256 of whitespace-normalized text
+    dim                INT NOT NULL,
+    vector             BYTEA NOT NULL,                   -- packed float32
+    created_at         TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (model, text_hash)
+);
@@ -0,0 +1,34 @@
+-- ==============================================================================
+-- 003: Job queue for the Postgres-backed job runner
+-- ==============================================================================
+-- Same objects as schema/jobs.sql, for databases created before it existed.
+-- Safe to re-run.
+-- ==============================================================================
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS job_queue (
+    id              BIGSERIAL PRIMARY KEY,
+    job_type        TEXT NOT NULL,
+    payload         JSONB NOT NULL DEFAULT '{}'::jsonb,
+    dedupe_key      TEXT UNIQUE,
+    status          TEXT NOT NULL DEFAULT 'queued',
+    attempts        INT NOT NULL DEFAULT 0,
+    max_attempts    INT NOT NULL DEFAULT 5,
+    run_after       TIMESTAMPTZ NOT NULL DEFAULT now(),
+    locked_by       TEXT,
+    locked_at       TIMESTAMPTZ,
+    last_error      TEXT,
+    result          JSONB,
+    created_at      TIMESTAMPTZ NOT NULL DEFAULT now(),
+    updated_at      TIMESTAMPTZ NOT NULL DEFAULT now(),
+    finished_at     TIMESTAMPTZ
+);
+
+CREATE INDEX IF NOT EXISTS idx_job_queue_claim
+    ON job_queue(run_after, id) WHERE status = 'queued';
+
+CREATE INDEX IF NOT EXISTS idx_job_queue_running
+    ON job_queue(locked_at) WHERE status = 'running';
+
+COMMIT;
@@ -0,0 +1,94 @@
+-- ==============================================================================
+-- 004: SOP unit-type bucket as a stored dimension
+-- ==============================================================================
+-- Adds zillow_listings.unit_bucket (stored generated column) and carries it
+-- into zillow_metrics_aggregated as a grouping key. The aggregate uniqueness
+-- constraint becomes NULLS NOT DISTINCT (Postgres 15+) so the ON CONFLICT
+-- upserts in populate_zillow_metrics.sql also match 'all dimensions' rows,
+-- which previously inserted a new duplicate on every run.
+--
+-- Adding a stored generated column rewrites zillow_listings; run it in a
+-- maintenance window on large tables. Safe to re-run.
+-- ==============================================================================
+
+BEGIN;
+
+-- Listings: bucket computed once on write
+ALTER TABLE zillow_listings ADD COLUMN IF NOT EXISTS unit_bucket VARCHAR(20) GENERATED ALWAYS AS (
+    CASE
+        WHEN home_type = 'STUDIO' THEN 'apt_0_1br'
+        WHEN bedrooms IS NULL THEN 'other'
+        WHEN home_type IN ('APARTMENT', 'CONDO', 'MULTI_FAMILY') THEN
+            CASE WHEN bedrooms <= 1 THEN 'apt_0_1br' WHEN bedrooms = 2 THEN 'apt_2br' ELSE 'apt_3plus_br' END
+        WHEN home_type IN ('SINGLE_FAMILY', 'TOWNHOUSE', 'ROW_HOUSE') THEN
+            CASE WHEN bedrooms <= 2 THEN 'house_1_2br' WHEN bedrooms = 3 THEN 'house_3br' ELSE 'house_4plus_br' END
+        ELSE 'other'
+    END
+) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_zillow_listing_zip_unit_bucket ON zillow_listings(zip_code, unit_bucket);
+
+-- Aggregates: new grouping column, backfilled from the existing dimensions
+ALTER TABLE zillow_metrics_aggregated ADD COLUMN IF NOT EXISTS unit_bucket VARCHAR(20);
+
+UPDATE zillow_metrics_aggregated SET unit_bucket =
+    CASE
+        WHEN home_type = 'STUDIO' THEN 'apt_0_1br'
+        WHEN bedrooms IS NULL THEN 'other'
+        WHEN home_type IN ('APARTMENT', 'CONDO', 'MULTI_FAMILY') THEN
+            CASE WHEN bedrooms <= 1 THEN 'apt_0_1br' WHEN bedrooms = 2 THEN 'apt_2br' ELSE 'apt_3plus_br' END
+        WHEN home_type IN ('SINGLE_FAMILY', 'TOWNHOUSE', 'ROW_HOUSE') THEN
+            CASE WHEN bedrooms <= 2 THEN 'house_1_2br' WHEN bedrooms = 3 THEN 'house_3br' ELSE 'house_4plus_br' END
+        ELSE 'other'
+    END
+WHERE unit_bucket IS NULL AND home_type IS NOT NULL;
+
+-- Drop the original (NULLS DISTINCT) unique constraint, whatever it was named
+DO $$
+DECLARE
+    constraint_name TEXT;
+BEGIN
+    FOR constraint_name IN
+        SELECT conname FROM pg_constraint
+        WHERE conrelid = 'zillow_metrics_aggregated'::regclass
+          AND contype = 'u'
+          AND conname <> 'zillow_metrics_aggregated_dimensions_key'
+    LOOP
+        EXECUTE format('ALTER TABLE zillow_metrics_aggregated DROP CONSTRAINT %I', constraint_name);
+    END LOOP;
+END $$;
+
+-- Collapse duplicates the old constraint let through, keeping the newest row
+DELETE FROM zillow_metrics_aggregated a
+USING zillow_metrics_aggregated b
+WHERE a.aggregation_type = b.aggregation_type
+  AND a.period_start_date = b.period_start_date
+  AND a.period_end_date = b.period_end_date
+  AND a.zip_code = b.zip_code
+  AND a.home_type IS NOT DISTINCT FROM b.home_type
+  AND a.unit_bucket IS NOT DISTINCT FROM b.unit_bucket
+  AND a.bedrooms IS NOT DISTINCT FROM b.bedrooms
+  AND a.bathrooms IS NOT DISTINCT FROM b.bathrooms
+  AND a.home_status IS NOT DISTINCT FROM b.home_status
+  AND (a.updated_at, a.id) < (b.updated_at, b.id);
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint
+        WHERE conrelid = 'zillow_metrics_aggregated'::regclass
+          AND conname = 'zillow_metrics_aggregated_dimensions_key'
+    ) THEN
+        ALTER TABLE zillow_metrics_aggregated
+            ADD CONSTRAINT zillow_metrics_aggregated_dimensions_key UNIQUE NULLS NOT DISTINCT (
+                aggregation_type, period_start_date, period_end_date, zip_code,
+                home_type, unit_bucket, bedrooms, bathrooms, home_status
+            );
+    END IF;
+END $$;
+
+CREATE INDEX IF NOT EXISTS idx_metrics_unit_bucket ON zillow_metrics_aggregated(aggregation_type, zip_code, unit_bucket, period_start_date DESC)
+    INCLUDE (total_listings, new_listings, median_price, average_price, median_price_per_sqft, median_days_on_market, average_days_on_market)
+    WHERE unit_bucket IS NOT NULL;
+
+COMMIT;
@@ -0,0 +1,29 @@
+-- ==============================================================================
+-- 005: Filter-option dimension table
+-- ==============================================================================
+-- Adds zillow_dimension_values, the distinct home types, statuses and
+-- bedroom counts seen in zillow_listings. Ingest (zillow/dimensions.py)
+-- keeps it current; the dashboard reads its filter options from it and from
+-- zillow_zip_codes instead of running SELECT DISTINCT over the listings.
+--
+-- The backfill scans zillow_listings once. Safe to re-run.
+-- ==============================================================================
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS zillow_dimension_values (
+    dimension VARCHAR(30) NOT NULL,
+    value VARCHAR(100) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (dimension, value)
+);
+
+INSERT INTO zillow_dimension_values (dimension, value)
+SELECT DISTINCT 'home_type', home_type FROM zillow_listings WHERE home_type IS NOT NULL
+UNION
+SELECT DISTINCT 'home_status', home_status FROM zillow_listings WHERE home_status IS NOT NULL
+UNION
+SELECT DISTINCT 'bedrooms', bedrooms::TEXT FROM zillow_listings WHERE bedrooms IS NOT NULL
+ON CONFLICT (dimension, value) DO NOTHING;
+
+COMMIT;
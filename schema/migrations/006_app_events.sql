@@ -0,0 +1,26 @@
+-- ==============================================================================
+-- 006: Application events table for the write-behind event sink
+-- ==============================================================================
+-- Same objects as schema/events.sql, for databases created before it existed.
+-- Safe to re-run.
+-- ==============================================================================
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS app_events (
+    id              BIGSERIAL PRIMARY KEY,
+    event_type      TEXT NOT NULL,
+    username        TEXT,
+    session_id      TEXT,
+    payload         JSONB NOT NULL DEFAULT '{}'::jsonb,
+    created_at      TIMESTAMPTZ NOT NULL,
+    inserted_at     TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_app_events_type_created
+    ON app_events(event_type, created_at);
+
+CREATE INDEX IF NOT EXISTS idx_app_events_username_created
+    ON app_events(username, created_at) WHERE username IS NOT NULL;
+
+COMMIT;
@@ -0,0 +1,40 @@
+-- ==============================================================================
+-- 007: Stored days-on-market and price-per-sqft
+-- ==============================================================================
+-- Adds zillow_listings.days_on_market and price_per_sqft as stored generated
+-- REAL columns, so dashboard and aggregation queries stop recomputing
+-- NUMERIC expressions per row, and indexes both.
+--
+-- days_on_market also settles the time_on_zillow unit in one place. The old
+-- queries divided by 86400000 (milliseconds) while the saved payloads carry
+-- seconds, so every stored DOM aggregate was 1000x too small. Re-run
+-- schema/populate_zillow_metrics.sql after this migration to recompute them.
+--
+-- Adding stored generated columns rewrites zillow_listings; run it in a
+-- maintenance window on large tables. Safe to re-run.
+-- ==============================================================================
+
+BEGIN;
+
+ALTER TABLE zillow_listings ADD COLUMN IF NOT EXISTS days_on_market REAL GENERATED ALWAYS AS (
+    CASE
+        -- Zillow documents timeOnZillow in milliseconds, but the saved
+        -- payloads carry seconds. daysOnZillow decides when present;
+        -- otherwise anything above a year in seconds must be milliseconds.
+        WHEN time_on_zillow IS NULL OR time_on_zillow <= 0 THEN days_on_zillow::REAL
+        WHEN days_on_zillow IS NOT NULL
+            AND ABS(time_on_zillow::FLOAT8 / 86400 - days_on_zillow) <= ABS(time_on_zillow::FLOAT8 / 86400000 - days_on_zillow)
+            THEN (time_on_zillow::FLOAT8 / 86400)::REAL
+        WHEN days_on_zillow IS NULL AND time_on_zillow < 31536000 THEN (time_on_zillow::FLOAT8 / 86400)::REAL
+        ELSE (time_on_zillow::FLOAT8 / 86400000)::REAL
+    END
+) STORED;
+
+ALTER TABLE zillow_listings ADD COLUMN IF NOT EXISTS price_per_sqft REAL GENERATED ALWAYS AS (
+    CASE WHEN living_area > 0 THEN (price::FLOAT8 / living_area)::REAL END
+) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_zillow_listing_days_on_market ON zillow_listings(days_on_market);
+CREATE INDEX IF NOT EXISTS idx_zillow_listing_price_per_sqft ON zillow_listings(price_per_sqft);
+
+COMMIT;
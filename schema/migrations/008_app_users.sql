@@ -0,0 +1,33 @@
+-- ==============================================================================
+-- 008: Application users and login sessions
+-- ==============================================================================
+-- Same objects as schema/auth.sql, for databases created before it existed.
+-- Until users exist, nobody can log in: register through the login page or
+-- run `python -m auth.users set-password USERNAME` in the streamlit container.
+-- Safe to re-run.
+-- ==============================================================================
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS app_users (
+    id              SERIAL PRIMARY KEY,
+    username        TEXT NOT NULL UNIQUE,
+    email           TEXT,
+    password_hash   TEXT NOT NULL,
+    is_active       BOOLEAN NOT NULL DEFAULT TRUE,
+    created_at      TIMESTAMPTZ NOT NULL DEFAULT now(),
+    last_login_at   TIMESTAMPTZ
+);
+
+CREATE TABLE IF NOT EXISTS app_sessions (
+    token_id        TEXT PRIMARY KEY,
+    username        TEXT NOT NULL REFERENCES app_users(username) ON DELETE CASCADE,
+    created_at      TIMESTAMPTZ NOT NULL DEFAULT now(),
+    expires_at      TIMESTAMPTZ NOT NULL,
+    revoked_at      TIMESTAMPTZ
+);
+
+CREATE INDEX IF NOT EXISTS idx_app_sessions_username
+    ON app_sessions(username);
+
+COMMIT;
@@ -0,0 +1,126 @@
+-- ==============================================================================
+-- 009: zillow_listings list-partitioned by market
+-- ==============================================================================
+-- Same objects as schema/zillow.sql, for databases created before markets
+-- existed:
+--   - zillow_markets: one row per market with the ZIP prefixes it covers,
+--     seeded with Greater Cincinnati.
+--   - zillow_market_for_zip(): the market of a ZIP, by longest matching
+--     prefix ('unassigned' when none matches).
+--   - zillow_zip_codes.market, backfilled from the prefixes.
+--   - zillow_listings rebuilt as a table partitioned BY LIST (market), with
+--     one partition per market and a DEFAULT partition for 'unassigned'.
+--     The primary key becomes (market, id) and the upsert key (market, zpid),
+--     since unique constraints must include the partition key.
+--
+-- The rebuild copies every listing (ids are kept, the id sequence moves to
+-- the new table) and holds an exclusive lock on zillow_listings until the
+-- commit; run it in a maintenance window on large tables. New markets are
+-- added afterwards with `python -m zillow.markets add`. Safe to re-run.
+-- ==============================================================================
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS zillow_markets (
+    market VARCHAR(40) PRIMARY KEY,
+    name TEXT NOT NULL,
+    zip_prefixes TEXT[] NOT NULL DEFAULT '{}',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO zillow_markets (market, name, zip_prefixes)
+VALUES ('cincinnati', 'Greater Cincinnati', ARRAY['410', '450', '451', '452', '470'])
+ON CONFLICT (market) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION zillow_market_for_zip(zip TEXT) RETURNS VARCHAR
+LANGUAGE sql STABLE AS $$
+    SELECT COALESCE(
+        (SELECT m.market
+         FROM zillow_markets m, unnest(m.zip_prefixes) AS prefix
+         WHERE zip LIKE prefix || '%'
+         ORDER BY length(prefix) DESC, m.market
+         LIMIT 1),
+        'unassigned'
+    )
+$$;
+
+ALTER TABLE zillow_zip_codes ADD COLUMN IF NOT EXISTS market VARCHAR(40) NOT NULL DEFAULT 'unassigned';
+UPDATE zillow_zip_codes
+SET market = zillow_market_for_zip(zip_code)
+WHERE market IS DISTINCT FROM zillow_market_for_zip(zip_code);
+CREATE INDEX IF NOT EXISTS idx_zillow_zip_code_market ON zillow_zip_codes(market);
+
+DO $$
+DECLARE
+    old_index RECORD;
+    target RECORD;
+    column_list TEXT;
+    source_columns TEXT;
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = 'zillow_listings'::regclass) = 'p' THEN
+        RAISE NOTICE 'zillow_listings is already partitioned';
+        RETURN;
+    END IF;
+
+    -- Free the table and index names for the partitioned table
+    ALTER TABLE zillow_listings RENAME TO zillow_listings_unpartitioned;
+    FOR old_index IN
+        SELECT indexrelid::regclass AS name FROM pg_index
+        WHERE indrelid = 'zillow_listings_unpartitioned'::regclass
+    LOOP
+        EXECUTE format('ALTER INDEX %s RENAME TO %I', old_index.name, left(old_index.name::text, 55) || '_old');
+    END LOOP;
+
+    -- Same columns, defaults (id keeps its sequence) and generated columns
+    ALTER TABLE zillow_listings_unpartitioned ADD COLUMN market VARCHAR(40) NOT NULL DEFAULT 'unassigned';
+    CREATE TABLE zillow_listings (
+        LIKE zillow_listings_unpartitioned INCLUDING DEFAULTS INCLUDING GENERATED,
+        PRIMARY KEY (market, id),
+        UNIQUE (market, zpid),
+        FOREIGN KEY (zip_code) REFERENCES zillow_zip_codes(zip_code)
+    ) PARTITION BY LIST (market);
+
+    CREATE TABLE zillow_listings_unassigned PARTITION OF zillow_listings DEFAULT;
+    FOR target IN SELECT market FROM zillow_markets ORDER BY market LOOP
+        EXECUTE format('CREATE TABLE %I PARTITION OF zillow_listings FOR VALUES IN (%L)',
+                       'zillow_listings_' || target.market, target.market);
+    END LOOP;
+
+    SELECT string_agg(quote_ident(attname), ', ' ORDER BY attnum),
+           string_agg('l.' || quote_ident(attname), ', ' ORDER BY attnum)
+    INTO column_list, source_columns
+    FROM pg_attribute
+    WHERE attrelid = 'zillow_listings_unpartitioned'::regclass
+        AND attnum > 0 AND NOT attisdropped
+        AND attgenerated = '' AND attname <> 'market';
+
+    EXECUTE format(
+        'INSERT INTO zillow_listings (%s, market)
+         SELECT %s, COALESCE(z.market, ''unassigned'')
+         FROM zillow_listings_unpartitioned l
+         LEFT JOIN zillow_zip_codes z ON z.zip_code = l.zip_code',
+        column_list, source_columns
+    );
+
+    EXECUTE format('ALTER SEQUENCE %s OWNED BY zillow_listings.id',
+                   pg_get_serial_sequence('zillow_listings_unpartitioned', 'id'));
+    DROP TABLE zillow_listings_unpartitioned;
+END $$;
+
+-- Created on the parent, so every market partition (present and future) gets them
+CREATE INDEX IF NOT EXISTS idx_zillow_listing_zpid ON zillow_listings(zpid);
+CREATE INDEX IF NOT EXISTS idx_zillow_listing_zip_code ON zillow_listings(zip_code);
+CREATE INDEX IF NOT EXISTS idx_zillow_listing_price ON zillow_listings(price);
+CREATE INDEX IF NOT EXISTS idx_zillow_listing_home_status ON zillow_listings(home_status);
+CREATE INDEX IF NOT EXISTS idx_zillow_listing_home_type ON zillow_listings(home_type);
+CREATE INDEX IF NOT EXISTS idx_zillow_listing_bedrooms ON zillow_listings(bedrooms);
+CREATE INDEX IF NOT EXISTS idx_zillow_listing_zip_unit_bucket ON zillow_listings(zip_code, unit_bucket);
+CREATE INDEX IF NOT EXISTS idx_zillow_listing_bathrooms ON zillow_listings(bathrooms);
+CREATE INDEX IF NOT EXISTS idx_zillow_listing_living_area ON zillow_listings(living_area);
+CREATE INDEX IF NOT EXISTS idx_zillow_listing_days_on_zillow ON zillow_listings(days_on_zillow);
+CREATE INDEX IF NOT EXISTS idx_zillow_listing_days_on_market ON zillow_listings(days_on_market);
+CREATE INDEX IF NOT EXISTS idx_zillow_listing_price_per_sqft ON zillow_listings(price_per_sqft);
+
+ANALYZE zillow_listings;
+
+COMMIT;
@@ -0,0 +1,42 @@
+-- ==============================================================================
+-- 010: Hot/cold tiering of zillow_listings
+-- ==============================================================================
+-- Same objects as schema/zillow.sql, for databases created before tiering:
+--   - zillow_zip_codes.ingestion_count: how many ingestion runs covered the
+--     ZIP; last_ingestion_run keeps the latest run id so each page of a
+--     paginated run does not count again.
+--   - zillow_listings.seen_ingestion: the ZIP's ingestion_count when the
+--     listing was last in a search result. A listing whose ZIP has been
+--     ingested ZILLOW_ARCHIVE_AFTER_INGESTIONS times since is delisted.
+--   - zillow_listing_archive_files: manifest of the Parquet files that
+--     zillow/archive.py moves delisted listings into. A file counts as
+--     archived only once its row is committed, in the same transaction that
+--     deletes its listings from zillow_listings.
+--
+-- Existing listings start at seen_ingestion 0 with their ZIPs at 0, so
+-- nothing is archived until ZIPs have been ingested again. Adding columns
+-- with constant defaults does not rewrite the tables. Safe to re-run.
+-- ==============================================================================
+
+BEGIN;
+
+ALTER TABLE zillow_zip_codes ADD COLUMN IF NOT EXISTS ingestion_count INT NOT NULL DEFAULT 0;
+ALTER TABLE zillow_zip_codes ADD COLUMN IF NOT EXISTS last_ingestion_run TEXT;
+ALTER TABLE zillow_zip_codes ADD COLUMN IF NOT EXISTS last_ingested_at TIMESTAMP;
+
+ALTER TABLE zillow_listings ADD COLUMN IF NOT EXISTS seen_ingestion INT NOT NULL DEFAULT 0;
+CREATE INDEX IF NOT EXISTS idx_zillow_listing_zip_seen ON zillow_listings(zip_code, seen_ingestion);
+
+CREATE TABLE IF NOT EXISTS zillow_listing_archive_files (
+    path TEXT PRIMARY KEY,  -- relative to ZILLOW_ARCHIVE_DIR
+    market VARCHAR(40) NOT NULL,
+    last_seen_on DATE NOT NULL,
+    row_count INT NOT NULL,
+    zip_codes TEXT[] NOT NULL,
+    archived_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_zillow_archive_market_date ON zillow_listing_archive_files(market, last_seen_on);
+CREATE INDEX IF NOT EXISTS idx_zillow_archive_zip_codes ON zillow_listing_archive_files USING GIN (zip_codes);
+
+COMMIT;
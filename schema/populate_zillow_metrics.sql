@@ -15,6 +15,7 @@ INSERT INTO zillow_metrics_aggregated (
     period_end_date,
     zip_code,
     home_type,
+    unit_bucket,
     bedrooms,
     bathrooms,
     home_status,
@@ -44,6 +45,7 @@ SELECT
     CURRENT_DATE - INTERVAL '1 day' AS period_end_date,
     zip_code,
     home_type,
+    unit_bucket,
     bedrooms,
     bathrooms,
     home_status,
@@ -62,14 +64,14 @@ SELECT
     MAX(price)::NUMERIC(12,2) AS max_price,
     
     -- Price per sqft
-    AVG(CASE WHEN living_area > 0 THEN price::NUMERIC / living_area ELSE NULL END)::NUMERIC(10,2) AS average_price_per_sqft,
-    PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY CASE WHEN living_area > 0 THEN price::NUMERIC / living_area ELSE NULL END)::NUMERIC(10,2) AS median_price_per_sqft,
+    AVG(price_per_sqft)::NUMERIC(10,2) AS average_price_per_sqft,
+    PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY price_per_sqft)::NUMERIC(10,2) AS median_price_per_sqft,
     
-    -- Days on market (convert time_on_zillow from seconds to days)
-    AVG(CASE WHEN time_on_zillow > 0 THEN time_on_zillow::NUMERIC / 86400000 ELSE NULL END)::NUMERIC(8,2) AS average_days_on_market,
-    PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY CASE WHEN time_on_zillow > 0 THEN time_on_zillow::NUMERIC / 86400000 ELSE NULL END)::NUMERIC(8,2) AS median_days_on_market,
-    MIN(CASE WHEN time_on_zillow > 0 THEN time_on_zillow / 86400000 ELSE NULL END) AS min_days_on_market,
-    MAX(CASE WHEN time_on_zillow > 0 THEN time_on_zillow / 86400000 ELSE NULL END) AS max_days_on_market,
+    -- Days on market (zillow_listings.days_on_market, stored on write)
+    AVG(days_on_market)::NUMERIC(8,2) AS average_days_on_market,
+    PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY days_on_market)::NUMERIC(8,2) AS median_days_on_market,
+    FLOOR(MIN(days_on_market))::INT AS min_days_on_market,
+    FLOOR(MAX(days_on_market))::INT AS max_days_on_market,
     
     -- Area metrics
     AVG(living_area)::NUMERIC(10,2) AS average_area_sqft,
@@ -78,8 +80,8 @@ SELECT
     MAX(living_area) AS max_area_sqft
 FROM zillow_listings
 WHERE DATE(created_at) <= CURRENT_DATE - INTERVAL '1 day'
-GROUP BY zip_code, home_type, bedrooms, bathrooms, home_status
-ON CONFLICT (aggregation_type, period_start_date, period_end_date, zip_code, home_type, bedrooms, bathrooms, home_status) 
+GROUP BY zip_code, home_type, unit_bucket, bedrooms, bathrooms, home_status
+ON CONFLICT (aggregation_type, period_start_date, period_end_date, zip_code, home_type, unit_bucket, bedrooms, bathrooms, home_status) 
 DO UPDATE SET
     total_listings = EXCLUDED.total_listings,
     new_listings = EXCLUDED.new_listings,
@@ -113,6 +115,7 @@ INSERT INTO zillow_metrics_aggregated (
     period_end_date,
     zip_code,
     home_type,
+    unit_bucket,
     bedrooms,
     bathrooms,
     home_status,
@@ -142,6 +145,7 @@ SELECT
     (DATE_TRUNC('week', CURRENT_DATE) + INTERVAL '6 days')::DATE AS period_end_date,
     zip_code,
     home_type,
+    unit_bucket,
     bedrooms,
     bathrooms,
     home_status,
@@ -161,14 +165,14 @@ SELECT
     MAX(price)::NUMERIC(12,2) AS max_price,
     
     -- Price per sqft
-    AVG(CASE WHEN living_area > 0 THEN price::NUMERIC / living_area ELSE NULL END)::NUMERIC(10,2) AS average_price_per_sqft,
-    PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY CASE WHEN living_area > 0 THEN price::NUMERIC / living_area ELSE NULL END)::NUMERIC(10,2) AS median_price_per_sqft,
+    AVG(price_per_sqft)::NUMERIC(10,2) AS average_price_per_sqft,
+    PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY price_per_sqft)::NUMERIC(10,2) AS median_price_per_sqft,
     
-    -- Days on market (convert time_on_zillow from seconds to days)
-    AVG(CASE WHEN time_on_zillow > 0 THEN time_on_zillow::NUMERIC / 86400000 ELSE NULL END)::NUMERIC(8,2) AS average_days_on_market,
-    PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY CASE WHEN time_on_zillow > 0 THEN time_on_zillow::NUMERIC / 86400000 ELSE NULL END)::NUMERIC(8,2) AS median_days_on_market,
-    MIN(CASE WHEN time_on_zillow > 0 THEN time_on_zillow / 86400000 ELSE NULL END) AS min_days_on_market,
-    MAX(CASE WHEN time_on_zillow > 0 THEN time_on_zillow / 86400000 ELSE NULL END) AS max_days_on_market,
+    -- Days on market (zillow_listings.days_on_market, stored on write)
+    AVG(days_on_market)::NUMERIC(8,2) AS average_days_on_market,
+    PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY days_on_market)::NUMERIC(8,2) AS median_days_on_market,
+    FLOOR(MIN(days_on_market))::INT AS min_days_on_market,
+    FLOOR(MAX(days_on_market))::INT AS max_days_on_market,
     
     -- Area metrics
     AVG(living_area)::NUMERIC(10,2) AS average_area_sqft,
@@ -177,8 +181,8 @@ SELECT
     MAX(living_area) AS max_area_sqft
 FROM zillow_listings
 WHERE DATE(created_at) <= CURRENT_DATE
-GROUP BY zip_code, home_type, bedrooms, bathrooms, home_status
-ON CONFLICT (aggregation_type, period_start_date, period_end_date, zip_code, home_type, bedrooms, bathrooms, home_status) 
+GROUP BY zip_code, home_type, unit_bucket, bedrooms, bathrooms, home_status
+ON CONFLICT (aggregation_type, period_start_date, period_end_date, zip_code, home_type, unit_bucket, bedrooms, bathrooms, home_status) 
 DO UPDATE SET
     total_listings = EXCLUDED.total_listings,
     new_listings = EXCLUDED.new_listings,
@@ -212,6 +216,7 @@ INSERT INTO zillow_metrics_aggregated (
     period_end_date,
     zip_code,
     home_type,
+    unit_bucket,
     bedrooms,
     bathrooms,
     home_status,
@@ -241,6 +246,7 @@ SELECT
     (DATE_TRUNC('month', CURRENT_DATE) + INTERVAL '1 month' - INTERVAL '1 day')::DATE AS period_end_date,
     zip_code,
     home_type,
+    unit_bucket,
     bedrooms,
     bathrooms,
     home_status,
@@ -260,14 +266,14 @@ SELECT
     MAX(price)::NUMERIC(12,2) AS max_price,
     
     -- Price per sqft
-    AVG(CASE WHEN living_area > 0 THEN price::NUMERIC / living_area ELSE NULL END)::NUMERIC(10,2) AS average_price_per_sqft,
-    PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY CASE WHEN living_area > 0 THEN price::NUMERIC / living_area ELSE NULL END)::NUMERIC(10,2) AS median_price_per_sqft,
+    AVG(price_per_sqft)::NUMERIC(10,2) AS average_price_per_sqft,
+    PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY price_per_sqft)::NUMERIC(10,2) AS median_price_per_sqft,
     
-    -- Days on market (convert time_on_zillow from seconds to days)
-    AVG(CASE WHEN time_on_zillow > 0 THEN time_on_zillow::NUMERIC / 86400000 ELSE NULL END)::NUMERIC(8,2) AS average_days_on_market,
-    PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY CASE WHEN time_on_zillow > 0 THEN time_on_zillow::NUMERIC / 86400000 ELSE NULL END)::NUMERIC(8,2) AS median_days_on_market,
-    MIN(CASE WHEN time_on_zillow > 0 THEN time_on_zillow / 86400000 ELSE NULL END) AS min_days_on_market,
-    MAX(CASE WHEN time_on_zillow > 0 THEN time_on_zillow / 86400000 ELSE NULL END) AS max_days_on_market,
+    -- Days on market (zillow_listings.days_on_market, stored on write)
+    AVG(days_on_market)::NUMERIC(8,2) AS average_days_on_market,
+    PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY days_on_market)::NUMERIC(8,2) AS median_days_on_market,
+    FLOOR(MIN(days_on_market))::INT AS min_days_on_market,
+    FLOOR(MAX(days_on_market))::INT AS max_days_on_market,
     
     -- Area metrics
     AVG(living_area)::NUMERIC(10,2) AS average_area_sqft,
@@ -276,8 +282,8 @@ SELECT
     MAX(living_area) AS max_area_sqft
 FROM zillow_listings
 WHERE DATE(created_at) <= CURRENT_DATE
-GROUP BY zip_code, home_type, bedrooms, bathrooms, home_status
-ON CONFLICT (aggregation_type, period_start_date, period_end_date, zip_code, home_type, bedrooms, bathrooms, home_status) 
+GROUP BY zip_code, home_type, unit_bucket, bedrooms, bathrooms, home_status
+ON CONFLICT (aggregation_type, period_start_date, period_end_date, zip_code, home_type, unit_bucket, bedrooms, bathrooms, home_status) 
 DO UPDATE SET
     total_listings = EXCLUDED.total_listings,
     new_listings = EXCLUDED.new_listings,
@@ -311,6 +317,7 @@ INSERT INTO zillow_metrics_aggregated (
     period_end_date,
     zip_code,
     home_type,
+    unit_bucket,
     bedrooms,
     bathrooms,
     home_status,
@@ -340,6 +347,7 @@ SELECT
     (DATE_TRUNC('quarter', CURRENT_DATE) + INTERVAL '3 months' - INTERVAL '1 day')::DATE AS period_end_date,
     zip_code,
     home_type,
+    unit_bucket,
     bedrooms,
     bathrooms,
     home_status,
@@ -359,14 +367,14 @@ SELECT
     MAX(price)::NUMERIC(12,2) AS max_price,
     
     -- Price per sqft
-    AVG(CASE WHEN living_area > 0 THEN price::NUMERIC / living_area ELSE NULL END)::NUMERIC(10,2) AS average_price_per_sqft,
-    PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY CASE WHEN living_area > 0 THEN price::NUMERIC / living_area ELSE NULL END)::NUMERIC(10,2) AS median_price_per_sqft,
+    AVG(price_per_sqft)::NUMERIC(10,2) AS average_price_per_sqft,
+    PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY price_per_sqft)::NUMERIC(10,2) AS median_price_per_sqft,
     
-    -- Days on market (convert time_on_zillow from seconds to days)
-    AVG(CASE WHEN time_on_zillow > 0 THEN time_on_zillow::NUMERIC / 86400000 ELSE NULL END)::NUMERIC(8,2) AS average_days_on_market,
-    PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY CASE WHEN time_on_zillow > 0 THEN time_on_zillow::NUMERIC / 86400000 ELSE NULL END)::NUMERIC(8,2) AS median_days_on_market,
-    MIN(CASE WHEN time_on_zillow > 0 THEN time_on_zillow / 86400000 ELSE NULL END) AS min_days_on_market,
-    MAX(CASE WHEN time_on_zillow > 0 THEN time_on_zillow / 86400000 ELSE NULL END) AS max_days_on_market,
+    -- Days on market (zillow_listings.days_on_market, stored on write)
+    AVG(days_on_market)::NUMERIC(8,2) AS average_days_on_market,
+    PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY days_on_market)::NUMERIC(8,2) AS median_days_on_market,
+    FLOOR(MIN(days_on_market))::INT AS min_days_on_market,
+    FLOOR(MAX(days_on_market))::INT AS max_days_on_market,
     
     -- Area metrics
     AVG(living_area)::NUMERIC(10,2) AS average_area_sqft,
@@ -375,8 +383,8 @@ SELECT
     MAX(living_area) AS max_area_sqft
 FROM zillow_listings
 WHERE DATE(created_at) <= CURRENT_DATE
-GROUP BY zip_code, home_type, bedrooms, bathrooms, home_status
-ON CONFLICT (aggregation_type, period_start_date, period_end_date, zip_code, home_type, bedrooms, bathrooms, home_status) 
+GROUP BY zip_code, home_type, unit_bucket, bedrooms, bathrooms, home_status
+ON CONFLICT (aggregation_type, period_start_date, period_end_date, zip_code, home_type, unit_bucket, bedrooms, bathrooms, home_status) 
 DO UPDATE SET
     total_listings = EXCLUDED.total_listings,
     new_listings = EXCLUDED.new_listings,
@@ -410,6 +418,7 @@ INSERT INTO zillow_metrics_aggregated (
     period_end_date,
     zip_code,
     home_type,
+    unit_bucket,
     bedrooms,
     bathrooms,
     home_status,
@@ -439,6 +448,7 @@ SELECT
     (DATE_TRUNC('month', CURRENT_DATE) + INTERVAL '1 month' - INTERVAL '1 day')::DATE AS period_end_date,
     zip_code,
     NULL AS home_type,  -- All types
+    NULL AS unit_bucket,  -- All unit buckets
     NULL AS bedrooms,   -- All bedrooms
     NULL AS bathrooms,  -- All bathrooms
     NULL AS home_status, -- All statuses
@@ -458,14 +468,14 @@ SELECT
     MAX(price)::NUMERIC(12,2) AS max_price,
     
     -- Price per sqft
-    AVG(CASE WHEN living_area > 0 THEN price::NUMERIC / living_area ELSE NULL END)::NUMERIC(10,2) AS average_price_per_sqft,
-    PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY CASE WHEN living_area > 0 THEN price::NUMERIC / living_area ELSE NULL END)::NUMERIC(10,2) AS median_price_per_sqft,
+    AVG(price_per_sqft)::NUMERIC(10,2) AS average_price_per_sqft,
+    PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY price_per_sqft)::NUMERIC(10,2) AS median_price_per_sqft,
     
-    -- Days on market (convert time_on_zillow from seconds to days)
-    AVG(CASE WHEN time_on_zillow > 0 THEN time_on_zillow::NUMERIC / 86400000 ELSE NULL END)::NUMERIC(8,2) AS average_days_on_market,
-    PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY CASE WHEN time_on_zillow > 0 THEN time_on_zillow::NUMERIC / 86400000 ELSE NULL END)::NUMERIC(8,2) AS median_days_on_market,
-    MIN(CASE WHEN time_on_zillow > 0 THEN time_on_zillow / 86400000 ELSE NULL END) AS min_days_on_market,
-    MAX(CASE WHEN time_on_zillow > 0 THEN time_on_zillow / 86400000 ELSE NULL END) AS max_days_on_market,
+    -- Days on market (zillow_listings.days_on_market, stored on write)
+    AVG(days_on_market)::NUMERIC(8,2) AS average_days_on_market,
+    PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY days_on_market)::NUMERIC(8,2) AS median_days_on_market,
+    FLOOR(MIN(days_on_market))::INT AS min_days_on_market,
+    FLOOR(MAX(days_on_market))::INT AS max_days_on_market,
     
     -- Area metrics
     AVG(living_area)::NUMERIC(10,2) AS average_area_sqft,
@@ -475,7 +485,113 @@ SELECT
 FROM zillow_listings
 WHERE DATE(created_at) <= CURRENT_DATE
 GROUP BY zip_code
-ON CONFLICT (aggregation_type, period_start_date, period_end_date, zip_code, home_type, bedrooms, bathrooms, home_status) 
+ON CONFLICT (aggregation_type, period_start_date, period_end_date, zip_code, home_type, unit_bucket, bedrooms, bathrooms, home_status) 
+DO UPDATE SET
+    total_listings = EXCLUDED.total_listings,
+    new_listings = EXCLUDED.new_listings,
+    active_listings = EXCLUDED.active_listings,
+    pending_listings = EXCLUDED.pending_listings,
+    sold_listings = EXCLUDED.sold_listings,
+    average_price = EXCLUDED.average_price,
+    median_price = EXCLUDED.median_price,
+    min_price = EXCLUDED.min_price,
+    max_price = EXCLUDED.max_price,
+    average_price_per_sqft = EXCLUDED.average_price_per_sqft,
+    median_price_per_sqft = EXCLUDED.median_price_per_sqft,
+    average_days_on_market = EXCLUDED.average_days_on_market,
+    median_days_on_market = EXCLUDED.median_days_on_market,
+    min_days_on_market = EXCLUDED.min_days_on_market,
+    max_days_on_market = EXCLUDED.max_days_on_market,
+    average_area_sqft = EXCLUDED.average_area_sqft,
+    median_area_sqft = EXCLUDED.median_area_sqft,
+    min_area_sqft = EXCLUDED.min_area_sqft,
+    max_area_sqft = EXCLUDED.max_area_sqft,
+    updated_at = CURRENT_TIMESTAMP;
+
+
+-- ==============================================================================
+-- 6. UNIT-BUCKET AGGREGATION (ROLLING) - By ZIP and SOP unit bucket
+-- ==============================================================================
+-- Run this daily for the SOP unit-type table (current month rolling).
+-- One row per (zip_code, unit_bucket), so the report is an index-only lookup
+-- on idx_metrics_unit_bucket. The SOP table reports the rental market, so
+-- active_listings counts FOR_RENT listings and the price, $/sqft and days on
+-- market metrics cover FOR_RENT listings only. total_listings, pending and
+-- sold counts still cover every status.
+INSERT INTO zillow_metrics_aggregated (
+    aggregation_type,
+    period_start_date,
+    period_end_date,
+    zip_code,
+    home_type,
+    unit_bucket,
+    bedrooms,
+    bathrooms,
+    home_status,
+    total_listings,
+    new_listings,
+    active_listings,
+    pending_listings,
+    sold_listings,
+    average_price,
+    median_price,
+    min_price,
+    max_price,
+    average_price_per_sqft,
+    median_price_per_sqft,
+    average_days_on_market,
+    median_days_on_market,
+    min_days_on_market,
+    max_days_on_market,
+    average_area_sqft,
+    median_area_sqft,
+    min_area_sqft,
+    max_area_sqft
+)
+SELECT
+    'unit_bucket' AS aggregation_type,
+    DATE_TRUNC('month', CURRENT_DATE)::DATE AS period_start_date,
+    (DATE_TRUNC('month', CURRENT_DATE) + INTERVAL '1 month' - INTERVAL '1 day')::DATE AS period_end_date,
+    zip_code,
+    NULL AS home_type,  -- All types
+    unit_bucket,
+    NULL AS bedrooms,   -- All bedrooms
+    NULL AS bathrooms,  -- All bathrooms
+    NULL AS home_status, -- All statuses
+    
+    -- Listing counts (snapshot as of today within the current month)
+    COUNT(*) AS total_listings,
+    COUNT(*) FILTER (WHERE DATE(created_at) >= DATE_TRUNC('month', CURRENT_DATE) 
+                      AND DATE(created_at) <= CURRENT_DATE) AS new_listings,
+    COUNT(*) FILTER (WHERE home_status = 'FOR_RENT') AS active_listings,  -- active rentals
+    COUNT(*) FILTER (WHERE home_status = 'PENDING') AS pending_listings,
+    COUNT(*) FILTER (WHERE home_status = 'SOLD') AS sold_listings,
+    
+    -- Rent metrics (FOR_RENT only; sale prices would skew the medians)
+    (AVG(price) FILTER (WHERE home_status = 'FOR_RENT'))::NUMERIC(12,2) AS average_price,
+    (PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY price) FILTER (WHERE home_status = 'FOR_RENT'))::NUMERIC(12,2) AS median_price,
+    (MIN(price) FILTER (WHERE home_status = 'FOR_RENT'))::NUMERIC(12,2) AS min_price,
+    (MAX(price) FILTER (WHERE home_status = 'FOR_RENT'))::NUMERIC(12,2) AS max_price,
+    
+    -- Rent per sqft
+    (AVG(price_per_sqft) FILTER (WHERE home_status = 'FOR_RENT'))::NUMERIC(10,2) AS average_price_per_sqft,
+    (PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY price_per_sqft) FILTER (WHERE home_status = 'FOR_RENT'))::NUMERIC(10,2) AS median_price_per_sqft,
+    
+    -- Days on market of active rentals (zillow_listings.days_on_market, stored on write)
+    (AVG(days_on_market) FILTER (WHERE home_status = 'FOR_RENT'))::NUMERIC(8,2) AS average_days_on_market,
+    (PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY days_on_market) FILTER (WHERE home_status = 'FOR_RENT'))::NUMERIC(8,2) AS median_days_on_market,
+    FLOOR(MIN(days_on_market) FILTER (WHERE home_status = 'FOR_RENT'))::INT AS min_days_on_market,
+    FLOOR(MAX(days_on_market) FILTER (WHERE home_status = 'FOR_RENT'))::INT AS max_days_on_market,
+    
+    -- Area metrics
+    AVG(living_area)::NUMERIC(10,2) AS average_area_sqft,
+    PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY living_area)::NUMERIC(10,2) AS median_area_sqft,
+    MIN(living_area) AS min_area_sqft,
+    MAX(living_area) AS max_area_sqft
+FROM zillow_listings
+WHERE DATE(created_at) <= CURRENT_DATE
+GROUP BY zip_code, unit_bucket
+ON CONFLICT (aggregation_type, period_start_date, period_end_date, zip_code, home_type, unit_bucket, bedrooms, bathrooms, home_status) 
 DO UPDATE SET
     total_listings = EXCLUDED.total_listings,
     new_listings = EXCLUDED.new_listings,
@@ -35,13 +35,33 @@ CREATE TABLE IF NOT EXISTS document_chunks (
 
     -- For quick debugging
     embedding_model    TEXT,
-    metadata_id        INT
+    metadata_id        INT,
+
+    -- Full-text search vector, maintained by Postgres
+    content_tsv        tsvector GENERATED ALWAYS AS (to_tsvector('english', content)) STORED
 );
 
 -- Index for fast doc-level retrieval
 CREATE INDEX IF NOT EXISTS idx_document_chunks_document_id
     ON document_chunks(document_id);
 
+CREATE INDEX IF NOT EXISTS idx_document_chunks_content_tsv
+    ON document_chunks USING GIN (content_tsv);
+
+-- ==============================
+-- 2b. Embedding Cache
+-- ==============================
+-- Content-addressed: one vector per (model, normalized text hash), reused
+-- across documents (see rag/embeddings.py)
+CREATE TABLE IF NOT EXISTS embedding_cache (
+    model              TEXT NOT NULL,
+    text_hash          CHAR(64) NOT NULL,                -- sha256 of whitespace-normalized text
+    dim                INT NOT NULL,
+    vector             BYTEA NOT NULL,                   -- packed float32
+    created_at         TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (model, text_hash)
+);
+
 -- ==============================
 -- 3. Tags Table
 -- ==============================
@@ -119,11 +139,21 @@ CREATE TABLE IF NOT EXISTS chunk_metadata (
     action_items JSONB DEFAULT '[]'::jsonb,          -- array of strings or objects
 
     summary TEXT,
+    summary_tsv tsvector GENERATED ALWAYS AS (to_tsvector('english', COALESCE(summary, ''))) STORED,
 
     created_at TIMESTAMPTZ DEFAULT now(),
     updated_at TIMESTAMPTZ DEFAULT now()
 );
 
+-- Index-friendly filters (see rag/filters.py)
+CREATE INDEX IF NOT EXISTS idx_chunk_metadata_section_type ON chunk_metadata(section_type);
+CREATE INDEX IF NOT EXISTS idx_chunk_metadata_topics ON chunk_metadata USING GIN (topics);
+CREATE INDEX IF NOT EXISTS idx_chunk_metadata_future_topics ON chunk_metadata USING GIN (future_topics);
+CREATE INDEX IF NOT EXISTS idx_chunk_metadata_entities ON chunk_metadata USING GIN (entities jsonb_path_ops);
+CREATE INDEX IF NOT EXISTS idx_chunk_metadata_custom_tags ON chunk_metadata USING GIN (custom_tags jsonb_path_ops);
+CREATE INDEX IF NOT EXISTS idx_chunk_metadata_action_items ON chunk_metadata USING GIN (action_items jsonb_path_ops);
+CREATE INDEX IF NOT EXISTS idx_chunk_metadata_summary_tsv ON chunk_metadata USING GIN (summary_tsv);
+
 -- Auto-update updated_at
 CREATE OR REPLACE FUNCTION set_updated_at()
 RETURNS TRIGGER AS $$
@@ -4,23 +4,58 @@ SET session_replication_role = 'replica';
 SET session_replication_role = 'origin';
 
 
+-- Markets (metro areas) and the ZIP prefixes they cover. Each market has its
+-- own zillow_listings partition; see zillow/markets.py to add one.
+CREATE TABLE IF NOT EXISTS zillow_markets (
+    market VARCHAR(40) PRIMARY KEY,
+    name TEXT NOT NULL,
+    zip_prefixes TEXT[] NOT NULL DEFAULT '{}',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO zillow_markets (market, name, zip_prefixes)
+VALUES ('cincinnati', 'Greater Cincinnati', ARRAY['410', '450', '451', '452', '470'])
+ON CONFLICT (market) DO NOTHING;
+
+-- Market of a ZIP by longest matching prefix ('unassigned' when none matches)
+CREATE OR REPLACE FUNCTION zillow_market_for_zip(zip TEXT) RETURNS VARCHAR
+LANGUAGE sql STABLE AS $$
+    SELECT COALESCE(
+        (SELECT m.market
+         FROM zillow_markets m, unnest(m.zip_prefixes) AS prefix
+         WHERE zip LIKE prefix || '%'
+         ORDER BY length(prefix) DESC, m.market
+         LIMIT 1),
+        'unassigned'
+    )
+$$;
+
 DROP TABLE IF EXISTS zillow_zip_codes CASCADE;
 CREATE TABLE IF NOT EXISTS zillow_zip_codes (
     id SERIAL PRIMARY KEY,
     zip_code VARCHAR(10) UNIQUE NOT NULL,
+    market VARCHAR(40) NOT NULL DEFAULT 'unassigned',  -- zillow_market_for_zip(zip_code), set at ingest
     city VARCHAR(100),
     state VARCHAR(100),
     county VARCHAR(100),
     country VARCHAR(100),
+    ingestion_count INT NOT NULL DEFAULT 0,  -- ingestion runs that covered this ZIP
+    last_ingestion_run TEXT,                 -- run id of the latest, so its later pages do not count again
+    last_ingested_at TIMESTAMP,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 
 );
 CREATE INDEX idx_zillow_zip_code ON zillow_zip_codes(zip_code);
+CREATE INDEX idx_zillow_zip_code_market ON zillow_zip_codes(market);
 
+-- Partitioned by market so queries that name their markets scan only those
+-- partitions. Unique keys must include the partition key, so listings are
+-- upserted on (market, zpid).
 CREATE TABLE IF NOT EXISTS zillow_listings (
-    id SERIAL PRIMARY KEY,
-    zpid BIGINT UNIQUE NOT NULL,  -- Zillow Property ID
+    id SERIAL,
+    market VARCHAR(40) NOT NULL DEFAULT 'unassigned',  -- zillow_zip_codes.market of zip_code
+    zpid BIGINT NOT NULL,  -- Zillow Property ID
     zip_code VARCHAR(10) REFERENCES zillow_zip_codes(zip_code),
     
     -- Address fields
@@ -38,12 +73,24 @@ CREATE TABLE IF NOT EXISTS zillow_listings (
     bathrooms INT,
     living_area INT,  -- sqft
     home_type VARCHAR(50),  -- e.g., 'SINGLE_FAMILY', 'CONDO', 'TOWNHOUSE'
+    -- SOP unit-type bucket, derived once on write instead of per query
+    unit_bucket VARCHAR(20) GENERATED ALWAYS AS (
+        CASE
+            WHEN home_type = 'STUDIO' THEN 'apt_0_1br'
+            WHEN bedrooms IS NULL THEN 'other'
+            WHEN home_type IN ('APARTMENT', 'CONDO', 'MULTI_FAMILY') THEN
+                CASE WHEN bedrooms <= 1 THEN 'apt_0_1br' WHEN bedrooms = 2 THEN 'apt_2br' ELSE 'apt_3plus_br' END
+            WHEN home_type IN ('SINGLE_FAMILY', 'TOWNHOUSE', 'ROW_HOUSE') THEN
+                CASE WHEN bedrooms <= 2 THEN 'house_1_2br' WHEN bedrooms = 3 THEN 'house_3br' ELSE 'house_4plus_br' END
+            ELSE 'other'
+        END
+    ) STORED,
     
     -- Listing status
     home_status VARCHAR(50),  -- e.g., 'FOR_SALE', 'FOR_RENT'
     home_status_for_hdp VARCHAR(50),
     days_on_zillow INT,
-    time_on_zillow BIGINT,  -- in seconds
+    time_on_zillow BIGINT,  -- seconds in the saved payloads, milliseconds per the Zillow docs
     
     -- Pricing
     price BIGINT,
@@ -53,6 +100,24 @@ CREATE TABLE IF NOT EXISTS zillow_listings (
     date_price_changed BIGINT,  -- unix timestamp, nullable
     price_reduction VARCHAR(20),  -- nullable, e.g., '-2%'
     
+    -- Derived metrics, computed once on write so queries read plain columns
+    days_on_market REAL GENERATED ALWAYS AS (
+        CASE
+            -- Zillow documents timeOnZillow in milliseconds, but the saved
+            -- payloads carry seconds. daysOnZillow decides when present;
+            -- otherwise anything above a year in seconds must be milliseconds.
+            WHEN time_on_zillow IS NULL OR time_on_zillow <= 0 THEN days_on_zillow::REAL
+            WHEN days_on_zillow IS NOT NULL
+                AND ABS(time_on_zillow::FLOAT8 / 86400 - days_on_zillow) <= ABS(time_on_zillow::FLOAT8 / 86400000 - days_on_zillow)
+                THEN (time_on_zillow::FLOAT8 / 86400)::REAL
+            WHEN days_on_zillow IS NULL AND time_on_zillow < 31536000 THEN (time_on_zillow::FLOAT8 / 86400)::REAL
+            ELSE (time_on_zillow::FLOAT8 / 86400000)::REAL
+        END
+    ) STORED,
+    price_per_sqft REAL GENERATED ALWAYS AS (
+        CASE WHEN living_area > 0 THEN (price::FLOAT8 / living_area)::REAL END
+    ) STORED,
+    
     -- Estimates and valuations
     zestimate BIGINT,  -- nullable
     rent_zestimate INT,  -- nullable
@@ -82,10 +147,21 @@ CREATE TABLE IF NOT EXISTS zillow_listings (
     -- Unit (optional)
     unit VARCHAR(50),  -- nullable
     
+    -- zillow_zip_codes.ingestion_count when last seen in a search result;
+    -- listings left behind by later ingestions are archived (zillow/archive.py)
+    seen_ingestion INT NOT NULL DEFAULT 0,
+    
     -- Timestamps
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    
+    PRIMARY KEY (market, id),
+    UNIQUE (market, zpid)
+) PARTITION BY LIST (market);
+
+-- ZIPs outside every market land in the default partition
+CREATE TABLE zillow_listings_unassigned PARTITION OF zillow_listings DEFAULT;
+CREATE TABLE zillow_listings_cincinnati PARTITION OF zillow_listings FOR VALUES IN ('cincinnati');
 
 CREATE INDEX idx_zillow_listing_zpid ON zillow_listings(zpid);
 CREATE INDEX idx_zillow_listing_zip_code ON zillow_listings(zip_code);
@@ -93,9 +169,37 @@ CREATE INDEX idx_zillow_listing_price ON zillow_listings(price);
 CREATE INDEX idx_zillow_listing_home_status ON zillow_listings(home_status);
 CREATE INDEX idx_zillow_listing_home_type ON zillow_listings(home_type);
 CREATE INDEX idx_zillow_listing_bedrooms ON zillow_listings(bedrooms);
+CREATE INDEX idx_zillow_listing_zip_unit_bucket ON zillow_listings(zip_code, unit_bucket);
 CREATE INDEX idx_zillow_listing_bathrooms ON zillow_listings(bathrooms);
 CREATE INDEX idx_zillow_listing_living_area ON zillow_listings(living_area);
 CREATE INDEX idx_zillow_listing_days_on_zillow ON zillow_listings(days_on_zillow);
+CREATE INDEX idx_zillow_listing_days_on_market ON zillow_listings(days_on_market);
+CREATE INDEX idx_zillow_listing_price_per_sqft ON zillow_listings(price_per_sqft);
+CREATE INDEX idx_zillow_listing_zip_seen ON zillow_listings(zip_code, seen_ingestion);
+
+-- Parquet files holding archived (delisted) listings, written by
+-- zillow/archive.py. A file is part of the archive once its row is
+-- committed, together with the deletion of its listings from zillow_listings.
+CREATE TABLE IF NOT EXISTS zillow_listing_archive_files (
+    path TEXT PRIMARY KEY,  -- relative to ZILLOW_ARCHIVE_DIR
+    market VARCHAR(40) NOT NULL,
+    last_seen_on DATE NOT NULL,
+    row_count INT NOT NULL,
+    zip_codes TEXT[] NOT NULL,
+    archived_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX idx_zillow_archive_market_date ON zillow_listing_archive_files(market, last_seen_on);
+CREATE INDEX idx_zillow_archive_zip_codes ON zillow_listing_archive_files USING GIN (zip_codes);
+
+-- Distinct filter values per listing dimension ('home_type', 'home_status',
+-- 'bedrooms'), maintained at ingest by zillow/dimensions.py so the dashboard
+-- filter options never scan zillow_listings
+CREATE TABLE IF NOT EXISTS zillow_dimension_values (
+    dimension VARCHAR(30) NOT NULL,
+    value VARCHAR(100) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (dimension, value)
+);
 
 CREATE TABLE zillow_metrics_aggregated (
     id BIGINT GENERATED ALWAYS AS IDENTITY,
@@ -108,6 +212,7 @@ CREATE TABLE zillow_metrics_aggregated (
     -- Grouping dimensions
     zip_code VARCHAR(10) NOT NULL,
     home_type VARCHAR(50),  -- nullable for 'all types' aggregation
+    unit_bucket VARCHAR(20),  -- SOP unit bucket, nullable for 'all buckets' aggregation
     bedrooms INT,  -- nullable for 'all bedrooms' aggregation
     bathrooms NUMERIC(3,1),  -- nullable for 'all bathrooms' aggregation
     home_status VARCHAR(50),  -- e.g., 'FOR_SALE', 'FOR_RENT', nullable for 'all statuses'
@@ -148,13 +253,15 @@ CREATE TABLE zillow_metrics_aggregated (
     -- Primary key must include partition key
     PRIMARY KEY (period_start_date, id),
     
-    -- Prevent duplicate aggregations
-    UNIQUE (
+    -- Prevent duplicate aggregations (NULL dimensions mean 'all', so they must
+    -- compare equal for ON CONFLICT to match)
+    CONSTRAINT zillow_metrics_aggregated_dimensions_key UNIQUE NULLS NOT DISTINCT (
         aggregation_type, 
         period_start_date, 
         period_end_date, 
         zip_code, 
         home_type, 
+        unit_bucket, 
         bedrooms, 
         bathrooms, 
         home_status
@@ -167,6 +274,10 @@ CREATE INDEX idx_metrics_period_start ON zillow_metrics_aggregated(period_start_
 CREATE INDEX idx_metrics_period_end ON zillow_metrics_aggregated(period_end_date);
 CREATE INDEX idx_metrics_home_type ON zillow_metrics_aggregated(home_type) WHERE home_type IS NOT NULL;
 CREATE INDEX idx_metrics_home_status ON zillow_metrics_aggregated(home_status) WHERE home_status IS NOT NULL;
+-- Covers the SOP unit-type table so it is answered by an index-only scan
+CREATE INDEX idx_metrics_unit_bucket ON zillow_metrics_aggregated(aggregation_type, zip_code, unit_bucket, period_start_date DESC)
+    INCLUDE (total_listings, new_listings, median_price, average_price, median_price_per_sqft, median_days_on_market, average_days_on_market)
+    WHERE unit_bucket IS NOT NULL;
 
 -- Create initial partitions (2025-2026 with monthly granularity)
 CREATE TABLE zillow_metrics_aggregated_2025_01 PARTITION OF zillow_metrics_aggregated
@@ -0,0 +1,150 @@
+'use strict';
+/**
+ * Scraping throughput against locally served listing pages.
+ *
+ * Cases:
+ *   - fresh:   a new browser per page, launched with the n8n Puppeteer flags
+ *              (--single-process --no-zygote), as each workflow run does today,
+ *   - pool N:  N warm contexts with resource/tracker blocking, every page
+ *              submitted at once so the pool queues the excess,
+ *   - pool N unblocked: same, loading images, fonts, css and trackers.
+ *
+ * Reports pages/sec, p50/p95 latency per page (queueing included), recycles,
+ * requests blocked, Chromium RSS and JS heap per context.
+ *
+ * Usage (from the scraper/ directory, with Chromium installed):
+ *     PUPPETEER_EXECUTABLE_PATH=/usr/bin/chromium npm run bench -- --pages 200 --sizes 1,4,8
+ *     docker compose exec scraper npm run bench
+ */
+const { launchBrowser, LAUNCH_ARGS } = require('../src/browser');
+const { ContextPool } = require('../src/pool');
+const { parseJob, scrape } = require('../src/scrape');
+const { TRACKER_HOST, startFixtureServer } = require('./fixtures');
+
+const N8N_LAUNCH_ARGS = [
+  '--no-sandbox', '--disable-setuid-sandbox', '--disable-dev-shm-usage', '--disable-gpu',
+  '--no-first-run', '--no-zygote', '--single-process', '--disable-extensions',
+];
+
+const SELECTORS = { address: '.listing .address', price: '.listing .price' };
+
+function parseArgs(argv) {
+  const args = { pages: 200, sizes: [1, 4, 8], freshPages: 20, maxNavigations: 50, assetLatency: 30 };
+  for (let i = 0; i < argv.length; i += 2) {
+    const [flag, value] = [argv[i], argv[i + 1]];
+    if (flag === '--pages') args.pages = Number(value);
+    else if (flag === '--sizes') args.sizes = value.split(',').map(Number);
+    else if (flag === '--fresh-pages') args.freshPages = Number(value);
+    else if (flag === '--max-navigations') args.maxNavigations = Number(value);
+    else if (flag === '--asset-latency') args.assetLatency = Number(value);
+    else throw new Error(`Unknown option ${flag}`);
+  }
+  return args;
+}
+
+function percentile(values, q) {
+  const sorted = [...values].sort((a, b) => a - b);
+  return sorted.length ? sorted[Math.min(sorted.length - 1, Math.floor(q * sorted.length))] : 0;
+}
+
+function summarize(name, latencies, elapsedMs, extra = {}) {
+  return {
+    case: name,
+    pages: latencies.length,
+    'pages/s': (latencies.length / (elapsedMs / 1000)).toFixed(2),
+    'p50 ms': percentile(latencies, 0.5),
+    'p95 ms': percentile(latencies, 0.95),
+    recycled: '-',
+    blocked: '-',
+    'rss MB': '-',
+    'rss/ctx MB': '-',
+    'heap/ctx MB': '-',
+    ...extra,
+  };
+}
+
+async function runFresh(baseUrl, pages) {
+  const latencies = [];
+  const start = Date.now();
+  for (let n = 0; n < pages; n += 1) {
+    const pageStart = Date.now();
+    const browser = await launchBrowser({ args: N8N_LAUNCH_ARGS });
+    try {
+      const page = await browser.newPage();
+      await page.goto(`${baseUrl}/listing/${n}`, { waitUntil: 'load' });
+      await page.$$eval(SELECTORS.price, (els) => els.map((el) => el.textContent));
+    } finally {
+      await browser.close();
+    }
+    latencies.push(Date.now() - pageStart);
+  }
+  return summarize('fresh browser/page', latencies, Date.now() - start);
+}
+
+async function runPool(baseUrl, pages, size, block, maxNavigations) {
+  const browser = await launchBrowser({ args: LAUNCH_ARGS });
+  try {
+    const pool = await new ContextPool(browser, {
+      size, block, maxNavigations, blockHosts: [TRACKER_HOST], maxQueue: pages,
+    }).start();
+    const start = Date.now();
+    const results = await Promise.all(Array.from({ length: pages }, (_, n) => {
+      const submitted = Date.now();
+      return scrape(pool, parseJob({ url: `${baseUrl}/listing/${n}`, selectors: SELECTORS, waitUntil: 'load' }))
+        .then((result) => {
+          if (result.data.price.length !== 40) {
+            throw new Error(`Page ${n}: expected 40 prices, got ${result.data.price.length}`);
+          }
+          return Date.now() - submitted;
+        });
+    }));
+    const elapsed = Date.now() - start;
+    const snapshot = await pool.snapshot();
+    const heaps = snapshot.contexts.map((ctx) => ctx.jsHeapMb).filter((mb) => mb !== null);
+    await pool.close();
+    return summarize(`pool ${size}${block ? '' : ' unblocked'}`, results, elapsed, {
+      recycled: snapshot.recycled,
+      blocked: snapshot.blocked,
+      'rss MB': snapshot.browserRssMb ?? 'n/a',
+      'rss/ctx MB': snapshot.rssPerContextMb ?? 'n/a',
+      'heap/ctx MB': heaps.length ? (heaps.reduce((a, b) => a + b, 0) / heaps.length).toFixed(2) : 'n/a',
+    });
+  } finally {
+    await browser.close();
+  }
+}
+
+function printTable(title, rows) {
+  const columns = Object.keys(rows[0]);
+  const widths = columns.map((col) => Math.max(col.length, ...rows.map((row) => String(row[col]).length)));
+  const line = (cells) => cells.map((cell, i) => String(cell).padStart(widths[i])).join('  ');
+  console.log(`\n${title}`);
+  console.log(line(columns));
+  console.log(line(widths.map((w) => '-'.repeat(w))));
+  rows.forEach((row) => console.log(line(columns.map((col) => row[col]))));
+}
+
+async function main() {
+  const args = parseArgs(process.argv.slice(2));
+  const { server, baseUrl } = await startFixtureServer({ assetLatencyMs: args.assetLatency });
+  const rows = [];
+  try {
+    if (args.freshPages > 0) {
+      rows.push(await runFresh(baseUrl, args.freshPages));
+    }
+    for (const size of args.sizes) {
+      rows.push(await runPool(baseUrl, args.pages, size, true, args.maxNavigations));
+    }
+    const unblockedSize = args.sizes.includes(4) ? 4 : args.sizes[args.sizes.length - 1];
+    rows.push(await runPool(baseUrl, args.pages, unblockedSize, false, args.maxNavigations));
+  } finally {
+    server.close();
+  }
+  printTable(`Scraper: ${args.pages} pages/case (fresh: ${args.freshPages}), asset latency `
+    + `${args.assetLatency} ms, recycle after ${args.maxNavigations}`, rows);
+}
+
+main().catch((err) => {
+  console.error(err.stack || err);
+  process.exit(1);
+});
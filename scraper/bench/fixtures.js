@@ -0,0 +1,79 @@
+'use strict';
+/**
+ * Local listing pages for the benchmark: each page carries images, a web
+ * font, a stylesheet and a "tracker" script, all served with latency so the
+ * cost of loading them (or blocking them) shows up in pages/sec.
+ *
+ * Pages are served from 127.0.0.1; the tracker is loaded from localhost so
+ * it can be blocked by host (pass TRACKER_HOST in blockHosts).
+ */
+const http = require('http');
+
+const TRACKER_HOST = 'localhost';
+
+function listingPage(n, port, images) {
+  const items = Array.from({ length: 40 }, (_, i) => `
+    <li class="listing"><span class="address">${100 + i} Fixture St Unit ${n}</span>
+      <span class="price">$${1200 + i * 25}/mo</span><img src="/img/${n}-${i % images}.png" alt=""></li>`).join('');
+  return `<!DOCTYPE html>
+<html>
+<head>
+  <meta charset="utf-8">
+  <title>Listings page ${n}</title>
+  <link rel="stylesheet" href="/style.css">
+  <script src="http://${TRACKER_HOST}:${port}/collect.js" async></script>
+</head>
+<body>
+  <h1>Rentals near 45223 (page ${n})</h1>
+  <ul>${items}</ul>
+</body>
+</html>`;
+}
+
+/**
+ * @param {object} options
+ * @param {number} options.assetLatencyMs delay before each image/font/css/script reply
+ * @param {number} options.imageKb size of each image
+ * @param {number} options.images distinct images per page
+ * @returns {Promise<{server: http.Server, baseUrl: string, hits: object}>}
+ */
+function startFixtureServer({ assetLatencyMs = 30, imageKb = 40, images = 6 } = {}) {
+  const image = Buffer.alloc(imageKb * 1024, 7);
+  const font = Buffer.alloc(60 * 1024, 3);
+  const hits = { pages: 0, assets: 0, tracker: 0 };
+
+  const server = http.createServer((req, res) => {
+    const { port } = server.address();
+    const path = req.url.split('?')[0];
+    const page = path.match(/^\/listing\/(\d+)$/);
+    if (page) {
+      hits.pages += 1;
+      res.writeHead(200, { 'Content-Type': 'text/html' });
+      res.end(listingPage(Number(page[1]), port, images));
+      return;
+    }
+    const asset = {
+      '/style.css': ['text/css', '@font-face { font-family: F; src: url(/font.woff2); } body { font-family: F; }'],
+      '/font.woff2': ['font/woff2', font],
+      '/collect.js': ['application/javascript', 'window.__tracked = true;'],
+    }[path] || (path.startsWith('/img/') ? ['image/png', image] : null);
+    if (!asset) {
+      res.writeHead(404);
+      res.end();
+      return;
+    }
+    hits[path === '/collect.js' ? 'tracker' : 'assets'] += 1;
+    setTimeout(() => {
+      res.writeHead(200, { 'Content-Type': asset[0], 'Cache-Control': 'no-store' });
+      res.end(asset[1]);
+    }, assetLatencyMs);
+  });
+
+  return new Promise((resolve) => {
+    server.listen(0, '127.0.0.1', () => {
+      resolve({ server, baseUrl: `http://127.0.0.1:${server.address().port}`, hits });
+    });
+  });
+}
+
+module.exports = { TRACKER_HOST, startFixtureServer };
@@ -0,0 +1,52 @@
+'use strict';
+/**
+ * Request blocking for pooled pages: images, media, fonts and stylesheets
+ * never affect the text we extract, and tracker/ad hosts only add latency.
+ */
+
+const BLOCKED_RESOURCE_TYPES = new Set(['image', 'media', 'font', 'stylesheet', 'texttrack', 'eventsource', 'websocket']);
+
+const TRACKER_HOSTS = [
+  'google-analytics.com',
+  'googletagmanager.com',
+  'googlesyndication.com',
+  'doubleclick.net',
+  'facebook.net',
+  'connect.facebook.net',
+  'hotjar.com',
+  'segment.io',
+  'segment.com',
+  'newrelic.com',
+  'nr-data.net',
+  'quantserve.com',
+  'scorecardresearch.com',
+  'adsrvr.org',
+  'amazon-adsystem.com',
+  'criteo.com',
+  'taboola.com',
+  'outbrain.com',
+  'bing.com',
+  'clarity.ms',
+];
+
+/**
+ * @param {string[]} extraHosts hosts blocked in addition to TRACKER_HOSTS
+ * @returns {(request: import('puppeteer-core').HTTPRequest) => boolean}
+ */
+function createBlocker(extraHosts = []) {
+  const hosts = [...TRACKER_HOSTS, ...extraHosts];
+  return (request) => {
+    if (BLOCKED_RESOURCE_TYPES.has(request.resourceType())) {
+      return true;
+    }
+    let hostname;
+    try {
+      hostname = new URL(request.url()).hostname;
+    } catch {
+      return false;
+    }
+    return hosts.some((host) => hostname === host || hostname.endsWith(`.${host}`));
+  };
+}
+
+module.exports = { BLOCKED_RESOURCE_TYPES, TRACKER_HOSTS, createBlocker };
@@ -0,0 +1,33 @@
+'use strict';
+/**
+ * Chromium launch for the pool.
+ *
+ * Unlike the n8n Puppeteer nodes this runs Chromium multi-process (no
+ * --single-process / --no-zygote): contexts get their own renderers, so one
+ * hung page cannot stall the others, and /dev/shm is used for IPC instead of
+ * /tmp (--disable-dev-shm-usage is dropped; the container sets shm_size).
+ */
+const puppeteer = require('puppeteer-core');
+
+const LAUNCH_ARGS = [
+  '--no-sandbox',
+  '--disable-setuid-sandbox',
+  '--disable-gpu',
+  '--disable-extensions',
+  '--disable-background-networking',
+  '--disable-background-timer-throttling',
+  '--disable-renderer-backgrounding',
+  '--disable-backgrounding-occluded-windows',
+  '--disable-component-update',
+  '--disable-default-apps',
+  '--disable-sync',
+  '--metrics-recording-only',
+  '--mute-audio',
+  '--no-first-run',
+];
+
+async function launchBrowser({ executablePath = process.env.PUPPETEER_EXECUTABLE_PATH || '/usr/bin/chromium', args = LAUNCH_ARGS } = {}) {
+  return puppeteer.launch({ executablePath, headless: true, args });
+}
+
+module.exports = { LAUNCH_ARGS, launchBrowser };
@@ -0,0 +1,55 @@
+'use strict';
+/**
+ * Resident memory of the Chromium process tree, read from /proc (Linux only).
+ */
+const fs = require('fs');
+
+const PAGE_SIZE = 4096;
+
+function readStat(pid) {
+  try {
+    const stat = fs.readFileSync(`/proc/${pid}/stat`, 'utf8');
+    // Fields after the parenthesised command name: state ppid ... rss (24th overall)
+    const fields = stat.slice(stat.lastIndexOf(')') + 2).split(' ');
+    return { ppid: Number(fields[1]), rssBytes: Number(fields[21]) * PAGE_SIZE };
+  } catch {
+    return null;
+  }
+}
+
+/**
+ * @param {number} rootPid browser process id
+ * @returns {number|null} summed RSS of the process and all its descendants
+ */
+function processTreeRssBytes(rootPid) {
+  if (!rootPid || !fs.existsSync('/proc')) {
+    return null;
+  }
+  const children = new Map();
+  const rss = new Map();
+  for (const entry of fs.readdirSync('/proc')) {
+    if (!/^\d+$/.test(entry)) {
+      continue;
+    }
+    const stat = readStat(entry);
+    if (!stat) {
+      continue;
+    }
+    const pid = Number(entry);
+    rss.set(pid, stat.rssBytes);
+    if (!children.has(stat.ppid)) {
+      children.set(stat.ppid, []);
+    }
+    children.get(stat.ppid).push(pid);
+  }
+  let total = 0;
+  const pending = [rootPid];
+  while (pending.length) {
+    const pid = pending.pop();
+    total += rss.get(pid) || 0;
+    pending.push(...(children.get(pid) || []));
+  }
+  return total;
+}
+
+module.exports = { processTreeRssBytes };
@@ -0,0 +1,223 @@
+'use strict';
+/**
+ * Warm pool of incognito browser contexts sharing one Chromium process.
+ *
+ * Each slot is a context with one page that is reused across navigations
+ * (creating a page costs a renderer round trip; a context costs far less
+ * than a browser launch). Callers borrow a slot with run(); when every slot
+ * is busy they wait in FIFO order. A slot is recycled - context closed and
+ * replaced - after maxNavigations pages or after a failed navigation, which
+ * bounds the memory a long-lived context accumulates.
+ */
+const { createBlocker } = require('./blocking');
+const { processTreeRssBytes } = require('./memory');
+
+const RATE_WINDOW_MS = 60 * 1000;
+
+class QueueFullError extends Error {}
+
+class ContextPool {
+  /**
+   * @param {import('puppeteer-core').Browser} browser
+   * @param {object} options
+   * @param {number} options.size contexts kept warm
+   * @param {number} options.maxNavigations navigations before a context is recycled
+   * @param {boolean} options.block block images, media, fonts, stylesheets and trackers
+   * @param {string[]} options.blockHosts extra hosts to block
+   * @param {number} options.navigationTimeoutMs default page.goto timeout
+   * @param {number} options.maxQueue callers allowed to wait for a slot before run() rejects
+   */
+  constructor(browser, {
+    size = 4,
+    maxNavigations = 50,
+    block = true,
+    blockHosts = [],
+    navigationTimeoutMs = 30000,
+    maxQueue = 500,
+  } = {}) {
+    this.browser = browser;
+    this.size = size;
+    this.maxNavigations = maxNavigations;
+    this.block = block;
+    this.shouldBlock = createBlocker(blockHosts);
+    this.navigationTimeoutMs = navigationTimeoutMs;
+    this.maxQueue = maxQueue;
+    this.slots = [];
+    this.idle = [];
+    this.waiters = [];
+    this.inFlight = 0;
+    this.closed = false;
+    this.startedAt = Date.now();
+    this.completions = [];
+    this.stats = { pages: 0, failed: 0, recycled: 0, blocked: 0 };
+  }
+
+  async start() {
+    this.slots = await Promise.all(Array.from({ length: this.size }, (_, id) => this._createSlot(id, 0)));
+    this.idle = [...this.slots];
+    return this;
+  }
+
+  async _createSlot(id, generation) {
+    const context = await this.browser.createBrowserContext();
+    const page = await context.newPage();
+    const slot = { id, generation, context, page, navigations: 0, blocked: 0, createdAt: Date.now() };
+    page.setDefaultNavigationTimeout(this.navigationTimeoutMs);
+    if (this.block) {
+      await page.setRequestInterception(true);
+      page.on('request', (request) => {
+        if (request.isInterceptResolutionHandled()) {
+          return;
+        }
+        if (this.shouldBlock(request)) {
+          slot.blocked += 1;
+          this.stats.blocked += 1;
+          request.abort('blockedbyclient').catch(() => {});
+        } else {
+          request.continue().catch(() => {});
+        }
+      });
+    }
+    return slot;
+  }
+
+  _acquire() {
+    if (this.closed) {
+      return Promise.reject(new Error('Pool is closed'));
+    }
+    if (this.idle.length) {
+      return Promise.resolve(this.idle.pop());
+    }
+    if (this.waiters.length >= this.maxQueue) {
+      return Promise.reject(new QueueFullError(`${this.waiters.length} requests already queued`));
+    }
+    return new Promise((resolve) => this.waiters.push(resolve));
+  }
+
+  _release(slot) {
+    const waiter = this.waiters.shift();
+    if (waiter) {
+      waiter(slot);
+    } else {
+      this.idle.push(slot);
+    }
+  }
+
+  async _recycle(slot) {
+    await slot.context.close().catch(() => {});
+    this.stats.recycled += 1;
+    for (;;) {
+      try {
+        const fresh = await this._createSlot(slot.id, slot.generation + 1);
+        this.slots[slot.id] = fresh;
+        return fresh;
+      } catch (err) {
+        if (this.closed || !this.browser.connected) {
+          throw err;
+        }
+        console.error(`[SCRAPER] Recreating context ${slot.id} failed: ${err.message}`);
+        await new Promise((resolve) => setTimeout(resolve, 1000));
+      }
+    }
+  }
+
+  /**
+   * Borrow a warm page for one navigation.
+   *
+   * @template T
+   * @param {(page: import('puppeteer-core').Page, slot: object) => Promise<T>} fn
+   * @returns {Promise<T>}
+   */
+  async run(fn) {
+    const slot = await this._acquire();
+    this.inFlight += 1;
+    let ok = false;
+    try {
+      const result = await fn(slot.page, slot);
+      ok = true;
+      return result;
+    } finally {
+      this.inFlight -= 1;
+      slot.navigations += 1;
+      this.stats.pages += 1;
+      if (!ok) {
+        this.stats.failed += 1;
+      }
+      this._recordCompletion();
+      if (!ok || slot.navigations >= this.maxNavigations) {
+        // Replace the context off the request path; the slot rejoins the pool when ready
+        this._recycle(slot).then((fresh) => this._release(fresh), (err) => {
+          console.error(`[SCRAPER] Context ${slot.id} lost: ${err.message}`);
+        });
+      } else {
+        this._release(slot);
+      }
+    }
+  }
+
+  _recordCompletion() {
+    const now = Date.now();
+    this.completions.push(now);
+    while (this.completions.length && now - this.completions[0] > RATE_WINDOW_MS) {
+      this.completions.shift();
+    }
+  }
+
+  /** Pages per second, over the pool's lifetime and over the last minute */
+  rates() {
+    const now = Date.now();
+    const recent = this.completions.filter((t) => now - t <= RATE_WINDOW_MS).length;
+    const uptime = (now - this.startedAt) / 1000;
+    return {
+      pagesPerSec: uptime ? this.stats.pages / uptime : 0,
+      pagesPerSecLastMinute: recent / Math.min(RATE_WINDOW_MS / 1000, Math.max(uptime, 1)),
+    };
+  }
+
+  /** Throughput, queue depth and memory per context */
+  async snapshot() {
+    const contexts = await Promise.all(this.slots.map(async (slot) => {
+      let jsHeapBytes = null;
+      try {
+        jsHeapBytes = (await slot.page.metrics()).JSHeapUsedSize;
+      } catch {
+        // Page is mid-recycle
+      }
+      return {
+        id: slot.id,
+        generation: slot.generation,
+        navigations: slot.navigations,
+        blocked: slot.blocked,
+        ageSec: Math.round((Date.now() - slot.createdAt) / 1000),
+        busy: !this.idle.includes(slot),
+        jsHeapMb: jsHeapBytes === null ? null : round(jsHeapBytes / 2 ** 20),
+      };
+    }));
+    const process = this.browser.process();
+    const rssBytes = process ? processTreeRssBytes(process.pid) : null;
+    return {
+      size: this.size,
+      maxNavigations: this.maxNavigations,
+      blocking: this.block,
+      uptimeSec: Math.round((Date.now() - this.startedAt) / 1000),
+      inFlight: this.inFlight,
+      queued: this.waiters.length,
+      ...this.stats,
+      ...Object.fromEntries(Object.entries(this.rates()).map(([key, value]) => [key, round(value)])),
+      browserRssMb: rssBytes === null ? null : round(rssBytes / 2 ** 20),
+      rssPerContextMb: rssBytes === null ? null : round(rssBytes / 2 ** 20 / this.size),
+      contexts,
+    };
+  }
+
+  async close() {
+    this.closed = true;
+    await Promise.all(this.slots.map((slot) => slot.context.close().catch(() => {})));
+  }
+}
+
+function round(value) {
+  return Math.round(value * 100) / 100;
+}
+
+module.exports = { ContextPool, QueueFullError };
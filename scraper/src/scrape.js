@@ -0,0 +1,71 @@
+'use strict';
+/**
+ * One scrape job: navigate a pooled page and extract text by CSS selector.
+ */
+
+const WAIT_UNTIL = new Set(['load', 'domcontentloaded', 'networkidle0', 'networkidle2']);
+
+/**
+ * Validate a job from a request body; throws TypeError with a client-facing message.
+ */
+function parseJob(body) {
+  if (!body || typeof body !== 'object') {
+    throw new TypeError('Body must be a JSON object');
+  }
+  const { url, selectors = {}, waitUntil = 'domcontentloaded', timeoutMs, html = false } = body;
+  let parsed;
+  try {
+    parsed = new URL(url);
+  } catch {
+    throw new TypeError(`Invalid url: ${url}`);
+  }
+  if (!['http:', 'https:'].includes(parsed.protocol)) {
+    throw new TypeError(`Unsupported protocol: ${parsed.protocol}`);
+  }
+  if (typeof selectors !== 'object' || Array.isArray(selectors)
+      || !Object.values(selectors).every((selector) => typeof selector === 'string')) {
+    throw new TypeError('selectors must map field names to CSS selectors');
+  }
+  if (!WAIT_UNTIL.has(waitUntil)) {
+    throw new TypeError(`waitUntil must be one of ${[...WAIT_UNTIL].join(', ')}`);
+  }
+  if (timeoutMs !== undefined && !(Number.isFinite(timeoutMs) && timeoutMs > 0)) {
+    throw new TypeError('timeoutMs must be a positive number');
+  }
+  return { url: parsed.href, selectors, waitUntil, timeoutMs, html: Boolean(html) };
+}
+
+/**
+ * @param {import('./pool').ContextPool} pool
+ * @param {ReturnType<typeof parseJob>} job
+ */
+async function scrape(pool, job) {
+  const queuedAt = Date.now();
+  return pool.run(async (page, slot) => {
+    const startedAt = Date.now();
+    const response = await page.goto(job.url, {
+      waitUntil: job.waitUntil,
+      ...(job.timeoutMs ? { timeout: job.timeoutMs } : {}),
+    });
+    const title = await page.title();
+    const data = await page.evaluate((selectors) => Object.fromEntries(
+      Object.entries(selectors).map(([name, selector]) => [
+        name,
+        Array.from(document.querySelectorAll(selector), (el) => el.textContent.trim()),
+      ]),
+    ), job.selectors);
+    return {
+      url: job.url,
+      finalUrl: page.url(),
+      status: response ? response.status() : null,
+      title,
+      data,
+      ...(job.html ? { html: await page.content() } : {}),
+      context: slot.id,
+      queuedMs: startedAt - queuedAt,
+      elapsedMs: Date.now() - startedAt,
+    };
+  });
+}
+
+module.exports = { parseJob, scrape };
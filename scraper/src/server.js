@@ -0,0 +1,137 @@
+'use strict';
+/**
+ * HTTP front end of the scraping pool, for n8n HTTP Request nodes.
+ *
+ *   POST /scrape        {url, selectors?, waitUntil?, timeoutMs?, html?}
+ *   POST /scrape/batch  {jobs: [...]} -> results in order, errors per job
+ *   GET  /stats         pages/sec, queue depth, recycles, memory per context
+ *   GET  /health
+ *
+ * Configuration (environment): PORT, SCRAPER_POOL_SIZE,
+ * SCRAPER_MAX_NAVIGATIONS, SCRAPER_BLOCK, SCRAPER_BLOCK_HOSTS,
+ * SCRAPER_NAV_TIMEOUT_MS, SCRAPER_MAX_QUEUE, SCRAPER_MAX_BATCH,
+ * PUPPETEER_EXECUTABLE_PATH.
+ */
+const http = require('http');
+const { launchBrowser } = require('./browser');
+const { ContextPool, QueueFullError } = require('./pool');
+const { parseJob, scrape } = require('./scrape');
+
+const MAX_BODY_BYTES = 1024 * 1024;
+
+const config = {
+  port: Number(process.env.PORT || 3000),
+  size: Number(process.env.SCRAPER_POOL_SIZE || 4),
+  maxNavigations: Number(process.env.SCRAPER_MAX_NAVIGATIONS || 50),
+  block: !['0', 'false', 'no'].includes((process.env.SCRAPER_BLOCK || 'true').toLowerCase()),
+  blockHosts: (process.env.SCRAPER_BLOCK_HOSTS || '').split(',').map((host) => host.trim()).filter(Boolean),
+  navigationTimeoutMs: Number(process.env.SCRAPER_NAV_TIMEOUT_MS || 30000),
+  maxQueue: Number(process.env.SCRAPER_MAX_QUEUE || 500),
+  maxBatch: Number(process.env.SCRAPER_MAX_BATCH || 100),
+};
+
+function readJson(req) {
+  return new Promise((resolve, reject) => {
+    const chunks = [];
+    let size = 0;
+    req.on('data', (chunk) => {
+      size += chunk.length;
+      if (size > MAX_BODY_BYTES) {
+        reject(new TypeError('Body too large'));
+        req.destroy();
+        return;
+      }
+      chunks.push(chunk);
+    });
+    req.on('end', () => {
+      try {
+        resolve(JSON.parse(Buffer.concat(chunks).toString('utf8') || '{}'));
+      } catch {
+        reject(new TypeError('Body is not valid JSON'));
+      }
+    });
+    req.on('error', reject);
+  });
+}
+
+function send(res, status, body) {
+  const data = Buffer.from(JSON.stringify(body));
+  res.writeHead(status, { 'Content-Type': 'application/json', 'Content-Length': data.length });
+  res.end(data);
+}
+
+function errorStatus(err) {
+  if (err instanceof TypeError) {
+    return 400;
+  }
+  if (err instanceof QueueFullError) {
+    return 503;
+  }
+  return 502;
+}
+
+function createServer(pool) {
+  return http.createServer(async (req, res) => {
+    const path = new URL(req.url, 'http://localhost').pathname;
+    try {
+      if (req.method === 'GET' && path === '/health') {
+        send(res, 200, { status: 'ok', contexts: pool.slots.length });
+      } else if (req.method === 'GET' && path === '/stats') {
+        send(res, 200, await pool.snapshot());
+      } else if (req.method === 'POST' && path === '/scrape') {
+        send(res, 200, await scrape(pool, parseJob(await readJson(req))));
+      } else if (req.method === 'POST' && path === '/scrape/batch') {
+        const { jobs } = await readJson(req);
+        if (!Array.isArray(jobs) || jobs.length === 0 || jobs.length > config.maxBatch) {
+          throw new TypeError(`jobs must be a list of 1 to ${config.maxBatch} scrape jobs`);
+        }
+        const parsed = jobs.map(parseJob);
+        const settled = await Promise.allSettled(parsed.map((job) => scrape(pool, job)));
+        send(res, 200, {
+          results: settled.map((outcome, i) => (outcome.status === 'fulfilled'
+            ? outcome.value
+            : { url: parsed[i].url, error: outcome.reason.message })),
+        });
+      } else {
+        send(res, 404, { error: 'not found' });
+      }
+    } catch (err) {
+      send(res, errorStatus(err), { error: err.message });
+    }
+  });
+}
+
+async function main() {
+  const browser = await launchBrowser();
+  const pool = await new ContextPool(browser, config).start();
+  const server = createServer(pool);
+  browser.on('disconnected', () => {
+    if (!pool.closed) {
+      console.error('[SCRAPER] Browser exited; shutting down');
+      process.exit(1);
+    }
+  });
+
+  const shutdown = async () => {
+    server.close();
+    await pool.close();
+    await browser.close();
+    process.exit(0);
+  };
+  process.on('SIGTERM', shutdown);
+  process.on('SIGINT', shutdown);
+
+  server.listen(config.port, () => {
+    console.log(`[SCRAPER] ${config.size} contexts (recycle after ${config.maxNavigations} pages, `
+      + `blocking ${config.block ? 'on' : 'off'}) listening on :${config.port}`);
+  });
+}
+
+if (require.main === module) {
+  main().catch((err) => {
+    console.error(`[SCRAPER] ${err.stack || err}`);
+    process.exit(1);
+  });
+}
+
+module.exports = { createServer };
@@ -0,0 +1,37 @@
+# Analytics package
+#
+# Exports resolve on first access, so importing one helper does not pull in
+# numpy or cachetools for modules the caller never uses.
+import importlib
+
+_EXPORTS = {
+    'listing_filter_params': ('map_clusters', 'listing_filter_params'),
+    'fetch_listing_extent': ('map_clusters', 'fetch_listing_extent'),
+    'fetch_clusters': ('map_clusters', 'fetch_clusters'),
+    'fit_zoom': ('map_clusters', 'fit_zoom'),
+    'build_cluster_deck': ('map_clusters', 'build_cluster_deck'),
+    'MIN_MAP_ZOOM': ('map_clusters', 'MIN_MAP_ZOOM'),
+    'MAX_MAP_ZOOM': ('map_clusters', 'MAX_MAP_ZOOM'),
+    'TREND_GRANULARITIES': ('timeseries', 'GRANULARITIES'),
+    'ANOMALY_Z_THRESHOLD': ('timeseries', 'ANOMALY_Z_THRESHOLD'),
+    'rolling_mean': ('timeseries', 'rolling_mean'),
+    'pct_change': ('timeseries', 'pct_change'),
+    'zscore': ('timeseries', 'zscore'),
+    'seasonal_adjust': ('timeseries', 'seasonal_adjust'),
+    'get_zip_trends': ('timeseries', 'get_zip_trends'),
+    'UNIT_BUCKETS': ('unit_buckets', 'UNIT_BUCKETS'),
+    'fetch_unit_bucket_table': ('unit_buckets', 'fetch_unit_bucket_table'),
+    'REPORT_FORMATS': ('market_report', 'REPORT_FORMATS'),
+    'generate_market_reports': ('market_report', 'generate_reports'),
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, attribute = _EXPORTS[name]
+    value = getattr(importlib.import_module(f".{module_name}", __name__), attribute)
+    globals()[name] = value
+    return value
@@ -0,0 +1,270 @@
+"""
+Server-side map clustering for the Rental Market Dashboard.
+
+Listings are bucketed in PostgreSQL into geohash-aligned grid cells whose
+size follows the map zoom level, so the browser only receives one point per
+occupied cell regardless of how many listings match the filters.
+"""
+import math
+import sys
+import os
+from typing import List, Dict, Any, Optional
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import database
+from zillow.markets import markets_for_zips
+
+GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+# Smallest on-screen cell (in pixels) before switching to a coarser geohash
+MIN_CELL_PX = 40
+MAX_PRECISION = 9
+
+# Zoom range of the dashboard's zoom slider; fit_zoom() stays inside it
+MIN_MAP_ZOOM = 3
+MAX_MAP_ZOOM = 16
+
+# Map canvas size used to derive the visible bounding box
+VIEWPORT_WIDTH_PX = 1200
+VIEWPORT_HEIGHT_PX = 500
+
+# Shared WHERE clause for the Property Listings filters; the market predicate
+# lets the planner prune zillow_listings to the selected ZIPs' partitions
+LISTING_FILTER_SQL = """
+    market = ANY(%s)
+    AND zip_code = ANY(%s)
+    AND bedrooms = ANY(%s)
+    AND home_type = ANY(%s)
+    AND home_status = ANY(%s)
+    AND price >= %s
+    AND price <= %s
+"""
+
+
+def listing_filter_params(zips, beds, types, statuses, min_price, max_price) -> tuple:
+    """Build the parameter tuple matching LISTING_FILTER_SQL"""
+    return (markets_for_zips(zips), list(zips), list(beds), list(types), list(statuses), min_price, max_price)
+
+
+def geohash_cell_size(precision: int) -> tuple:
+    """
+    Return (lat_degrees, lon_degrees) covered by one geohash cell.
+
+    A geohash of length p interleaves 5p bits, longitude taking the extra bit
+    when the total is odd.
+    """
+    bits = 5 * precision
+    lon_bits = (bits + 1) // 2
+    lat_bits = bits // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits)
+
+
+def encode_geohash(lat: float, lon: float, precision: int) -> str:
+    """Encode a coordinate as a base32 geohash string"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bit = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        rng, coord = (lon_range, lon) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        if coord >= mid:
+            value = (value << 1) | 1
+            rng[0] = mid
+        else:
+            value <<= 1
+            rng[1] = mid
+        even = not even
+        bit += 1
+        if bit == 5:
+            chars.append(GEOHASH_BASE32[value])
+            bit = 0
+            value = 0
+    return "".join(chars)
+
+
+def degrees_per_pixel(zoom: float) -> float:
+    """Longitude degrees spanned by one pixel of a 256px Web Mercator tile"""
+    return 360.0 / (256 * 2 ** zoom)
+
+
+def precision_for_zoom(zoom: float) -> int:
+    """Pick the finest geohash precision whose cells stay at least MIN_CELL_PX wide"""
+    px_deg = degrees_per_pixel(zoom)
+    precision = 1
+    for candidate in range(1, MAX_PRECISION + 1):
+        _, lon_deg = geohash_cell_size(candidate)
+        if lon_deg / px_deg < MIN_CELL_PX:
+            break
+        precision = candidate
+    return precision
+
+
+def viewport_bounds(center_lat: float, center_lon: float, zoom: float,
+                    width_px: int = VIEWPORT_WIDTH_PX,
+                    height_px: int = VIEWPORT_HEIGHT_PX) -> Dict[str, float]:
+    """Approximate the lat/lon bounding box visible at a given center and zoom"""
+    half_width = degrees_per_pixel(zoom) * width_px / 2
+    half_height = half_width * (height_px / width_px) * math.cos(math.radians(center_lat))
+    return {
+        'min_lat': max(center_lat - half_height, -90.0),
+        'max_lat': min(center_lat + half_height, 90.0),
+        'min_lon': max(center_lon - half_width, -180.0),
+        'max_lon': min(center_lon + half_width, 180.0),
+    }
+
+
+def fetch_listing_extent(filter_params: tuple) -> Optional[Dict[str, Any]]:
+    """
+    Return the count, centroid and bounding box of all filtered listings.
+
+    Args:
+        filter_params: Tuple built by listing_filter_params()
+
+    Returns:
+        Dictionary with total, center and bounds, or None if nothing matches
+    """
+    query = f"""
+        SELECT
+            COUNT(*) as total,
+            AVG(latitude::float8) as center_lat,
+            AVG(longitude::float8) as center_lon,
+            MIN(latitude::float8) as min_lat,
+            MAX(latitude::float8) as max_lat,
+            MIN(longitude::float8) as min_lon,
+            MAX(longitude::float8) as max_lon
+        FROM zillow_listings
+        WHERE {LISTING_FILTER_SQL}
+            AND latitude IS NOT NULL
+            AND longitude IS NOT NULL
+    """
+    extent = database.fetch_one(query, filter_params)
+    if not extent or not extent['total']:
+        return None
+    return extent
+
+
+def fit_zoom(extent: Dict[str, Any],
+             width_px: int = VIEWPORT_WIDTH_PX,
+             height_px: int = VIEWPORT_HEIGHT_PX) -> float:
+    """Zoom level that fits the listing extent into the map canvas, within [MIN_MAP_ZOOM, MAX_MAP_ZOOM]"""
+    lon_span = max(extent['max_lon'] - extent['min_lon'], 1e-4)
+    lat_span = max(extent['max_lat'] - extent['min_lat'], 1e-4)
+    lat_scale = math.cos(math.radians(extent['center_lat']))
+    zoom_lon = math.log2(360.0 * width_px / (256 * lon_span))
+    zoom_lat = math.log2(360.0 * height_px * lat_scale / (256 * lat_span))
+    return float(max(MIN_MAP_ZOOM, min(zoom_lon, zoom_lat, MAX_MAP_ZOOM)))
+
+
+def fetch_clusters(filter_params: tuple, center_lat: float, center_lon: float,
+                   zoom: float) -> List[Dict[str, Any]]:
+    """
+    Aggregate filtered listings inside the viewport into geohash grid cells.
+
+    The bucketing happens in PostgreSQL, so the result size is bounded by the
+    number of visible cells rather than the number of listings.
+
+    Only the viewport_bounds() around (center_lat, center_lon) at this zoom
+    is clustered. Streamlit does not report pans back to the server, so
+    cells panned into view after zooming in past the fitted zoom stay empty.
+
+    Args:
+        filter_params: Tuple built by listing_filter_params()
+        center_lat: Map center latitude
+        center_lon: Map center longitude
+        zoom: Map zoom level
+
+    Returns:
+        List of cluster dictionaries with geohash, lat, lon, listing_count,
+        median_price and avg_price
+    """
+    precision = precision_for_zoom(zoom)
+    cell_lat, cell_lon = geohash_cell_size(precision)
+    bounds = viewport_bounds(center_lat, center_lon, zoom)
+
+    query = f"""
+        SELECT
+            FLOOR((longitude::float8 + 180) / %s)::BIGINT as cell_x,
+            FLOOR((latitude::float8 + 90) / %s)::BIGINT as cell_y,
+            COUNT(*) as listing_count,
+            AVG(latitude::float8) as lat,
+            AVG(longitude::float8) as lon,
+            PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY price) as median_price,
+            AVG(price)::float8 as avg_price
+        FROM zillow_listings
+        WHERE {LISTING_FILTER_SQL}
+            AND latitude BETWEEN %s AND %s
+            AND longitude BETWEEN %s AND %s
+        GROUP BY cell_x, cell_y
+    """
+    params = (cell_lon, cell_lat) + filter_params + (
+        bounds['min_lat'], bounds['max_lat'], bounds['min_lon'], bounds['max_lon']
+    )
+    clusters = database.fetch_data(query, params)
+
+    for cluster in clusters:
+        # Key each bucket by the geohash of its cell center
+        cell_center_lat = (cluster['cell_y'] + 0.5) * cell_lat - 90
+        cell_center_lon = (cluster['cell_x'] + 0.5) * cell_lon - 180
+        cluster['geohash'] = encode_geohash(cell_center_lat, cell_center_lon, precision)
+        cluster['listing_count'] = int(cluster['listing_count'])
+        cluster['median_price'] = float(cluster['median_price'] or 0)
+    return clusters
+
+
+def build_cluster_deck(clusters: List[Dict[str, Any]], center_lat: float,
+                       center_lon: float, zoom: float) -> 'pdk.Deck':
+    """
+    Render pre-aggregated clusters as scatter and text layers.
+
+    Both layers draw one glyph per cluster, so no client-side aggregation is
+    required.
+    """
+    # Imported here so only the clustered map view pays for pydeck
+    import pydeck as pdk
+
+    max_count = max((c['listing_count'] for c in clusters), default=1)
+    points = [
+        {
+            'geohash': c['geohash'],
+            'lat': c['lat'],
+            'lon': c['lon'],
+            'listing_count': c['listing_count'],
+            'label': str(c['listing_count']),
+            'median_price': f"${c['median_price']:,.0f}",
+            'radius': 8 + 24 * math.sqrt(c['listing_count'] / max_count),
+        }
+        for c in clusters
+    ]
+
+    scatter = pdk.Layer(
+        "ScatterplotLayer",
+        data=points,
+        get_position='[lon, lat]',
+        get_radius='radius',
+        radius_units='pixels',
+        get_fill_color=[255, 75, 75, 160],
+        get_line_color=[255, 255, 255],
+        line_width_min_pixels=1,
+        stroked=True,
+        pickable=True,
+    )
+    labels = pdk.Layer(
+        "TextLayer",
+        data=points,
+        get_position='[lon, lat]',
+        get_text='label',
+        get_size=12,
+        get_color=[255, 255, 255],
+        get_alignment_baseline="'center'",
+    )
+    return pdk.Deck(
+        layers=[scatter, labels],
+        initial_view_state=pdk.ViewState(latitude=center_lat, longitude=center_lon, zoom=zoom),
+        tooltip={"text": "{listing_count} listings\nMedian price: {median_price}\nCell: {geohash}"},
+        map_style=None,
+    )
@@ -0,0 +1,313 @@
+"""
+Weekly SOP market report for every tracked ZIP.
+
+For each row in zillow_zip_codes the report is the table from the rental
+data SOP: one row per unit-type bucket with the number of active (FOR_RENT)
+listings, the median days on market ("days ago") and the median asking rent.
+
+A run takes two statements however many ZIPs there are:
+  1. a version stamp per ZIP (listing count and newest updated_at), and
+  2. one grouped scan over zillow_listings for the ZIPs whose stamp changed.
+Reports are then rendered as Markdown, CSV and HTML on a thread pool
+(REPORT_WORKERS) and recorded in a manifest, so the next run skips ZIPs
+whose data has not changed. market_report.csv combines every ZIP.
+
+Usage (from the streamlit/ directory):
+    python -m analytics.market_report --out ../reports
+    python -m analytics.market_report --zip 45223 45220 --formats md --force
+"""
+import argparse
+import csv
+import html
+import io
+import json
+import sys
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Sequence
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from db import database
+from analytics.unit_buckets import UNIT_BUCKETS
+from zillow.markets import markets_for_zips
+
+REPORT_FORMATS = ('md', 'csv', 'html')
+MANIFEST_FILE = 'manifest.json'
+COMBINED_CSV_FILE = 'market_report.csv'
+
+# Part of every version stamp: bump when the table or rendering changes so
+# the next run re-renders every ZIP
+REPORT_LAYOUT_VERSION = 1
+
+CSV_COLUMNS = ['zip_code', 'unit_type', 'active_listings', 'median_days_ago', 'median_rent',
+               'data_as_of', 'generated_at']
+
+
+# ==============================================================================
+# Data
+# ==============================================================================
+
+def fetch_zip_versions(zip_codes: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Version stamp per tracked ZIP, from the listing count and newest update.
+
+    Returns:
+        Mapping of zip_code to {'version': str, 'data_as_of': datetime or None}
+    """
+    zip_filter = "WHERE z.zip_code = ANY(%s)" if zip_codes else ""
+    rows = database.fetch_data(f"""
+        SELECT z.zip_code, COUNT(l.id) as listings, MAX(l.updated_at) as last_updated
+        FROM zillow_zip_codes z
+        LEFT JOIN zillow_listings l ON l.market = z.market AND l.zip_code = z.zip_code
+        {zip_filter}
+        GROUP BY z.zip_code
+        ORDER BY z.zip_code
+    """, (list(zip_codes),) if zip_codes else None)
+    return {
+        row['zip_code']: {
+            'version': f"{REPORT_LAYOUT_VERSION}:{row['listings']}:"
+                       f"{row['last_updated'].isoformat() if row['last_updated'] else ''}",
+            'data_as_of': row['last_updated'],
+        }
+        for row in rows
+    }
+
+
+def fetch_report_tables(zip_codes: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    SOP table for each ZIP, from one grouped scan.
+
+    Returns:
+        Mapping of zip_code to one row per unit bucket, in SOP order; buckets
+        without active listings have a count of 0 and no medians
+    """
+    rows = database.fetch_data("""
+        SELECT
+            zip_code,
+            unit_bucket,
+            COUNT(*) as active_listings,
+            PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY days_on_market) as median_days_ago,
+            PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY price) as median_rent
+        FROM zillow_listings
+        WHERE home_status = 'FOR_RENT'
+            AND unit_bucket = ANY(%s)
+            AND market = ANY(%s)
+            AND zip_code = ANY(%s)
+        GROUP BY zip_code, unit_bucket
+    """, (list(UNIT_BUCKETS), markets_for_zips(zip_codes), list(zip_codes)))
+
+    found = {(row['zip_code'], row['unit_bucket']): row for row in rows}
+    tables = {}
+    for zip_code in zip_codes:
+        table = []
+        for bucket, label in UNIT_BUCKETS.items():
+            row = found.get((zip_code, bucket), {})
+            days, rent = row.get('median_days_ago'), row.get('median_rent')
+            table.append({
+                'unit_type': label,
+                'active_listings': int(row.get('active_listings', 0)),
+                'median_days_ago': round(float(days), 1) if days is not None else None,
+                'median_rent': int(round(float(rent))) if rent is not None else None,
+            })
+        tables[zip_code] = table
+    return tables
+
+
+# ==============================================================================
+# Rendering
+# ==============================================================================
+
+def _days(value: Optional[float]) -> str:
+    return f"{value:g}" if value is not None else "—"
+
+
+def _rent(value: Optional[int]) -> str:
+    return f"${value:,}" if value is not None else "—"
+
+
+def _as_of(report: Dict[str, Any]) -> str:
+    return report['data_as_of'] or "no listings"
+
+
+def render_markdown(report: Dict[str, Any]) -> str:
+    lines = [
+        f"# Rental Market Report: {report['zip_code']}",
+        "",
+        f"Generated {report['generated_at']} from Zillow listings (data as of {_as_of(report)}).",
+        "",
+        "| Property Type | Active Listings | Median Days Ago | Median Rent |",
+        "|---|---:|---:|---:|",
+    ]
+    for row in report['rows']:
+        lines.append(f"| {row['unit_type']} | {row['active_listings']} | "
+                     f"{_days(row['median_days_ago'])} | {_rent(row['median_rent'])} |")
+    return "\n".join(lines) + "\n"
+
+
+def _csv_rows(report: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{**row, 'zip_code': report['zip_code'], 'data_as_of': report['data_as_of'],
+             'generated_at': report['generated_at']} for row in report['rows']]
+
+
+def render_csv(*reports: Dict[str, Any]) -> str:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS)
+    writer.writeheader()
+    for report in reports:
+        writer.writerows(_csv_rows(report))
+    return buffer.getvalue()
+
+
+def render_html(report: Dict[str, Any]) -> str:
+    zip_code = html.escape(report['zip_code'])
+    body = "\n".join(
+        f"<tr><td>{html.escape(row['unit_type'])}</td><td>{row['active_listings']}</td>"
+        f"<td>{_days(row['median_days_ago'])}</td><td>{html.escape(_rent(row['median_rent']))}</td></tr>"
+        for row in report['rows']
+    )
+    return f"""<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>Rental Market Report: {zip_code}</title></head>
+<body>
+<h1>Rental Market Report: {zip_code}</h1>
+<p>Generated {html.escape(report['generated_at'])} from Zillow listings (data as of {html.escape(_as_of(report))}).</p>
+<table>
+<thead><tr><th>Property Type</th><th>Active Listings</th><th>Median Days Ago</th><th>Median Rent</th></tr></thead>
+<tbody>
+{body}
+</tbody>
+</table>
+</body>
+</html>
+"""
+
+
+RENDERERS = {
+    'md': render_markdown,
+    'csv': render_csv,
+    'html': render_html,
+}
+
+
+# ==============================================================================
+# Output
+# ==============================================================================
+
+def _write_atomic(path: str, content: str) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def _write_report(out_dir: str, report: Dict[str, Any], fmt: str) -> str:
+    path = os.path.join(out_dir, f"{report['zip_code']}.{fmt}")
+    _write_atomic(path, RENDERERS[fmt](report))
+    return path
+
+
+def load_manifest(out_dir: str) -> Dict[str, Any]:
+    try:
+        with open(os.path.join(out_dir, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _is_current(entry: Optional[Dict[str, Any]], version: str, out_dir: str, formats: Sequence[str]) -> bool:
+    return bool(entry) and entry['version'] == version and all(
+        os.path.exists(os.path.join(out_dir, f"{entry['zip_code']}.{fmt}")) for fmt in formats
+    )
+
+
+def write_combined_csv(out_dir: str, manifest: Dict[str, Any]) -> str:
+    """All ZIPs in one CSV (for the Market Leasing Dashboard sheet)"""
+    content = render_csv(*(manifest[zip_code] for zip_code in sorted(manifest)))
+    path = os.path.join(out_dir, COMBINED_CSV_FILE)
+    _write_atomic(path, content)
+    return path
+
+
+def generate_reports(out_dir: Optional[str] = None, formats: Sequence[str] = REPORT_FORMATS,
+                     zip_codes: Optional[List[str]] = None, force: bool = False) -> Dict[str, Any]:
+    """
+    Write the SOP report of every tracked ZIP whose data changed since the last run.
+
+    Args:
+        out_dir: Output directory (default: settings.REPORT_DIR)
+        formats: Any of 'md', 'csv', 'html'
+        zip_codes: Only these ZIPs (default: every row in zillow_zip_codes)
+        force: Re-render even if the data version is unchanged
+
+    Returns:
+        Counts of ZIPs rendered and skipped, files written and elapsed seconds
+    """
+    out_dir = out_dir or settings.REPORT_DIR
+    unknown = set(formats) - set(RENDERERS)
+    if unknown:
+        raise ValueError(f"Unknown report format(s): {', '.join(sorted(unknown))}")
+    os.makedirs(out_dir, exist_ok=True)
+    start = time.perf_counter()
+
+    versions = fetch_zip_versions(zip_codes)
+    manifest = load_manifest(out_dir)
+    stale = [
+        zip_code for zip_code, stamp in versions.items()
+        if force or not _is_current(manifest.get(zip_code), stamp['version'], out_dir, formats)
+    ]
+    tables = fetch_report_tables(stale) if stale else {}
+
+    generated_at = datetime.now().strftime("%Y-%m-%d %H:%M")
+    reports = [{
+        'zip_code': zip_code,
+        'version': versions[zip_code]['version'],
+        'data_as_of': versions[zip_code]['data_as_of'].strftime("%Y-%m-%d %H:%M")
+                      if versions[zip_code]['data_as_of'] else None,
+        'generated_at': generated_at,
+        'rows': tables[zip_code],
+    } for zip_code in stale]
+
+    with ThreadPoolExecutor(max_workers=settings.REPORT_WORKERS, thread_name_prefix="report") as pool:
+        paths = list(pool.map(
+            lambda job: _write_report(out_dir, *job),
+            [(report, fmt) for report in reports for fmt in formats]
+        ))
+
+    for report in reports:
+        manifest[report['zip_code']] = report
+    if zip_codes is None:
+        # ZIPs no longer tracked drop out of the combined CSV
+        manifest = {zip_code: entry for zip_code, entry in manifest.items() if zip_code in versions}
+    _write_atomic(os.path.join(out_dir, MANIFEST_FILE), json.dumps(manifest, indent=2))
+    if reports or not os.path.exists(os.path.join(out_dir, COMBINED_CSV_FILE)):
+        write_combined_csv(out_dir, manifest)
+
+    return {
+        'zip_codes': len(versions),
+        'rendered': len(reports),
+        'skipped': len(versions) - len(reports),
+        'files': len(paths),
+        'seconds': round(time.perf_counter() - start, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write the SOP market report for every tracked ZIP")
+    parser.add_argument("--out", default=settings.REPORT_DIR, help="Output directory")
+    parser.add_argument("--formats", nargs="+", choices=REPORT_FORMATS, default=list(REPORT_FORMATS))
+    parser.add_argument("--zip", nargs="+", dest="zip_codes", help="Only these ZIP codes")
+    parser.add_argument("--force", action="store_true", help="Re-render unchanged ZIPs too")
+    args = parser.parse_args()
+
+    summary = generate_reports(args.out, args.formats, args.zip_codes, args.force)
+    print(f"[REPORT] {summary['rendered']} ZIP(s) rendered, {summary['skipped']} unchanged, "
+          f"{summary['files']} file(s) in {summary['seconds']}s -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""
+Rolling-window and time-series analytics over zillow_metrics_aggregated.
+
+Aggregate rows are loaded per ZIP into date-indexed NumPy arrays with one
+slot per period (gaps are NaN), then rolling means, period-over-period
+change, z-score anomaly flags and seasonality-adjusted DOM are computed in
+vectorized form across all ZIPs at once. Results are cached per
+(zip, granularity, unit type, data version), so a ZIP is only recomputed
+after new aggregates land for it.
+"""
+import sys
+import os
+import threading
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+from cachetools import LRUCache
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import database
+
+# granularity -> (numpy unit, step in that unit, season length, rolling window)
+GRANULARITIES = {
+    'daily': ('D', 1, 7, 7),
+    'weekly': ('D', 7, 52, 4),
+    'monthly': ('M', 1, 12, 3),
+    'quarterly': ('M', 3, 4, 4),
+}
+
+METRICS = ('median_rent', 'avg_rent', 'avg_dom', 'total_listings', 'new_listings')
+
+ANOMALY_Z_THRESHOLD = 2.0
+
+_cache = LRUCache(maxsize=512)
+_cache_lock = threading.Lock()
+
+
+# ==============================================================================
+# Vectorized primitives (operate along the last axis, NaN-aware)
+# ==============================================================================
+
+def rolling_mean(values: np.ndarray, window: int, min_periods: int = 1) -> np.ndarray:
+    """Trailing rolling mean ignoring NaNs, via cumulative sums"""
+    valid = ~np.isnan(values)
+    filled = np.where(valid, values, 0.0)
+    pad = [(0, 0)] * (values.ndim - 1) + [(1, 0)]
+    csum = np.cumsum(np.pad(filled, pad), axis=-1)
+    ccount = np.cumsum(np.pad(valid.astype(float), pad), axis=-1)
+    n = values.shape[-1]
+    lower = np.clip(np.arange(1, n + 1) - window, 0, None)
+    upper = np.arange(1, n + 1)
+    sums = csum[..., upper] - csum[..., lower]
+    counts = ccount[..., upper] - ccount[..., lower]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        result = sums / counts
+    return np.where(counts >= min_periods, result, np.nan)
+
+
+def rolling_std(values: np.ndarray, window: int, min_periods: int = 2) -> np.ndarray:
+    """Trailing rolling population standard deviation ignoring NaNs"""
+    mean = rolling_mean(values, window, min_periods)
+    mean_sq = rolling_mean(values ** 2, window, min_periods)
+    return np.sqrt(np.clip(mean_sq - mean ** 2, 0, None))
+
+
+def pct_change(values: np.ndarray, periods: int = 1) -> np.ndarray:
+    """Percentage change versus 'periods' slots earlier (NaN where undefined)"""
+    shifted = np.full_like(values, np.nan)
+    shifted[..., periods:] = values[..., :-periods]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        change = (values - shifted) / np.abs(shifted) * 100
+    return np.where(np.isfinite(change), change, np.nan)
+
+
+def zscore(values: np.ndarray, window: int) -> np.ndarray:
+    """Z-score of each point against the trailing window that precedes it"""
+    prior = np.full_like(values, np.nan)
+    prior[..., 1:] = values[..., :-1]
+    mean = rolling_mean(prior, window, min_periods=2)
+    std = rolling_std(prior, window, min_periods=2)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        z = (values - mean) / std
+    return np.where(np.isfinite(z), z, np.nan)
+
+
+def seasonal_adjust(values: np.ndarray, season_index: np.ndarray, season_length: int) -> np.ndarray:
+    """
+    Remove the average seasonal offset from each series.
+
+    Each slot's season (e.g. month of year) gets the mean deviation of that
+    season from the series mean; the adjusted value subtracts it. Seasons
+    observed fewer than twice (less than two full cycles) are left as is.
+    """
+    values_2d = np.atleast_2d(values)
+    rows = values_2d.shape[0]
+    valid = ~np.isnan(values_2d)
+    series_mean = np.nanmean(np.where(valid, values_2d, np.nan), axis=1, keepdims=True)
+    deviation = np.where(valid, values_2d - series_mean, 0.0)
+
+    flat_index = (np.arange(rows)[:, None] * season_length + season_index[None, :]).ravel()
+    sums = np.bincount(flat_index, weights=deviation.ravel(), minlength=rows * season_length)
+    counts = np.bincount(flat_index, weights=valid.ravel().astype(float), minlength=rows * season_length)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        offsets = np.where(counts >= 2, sums / counts, 0.0).reshape(rows, season_length)
+
+    adjusted = values_2d - offsets[np.arange(rows)[:, None], season_index[None, :]]
+    return adjusted.reshape(values.shape)
+
+
+# ==============================================================================
+# Loading
+# ==============================================================================
+
+def _period_index(dates: np.ndarray, granularity: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Full, gap-free period index covering dates, plus the slot of each date"""
+    unit, step, _, _ = GRANULARITIES[granularity]
+    as_unit = dates.astype(f'datetime64[{unit}]')
+    start, end = as_unit.min(), as_unit.max()
+    index = np.arange(start, end + np.timedelta64(step, unit), np.timedelta64(step, unit))
+    slots = ((as_unit - start) // np.timedelta64(step, unit)).astype(int)
+    return index, slots
+
+
+def _season_index(index: np.ndarray, granularity: str) -> np.ndarray:
+    if granularity == 'daily':
+        # 1970-01-01 was a Thursday; shift so Monday = 0
+        return ((index.astype('datetime64[D]').astype(int) + 3) % 7).astype(int)
+    if granularity == 'weekly':
+        day_of_year = (index.astype('datetime64[D]') - index.astype('datetime64[Y]')).astype(int)
+        return np.minimum(day_of_year // 7, 51)
+    months = index.astype('datetime64[M]').astype(int) % 12
+    return months if granularity == 'monthly' else months // 3
+
+
+def data_versions(zip_codes: List[str], granularity: str) -> Dict[str, str]:
+    """Cheap per-ZIP version stamp: last update time and row count"""
+    rows = database.fetch_data("""
+        SELECT zip_code, MAX(updated_at) as last_updated, COUNT(*) as row_count
+        FROM zillow_metrics_aggregated
+        WHERE zip_code = ANY(%s) AND aggregation_type = %s
+        GROUP BY zip_code
+    """, (list(zip_codes), granularity))
+    return {row['zip_code']: f"{row['last_updated']}:{row['row_count']}" for row in rows}
+
+
+def load_rows(zip_codes: List[str], granularity: str, unit_buckets: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """
+    One row per (zip, period), combining dimension rows weighted by listing count.
+    """
+    bucket_filter = "AND unit_bucket = ANY(%s)" if unit_buckets else ""
+    params = (list(zip_codes), granularity) + ((list(unit_buckets),) if unit_buckets else ())
+    return database.fetch_data(f"""
+        SELECT
+            zip_code,
+            period_start_date,
+            (SUM(median_price * total_listings) / NULLIF(SUM(total_listings), 0))::float8 as median_rent,
+            (SUM(average_price * total_listings) / NULLIF(SUM(total_listings), 0))::float8 as avg_rent,
+            (SUM(average_days_on_market * total_listings) / NULLIF(SUM(total_listings), 0))::float8 as avg_dom,
+            SUM(total_listings)::float8 as total_listings,
+            SUM(new_listings)::float8 as new_listings
+        FROM zillow_metrics_aggregated
+        WHERE zip_code = ANY(%s) AND aggregation_type = %s {bucket_filter}
+        GROUP BY zip_code, period_start_date
+        ORDER BY zip_code, period_start_date
+    """, params)
+
+
+def build_matrix(rows: List[Dict[str, Any]], zip_codes: List[str], granularity: str) -> Dict[str, Any]:
+    """Scatter rows into (n_zips, n_periods) arrays on a shared period index"""
+    dates = np.array([np.datetime64(row['period_start_date'], 'D') for row in rows])
+    index, slots = _period_index(dates, granularity)
+    row_of_zip = {zip_code: i for i, zip_code in enumerate(zip_codes)}
+    zip_rows = np.array([row_of_zip[row['zip_code']] for row in rows])
+
+    matrix = {'dates': index.astype('datetime64[D]'), 'zip_codes': list(zip_codes)}
+    for metric in METRICS:
+        values = np.full((len(zip_codes), len(index)), np.nan)
+        values[zip_rows, slots] = [np.nan if row[metric] is None else row[metric] for row in rows]
+        matrix[metric] = values
+    return matrix
+
+
+def compute_trends(matrix: Dict[str, Any], granularity: str) -> Dict[str, Any]:
+    """Add rolling, change, anomaly and seasonal-adjustment arrays to a matrix"""
+    _, _, season_length, window = GRANULARITIES[granularity]
+    result = dict(matrix)
+    for metric in ('median_rent', 'avg_dom', 'total_listings'):
+        values = matrix[metric]
+        result[f'{metric}_rolling'] = rolling_mean(values, window)
+        result[f'{metric}_pct_change'] = pct_change(values, 1)
+        z = zscore(values, window * 2)
+        result[f'{metric}_zscore'] = z
+        result[f'{metric}_anomaly'] = np.abs(np.nan_to_num(z)) >= ANOMALY_Z_THRESHOLD
+
+    # Week-over-week / month-over-month regardless of the loaded granularity
+    if granularity == 'daily':
+        result['median_rent_wow'] = pct_change(matrix['median_rent'], 7)
+        result['median_rent_mom'] = pct_change(matrix['median_rent'], 30)
+    elif granularity == 'weekly':
+        result['median_rent_wow'] = pct_change(matrix['median_rent'], 1)
+        result['median_rent_mom'] = pct_change(matrix['median_rent'], 4)
+    elif granularity == 'monthly':
+        result['median_rent_mom'] = pct_change(matrix['median_rent'], 1)
+
+    result['avg_dom_seasonal_adjusted'] = seasonal_adjust(
+        matrix['avg_dom'], _season_index(matrix['dates'], granularity), season_length
+    )
+    return result
+
+
+# ==============================================================================
+# Cached entry point
+# ==============================================================================
+
+def _slice_zip(trends: Dict[str, Any], row: int) -> Dict[str, Any]:
+    series = {}
+    for key, value in trends.items():
+        if isinstance(value, np.ndarray) and value.ndim == 2:
+            series[key] = value[row]
+        elif key != 'zip_codes':
+            series[key] = value
+    return series
+
+
+def get_zip_trends(zip_codes: List[str], granularity: str = 'weekly',
+                   unit_buckets: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Trend analytics per ZIP, each on its own date index.
+
+    Only ZIPs whose data version changed (or that were never computed) are
+    loaded and recomputed, together in one query.
+
+    Returns:
+        {zip_code: {'dates': ..., 'median_rent': ..., 'median_rent_rolling': ..., ...}}
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unsupported granularity: {granularity}")
+    unit_key = tuple(sorted(unit_buckets)) if unit_buckets else ()
+    versions = data_versions(zip_codes, granularity)
+
+    results = {}
+    misses = []
+    with _cache_lock:
+        for zip_code, version in versions.items():
+            cached = _cache.get((zip_code, granularity, unit_key, version))
+            if cached is not None:
+                results[zip_code] = cached
+            else:
+                misses.append(zip_code)
+
+    if misses:
+        rows = load_rows(misses, granularity, unit_buckets)
+        loaded = sorted({row['zip_code'] for row in rows})
+        if loaded:
+            trends = compute_trends(build_matrix(rows, loaded, granularity), granularity)
+            with _cache_lock:
+                for i, zip_code in enumerate(loaded):
+                    series = _slice_zip(trends, i)
+                    # Trim the shared index back to this ZIP's own span
+                    present = ~np.isnan(series['total_listings'])
+                    first, last = np.argmax(present), len(present) - np.argmax(present[::-1])
+                    series = {
+                        k: (v[first:last] if isinstance(v, np.ndarray) else v)
+                        for k, v in series.items()
+                    }
+                    _cache[(zip_code, granularity, unit_key, versions[zip_code])] = series
+                    results[zip_code] = series
+    return results
+
+
+def clear_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
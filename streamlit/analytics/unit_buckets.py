@@ -0,0 +1,65 @@
+"""
+SOP unit-type buckets.
+
+zillow_listings.unit_bucket is a stored generated column (see
+schema/zillow.sql), and the 'unit_bucket' block of populate_zillow_metrics.sql
+keeps one aggregate row per (zip_code, unit_bucket), so the SOP table is read
+straight from idx_metrics_unit_bucket instead of re-deriving buckets with CASE
+logic over home_type/bedrooms on every query.
+"""
+import sys
+import os
+from typing import List, Dict, Any, Optional
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import database
+
+# Bucket key -> display label, in SOP order
+UNIT_BUCKETS = {
+    'apt_0_1br': '0–1 BR Apartment',
+    'apt_2br': '2 BR Apartment',
+    'apt_3plus_br': '3+ BR Apartment',
+    'house_1_2br': '1–2 BR House/Townhouse',
+    'house_3br': '3 BR House/Townhouse',
+    'house_4plus_br': '4+ BR House/Townhouse',
+}
+
+
+def fetch_unit_bucket_table(zip_codes: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Latest SOP unit-type metrics per (zip_code, unit_bucket).
+
+    Args:
+        zip_codes: Restrict to these ZIPs (default: all)
+
+    Returns:
+        Rows in ZIP then SOP bucket order, with a 'unit_label' added
+    """
+    zip_filter = "AND zip_code = ANY(%s)" if zip_codes else ""
+    params = (list(UNIT_BUCKETS),) + ((list(zip_codes),) if zip_codes else ())
+    rows = database.fetch_data(f"""
+        SELECT DISTINCT ON (zip_code, unit_bucket)
+            zip_code,
+            unit_bucket,
+            period_start_date,
+            total_listings,
+            active_listings,
+            new_listings,
+            median_price,
+            average_price,
+            median_price_per_sqft,
+            median_days_on_market,
+            average_days_on_market
+        FROM zillow_metrics_aggregated
+        WHERE aggregation_type = 'unit_bucket'
+            AND unit_bucket = ANY(%s) {zip_filter}
+        ORDER BY zip_code, unit_bucket, period_start_date DESC
+    """, params)
+
+    order = {bucket: i for i, bucket in enumerate(UNIT_BUCKETS)}
+    rows.sort(key=lambda row: (row['zip_code'], order[row['unit_bucket']]))
+    for row in rows:
+        row['unit_label'] = UNIT_BUCKETS[row['unit_bucket']]
+    return rows
@@ -1,12 +1,15 @@
 """
-Basic authentication system for the Streamlit app
+Authentication for the Streamlit app: users live in Postgres (auth.users)
+and a login is carried by a signed session token (auth.sessions), so the
+check on every rerun is served from memory.
+
+auth.users and auth.sessions are imported inside the methods that need
+them, so rendering the login page does not load psycopg2 or argon2.
 """
 import streamlit as st
-import hashlib
-import time
 
 class Authentication:
-    """Simple session-based authentication"""
+    """Session-based authentication backed by app_users / app_sessions"""
     
     def __init__(self):
         # Initialize session state
@@ -15,10 +18,6 @@ class Authentication:
         if 'username' not in st.session_state:
             st.session_state.username = None
     
-    def hash_password(self, password: str) -> str:
-        """Simple password hashing (use proper hashing in production)"""
-        return hashlib.sha256(password.encode()).hexdigest()
-    
     def login_form(self):
         """Display login form"""
         st.subheader("🔐 Login to Chat Hub")
@@ -29,14 +28,16 @@ class Authentication:
             submitted = st.form_submit_button("Login")
             
             if submitted:
-                # Simple authentication (replace with database check)
+                username = username.strip()
                 if self.authenticate_user(username, password):
+                    from .sessions import issue_token
+                    st.session_state.auth_token = issue_token(username)
                     st.session_state.authenticated = True
                     st.session_state.username = username
-                    st.success("Login successful!")
-                    time.sleep(1)
+                    self._audit('login', username)
                     st.rerun()
                 else:
+                    self._audit('login_failed', username)
                     st.error("Invalid username or password")
     
     def register_form(self):
@@ -51,7 +52,9 @@ class Authentication:
             submitted = st.form_submit_button("Register")
             
             if submitted:
-                if password != confirm_password:
+                if not username.strip():
+                    st.error("Please choose a username")
+                elif password != confirm_password:
                     st.error("Passwords don't match")
                 elif len(password) < 6:
                     st.error("Password must be at least 6 characters")
@@ -61,24 +64,49 @@ class Authentication:
                     st.error("Username already exists")
     
     def authenticate_user(self, username: str, password: str) -> bool:
-        """Authenticate user (placeholder - replace with database check)"""
-        # Temporary: Allow any user with password 'demo123'
-        return password == 'demo123'
+        """Check credentials against app_users (argon2, at most AUTH_HASH_WORKERS at once)"""
+        from .users import verify_user
+        try:
+            return verify_user(username, password)
+        except Exception as e:
+            # Database down or misconfigured: fail the login like bad credentials
+            print(f"[AUTH] Login check for '{username}' failed: {str(e)}")
+            return False
     
     def register_user(self, username: str, email: str, password: str) -> bool:
-        """Register new user (placeholder - replace with database insert)"""
-        # Placeholder implementation
-        return True
+        """Create a user; False if the username is taken"""
+        from .users import create_user
+        return create_user(username.strip(), email.strip(), password)
+    
+    def _audit(self, event_type: str, username: str):
+        """Queue an audit event (write-behind, never blocks the rerun on the database)"""
+        # Imported here so the login page does not load psycopg2 up front
+        from events import emit_event
+        emit_event(event_type, username=username or None, session_id=st.session_state.get('session_id'))
     
     def logout(self):
         """Logout current user"""
+        from .sessions import revoke_token
+        self._audit('logout', self.get_username())
+        revoke_token(st.session_state.get('auth_token'))
+        self._clear_session()
+        st.rerun()
+    
+    def _clear_session(self):
         st.session_state.authenticated = False
         st.session_state.username = None
-        st.rerun()
+        st.session_state.auth_token = None
     
     def is_authenticated(self) -> bool:
-        """Check if user is authenticated"""
-        return st.session_state.get('authenticated', False)
+        """Check if user is authenticated (token validated from cache, no DB hit per rerun)"""
+        if not st.session_state.get('authenticated', False):
+            return False
+        from .sessions import validate_token
+        if validate_token(st.session_state.get('auth_token'), st.session_state.get('username')):
+            return True
+        # Expired, revoked or deactivated: back to the login form
+        self._clear_session()
+        return False
     
     def get_username(self) -> str:
         """Get current username"""
@@ -0,0 +1,110 @@
+"""
+Signed login tokens (table: app_sessions, see schema/auth.sql).
+
+A token is "<token_id>.<expires>.<signature>", the signature an HMAC-SHA256
+over the id, the username and the expiry. Validation checks the signature
+and expiry in memory, then asks a TTL cache whether the session is still
+live; only a cache miss (at most once per AUTH_TOKEN_CACHE_TTL per session)
+reads app_sessions. The per-rerun auth check therefore never waits on the
+database in the common case.
+
+Without AUTH_SECRET_KEY a random key is drawn per process. Streamlit
+session state does not outlive the process either, so that only matters
+when tokens must be checked by more than one process.
+"""
+import hashlib
+import hmac
+import secrets
+import sys
+import os
+import threading
+import time
+from typing import Optional, Tuple
+
+from cachetools import TTLCache
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from db import database
+
+_secret = settings.AUTH_SECRET_KEY.encode('utf-8') or secrets.token_bytes(32)
+
+# token_id -> whether the session is live
+_valid: TTLCache = TTLCache(maxsize=settings.AUTH_TOKEN_CACHE_SIZE, ttl=settings.AUTH_TOKEN_CACHE_TTL)
+_valid_lock = threading.Lock()
+
+
+def _sign(token_id: str, username: str, expires: int) -> str:
+    message = f"{token_id}.{username}.{expires}".encode('utf-8')
+    return hmac.new(_secret, message, hashlib.sha256).hexdigest()
+
+
+def _parse(token: str) -> Optional[Tuple[str, int, str]]:
+    try:
+        token_id, expires, signature = token.split('.')
+        return token_id, int(expires), signature
+    except (AttributeError, ValueError):
+        return None
+
+
+def issue_token(username: str) -> str:
+    """Start a session for an authenticated user and return its token"""
+    token_id = secrets.token_urlsafe(16)
+    expires = int(time.time() + settings.AUTH_SESSION_HOURS * 3600)
+    with database.get_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("""
+                INSERT INTO app_sessions (token_id, username, expires_at)
+                VALUES (%s, %s, to_timestamp(%s))
+            """, (token_id, username, expires))
+            cur.execute("UPDATE app_users SET last_login_at = now() WHERE username = %s", (username,))
+    with _valid_lock:
+        _valid[token_id] = True
+    return f"{token_id}.{expires}.{_sign(token_id, username, expires)}"
+
+
+def validate_token(token: Optional[str], username: Optional[str]) -> bool:
+    """True if the token was issued to username, has not expired and was not revoked"""
+    parsed = _parse(token) if token and username else None
+    if parsed is None:
+        return False
+    token_id, expires, signature = parsed
+    if expires < time.time() or not hmac.compare_digest(signature, _sign(token_id, username, expires)):
+        return False
+
+    with _valid_lock:
+        cached = _valid.get(token_id)
+    if cached is not None:
+        return cached
+
+    row = database.fetch_one("""
+        SELECT 1 as live
+        FROM app_sessions s
+        JOIN app_users u ON u.username = s.username
+        WHERE s.token_id = %s
+          AND s.username = %s
+          AND s.revoked_at IS NULL
+          AND s.expires_at > now()
+          AND u.is_active
+    """, (token_id, username))
+    live = row is not None
+    with _valid_lock:
+        _valid[token_id] = live
+    return live
+
+
+def revoke_token(token: Optional[str]) -> None:
+    """End a session (logout)"""
+    parsed = _parse(token) if token else None
+    if parsed is None:
+        return
+    token_id = parsed[0]
+    with _valid_lock:
+        _valid[token_id] = False
+    database.execute_query(
+        "UPDATE app_sessions SET revoked_at = now() WHERE token_id = %s AND revoked_at IS NULL",
+        (token_id,)
+    )
+
@@ -0,0 +1,141 @@
+"""
+User store (table: app_users, see schema/auth.sql).
+
+Passwords are hashed with argon2id, which is slow and memory-hard by design.
+The hash runs on the caller's thread, so a login rerun waits for it; at
+most AUTH_HASH_WORKERS hashes run at once across the process, which bounds
+the CPU and memory a burst of logins can take. argon2 releases the GIL, so
+other sessions' reruns keep going meanwhile.
+
+Usage (from the streamlit/ directory):
+    python -m auth.users set-password alice --email alice@example.com
+    python -m auth.users deactivate alice
+"""
+import argparse
+import getpass
+import sys
+import os
+import threading
+from typing import Dict, Any, Optional
+
+from argon2 import PasswordHasher
+from argon2.exceptions import VerificationError, InvalidHashError
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from db import database
+
+_hasher = PasswordHasher()
+_hash_slots = threading.BoundedSemaphore(settings.AUTH_HASH_WORKERS)
+
+# Verified when the username is unknown, so a miss takes as long as a wrong password
+_DUMMY_HASH = _hasher.hash("not-a-password")
+
+
+def hash_password(password: str) -> str:
+    """argon2id hash in PHC string format"""
+    with _hash_slots:
+        return _hasher.hash(password)
+
+
+def _verify(password_hash: str, password: str) -> bool:
+    try:
+        with _hash_slots:
+            return _hasher.verify(password_hash, password)
+    except (VerificationError, InvalidHashError):
+        return False
+
+
+def get_user(username: str) -> Optional[Dict[str, Any]]:
+    return database.fetch_one(
+        "SELECT id, username, email, password_hash, is_active FROM app_users WHERE username = %s",
+        (username,)
+    )
+
+
+def verify_user(username: str, password: str) -> bool:
+    """Check a login; rehashes the stored password when the hash parameters changed"""
+    user = get_user(username) if username else None
+    password_hash = user['password_hash'] if user else _DUMMY_HASH
+    valid = _verify(password_hash, password)
+    if not (user and valid and user['is_active']):
+        return False
+    if _hasher.check_needs_rehash(password_hash):
+        database.execute_query(
+            "UPDATE app_users SET password_hash = %s WHERE username = %s",
+            (hash_password(password), username)
+        )
+    return True
+
+
+def create_user(username: str, email: Optional[str], password: str) -> bool:
+    """
+    Add a user.
+
+    Returns:
+        False if the username is taken
+    """
+    password_hash = hash_password(password)
+    with database.get_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("""
+                INSERT INTO app_users (username, email, password_hash)
+                VALUES (%s, %s, %s)
+                ON CONFLICT (username) DO NOTHING
+            """, (username, email or None, password_hash))
+            return cur.rowcount == 1
+
+
+def set_password(username: str, password: str, email: Optional[str] = None) -> None:
+    """Create the user, or replace the password (and reactivate) if it exists"""
+    database.execute_query("""
+        INSERT INTO app_users (username, email, password_hash)
+        VALUES (%s, %s, %s)
+        ON CONFLICT (username) DO UPDATE SET
+            password_hash = EXCLUDED.password_hash,
+            email = COALESCE(EXCLUDED.email, app_users.email),
+            is_active = TRUE
+    """, (username, email, hash_password(password)))
+
+
+def deactivate_user(username: str) -> bool:
+    """Block logins and revoke the user's sessions (effective within AUTH_TOKEN_CACHE_TTL)"""
+    with database.get_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("UPDATE app_users SET is_active = FALSE WHERE username = %s", (username,))
+            found = cur.rowcount == 1
+            cur.execute(
+                "UPDATE app_sessions SET revoked_at = now() WHERE username = %s AND revoked_at IS NULL",
+                (username,)
+            )
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage app users")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    set_pw = subparsers.add_parser("set-password", help="Create a user or reset its password")
+    set_pw.add_argument("username")
+    set_pw.add_argument("--email")
+
+    deactivate = subparsers.add_parser("deactivate", help="Block a user and end its sessions")
+    deactivate.add_argument("username")
+
+    args = parser.parse_args()
+    if args.command == "set-password":
+        password = getpass.getpass("Password: ")
+        if password != getpass.getpass("Confirm password: "):
+            sys.exit("[AUTH] Passwords don't match")
+        set_password(args.username, password, args.email)
+        print(f"[AUTH] Password set for '{args.username}'")
+    elif not deactivate_user(args.username):
+        sys.exit(f"[AUTH] No user '{args.username}'")
+    else:
+        print(f"[AUTH] Deactivated '{args.username}'")
+
+
+if __name__ == "__main__":
+    main()
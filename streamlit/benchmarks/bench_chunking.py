@@ -0,0 +1,117 @@
+"""
+Chunking throughput (MB/s of input text) for rag/chunking.py.
+
+Synthetic meeting transcripts - speaker lines under Markdown section
+headings - are chunked:
+  - stream:     one large transcript read line by line from a file,
+                reporting peak RSS to show memory stays flat,
+  - workers=N:  a batch of transcripts across N processes (chunk_documents).
+
+Usage (from the streamlit/ directory):
+    python -m benchmarks.bench_chunking --docs 400 --doc-kb 64 --workers 1 2 4 --stream-mb 50
+"""
+import argparse
+import random
+import sys
+import os
+import tempfile
+import time
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import max_rss_mb, print_report
+from config import settings
+from rag.chunking import TokenChunker, chunk_documents
+
+SECTIONS = ['Team Check-in', 'Operations', 'Financials', 'Rent Roll', 'Maintenance',
+            'Acquisitions', 'Investor Updates', 'Open Questions']
+SPEAKERS = ['Alex', 'Jordan', 'Sam', 'Taylor', 'Morgan']
+WORDS = ("rent tenant lease unit vacancy repair invoice budget roof hvac plumbing renewal "
+         "deposit turnover occupancy collections variance forecast closing escrow lender "
+         "refinance appraisal inspection contractor schedule quarter owner update property "
+         "the a to and of for on with we they is was will need next week month").split()
+
+
+def transcript(target_bytes: int, rng: random.Random) -> str:
+    lines, size = [], 0
+    while size < target_bytes:
+        heading = f"## {rng.choice(SECTIONS)}"
+        lines.append(heading)
+        size += len(heading) + 1
+        for _ in range(rng.randint(10, 40)):
+            line = f"{rng.choice(SPEAKERS)}: " + " ".join(rng.choices(WORDS, k=rng.randint(6, 40))) + "."
+            lines.append(line)
+            size += len(line) + 1
+    return "\n".join(lines)
+
+
+def bench_stream(stream_mb: float, max_tokens: int, overlap: int) -> dict:
+    rng = random.Random(7)
+    with tempfile.NamedTemporaryFile('w', suffix='.md', delete=False, encoding='utf-8') as f:
+        path = f.name
+        written = 0
+        while written < stream_mb * 1024 * 1024:
+            written += f.write(transcript(1024 * 1024, rng) + "\n")
+    try:
+        chunker = TokenChunker(max_tokens, overlap)
+        rss_before = max_rss_mb()
+        start = time.perf_counter()
+        chunks = tokens = 0
+        with open(path, 'r', encoding='utf-8') as f:
+            for chunk in chunker.chunk_text('bench-stream', f):
+                chunks += 1
+                tokens += chunk.token_count
+        elapsed = time.perf_counter() - start
+    finally:
+        os.unlink(path)
+    return _row('stream (1 doc)', written, elapsed, chunks, tokens,
+                rss_growth_mb=max_rss_mb() - rss_before)
+
+
+def bench_batch(docs: list, workers: int, max_tokens: int, overlap: int) -> dict:
+    size = sum(len(text.encode('utf-8')) for _, text in docs)
+    start = time.perf_counter()
+    chunks = tokens = 0
+    for doc_chunks in chunk_documents(docs, max_tokens, overlap, workers=workers):
+        chunks += len(doc_chunks)
+        tokens += sum(chunk.token_count for chunk in doc_chunks)
+    return _row(f"workers={workers}", size, time.perf_counter() - start, chunks, tokens)
+
+
+def _row(case: str, size: int, elapsed: float, chunks: int, tokens: int, rss_growth_mb: float = None) -> dict:
+    return {
+        'case': case,
+        'mb': size / 2 ** 20,
+        'seconds': elapsed,
+        'mb_per_s': size / 2 ** 20 / elapsed,
+        'chunks': chunks,
+        'ktokens_per_s': tokens / elapsed / 1000,
+        'rss_growth_mb': rss_growth_mb if rss_growth_mb is not None else '-',
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chunking throughput benchmark")
+    parser.add_argument("--docs", type=int, default=400, help="Transcripts per batch case")
+    parser.add_argument("--doc-kb", type=int, default=64, help="Size of each transcript")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--stream-mb", type=float, default=50, help="Size of the streamed transcript (0: skip)")
+    parser.add_argument("--max-tokens", type=int, default=settings.CHUNK_TOKENS)
+    parser.add_argument("--overlap", type=int, default=settings.CHUNK_OVERLAP_TOKENS)
+    args = parser.parse_args()
+
+    rows = []
+    if args.stream_mb:
+        rows.append(bench_stream(args.stream_mb, args.max_tokens, args.overlap))
+    rng = random.Random(42)
+    docs = [(f"bench-{i}", transcript(args.doc_kb * 1024, rng)) for i in range(args.docs)]
+    for workers in args.workers:
+        rows.append(bench_batch(docs, workers, args.max_tokens, args.overlap))
+
+    print_report(f"Chunking: {args.max_tokens} tokens/chunk, {args.overlap} overlap, "
+                 f"{settings.CHUNK_ENCODING}; batch of {args.docs} x {args.doc_kb} KiB", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""
+Dashboard, aggregation and db helper benchmark over synthetic listings.
+
+For each scale, synthetic listings (see benchmarks/synthetic.py) are loaded
+with COPY and ANALYZEd, then the script times:
+
+  - every SQL query in pages/3_Rental_Market_Dashboard.py (extracted from the
+    page source, so the benchmark follows the page as it changes),
+  - the analytics and filter-option helpers the page calls,
+  - each block of schema/populate_zillow_metrics.sql,
+  - the db.database fetch helpers.
+
+Each case reports p50/p95 latency, peak Python heap per call and the
+process RSS. Save a run with --output and compare a later one with
+--baseline to flag regressions.
+
+Run it against a scratch database; synthetic rows are removed with --cleanup.
+
+Usage (from the streamlit/ directory):
+    python -m benchmarks.bench_dashboard --rows 10000 100000 1000000 --output bench.json
+    python -m benchmarks.bench_dashboard --rows 10000 --baseline bench.json
+"""
+import argparse
+import ast
+import re
+import sys
+import os
+import time
+from typing import List, Dict, Any, Callable, Tuple
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import (
+    measure, peak_memory_kb, max_rss_mb, print_report, write_results, compare_to_baseline
+)
+from benchmarks.synthetic import load_synthetic, delete_synthetic
+from db import database
+from zillow.aggregate import load_aggregation_blocks
+from zillow.dimensions import get_filter_options, invalidate_filter_options
+from zillow.markets import markets_for_zips
+from analytics import (
+    listing_filter_params,
+    fetch_listing_extent,
+    fetch_clusters,
+    fit_zoom,
+    get_zip_trends,
+    fetch_unit_bucket_table,
+)
+from analytics import timeseries
+
+DASHBOARD_PAGE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'pages', '3_Rental_Market_Dashboard.py'
+)
+
+FETCH_HELPERS = {'fetch_data', 'fetch_one'}
+
+# "<column> <op> [ANY(]%s" for binding sample parameters to placeholders
+PLACEHOLDER = re.compile(r"(\w+)\s*(=|>=|<=)\s*(ANY\()?\s*%s")
+
+
+# ==============================================================================
+# Dashboard query extraction
+# ==============================================================================
+
+def extract_dashboard_queries(path: str = DASHBOARD_PAGE) -> List[Tuple[str, str, str]]:
+    """
+    Find every database.fetch_data/fetch_one call in the dashboard page.
+
+    The SQL argument is either a string literal or a variable assigned a
+    string literal earlier in the file.
+
+    Returns:
+        (name, helper, sql) tuples in source order, one per distinct query
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+
+    assignments: Dict[str, List[Tuple[int, str]]] = {}
+    for node in ast.walk(tree):
+        if (isinstance(node, ast.Assign) and len(node.targets) == 1
+                and isinstance(node.targets[0], ast.Name)
+                and isinstance(node.value, ast.Constant) and isinstance(node.value.value, str)):
+            assignments.setdefault(node.targets[0].id, []).append((node.lineno, node.value.value))
+
+    queries = []
+    for node in ast.walk(tree):
+        if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+                and node.func.attr in FETCH_HELPERS and node.args):
+            continue
+        arg = node.args[0]
+        if isinstance(arg, ast.Constant) and isinstance(arg.value, str):
+            name, sql = f"line_{node.lineno}", arg.value
+        elif isinstance(arg, ast.Name) and arg.id in assignments:
+            # Closest assignment above the call (names like zip_query are reused)
+            lineno, sql = max(
+                (a for a in assignments[arg.id] if a[0] <= node.lineno), default=(None, None)
+            )
+            if sql is None:
+                continue
+            name = f"{arg.id}@{lineno}"
+        else:
+            continue
+        queries.append((node.lineno, name, node.func.attr, sql))
+    unique = {}
+    for _, name, helper, sql in sorted(queries):
+        unique.setdefault(name, (name, helper, sql))
+    return list(unique.values())
+
+
+def sample_params(sql: str, context: Dict[str, Any]) -> tuple:
+    """Bind representative values to each %s placeholder, by column"""
+    params = []
+    for column, op, is_any in PLACEHOLDER.findall(sql):
+        if column == 'market':
+            params.append(context['markets'])
+        elif column == 'zip_code':
+            params.append(context['zip_codes'] if is_any else context['zip_codes'][0])
+        elif column == 'bedrooms':
+            params.append(list(range(0, 7)))
+        elif column == 'home_type':
+            params.append(context['home_types'])
+        elif column == 'home_status':
+            params.append(context['home_statuses'])
+        elif column == 'price':
+            params.append(0 if op == '>=' else 10 ** 9)
+        elif column == 'aggregation_type':
+            params.append('monthly')
+        else:
+            raise ValueError(f"No sample value for placeholder on '{column}' in:\n{sql}")
+    if len(params) != sql.count('%s'):
+        raise ValueError(f"Could not bind every placeholder in:\n{sql}")
+    return tuple(params)
+
+
+def query_context() -> Dict[str, Any]:
+    """Filter values the dashboard would offer for the loaded data"""
+    invalidate_filter_options()
+    options = get_filter_options()
+    return {
+        'markets': markets_for_zips(options['zip_codes']),
+        'zip_codes': list(options['zip_codes']),
+        'home_types': list(options['home_types']),
+        'home_statuses': list(options['home_statuses']),
+    }
+
+
+# ==============================================================================
+# Cases
+# ==============================================================================
+
+def dashboard_cases(context: Dict[str, Any]) -> List[Tuple[str, Callable[[], Any]]]:
+    cases = []
+    for name, helper, sql in extract_dashboard_queries():
+        params = sample_params(sql, context)
+        fn = getattr(database, helper)
+        cases.append((name, lambda fn=fn, sql=sql, params=params: fn(sql, params or None)))
+
+    filter_params = listing_filter_params(
+        context['zip_codes'], list(range(0, 7)), context['home_types'],
+        context['home_statuses'], 0, 10 ** 9
+    )
+
+    def clusters():
+        extent = fetch_listing_extent(filter_params)
+        if extent:
+            zoom = fit_zoom(extent)
+            fetch_clusters(filter_params, extent['center_lat'], extent['center_lon'], zoom)
+
+    def filter_options_cold():
+        invalidate_filter_options()
+        get_filter_options()
+
+    def trends_cold():
+        timeseries.clear_cache()
+        get_zip_trends(context['zip_codes'], 'weekly')
+
+    cases += [
+        ('zillow.filter_options (cold)', filter_options_cold),
+        ('zillow.filter_options (cached)', get_filter_options),
+        ('analytics.map_clusters', clusters),
+        ('analytics.zip_trends (cold)', trends_cold),
+        ('analytics.zip_trends (cached)', lambda: get_zip_trends(context['zip_codes'], 'weekly')),
+        ('analytics.unit_bucket_table', fetch_unit_bucket_table),
+    ]
+    return cases
+
+
+def helper_cases() -> List[Tuple[str, Callable[[], Any]]]:
+    return [
+        ('database.test_connection', database.test_connection),
+        ('database.fetch_one (SELECT 1)', lambda: database.fetch_one("SELECT 1 AS one")),
+        ('database.fetch_data (1k rows)', lambda: database.fetch_data(
+            "SELECT * FROM zillow_listings ORDER BY zpid LIMIT 1000")),
+        ('database.fetch_data (10k rows)', lambda: database.fetch_data(
+            "SELECT * FROM zillow_listings ORDER BY zpid LIMIT 10000")),
+        ('database.execute_query (no-op UPDATE)', lambda: database.execute_query(
+            "UPDATE zillow_listings SET updated_at = updated_at WHERE zpid = -1")),
+    ]
+
+
+def aggregation_cases() -> List[Tuple[str, Callable[[], Any]]]:
+    return [
+        (f"populate.{name}", lambda sql=sql: database.execute_query(sql))
+        for name, sql in load_aggregation_blocks().items()
+    ]
+
+
+def run_cases(scale: int, group: str, cases: List[Tuple[str, Callable[[], Any]]],
+              iterations: int, warmup: int) -> List[Dict[str, Any]]:
+    rows = []
+    for name, fn in cases:
+        try:
+            stats = measure(fn, iterations=iterations, warmup=warmup)
+            stats['peak_kb'] = peak_memory_kb(fn)
+        except Exception as e:
+            print(f"[BENCH] {name} failed: {str(e)}")
+            continue
+        rows.append({
+            'rows': scale, 'group': group, 'case': name,
+            'p50_ms': stats['p50_ms'], 'p95_ms': stats['p95_ms'],
+            'max_ms': stats['max_ms'], 'peak_kb': stats['peak_kb'], 'rss_mb': max_rss_mb(),
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dashboard and aggregation benchmark on synthetic listings")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--aggregation-iterations", type=int, default=3)
+    parser.add_argument("--skip-load", action="store_true", help="Use listings already in the database")
+    parser.add_argument("--cleanup", action="store_true", help="Delete synthetic listings when done")
+    parser.add_argument("--output", help="Write results as JSON")
+    parser.add_argument("--baseline", help="Compare p95 against an earlier --output file")
+    parser.add_argument("--threshold", type=float, default=1.25, help="p95 ratio that counts as a regression")
+    args = parser.parse_args()
+
+    results = []
+    for scale in args.rows:
+        if not args.skip_load:
+            delete_synthetic()
+            start = time.perf_counter()
+            loaded = load_synthetic(scale, seed=args.seed)
+            elapsed = time.perf_counter() - start
+            database.execute_query("ANALYZE zillow_listings")
+            print(f"[BENCH] Loaded {loaded:,} listings in {elapsed:.1f}s ({loaded / elapsed:,.0f} rows/s)")
+
+        # Aggregates first, so the trend and unit-bucket queries have data
+        results += run_cases(scale, 'populate', aggregation_cases(), args.aggregation_iterations, 0)
+        context = query_context()
+        results += run_cases(scale, 'dashboard', dashboard_cases(context), args.iterations, args.warmup)
+        results += run_cases(scale, 'db', helper_cases(), args.iterations, args.warmup)
+
+    print_report("Dashboard benchmark", results)
+
+    if args.output:
+        write_results(args.output, results)
+        print(f"\n[BENCH] Results written to {args.output}")
+    if args.baseline:
+        comparison = compare_to_baseline(results, args.baseline, ['rows', 'case'], threshold=args.threshold)
+        print_report(f"Compared to {args.baseline}", comparison)
+        if any(row['status'] == 'REGRESSION' for row in comparison):
+            sys.exit(1)
+
+    if args.cleanup:
+        print(f"[BENCH] Removed {delete_synthetic():,} synthetic listings")
+
+
+if __name__ == "__main__":
+    main()
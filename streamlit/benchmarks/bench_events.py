@@ -0,0 +1,83 @@
+"""
+Event sink benchmark: per-event latency on the request path and drain
+throughput, compared with inserting each event inline.
+
+Cases:
+  - inline:        one execute_query INSERT per event (a connection each),
+  - write-behind:  EventSink.emit() per event, then the time until the
+                   background thread has written everything (flush).
+
+Run it against a scratch database; benchmark rows are removed afterwards.
+
+Usage (from the streamlit/ directory):
+    python -m benchmarks.bench_events --events 200 5000 --batch-size 500
+"""
+import argparse
+import json
+import sys
+import os
+import time
+from datetime import datetime, timezone
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import summarize, print_report
+from db import database
+from events import EventSink
+
+BENCH_EVENT_TYPE = 'bench_event'
+
+
+def bench_inline(count: int) -> dict:
+    samples = []
+    start = time.perf_counter()
+    for i in range(count):
+        t = time.perf_counter()
+        database.execute_query(
+            "INSERT INTO app_events (event_type, payload, created_at) VALUES (%s, %s::jsonb, %s)",
+            (BENCH_EVENT_TYPE, json.dumps({'i': i}), datetime.now(timezone.utc))
+        )
+        samples.append((time.perf_counter() - t) * 1000)
+    elapsed = time.perf_counter() - start
+    return {'case': 'inline', 'events': count, **summarize(samples),
+            'drain_s': elapsed, 'events_per_s': count / elapsed, 'batches': count, 'dropped': 0}
+
+
+def bench_write_behind(count: int, batch_size: int, flush_interval_ms: float) -> dict:
+    sink = EventSink(max_queue=count + 1, batch_size=batch_size, flush_interval_ms=flush_interval_ms).start()
+    samples = []
+    start = time.perf_counter()
+    for i in range(count):
+        t = time.perf_counter()
+        sink.emit(BENCH_EVENT_TYPE, {'i': i})
+        samples.append((time.perf_counter() - t) * 1000)
+    sink.close(timeout=300)
+    elapsed = time.perf_counter() - start
+    return {'case': f'write-behind (batch {batch_size})', 'events': count, **summarize(samples),
+            'drain_s': elapsed, 'events_per_s': sink.stats['written'] / elapsed,
+            'batches': sink.stats['batches'], 'dropped': sink.stats['dropped']}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write-behind event sink benchmark")
+    parser.add_argument("--events", type=int, nargs="+", default=[200, 5000])
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--flush-interval-ms", type=float, default=250)
+    parser.add_argument("--skip-inline", action="store_true", help="Skip the slow inline baseline")
+    args = parser.parse_args()
+
+    rows = []
+    try:
+        for count in args.events:
+            if not args.skip_inline:
+                rows.append(bench_inline(count))
+            rows.append(bench_write_behind(count, args.batch_size, args.flush_interval_ms))
+    finally:
+        database.execute_query("DELETE FROM app_events WHERE event_type = %s", (BENCH_EVENT_TYPE,))
+
+    print_report("Event sink: request-path latency per event and drain throughput", rows)
+
+
+if __name__ == "__main__":
+    main()
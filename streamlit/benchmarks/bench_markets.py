@@ -0,0 +1,172 @@
+"""
+Per-market query time as markets are added to the partitioned
+zillow_listings (see zillow/markets.py).
+
+Benchmark markets are added one step at a time, each with its own
+partition and the same number of synthetic listings. After each step the
+script times queries for the first benchmark market's ZIPs:
+  - pruned:    the dashboard ZIP comparison with the market predicate, so
+               only that market's partition is scanned,
+  - unpruned:  the same query filtered on zip_code alone, which probes
+               every partition,
+  - listings:  the Property Listings filter (LISTING_FILTER_SQL),
+  - report:    the SOP report scan (fetch_report_tables).
+The pruned cases should stay flat as markets are added; 'partitions' is
+the number of partitions in the pruned plan and 'plan_ms' its planning time.
+
+Benchmark markets use ZIP+4 codes under the 000NN prefixes, which match no
+real ZIP, and are removed at the end unless --keep is given. Run it against
+a scratch database.
+
+Usage (from the streamlit/ directory):
+    python -m benchmarks.bench_markets --markets 1 2 4 8 16 --listings-per-market 100000
+"""
+import argparse
+import json
+import sys
+import os
+import time
+from typing import List, Dict, Any
+
+from psycopg2 import sql
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import measure, print_report
+from benchmarks.synthetic import SYNTHETIC_ZPID_BASE, load_synthetic
+from db import database
+from analytics.map_clusters import LISTING_FILTER_SQL, listing_filter_params
+from analytics.market_report import fetch_report_tables
+from zillow.markets import add_market, markets_for_zips, partition_name, invalidate_market_map
+
+ZIPS_PER_MARKET = 30
+# zpid ranges per benchmark market, above the default synthetic range
+ZPID_STRIDE = 100_000_000
+
+ZIP_METRICS_SQL = """
+    SELECT
+        zip_code,
+        COUNT(*) as total_listings,
+        AVG(days_on_market) as avg_dom,
+        PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY days_on_market) as median_dom,
+        PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY price) as median_rent,
+        AVG(price) as avg_rent,
+        AVG(price_per_sqft) as avg_price_per_sqft
+    FROM zillow_listings
+    WHERE {market_filter} zip_code = ANY(%s)
+    GROUP BY zip_code
+    ORDER BY zip_code
+"""
+
+
+def bench_market_id(index: int) -> str:
+    return f"bench_m{index:02d}"
+
+
+def bench_zips(index: int) -> List[str]:
+    return [f"000{index:02d}-{i:04d}" for i in range(1, ZIPS_PER_MARKET + 1)]
+
+
+def add_bench_market(index: int, listings: int, seed: int) -> None:
+    market = bench_market_id(index)
+    add_market(market, f"Benchmark market {index}", [f"000{index:02d}"])
+    start = time.perf_counter()
+    loaded = load_synthetic(listings, seed=seed + index, zip_codes=bench_zips(index),
+                            zpid_start=SYNTHETIC_ZPID_BASE + index * ZPID_STRIDE,
+                            city=f"Benchmark {index}", state='ZZ')
+    print(f"[BENCH] {market}: loaded {loaded:,} listings in {time.perf_counter() - start:.1f}s")
+
+
+def remove_bench_markets() -> None:
+    """Drop benchmark partitions, markets and ZIPs"""
+    markets = [row['market'] for row in database.fetch_data(
+        "SELECT market FROM zillow_markets WHERE market LIKE %s", ('bench\\_m%',)
+    )]
+    with database.get_connection() as conn:
+        with conn.cursor() as cur:
+            for market in markets:
+                cur.execute(sql.SQL("DROP TABLE IF EXISTS {}").format(sql.Identifier(partition_name(market))))
+            cur.execute("DELETE FROM zillow_zip_codes WHERE market = ANY(%s)", (markets,))
+            cur.execute("DELETE FROM zillow_markets WHERE market = ANY(%s)", (markets,))
+    invalidate_market_map()
+    print(f"[BENCH] Removed {len(markets)} benchmark market(s)")
+
+
+def explain_pruned(query: str, params: tuple) -> Dict[str, Any]:
+    """Partitions in the plan and planning time of a query"""
+    row = database.fetch_one(f"EXPLAIN (ANALYZE, FORMAT JSON) {query}", params)
+    plan = next(iter(row.values()))
+    plan = json.loads(plan) if isinstance(plan, str) else plan
+    relations = set()
+
+    def walk(node):
+        if 'Relation Name' in node:
+            relations.add(node['Relation Name'])
+        for child in node.get('Plans', []):
+            walk(child)
+
+    walk(plan[0]['Plan'])
+    return {'partitions': len(relations), 'plan_ms': plan[0]['Planning Time']}
+
+
+def run_step(markets: int, total_listings: int, iterations: int) -> Dict[str, Any]:
+    zips = bench_zips(1)
+    market_list = markets_for_zips(zips)
+    pruned_sql = ZIP_METRICS_SQL.format(market_filter="market = ANY(%s) AND")
+    pruned_params = (market_list, zips)
+    unpruned_sql = ZIP_METRICS_SQL.format(market_filter="")
+    filter_params = listing_filter_params(zips, list(range(0, 7)), ['SINGLE_FAMILY', 'APARTMENT', 'CONDO', 'TOWNHOUSE'],
+                                          ['FOR_RENT', 'FOR_SALE'], 0, 10 ** 9)
+    listings_sql = f"SELECT zpid, price FROM zillow_listings WHERE {LISTING_FILTER_SQL} " \
+                   f"ORDER BY days_on_market ASC NULLS LAST LIMIT 100"
+
+    pruned = measure(lambda: database.fetch_data(pruned_sql, pruned_params), iterations=iterations)
+    unpruned = measure(lambda: database.fetch_data(unpruned_sql, (zips,)), iterations=iterations)
+    listings = measure(lambda: database.fetch_data(listings_sql, filter_params), iterations=iterations)
+    report = measure(lambda: fetch_report_tables(zips), iterations=iterations)
+    return {
+        'markets': markets,
+        'total_listings': total_listings,
+        'pruned_p50_ms': pruned['p50_ms'],
+        'pruned_p95_ms': pruned['p95_ms'],
+        'unpruned_p50_ms': unpruned['p50_ms'],
+        'listings_p50_ms': listings['p50_ms'],
+        'report_p50_ms': report['p50_ms'],
+        **explain_pruned(pruned_sql, pruned_params),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-market query time as market partitions are added")
+    parser.add_argument("--markets", type=int, nargs="+", default=[1, 2, 4, 8, 16],
+                        help="Benchmark market counts to measure at (at most 99)")
+    parser.add_argument("--listings-per-market", type=int, default=100000)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keep", action="store_true", help="Keep the benchmark markets and listings")
+    args = parser.parse_args()
+    if max(args.markets) > 99:
+        parser.error("--markets supports at most 99 benchmark markets")
+
+    remove_bench_markets()
+    rows = []
+    added = 0
+    try:
+        for target in sorted(set(args.markets)):
+            while added < target:
+                added += 1
+                add_bench_market(added, args.listings_per_market, args.seed)
+            database.execute_query("ANALYZE zillow_listings")
+            total = database.fetch_one("SELECT COUNT(*) as listings FROM zillow_listings")['listings']
+            rows.append(run_step(added, total, args.iterations))
+    finally:
+        if not args.keep:
+            remove_bench_markets()
+
+    print_report(f"Market partitions: {args.listings_per_market:,} listings per market, "
+                 f"queries for {bench_market_id(1)} ({ZIPS_PER_MARKET} ZIPs)", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Recall, latency and memory of the RAG collection storage configurations
+(rag/collections.py) on a local Qdrant.
+
+The same clustered, normalized vectors are loaded into one collection per
+configuration:
+  - float32-ram:   no quantization, vectors in RAM (Qdrant defaults),
+  - float32-disk:  no quantization, vectors memory-mapped,
+  - scalar:        int8 copies in RAM, originals on disk, rescored,
+  - product:       x16 product-quantized copies in RAM, originals on disk.
+
+Recall@k is measured against exact (numpy brute-force) neighbours, for
+unfiltered searches and for searches filtered on the indexed section_type.
+Memory is reported as the estimated RAM for vectors and the Qdrant
+process RSS from /metrics once the collection is indexed (other
+collections are dropped first).
+
+Usage (from the streamlit/ directory):
+    python -m benchmarks.bench_qdrant_collections --qdrant-url http://localhost:6333 --points 50000 --dim 384
+"""
+import argparse
+import re
+import sys
+import os
+import time
+import uuid
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import summarize, print_report
+from rag.collections import CollectionSpec, ensure_collection, search_params
+from rag.qdrant import QdrantClient
+
+SECTION_TYPES = [
+    'team_check_in', 'operations', 'financials', 'rent_roll',
+    'maintenance', 'acquisitions', 'investor_updates', 'general'
+]
+CONFIGS = {
+    'float32-ram': {'quantization': 'none', 'on_disk': False},
+    'float32-disk': {'quantization': 'none', 'on_disk': True},
+    'scalar': {'quantization': 'scalar', 'on_disk': True},
+    'product': {'quantization': 'product', 'on_disk': True},
+}
+# Bytes of RAM per vector dimension of the quantized copy
+BYTES_PER_DIM = {'scalar': 1, 'product': 4 / 16}
+
+
+def clustered_vectors(rng: np.random.Generator, count: int, dim: int, clusters: int = 64) -> np.ndarray:
+    """Normalized vectors around random centres, closer to real embeddings than uniform noise"""
+    centres = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = centres[rng.integers(0, clusters, count)] + 0.6 * rng.standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def exact_top_k(vectors: np.ndarray, queries: np.ndarray, k: int, mask: np.ndarray = None) -> list:
+    scores = queries @ vectors.T
+    if mask is not None:
+        scores[:, ~mask] = -np.inf
+    return [set(np.argpartition(-row, k)[:k].tolist()) for row in scores]
+
+
+def resident_mb(client: QdrantClient):
+    match = re.search(r"^memory_resident_bytes\s+(\S+)", client.metrics(), re.MULTILINE)
+    return float(match.group(1)) / 2 ** 20 if match else None
+
+
+def wait_until_indexed(client: QdrantClient, name: str, points: int, timeout: float = 600) -> float:
+    """Seconds until every upsert is applied and the optimizers are idle"""
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        info = client.get_collection(name)
+        if info.get('status') == 'green' and (info.get('points_count') or 0) >= points:
+            return time.perf_counter() - start
+        time.sleep(0.5)
+    raise TimeoutError(f"Collection '{name}' not indexed after {timeout}s")
+
+
+def run_config(client: QdrantClient, label: str, options: dict, vectors: np.ndarray, sections: list,
+               queries: np.ndarray, truth: list, filtered_truth: list, args) -> dict:
+    name = f"bench_collections_{label.replace('-', '_')}"
+    spec = CollectionSpec(name=name, size=vectors.shape[1], hnsw_m=args.m,
+                          hnsw_ef_construct=args.ef_construct, **options)
+    ensure_collection(spec, client, recreate=True)
+    # Build the HNSW graph at benchmark sizes too (the default threshold is 20,000 KB)
+    client.update_collection(name, {'optimizers_config': {'indexing_threshold': 1000}})
+
+    start = time.perf_counter()
+    for offset in range(0, len(vectors), args.batch_size):
+        client.upsert(name, [
+            {'id': str(uuid.UUID(int=i)), 'vector': vectors[i].tolist(),
+             'payload': {'section_type': sections[i], 'chunk_id': str(i)}}
+            for i in range(offset, min(offset + args.batch_size, len(vectors)))
+        ], wait=False)
+    load_s = time.perf_counter() - start
+    index_s = wait_until_indexed(client, name, len(vectors))
+
+    params = search_params(spec.quantization)
+    query_filter = {'must': [{'key': 'section_type', 'match': {'value': SECTION_TYPES[0]}}]}
+    latencies, filtered_latencies, recall, filtered_recall = [], [], [], []
+    for query, expected, expected_filtered in zip(queries, truth, filtered_truth):
+        t = time.perf_counter()
+        hits = client.search(name, query.tolist(), limit=args.k, search_params=params)
+        latencies.append((time.perf_counter() - t) * 1000)
+        recall.append(len({uuid.UUID(str(hit['id'])).int for hit in hits} & expected) / args.k)
+
+        t = time.perf_counter()
+        hits = client.search(name, query.tolist(), query_filter=query_filter, limit=args.k, search_params=params)
+        filtered_latencies.append((time.perf_counter() - t) * 1000)
+        filtered_recall.append(len({uuid.UUID(str(hit['id'])).int for hit in hits} & expected_filtered) / args.k)
+
+    rss = resident_mb(client)
+    if not args.keep:
+        client.delete_collection(name)
+
+    stats, filtered_stats = summarize(latencies), summarize(filtered_latencies)
+    # Quantized copies are always in RAM; originals only when not on disk
+    values = len(vectors) * vectors.shape[1]
+    ram_vectors = (0 if spec.on_disk else values * 4) + \
+        (values * BYTES_PER_DIM[spec.quantization] if spec.quantization != 'none' else 0)
+    return {
+        'config': label,
+        'load_s': load_s,
+        'index_s': index_s,
+        f'recall@{args.k}': sum(recall) / len(recall),
+        'p50_ms': stats['p50_ms'],
+        'p95_ms': stats['p95_ms'],
+        f'filtered_recall@{args.k}': sum(filtered_recall) / len(filtered_recall),
+        'filtered_p95_ms': filtered_stats['p95_ms'],
+        'vector_ram_mb': ram_vectors / 2 ** 20,
+        'qdrant_rss_mb': rss if rss is not None else 'n/a',
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Qdrant collection configuration benchmark")
+    parser.add_argument("--qdrant-url", default="http://localhost:6333")
+    parser.add_argument("--points", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--m", type=int, default=16, help="HNSW m")
+    parser.add_argument("--ef-construct", type=int, default=128)
+    parser.add_argument("--batch-size", type=int, default=512)
+    parser.add_argument("--configs", nargs="+", choices=list(CONFIGS), default=list(CONFIGS))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keep", action="store_true", help="Keep the benchmark collections")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    vectors = clustered_vectors(rng, args.points, args.dim)
+    sections = [SECTION_TYPES[i] for i in rng.integers(0, len(SECTION_TYPES), args.points)]
+    # Queries land near stored vectors, as real questions land near their answers
+    queries = vectors[rng.integers(0, args.points, args.queries)] + \
+        0.3 * rng.standard_normal((args.queries, args.dim)).astype(np.float32) / np.sqrt(args.dim)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    truth = exact_top_k(vectors, queries, args.k)
+    filtered_truth = exact_top_k(vectors, queries, args.k, np.array([s == SECTION_TYPES[0] for s in sections]))
+
+    client = QdrantClient(url=args.qdrant_url)
+    rows = [
+        run_config(client, label, CONFIGS[label], vectors, sections, queries, truth, filtered_truth, args)
+        for label in args.configs
+    ]
+    print_report(f"Qdrant collections: {args.points:,} x {args.dim}-d, m={args.m}, "
+                 f"ef_construct={args.ef_construct}, {args.queries} queries", rows)
+
+
+if __name__ == "__main__":
+    main()
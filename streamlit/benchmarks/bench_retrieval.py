@@ -0,0 +1,121 @@
+"""
+Latency benchmark for the hybrid retrieval path against a local Qdrant.
+
+Loads a synthetic collection with RAG-style payloads, then times filtered
+and unfiltered vector searches. With --with-postgres it also times the
+full-text and hydration queries against the configured database.
+
+Usage (from the streamlit/ directory):
+    python -m benchmarks.bench_retrieval --qdrant-url http://localhost:6333
+"""
+import argparse
+import random
+import sys
+import os
+import uuid
+from datetime import datetime, timedelta
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import measure, print_report
+from rag.qdrant import QdrantClient
+from rag.retrieval import build_chunk_filter, full_text_search, hydrate_chunks
+
+SECTION_TYPES = [
+    'team_check_in', 'operations', 'financials', 'rent_roll',
+    'maintenance', 'acquisitions', 'investor_updates', 'general'
+]
+TAGS = ['finance', 'maintenance', 'owner-update', 'leasing', 'capex', 'tenant', 'vacancy', 'legal']
+BENCH_COLLECTION = "bench_retrieval"
+
+
+def random_vector(rng: random.Random, dim: int) -> list:
+    return [rng.uniform(-1.0, 1.0) for _ in range(dim)]
+
+
+def load_collection(client: QdrantClient, points: int, dim: int, batch_size: int, rng: random.Random) -> None:
+    """Recreate the benchmark collection and fill it with synthetic points"""
+    if client.collection_exists(BENCH_COLLECTION):
+        client.delete_collection(BENCH_COLLECTION)
+    client.create_collection(BENCH_COLLECTION, {"vectors": {"size": dim, "distance": "Cosine"}})
+    client.create_payload_index(BENCH_COLLECTION, "section_type", "keyword")
+    client.create_payload_index(BENCH_COLLECTION, "tags", "keyword")
+    client.create_payload_index(BENCH_COLLECTION, "created_at", "datetime")
+
+    start_date = datetime(2025, 1, 1)
+    for offset in range(0, points, batch_size):
+        batch = []
+        for _ in range(min(batch_size, points - offset)):
+            batch.append({
+                "id": str(uuid.uuid4()),
+                "vector": random_vector(rng, dim),
+                "payload": {
+                    "chunk_id": str(uuid.uuid4()),
+                    "section_type": rng.choice(SECTION_TYPES),
+                    "tags": rng.sample(TAGS, rng.randint(1, 3)),
+                    "created_at": (start_date + timedelta(days=rng.randint(0, 365))).isoformat(),
+                },
+            })
+        client.upsert(BENCH_COLLECTION, batch)
+    print(f"[BENCH] Loaded {points:,} points (dim={dim}) into '{BENCH_COLLECTION}'")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hybrid retrieval latency benchmark")
+    parser.add_argument("--qdrant-url", default="http://localhost:6333")
+    parser.add_argument("--points", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--batch-size", type=int, default=512)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-load", action="store_true", help="Reuse an existing benchmark collection")
+    parser.add_argument("--with-postgres", action="store_true", help="Also time full-text and hydration queries")
+    parser.add_argument("--query", default="rent roll delinquency for parker woods")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    client = QdrantClient(url=args.qdrant_url)
+    if not args.skip_load:
+        load_collection(client, args.points, args.dim, args.batch_size, rng)
+
+    scenarios = {
+        "unfiltered": None,
+        "section_type": build_chunk_filter(section_types=['rent_roll']).to_qdrant(),
+        "tags": build_chunk_filter(tags=['finance', 'capex']).to_qdrant(),
+        "section+tags+date": build_chunk_filter(
+            section_types=['financials', 'rent_roll'],
+            tags=['finance'],
+            date_from=datetime(2025, 6, 1),
+            date_to=datetime(2025, 9, 30),
+        ).to_qdrant(),
+    }
+
+    rows = []
+    for name, qdrant_filter in scenarios.items():
+        stats = measure(
+            lambda: client.search(BENCH_COLLECTION, random_vector(rng, args.dim),
+                                  query_filter=qdrant_filter, limit=args.limit),
+            iterations=args.iterations,
+        )
+        rows.append({'scenario': f"qdrant {name}", **stats})
+
+    if args.with_postgres:
+        chunk_filter = build_chunk_filter(section_types=['rent_roll'])
+        ranking = []
+
+        def run_text_search():
+            ranking[:] = full_text_search(args.query, chunk_filter, args.limit)
+
+        rows.append({'scenario': "postgres full-text", **measure(run_text_search, iterations=args.iterations)})
+        rows.append({
+            'scenario': f"postgres hydrate ({len(ranking)} ids)",
+            **measure(lambda: hydrate_chunks([], ranking), iterations=args.iterations),
+        })
+
+    print_report("Hybrid retrieval latency", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Cold-start benchmark for the streamlit app.
+
+Three measurements, each repeated in fresh processes so nothing is warm:
+
+  - first render: a new interpreter imports Streamlit's AppTest, then runs
+    one page (hub, dashboard, chat) once and reports the time to the first
+    complete render plus which heavy modules (pandas, altair, pyarrow, numpy,
+    pydeck) that page imported itself, as opposed to Streamlit preloading
+    them,
+  - server ready: `streamlit run app.py` is started and /_stcore/health is
+    polled until it answers,
+  - container restart (optional): --restart-cmd is run (e.g.
+    "docker compose restart streamlit") and --health-url polled.
+
+Usage (from the streamlit/ directory):
+    python -m benchmarks.bench_startup --repeat 5
+    python -m benchmarks.bench_startup --skip-server \\
+        --restart-cmd "docker compose restart streamlit" --health-url http://localhost:8501/_stcore/health
+"""
+import argparse
+import json
+import secrets
+import shlex
+import socket
+import subprocess
+import sys
+import os
+import time
+import urllib.request
+from typing import List, Dict, Any, Optional
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import summarize, print_report
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PAGES = {
+    'hub': 'app.py',
+    'dashboard': os.path.join('pages', '3_Rental_Market_Dashboard.py'),
+    'chat': os.path.join('pages', '2_Controller_Agent.py'),
+}
+
+HEAVY_MODULES = ['pandas', 'altair', 'pyarrow', 'numpy', 'pydeck']
+
+READY_TIMEOUT = 120
+
+
+# ==============================================================================
+# First render (child process)
+# ==============================================================================
+
+def render_page(page: str) -> Dict[str, Any]:
+    """Runs in a fresh interpreter: time one page's first render"""
+    start = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    import_ms = (time.perf_counter() - start) * 1000
+
+    app = AppTest.from_file(os.path.join(APP_DIR, PAGES[page]), default_timeout=READY_TIMEOUT)
+    if page != 'hub':
+        # Log in outside the timed render; what that loads counts as preloaded
+        from auth import users as user_store
+        from auth.sessions import issue_token
+        user_store.set_password('bench', secrets.token_urlsafe(16))
+        app.session_state['authenticated'] = True
+        app.session_state['username'] = 'bench'
+        app.session_state['auth_token'] = issue_token('bench')
+    preloaded = {name for name in HEAVY_MODULES if name in sys.modules}
+    start = time.perf_counter()
+    app.run()
+    render_ms = (time.perf_counter() - start) * 1000
+
+    return {
+        'import_ms': import_ms,
+        'render_ms': render_ms,
+        'preloaded': sorted(preloaded),
+        'page_imports': sorted(n for n in HEAVY_MODULES if n in sys.modules and n not in preloaded),
+        'exception': app.exception[0].message if app.exception else None,
+    }
+
+
+def first_render(page: str) -> Dict[str, Any]:
+    """Start a new interpreter for one page render and collect its result"""
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.bench_startup', '--child', page],
+        cwd=APP_DIR, capture_output=True, text=True, timeout=READY_TIMEOUT
+    )
+    total_ms = (time.perf_counter() - start) * 1000
+    if proc.returncode != 0:
+        raise RuntimeError(f"{page}: {proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else proc.returncode}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result['process_ms'] = total_ms
+    return result
+
+
+# ==============================================================================
+# Server and container readiness
+# ==============================================================================
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_healthy(url: str, timeout: float = READY_TIMEOUT, interval: float = 0.05) -> float:
+    """Poll url until it answers 200; returns the seconds waited"""
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return time.perf_counter() - start
+        except OSError:
+            pass
+        time.sleep(interval)
+    raise TimeoutError(f"{url} not healthy after {timeout:.0f}s")
+
+
+def server_ready() -> float:
+    """Milliseconds from `streamlit run` to a healthy server"""
+    port = _free_port()
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, '-m', 'streamlit', 'run', 'app.py',
+         '--server.headless', 'true', '--server.port', str(port),
+         '--server.fileWatcherType', 'none', '--browser.gatherUsageStats', 'false'],
+        cwd=APP_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_healthy(f"http://127.0.0.1:{port}/_stcore/health")
+        return (time.perf_counter() - start) * 1000
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def container_restart(restart_cmd: str, health_url: str) -> float:
+    """Milliseconds from issuing restart_cmd to a healthy health_url"""
+    start = time.perf_counter()
+    subprocess.run(shlex.split(restart_cmd), check=True, stdout=subprocess.DEVNULL)
+    # The old container may still answer briefly; wait for it to go away first
+    while time.perf_counter() - start < READY_TIMEOUT:
+        try:
+            urllib.request.urlopen(health_url, timeout=0.5).close()
+        except OSError:
+            break
+        time.sleep(0.05)
+    wait_healthy(health_url)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streamlit cold-start benchmark")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--pages", nargs="+", choices=list(PAGES), default=list(PAGES))
+    parser.add_argument("--skip-server", action="store_true", help="Do not time `streamlit run`")
+    parser.add_argument("--restart-cmd", help="Command that restarts the container, e.g. 'docker compose restart streamlit'")
+    parser.add_argument("--health-url", default="http://localhost:8501/_stcore/health")
+    parser.add_argument("--child", choices=list(PAGES), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(render_page(args.child)))
+        return
+
+    rows = []
+    for page in args.pages:
+        samples: Dict[str, List[float]] = {'process_ms': [], 'import_ms': [], 'render_ms': []}
+        last: Optional[Dict[str, Any]] = None
+        for _ in range(args.repeat):
+            try:
+                last = first_render(page)
+            except Exception as e:
+                print(f"[STARTUP] {str(e)}")
+                continue
+            for key in samples:
+                samples[key].append(last[key])
+        if last is None:
+            continue
+        if last['exception']:
+            print(f"[STARTUP] {page} raised: {last['exception']}")
+        rows.append({
+            'case': f"first render: {page}",
+            **summarize(samples['render_ms']),
+            'import_p50_ms': summarize(samples['import_ms'])['p50_ms'],
+            'process_p50_ms': summarize(samples['process_ms'])['p50_ms'],
+            'page_imports': ', '.join(last['page_imports']) or '-',
+        })
+
+    if not args.skip_server:
+        samples = [server_ready() for _ in range(args.repeat)]
+        rows.append({'case': 'server ready: streamlit run', **summarize(samples)})
+
+    if args.restart_cmd:
+        samples = [container_restart(args.restart_cmd, args.health_url) for _ in range(args.repeat)]
+        rows.append({'case': f"container restart: {args.restart_cmd}", **summarize(samples)})
+
+    print_report("Cold start", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Zillow fetch client benchmark against the local stub (mock_zillow).
+
+Serves N synthetic ZIPs (copies of the mock_data payloads under new ZIP
+codes), paginated so every ZIP takes several requests, and runs the same
+fetch four times over one response cache:
+
+  - cold:        empty cache, every page downloaded,
+  - warm:        within ZILLOW_CACHE_TTL, served from disk (no requests),
+  - revalidate:  TTL expired, conditional requests answered with 304,
+  - replay:      replay=True, no network at all.
+
+Also reports the request rate the stub saw against the client's rate limit,
+and the cache's size on disk against the raw bytes downloaded.
+
+Usage (from the streamlit/ directory):
+    python -m benchmarks.bench_zillow_fetch --zips 40 --page-size 5 --rate-limit 50 --latency 0.05
+"""
+import argparse
+import glob
+import json
+import sys
+import os
+import tempfile
+import time
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import print_report
+from mock_zillow import MockZillowConfig, start_mock_server
+from mock_zillow.server import MOCK_DATA_DIR
+from zillow.fetch import ZillowFetchClient
+
+
+def write_synthetic_zips(data_dir: str, count: int) -> list:
+    """Copy the mock payloads under ZIP codes 90000, 90001, ..."""
+    templates = []
+    for path in sorted(glob.glob(os.path.join(MOCK_DATA_DIR, 'zillow_*_mock.json'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            templates.append(json.load(f))
+    zip_codes = []
+    for i in range(count):
+        zip_code = f"{90000 + i}"
+        payload = templates[i % len(templates)]
+        results = [{**result, 'zipcode': zip_code, 'zpid': int(f"9{i:04d}{n:03d}")}
+                   for n, result in enumerate(payload['results'])]
+        with open(os.path.join(data_dir, f"zillow_{zip_code}_mock.json"), 'w', encoding='utf-8') as f:
+            json.dump({**payload, 'results': results}, f)
+        zip_codes.append(zip_code)
+    return zip_codes
+
+
+def cache_size_bytes(root: str) -> int:
+    return sum(os.path.getsize(path) for path in glob.glob(os.path.join(root, '**', '*'), recursive=True)
+               if os.path.isfile(path))
+
+
+def run_case(case: str, server, url: str, cache_dir: str, zip_codes: list, args,
+             cache_ttl: float, replay: bool = False) -> dict:
+    client = ZillowFetchClient(url=url, api_key='', cache_dir=cache_dir, cache_ttl=cache_ttl,
+                               rate_limit=args.rate_limit, burst=args.burst,
+                               max_workers=args.workers, replay=replay)
+    with server.lock:
+        before = dict(server.stats)
+    start = time.perf_counter()
+    fetched, errors = client.fetch_zips(zip_codes)
+    elapsed = time.perf_counter() - start
+    with server.lock:
+        served = {key: value - before.get(key, 0) for key, value in server.stats.items()}
+    return {
+        'case': case,
+        'zips': len(fetched),
+        'errors': len(errors),
+        'listings': sum(len(payload['results']) for payload, _ in fetched.values()),
+        'elapsed_s': elapsed,
+        'requests': client.stats['requests'],
+        'req_per_s': client.stats['requests'] / elapsed if elapsed else 0.0,
+        'downloaded': client.stats['downloaded'],
+        'not_modified': client.stats['not_modified'],
+        'cache_hits': client.stats['cache_hits'],
+        'retries': client.stats['retries'],
+        'server_429': served.get('rate_limited', 0),
+        'kb_downloaded': client.stats['bytes'] / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Zillow fetch client benchmark (local stub)")
+    parser.add_argument("--zips", type=int, default=40)
+    parser.add_argument("--page-size", type=int, default=5, help="Stub results per page")
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub seconds per request")
+    parser.add_argument("--rate-limit", type=float, default=50, help="Client requests per second")
+    parser.add_argument("--burst", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=8, help="ZIPs fetched concurrently")
+    parser.add_argument("--server-rate-limit", type=float, default=0,
+                        help="Stub answers 429 above this many requests/s (0: off)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir, tempfile.TemporaryDirectory() as cache_dir:
+        zip_codes = write_synthetic_zips(data_dir, args.zips)
+        server, url = start_mock_server(MockZillowConfig(
+            data_dir=data_dir, page_size=args.page_size, latency=args.latency,
+            rate_limit=args.server_rate_limit
+        ))
+        try:
+            rows = [
+                run_case('cold', server, url, cache_dir, zip_codes, args, cache_ttl=3600),
+                run_case('warm', server, url, cache_dir, zip_codes, args, cache_ttl=3600),
+                run_case('revalidate', server, url, cache_dir, zip_codes, args, cache_ttl=0),
+                run_case('replay', server, url, cache_dir, zip_codes, args, cache_ttl=0, replay=True),
+            ]
+        finally:
+            server.shutdown()
+        on_disk = cache_size_bytes(cache_dir)
+
+    print_report(f"Zillow fetch: {args.zips} ZIPs, {args.page_size} results/page, "
+                 f"client limit {args.rate_limit:g} req/s", rows)
+    raw_kb = rows[0]['kb_downloaded']
+    print(f"Response cache: {on_disk / 1024:.1f} KiB on disk for {raw_kb:.1f} KiB downloaded "
+          f"({on_disk / 1024 / raw_kb:.0%})" if raw_kb else "Response cache: nothing downloaded")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Shared timing helpers for the benchmark scripts
+"""
+import json
+import resource
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Any, Optional
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Linear-interpolated percentile of a list of samples (pct in 0-100)"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    position = (len(ordered) - 1) * pct / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(samples_ms: List[float]) -> Dict[str, float]:
+    """Summarize latency samples in milliseconds"""
+    return {
+        'n': len(samples_ms),
+        'p50_ms': percentile(samples_ms, 50),
+        'p95_ms': percentile(samples_ms, 95),
+        'mean_ms': sum(samples_ms) / len(samples_ms) if samples_ms else 0.0,
+        'max_ms': max(samples_ms) if samples_ms else 0.0,
+    }
+
+
+def measure(fn: Callable[[], Any], iterations: int = 50, warmup: int = 5) -> Dict[str, float]:
+    """Call fn repeatedly and return its latency summary"""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)
+
+
+def peak_memory_kb(fn: Callable[[], Any]) -> float:
+    """Peak Python heap allocated during one call of fn, in KiB"""
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+def max_rss_mb() -> float:
+    """Peak resident set size of this process so far, in MiB"""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def write_results(path: str, rows: List[Dict[str, Any]]) -> None:
+    """Save benchmark rows as JSON, e.g. to use as a later baseline"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(rows, f, indent=2, default=str)
+
+
+def compare_to_baseline(rows: List[Dict[str, Any]], baseline_path: str, key_fields: List[str],
+                        metric: str = 'p95_ms', threshold: float = 1.25) -> List[Dict[str, Any]]:
+    """
+    Compare rows against a baseline saved by write_results().
+
+    Returns:
+        One row per result present in both runs, flagged when metric grew
+        by more than threshold (a ratio)
+    """
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {tuple(row.get(k) for k in key_fields): row for row in json.load(f)}
+
+    comparison = []
+    for row in rows:
+        before: Optional[Dict[str, Any]] = baseline.get(tuple(row.get(k) for k in key_fields))
+        if not before or not before.get(metric):
+            continue
+        ratio = row[metric] / before[metric]
+        comparison.append({
+            **{k: row.get(k) for k in key_fields},
+            f'baseline_{metric}': before[metric],
+            metric: row[metric],
+            'ratio': ratio,
+            'status': 'REGRESSION' if ratio > threshold else 'ok',
+        })
+    return comparison
+
+
+def print_report(title: str, rows: List[Dict[str, Any]]) -> None:
+    """Print benchmark rows as an aligned table"""
+    print(f"\n{'='*80}")
+    print(title)
+    print(f"{'='*80}")
+    if not rows:
+        print("(no results)")
+        return
+    columns = list(rows[0].keys())
+    widths = {
+        col: max(len(col), *(len(_format(row.get(col))) for row in rows))
+        for col in columns
+    }
+    print("  ".join(col.ljust(widths[col]) for col in columns))
+    for row in rows:
+        print("  ".join(_format(row.get(col)).ljust(widths[col]) for col in columns))
+
+
+def _format(value: Any) -> str:
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    return str(value)
@@ -0,0 +1,321 @@
+"""
+Load test for concurrent Streamlit sessions.
+
+Drives N virtual users in one process, the way the single streamlit
+container hosts every session. Each user repeatedly walks the hub, the
+dashboard (initial render, then the Metrics Trends view and a period
+change) and the chat page (one chat turn, until its answer is shown) with
+Streamlit's AppTest. The chat webhook is answered by the bundled mock
+(mock_n8n), with settings.N8N_WEBHOOK_URL pointed at it.
+
+Reported:
+  - throughput (scenarios/s and script runs/s),
+  - latency percentiles per step,
+  - database connections: psycopg2.connect calls per scenario, and peak/mean
+    backends in pg_stat_activity sampled during the run,
+  - memory: process RSS at start and peak, and the growth per session.
+
+Usage (from the streamlit/ directory):
+    python -m benchmarks.load_sessions --users 1 5 10 25 --duration 60
+    python -m benchmarks.load_sessions --users 10 --mock-latency 3 --steps hub chat
+"""
+import argparse
+import secrets
+import sys
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
+
+from streamlit.testing.v1 import AppTest
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from auth import users as user_store
+from auth.sessions import issue_token
+from benchmarks.common import summarize, percentile, print_report
+from config import settings
+from db import database
+from mock_n8n import MockN8nConfig, start_mock_server
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HUB_SCRIPT = os.path.join(APP_DIR, 'app.py')
+DASHBOARD_SCRIPT = os.path.join(APP_DIR, 'pages', '3_Rental_Market_Dashboard.py')
+CHAT_SCRIPT = os.path.join(APP_DIR, 'pages', '2_Controller_Agent.py')
+
+STEPS = ['hub', 'dashboard', 'dashboard_trends', 'chat']
+TRENDS_VIEW = "📊 Metrics Trends"
+SCRIPT_TIMEOUT = 120
+
+
+def _rss_mb() -> float:
+    """Current resident set size of this process, in MiB"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class ConnectCounter:
+    """Counts psycopg2.connect calls made through db.database"""
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+        self._original = database.psycopg2.connect
+
+    def __enter__(self):
+        def counting_connect(*args, **kwargs):
+            with self._lock:
+                self.count += 1
+            return self._original(*args, **kwargs)
+        database.psycopg2.connect = counting_connect
+        return self
+
+    def __exit__(self, *exc):
+        database.psycopg2.connect = self._original
+
+
+class Sampler:
+    """Background sampler for DB backends and process RSS"""
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self.backends: List[int] = []
+        self.rss: List[float] = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="load-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.rss.append(_rss_mb())
+            try:
+                row = database.fetch_one(
+                    "SELECT COUNT(*) AS backends FROM pg_stat_activity WHERE datname = current_database()"
+                )
+                # Exclude the sampler's own connection
+                self.backends.append(max(row['backends'] - 1, 0))
+            except Exception:
+                pass
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+# ==============================================================================
+# Virtual user
+# ==============================================================================
+
+class VirtualUser:
+    """One browser session: its own AppTest instances and session state"""
+
+    def __init__(self, index: int, password: Optional[str], steps: List[str]):
+        self.index = index
+        self.username = f"loaduser{index}"
+        self.password = password
+        self.steps = steps
+        # Without a password, sessions start out authenticated
+        self.authenticated = password is None
+        self.token = issue_token(self.username) if self.authenticated else None
+        self.hub: Optional[AppTest] = None
+        self.dashboard: Optional[AppTest] = None
+        self.chat: Optional[AppTest] = None
+
+    def _new_app(self, script: str) -> AppTest:
+        app = AppTest.from_file(script, default_timeout=SCRIPT_TIMEOUT)
+        # Pages share one browser session, so they all see the login
+        if self.authenticated:
+            app.session_state['authenticated'] = True
+            app.session_state['username'] = self.username
+            app.session_state['auth_token'] = self.token
+        return app
+
+    def _check(self, app: AppTest, step: str) -> None:
+        if app.exception:
+            raise RuntimeError(f"{step}: {app.exception[0].message}")
+        errors = [e.value for e in app.error]
+        if errors:
+            raise RuntimeError(f"{step}: {errors[0]}")
+
+    def login(self) -> None:
+        """Go through the login form (only when a password is given)"""
+        app = AppTest.from_file(HUB_SCRIPT, default_timeout=SCRIPT_TIMEOUT).run()
+        app.text_input[0].input(self.username)
+        app.text_input[1].input(self.password)
+        app.button[0].click().run()
+        self._check(app, 'login')
+        if not app.session_state['authenticated']:
+            raise RuntimeError("login: rejected")
+        self.authenticated = True
+        self.token = app.session_state['auth_token']
+        self.hub = app
+
+    def run_step(self, step: str, iteration: int) -> None:
+        if step == 'hub':
+            self.hub = self.hub or self._new_app(HUB_SCRIPT)
+            self.hub.run()
+            self._check(self.hub, step)
+        elif step == 'dashboard':
+            self.dashboard = self._new_app(DASHBOARD_SCRIPT)
+            self.dashboard.run()
+            self._check(self.dashboard, step)
+        elif step == 'dashboard_trends':
+            if self.dashboard is None:
+                self.dashboard = self._new_app(DASHBOARD_SCRIPT).run()
+            view = self.dashboard.radio(key='dashboard_view')
+            if view.value != TRENDS_VIEW:
+                view.set_value(TRENDS_VIEW).run()
+            selectboxes = [s for s in self.dashboard.selectbox if s.label == "Select Period Type"]
+            if selectboxes:
+                options = selectboxes[0].options
+                selectboxes[0].select(options[iteration % len(options)]).run()
+            else:
+                self.dashboard.run()
+            self._check(self.dashboard, step)
+        elif step == 'chat':
+            self.chat = self.chat or self._new_app(CHAT_SCRIPT).run()
+            self.chat.chat_input[0].set_value(f"Load test question {iteration} from {self.username}").run()
+            # The turn is answered in the background; rerun the way the page polls
+            deadline = time.monotonic() + SCRIPT_TIMEOUT
+            while self.chat.session_state['pending_controller']:
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"{step}: no answer after {SCRIPT_TIMEOUT}s")
+                time.sleep(settings.CHAT_POLL_INTERVAL)
+                self.chat.run()
+            self._check(self.chat, step)
+        else:
+            raise ValueError(f"Unknown step: {step}")
+
+
+def run_user(user: VirtualUser, deadline: float, samples: Dict[str, List[float]],
+             errors: List[str], counters: Dict[str, int], lock: threading.Lock) -> None:
+    if user.password is not None:
+        start = time.perf_counter()
+        try:
+            user.login()
+            with lock:
+                samples.setdefault('login', []).append((time.perf_counter() - start) * 1000)
+        except Exception as e:
+            with lock:
+                errors.append(f"user {user.index} {str(e)}")
+            return
+
+    iteration = 0
+    while time.monotonic() < deadline:
+        for step in user.steps:
+            start = time.perf_counter()
+            try:
+                user.run_step(step, iteration)
+                elapsed = (time.perf_counter() - start) * 1000
+                with lock:
+                    samples.setdefault(step, []).append(elapsed)
+                    counters['runs'] += 1
+            except Exception as e:
+                with lock:
+                    errors.append(f"user {user.index} {str(e)}")
+        with lock:
+            counters['scenarios'] += 1
+        iteration += 1
+
+
+def run_load(users: int, duration: float, steps: List[str], password: Optional[str],
+             ramp_up: float) -> Dict[str, Any]:
+    """Run one load level and return its summary"""
+    samples: Dict[str, List[float]] = {}
+    errors: List[str] = []
+    counters = {'runs': 0, 'scenarios': 0}
+    lock = threading.Lock()
+
+    rss_start = _rss_mb()
+    start = time.monotonic()
+    deadline = start + ramp_up + duration
+    with ConnectCounter() as connects, Sampler() as sampler:
+        with ThreadPoolExecutor(max_workers=users, thread_name_prefix="vuser") as pool:
+            for index in range(users):
+                pool.submit(run_user, VirtualUser(index, password, steps), deadline, samples, errors, counters, lock)
+                if ramp_up and users > 1:
+                    time.sleep(ramp_up / users)
+    elapsed = time.monotonic() - start
+
+    all_samples = [s for values in samples.values() for s in values]
+    rss_peak = max(sampler.rss + [_rss_mb()])
+    return {
+        'users': users,
+        'elapsed_s': elapsed,
+        'scenarios': counters['scenarios'],
+        'scenarios_per_s': counters['scenarios'] / elapsed,
+        'runs_per_s': counters['runs'] / elapsed,
+        'p50_ms': percentile(all_samples, 50),
+        'p95_ms': percentile(all_samples, 95),
+        'p99_ms': percentile(all_samples, 99),
+        'errors': len(errors),
+        'db_connects': connects.count,
+        'connects_per_scenario': connects.count / counters['scenarios'] if counters['scenarios'] else 0.0,
+        'db_backends_peak': max(sampler.backends, default=0),
+        'db_backends_mean': sum(sampler.backends) / len(sampler.backends) if sampler.backends else 0.0,
+        'rss_start_mb': rss_start,
+        'rss_peak_mb': rss_peak,
+        'mb_per_session': (rss_peak - rss_start) / users,
+        'steps': {step: summarize(values) for step, values in samples.items()},
+        'error_samples': errors[:5],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent Streamlit session load test")
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 5, 10])
+    parser.add_argument("--duration", type=float, default=60, help="Seconds per load level (after ramp-up)")
+    parser.add_argument("--ramp-up", type=float, default=5, help="Seconds over which users start")
+    parser.add_argument("--steps", nargs="+", choices=STEPS, default=STEPS)
+    parser.add_argument("--password", default=os.getenv('LOADTEST_PASSWORD'),
+                        help="Log in through the form with this password (default: pre-authenticated sessions)")
+    parser.add_argument("--mock-latency", type=float, default=1.0, help="Seconds the mock webhook waits")
+    parser.add_argument("--mock-jitter", type=float, default=0.0, help="Extra random mock delay, up to this many seconds")
+    parser.add_argument("--mock-error-rate", type=float, default=0.0, help="Fraction of mock webhook errors")
+    args = parser.parse_args()
+
+    server, mock_url = start_mock_server(MockN8nConfig(
+        latency=args.mock_latency, jitter=args.mock_jitter, error_rate=args.mock_error_rate, seed=0
+    ))
+    webhook_url = settings.N8N_WEBHOOK_URL
+    settings.N8N_WEBHOOK_URL = f"{mock_url}/webhook/financial-controller-chatbot"
+    print(f"[LOAD] Mock n8n webhook at {settings.N8N_WEBHOOK_URL} (latency {args.mock_latency}s)")
+
+    # Virtual users are real accounts (loaduser0, loaduser1, ...); without
+    # --password they get a random one and skip the login form
+    password = args.password or secrets.token_urlsafe(16)
+    for index in range(max(args.users)):
+        user_store.set_password(f"loaduser{index}", password)
+
+    levels = []
+    try:
+        for users in args.users:
+            print(f"[LOAD] {users} user(s) for {args.duration:.0f}s ...")
+            result = run_load(users, args.duration, args.steps, args.password, args.ramp_up)
+            levels.append(result)
+            print_report(f"{users} user(s): latency per step", [
+                {'step': step, **stats} for step, stats in result['steps'].items()
+            ])
+            for error in result['error_samples']:
+                print(f"  error: {error}")
+    finally:
+        settings.N8N_WEBHOOK_URL = webhook_url
+        server.shutdown()
+
+    print_report("Load levels", [
+        {k: v for k, v in level.items() if k not in ('steps', 'error_samples')} for level in levels
+    ])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+Synthetic Zillow listings seeded from mock_data/*.json.
+
+Each synthetic listing starts from a randomly drawn mock listing (so home
+type, bedroom, bathroom and status mixes follow the mock data) and then has
+its price, area, days on market and position perturbed. Listings are spread
+over Cincinnati ZIP codes (or the given ones) whose centroids are offset
+from the mock ZIPs.
+
+Rows are written with COPY in chunks. Synthetic zpids start at
+SYNTHETIC_ZPID_BASE, so they never collide with real listings and can be
+removed with delete_synthetic().
+"""
+import csv
+import glob
+import io
+import json
+import math
+import random
+import sys
+import os
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Iterator, Optional
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import database
+from zillow.ingest import LISTING_COLUMNS, ensure_zip_codes, load_payload
+from zillow.dimensions import record_dimensions, refresh_dimensions, invalidate_filter_options
+
+SYNTHETIC_ZPID_BASE = 9_000_000_000
+
+MOCK_DATA_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'mock_data'
+)
+
+CINCINNATI_ZIPS = [
+    '45202', '45203', '45204', '45205', '45206', '45207', '45208', '45209', '45211',
+    '45212', '45213', '45214', '45215', '45216', '45217', '45219', '45220', '45223',
+    '45224', '45225', '45226', '45227', '45229', '45230', '45231', '45232', '45236',
+    '45237', '45238', '45239', '45240', '45242', '45243', '45244', '45246', '45247',
+]
+
+# Share of generated listings turned into rentals (the mock data is all for sale)
+DEFAULT_RENT_SHARE = 0.5
+RENT_TO_PRICE_RATIO = 0.008
+
+COPY_CHUNK_ROWS = 50_000
+
+
+def load_mock_listings(pattern: Optional[str] = None) -> List[Dict[str, Any]]:
+    """All listings from the mock search payloads"""
+    pattern = pattern or os.path.join(MOCK_DATA_DIR, 'zillow_*_mock.json')
+    listings = []
+    for path in sorted(glob.glob(pattern)):
+        listings.extend(load_payload(path).get('results', []))
+    if not listings:
+        raise ValueError(f"No mock listings found for {pattern}")
+    return listings
+
+
+def _zip_centroids(templates: List[Dict[str, Any]], rng: random.Random,
+                   zip_codes: List[str]) -> Dict[str, tuple]:
+    """Mock ZIPs keep their centroid; the others are scattered around them"""
+    by_zip: Dict[str, List[tuple]] = {}
+    for listing in templates:
+        if listing.get('latitude') is not None and listing.get('longitude') is not None:
+            by_zip.setdefault(listing['zipcode'], []).append((listing['latitude'], listing['longitude']))
+    centroids = {
+        zip_code: (sum(p[0] for p in points) / len(points), sum(p[1] for p in points) / len(points))
+        for zip_code, points in by_zip.items()
+    }
+    base_lat = sum(c[0] for c in centroids.values()) / len(centroids)
+    base_lon = sum(c[1] for c in centroids.values()) / len(centroids)
+    for zip_code in zip_codes:
+        centroids.setdefault(zip_code, (base_lat + rng.uniform(-0.12, 0.12), base_lon + rng.uniform(-0.18, 0.18)))
+    return centroids
+
+
+def generate_listings(count: int, seed: int = 42, rent_share: float = DEFAULT_RENT_SHARE,
+                      templates: Optional[List[Dict[str, Any]]] = None,
+                      now: Optional[datetime] = None, zip_codes: Optional[List[str]] = None,
+                      zpid_start: int = SYNTHETIC_ZPID_BASE) -> Iterator[Dict[str, Any]]:
+    """
+    Yield synthetic search results (mock payload shape plus 'createdAt').
+
+    Args:
+        count: Number of listings
+        seed: RNG seed; the same seed yields the same listings
+        rent_share: Fraction converted to FOR_RENT with a rent-level price
+        templates: Listings to draw from (default: mock_data/*.json)
+        now: Reference time for created_at (default: current time)
+        zip_codes: ZIPs to spread listings over (default: Cincinnati and mock ZIPs)
+        zpid_start: zpid of the first listing
+    """
+    rng = random.Random(seed)
+    templates = templates or load_mock_listings()
+    centroids = _zip_centroids(templates, rng, zip_codes or CINCINNATI_ZIPS)
+    zip_codes = sorted(zip_codes or centroids)
+    now = now or datetime.now()
+
+    for index in range(count):
+        template = rng.choice(templates)
+        listing = dict(template)
+        zip_code = rng.choice(zip_codes)
+        lat, lon = centroids[zip_code]
+
+        days = max(1, int(round((template.get('daysOnZillow') or 1) * rng.lognormvariate(0, 0.6))))
+        days = min(days, 365)
+        price = (template.get('price') or 150000) * rng.lognormvariate(0, 0.2)
+        area = (template.get('livingArea') or 1200) * rng.lognormvariate(0, 0.12)
+
+        status = template.get('homeStatus') or 'FOR_SALE'
+        if rng.random() < rent_share:
+            status = 'FOR_RENT'
+            price = price * RENT_TO_PRICE_RATIO
+
+        listing.update({
+            'zpid': zpid_start + index,
+            'zipcode': zip_code,
+            'streetAddress': f"{rng.randint(100, 9999)} Synthetic St",
+            'latitude': round(lat + rng.gauss(0, 0.01), 7),
+            'longitude': round(lon + rng.gauss(0, 0.012), 7),
+            'livingArea': int(area),
+            'price': int(round(price, -1 if status == 'FOR_RENT' else -2)),
+            'priceForHDP': None,
+            'homeStatus': status,
+            'homeStatusForHDP': status,
+            'daysOnZillow': days,
+            'timeOnZillow': days * 86400,  # seconds, as in the mock data
+            'createdAt': now - timedelta(days=days, seconds=rng.randint(0, 86399)),
+        })
+        listing['priceForHDP'] = listing['price']
+        yield listing
+
+
+def _copy_value(value: Any) -> Any:
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def load_synthetic(count: int, seed: int = 42, rent_share: float = DEFAULT_RENT_SHARE,
+                   chunk_rows: int = COPY_CHUNK_ROWS, zip_codes: Optional[List[str]] = None,
+                   zpid_start: int = SYNTHETIC_ZPID_BASE, city: str = 'Cincinnati', state: str = 'OH') -> int:
+    """
+    Generate and COPY synthetic listings into zillow_listings.
+
+    Args:
+        zip_codes: ZIPs to spread listings over (default: Cincinnati and mock
+            ZIPs); they are registered under city and state
+        zpid_start: zpid of the first listing; keep it at or above
+            SYNTHETIC_ZPID_BASE so delete_synthetic() removes the rows
+
+    Returns:
+        Number of rows loaded
+    """
+    templates = load_mock_listings()
+    markets = ensure_zip_codes([
+        {'zipcode': zip_code, 'city': city, 'state': state, 'country': 'USA'}
+        for zip_code in (set(zip_codes) if zip_codes else set(CINCINNATI_ZIPS) | {t['zipcode'] for t in templates})
+    ])
+
+    columns = [column for column, _ in LISTING_COLUMNS] + ['market', 'created_at', 'updated_at']
+    copy_sql = f"COPY zillow_listings ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+
+    loaded = 0
+    listings = generate_listings(count, seed, rent_share, templates, zip_codes=zip_codes, zpid_start=zpid_start)
+    with database.get_connection() as conn:
+        with conn.cursor() as cur:
+            while loaded < count:
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                chunk = []
+                for listing in listings:
+                    row = [_copy_value(listing.get(key)) for _, key in LISTING_COLUMNS]
+                    row += [markets[listing['zipcode']], listing['createdAt'], listing['createdAt']]
+                    writer.writerow(row)
+                    chunk.append(listing)
+                    if len(chunk) >= chunk_rows:
+                        break
+                if not chunk:
+                    break
+                buffer.seek(0)
+                cur.copy_expert(copy_sql, buffer)
+                # COPY bypasses upsert_listings, so register filter values here
+                record_dimensions(cur, chunk)
+                loaded += len(chunk)
+    invalidate_filter_options()
+    return loaded
+
+
+def delete_synthetic() -> int:
+    """Remove all synthetic listings"""
+    with database.get_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("DELETE FROM zillow_listings WHERE zpid >= %s", (SYNTHETIC_ZPID_BASE,))
+            deleted = cur.rowcount
+    if deleted:
+        refresh_dimensions()
+    return deleted
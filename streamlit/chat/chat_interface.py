@@ -6,8 +6,11 @@ import requests
 import json
 import time
 import base64
+import uuid
 from datetime import datetime
 from config import settings
+from events import emit_event
+from . import turns
 
 class ChatInterface:
     """Base chat interface for chatbots"""
@@ -20,6 +23,12 @@ class ChatInterface:
         self.messages_key = f"messages_{chatbot_key}"
         if self.messages_key not in st.session_state:
             st.session_state[self.messages_key] = []
+        # Job IDs of turns still waiting for an answer (see chat.turns)
+        self.pending_key = f"pending_{chatbot_key}"
+        if self.pending_key not in st.session_state:
+            st.session_state[self.pending_key] = []
+        if 'session_id' not in st.session_state:
+            st.session_state.session_id = uuid.uuid4().hex
     
     def display_header(self):
         """Display compact chatbot header"""
@@ -35,17 +44,59 @@ class ChatInterface:
                 if "timestamp" in message:
                     st.caption(f"📅 {message['timestamp']}")
     
-    def add_message(self, role: str, content: str):
-        """Add message to chat history"""
+    def add_message(self, role: str, content: str, position: int = None, **details) -> dict:
+        """Add message to chat history (at position, default the end) and queue it for the message log"""
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        st.session_state[self.messages_key].append({
+        message = {
             "role": role,
             "content": content,
             "timestamp": timestamp
-        })
+        }
+        messages = st.session_state[self.messages_key]
+        messages.insert(len(messages) if position is None else position, message)
+        # Write-behind: never waits on the database
+        emit_event(
+            'chat_message',
+            {"chatbot": self.chatbot_key, "role": role, "content": content, **details},
+            username=st.session_state.get('username'),
+            session_id=st.session_state.get('session_id')
+        )
+        return message
+    
+    def submit_message(self, prompt: str, handler: turns.TurnHandler) -> str:
+        """Add the user's message and answer it in the background; returns the job ID"""
+        message = self.add_message("user", prompt)
+        job_id = turns.submit_turn(
+            st.session_state.session_id, handler, prompt, st.session_state[self.messages_key]
+        )
+        message["job_id"] = job_id
+        st.session_state[self.pending_key].append(job_id)
+        return job_id
+    
+    def collect_answers(self) -> int:
+        """Move finished turns into the history, each right after its question"""
+        pending = st.session_state[self.pending_key]
+        collected = 0
+        for job_id in list(pending):
+            turn = turns.get_turn(job_id)
+            if turn is not None and not turn.done:
+                continue
+            pending.remove(job_id)
+            turn = turns.pop_turn(job_id)
+            if turn is None:
+                continue
+            messages = st.session_state[self.messages_key]
+            asked = next((i for i, message in enumerate(messages) if message.get("job_id") == job_id), None)
+            self.add_message("assistant", turn.response,
+                             position=None if asked is None else asked + 1,
+                             latency_ms=turn.latency_ms)
+            collected += 1
+        return collected
     
     def clear_chat(self):
-        """Clear chat history"""
+        """Clear chat history and drop unanswered turns"""
+        turns.cancel_turns(st.session_state[self.pending_key])
+        st.session_state[self.pending_key] = []
         st.session_state[self.messages_key] = []
         st.rerun()
 
@@ -64,27 +115,24 @@ class ControllerAgentChat(ChatInterface):
     def get_controller_response(self, query: str, conversation_history: list = None) -> str:
         """Get response from Financial Controller via n8n webhook"""
         try:
-            url = "https://n8n.srv1075445.hstgr.cloud/webhook/financial-controller-chatbot"
+            url = settings.N8N_WEBHOOK_URL
             
             print(f"\n{'='*80}")
             print(f"[CONTROLLER CHAT] Starting request to n8n webhook")
             print(f"[CONTROLLER CHAT] URL: {url}")
             print(f"[CONTROLLER CHAT] User Query: {query[:100]}...")
             
-            # Basic authentication
-            username = "admin"
-            password = "tlp123"
-            auth_string = f"{username}:{password}"
-            auth_bytes = auth_string.encode('utf-8')
-            auth_b64 = base64.b64encode(auth_bytes).decode('utf-8')
-            
-            print(f"[CONTROLLER CHAT] Auth configured: Basic {auth_b64[:20]}...")
-            
             headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Basic {auth_b64}"
+                "Content-Type": "application/json"
             }
             
+            # Basic authentication (credentials come from settings)
+            if settings.N8N_WEBHOOK_USER:
+                auth_string = f"{settings.N8N_WEBHOOK_USER}:{settings.N8N_WEBHOOK_PASSWORD}"
+                auth_b64 = base64.b64encode(auth_string.encode('utf-8')).decode('utf-8')
+                headers["Authorization"] = f"Basic {auth_b64}"
+                print(f"[CONTROLLER CHAT] Auth configured for user: {settings.N8N_WEBHOOK_USER}")
+            
             # Enhanced system prompt for Financial Controller Agent
             system_prompt = """You are a Financial Controller Agent, an advanced AI assistant specialized in:
             - Financial planning, analysis, and reporting
@@ -138,7 +186,7 @@ class ControllerAgentChat(ChatInterface):
             
             # Make the POST request to n8n webhook
             print(f"[CONTROLLER CHAT] Sending POST request...")
-            response = requests.post(url, headers=headers, json=payload, timeout=45)
+            response = requests.post(url, headers=headers, json=payload, timeout=settings.N8N_WEBHOOK_TIMEOUT)
             
             print(f"[CONTROLLER CHAT] Response received:")
             print(f"  - Status Code: {response.status_code}")
@@ -220,7 +268,7 @@ class ControllerAgentChat(ChatInterface):
             elif response.status_code == 401:
                 print(f"[CONTROLLER CHAT] ERROR: Authentication failed (401)")
                 print(f"{'='*80}\n")
-                return "🔐 Authentication failed with n8n webhook."
+                return "🔐 Authentication failed with n8n webhook. Check N8N_WEBHOOK_USER and N8N_WEBHOOK_PASSWORD in .env."
             elif response.status_code == 404:
                 print(f"[CONTROLLER CHAT] ERROR: Webhook not found (404)")
                 print(f"{'='*80}\n")
@@ -282,33 +330,36 @@ class ControllerAgentChat(ChatInterface):
         # Compact tip
         st.success("💡 **Ask me about**: Budgets • Analysis • Cash Flow • Investments • Planning", icon="💰")
         
-        # Chat messages
+        # Main chat input: the turn is answered in the background, so the page
+        # stays usable and several questions can queue
+        if prompt := st.chat_input("Ask the Controller Agent anything...", key="controller_input"):
+            self.submit_message(prompt, self.get_controller_response)
+        
+        # Chat messages; polls for answers only while turns are pending
+        self._polling = bool(st.session_state[self.pending_key])
+        st.fragment(run_every=settings.CHAT_POLL_INTERVAL if self._polling else None)(self._display_messages)()
+    
+    def _display_messages(self):
+        """Chat history, with a status line under each question still being answered"""
+        self.collect_answers()
+        pending = st.session_state[self.pending_key]
         for message in st.session_state[self.messages_key]:
             with st.chat_message(message["role"], avatar="🤖" if message["role"] == "assistant" else "👤"):
                 st.markdown(message["content"])
+            if message.get("job_id") in pending:
+                self._display_pending_turn(message["job_id"])
         
-        # Main chat input
-        if prompt := st.chat_input("Ask the Controller Agent anything...", key="controller_input"):
-            self._process_user_message(prompt)
+        # Last answer arrived: rerun the page once to stop polling and refresh the sidebar
+        if self._polling and not pending:
+            st.rerun()
     
-    def _process_user_message(self, prompt: str):
-        """Process user message and get AI response"""
-        # Add user message
-        self.add_message("user", prompt)
-        
-        # Display user message immediately
-        with st.chat_message("user", avatar="👤"):
-            st.markdown(prompt)
-        
-        # Get and display assistant response
+    def _display_pending_turn(self, job_id: str):
+        turn = turns.get_turn(job_id)
+        if turn is None:
+            return
         with st.chat_message("assistant", avatar="🤖"):
-            with st.spinner("🤖 Controller Agent is analyzing..."):
-                # Get conversation history for context
-                conversation_history = st.session_state[self.messages_key]
-                response = self.get_controller_response(prompt, conversation_history)
-            
-            # Display response
-            st.markdown(response)
-        
-        # Add assistant response to history
-        self.add_message("assistant", response)
+            if turn.status == turns.RUNNING:
+                st.markdown(f"🤖 Controller Agent is analyzing... ({time.time() - turn.started_at:.0f}s)")
+            else:
+                ahead = turns.queue_position(job_id)
+                st.caption(f"⏳ Queued behind {ahead} question{'s' if ahead != 1 else ''}")
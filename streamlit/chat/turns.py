@@ -0,0 +1,190 @@
+"""
+Background chat turns.
+
+A chat turn (one webhook round trip) runs on a process-wide thread pool
+instead of inside the Streamlit script, so a rerun, a click or a page switch
+no longer abandons the request. Turns are tracked by job ID: the page keeps
+the IDs of its pending turns in session state and collects each answer on a
+later run, whichever page the user was on in between.
+
+Turns of one session run one after another, in submission order, so a
+queued question sees the answers to the questions before it. Turns of
+different sessions run in parallel, up to CHAT_WORKERS at a time.
+
+Usage:
+    job_id = submit_turn(session_id, handler, prompt, history)
+    turn = get_turn(job_id)
+    if turn.done:
+        answer = pop_turn(job_id).response
+"""
+import sys
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, List, Optional, Any
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+CANCELLED = 'cancelled'
+
+# handler(prompt, conversation_history) -> response text
+TurnHandler = Callable[[str, List[Dict[str, Any]]], str]
+
+
+@dataclass
+class ChatTurn:
+    """One submitted question and, once done, its answer"""
+    job_id: str
+    session_id: str
+    prompt: str
+    history: List[Dict[str, Any]]
+    handler: TurnHandler
+    status: str = QUEUED
+    response: Optional[str] = None
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in (DONE, CANCELLED)
+
+    @property
+    def latency_ms(self) -> Optional[int]:
+        """Webhook time only, without the time spent queued"""
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return round((self.finished_at - self.started_at) * 1000)
+
+
+_turns: Dict[str, ChatTurn] = {}
+_queues: Dict[str, Deque[ChatTurn]] = {}
+_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=settings.CHAT_WORKERS, thread_name_prefix="chat-turn")
+    return _executor
+
+
+def submit_turn(session_id: str, handler: TurnHandler, prompt: str,
+                history: List[Dict[str, Any]]) -> str:
+    """
+    Queue a chat turn for a session.
+
+    Args:
+        session_id: Turns with the same session_id run in order, one at a time
+        handler: Called as handler(prompt, history) on a worker thread
+        prompt: The user's question
+        history: Conversation so far; answers to this session's earlier
+            queued turns are added when the turn starts
+
+    Returns:
+        Job ID for get_turn() / pop_turn()
+    """
+    turn = ChatTurn(job_id=uuid.uuid4().hex, session_id=session_id, prompt=prompt,
+                    history=list(history), handler=handler)
+    with _lock:
+        _expire_turns()
+        _turns[turn.job_id] = turn
+        pending = _queues.get(session_id)
+        if pending is not None:
+            # A worker is already draining this session; it picks the turn up
+            pending.append(turn)
+            return turn.job_id
+        _queues[session_id] = deque([turn])
+        _get_executor().submit(_drain, session_id)
+    return turn.job_id
+
+
+def _drain(session_id: str) -> None:
+    """Run a session's queued turns in order until its queue is empty"""
+    answered: List[ChatTurn] = []
+    while True:
+        with _lock:
+            pending = _queues[session_id]
+            if not pending:
+                del _queues[session_id]
+                return
+            turn = pending[0]
+            if turn.status == CANCELLED:
+                pending.popleft()
+                continue
+            turn.status = RUNNING
+            turn.started_at = time.time()
+
+        history = _with_answers(turn.history, answered)
+        try:
+            response = turn.handler(turn.prompt, history)
+        except Exception as e:
+            print(f"[CHAT TURNS] Turn {turn.job_id} failed: {str(e)}")
+            response = f"💥 Unexpected error: {str(e)}"
+
+        with _lock:
+            turn.response = response
+            turn.finished_at = time.time()
+            turn.status = DONE
+            _queues[session_id].popleft()
+        answered.append(turn)
+
+
+def _with_answers(history: List[Dict[str, Any]], answered: List[ChatTurn]) -> List[Dict[str, Any]]:
+    """Put each earlier turn's answer right after its question"""
+    history = list(history)
+    for earlier in answered:
+        asked = [i for i, message in enumerate(history)
+                 if message['role'] == 'user' and message['content'] == earlier.prompt]
+        position = asked[-1] + 1 if asked else len(history)
+        history.insert(position, {"role": "assistant", "content": earlier.response})
+    return history
+
+
+def get_turn(job_id: str) -> Optional[ChatTurn]:
+    with _lock:
+        return _turns.get(job_id)
+
+
+def pop_turn(job_id: str) -> Optional[ChatTurn]:
+    """Remove and return a turn once its answer has been collected"""
+    with _lock:
+        return _turns.pop(job_id, None)
+
+
+def queue_position(job_id: str) -> int:
+    """Turns ahead of this one in its session's queue (0 when running or done)"""
+    with _lock:
+        turn = _turns.get(job_id)
+        if turn is None or turn.status != QUEUED:
+            return 0
+        pending = _queues.get(turn.session_id, ())
+        return next((i for i, queued in enumerate(pending) if queued.job_id == job_id), 0)
+
+
+def cancel_turns(job_ids: List[str]) -> None:
+    """Drop turns; queued ones never run, a running one finishes but is discarded"""
+    with _lock:
+        for job_id in job_ids:
+            turn = _turns.pop(job_id, None)
+            if turn is not None and turn.status == QUEUED:
+                turn.status = CANCELLED
+
+
+def _expire_turns() -> None:
+    """Forget finished turns nobody collected (the session went away); caller holds _lock"""
+    cutoff = time.time() - settings.CHAT_TURN_TTL
+    for job_id in [job_id for job_id, turn in _turns.items()
+                   if turn.done and turn.finished_at is not None and turn.finished_at < cutoff]:
+        del _turns[job_id]
@@ -12,9 +12,122 @@ class Settings:
     POSTGRES_PASSWORD = os.getenv('POSTGRES_PASSWORD', 'n8npassword')
     POSTGRES_HOST = os.getenv('POSTGRES_HOST', 'postgres')
     POSTGRES_PORT = int(os.getenv('POSTGRES_PORT', '5432'))
+    POSTGRES_QUERY_WORKERS = int(os.getenv('POSTGRES_QUERY_WORKERS', '4'))
+    
+    # Qdrant Configuration
+    QDRANT_URL = os.getenv('QDRANT_URL', 'http://qdrant:6333')
+    QDRANT_API_KEY = os.getenv('QDRANT_API_KEY', '')
+    RAG_COLLECTION = os.getenv('RAG_COLLECTION', 'document_chunks')
+    # Collection storage (rag/collections.py): quantization ('scalar',
+    # 'product' or 'none'; quantized copies stay in RAM), memory-mapped
+    # original vectors, HNSW build/search parameters, and how many extra
+    # candidates are rescored against the original vectors
+    RAG_QUANTIZATION = os.getenv('RAG_QUANTIZATION', 'scalar')
+    RAG_VECTORS_ON_DISK = os.getenv('RAG_VECTORS_ON_DISK', 'true').lower() == 'true'
+    RAG_HNSW_M = int(os.getenv('RAG_HNSW_M', '16'))
+    RAG_HNSW_EF_CONSTRUCT = int(os.getenv('RAG_HNSW_EF_CONSTRUCT', '128'))
+    RAG_HNSW_EF = int(os.getenv('RAG_HNSW_EF', '128'))
+    RAG_RESCORE_OVERSAMPLING = float(os.getenv('RAG_RESCORE_OVERSAMPLING', '2.0'))
+    
+    # n8n Webhook Configuration (basic auth is sent only when a user is set)
+    N8N_WEBHOOK_URL = os.getenv('N8N_WEBHOOK_URL', 'http://n8n:5678/webhook/financial-controller-chatbot')
+    N8N_WEBHOOK_USER = os.getenv('N8N_WEBHOOK_USER', '')
+    N8N_WEBHOOK_PASSWORD = os.getenv('N8N_WEBHOOK_PASSWORD', '')
+    N8N_WEBHOOK_TIMEOUT = float(os.getenv('N8N_WEBHOOK_TIMEOUT', '45'))
+    # Chat turns run in the background: webhook calls in flight at once (all
+    # sessions), seconds between checks for answers, and how long an answer
+    # nobody collected is kept
+    CHAT_WORKERS = int(os.getenv('CHAT_WORKERS', '8'))
+    CHAT_POLL_INTERVAL = float(os.getenv('CHAT_POLL_INTERVAL', '1.0'))
+    CHAT_TURN_TTL = int(os.getenv('CHAT_TURN_TTL', '3600'))
+    
+    # Authentication: login tokens are signed with AUTH_SECRET_KEY (random per
+    # process if unset), last AUTH_SESSION_HOURS, and are re-checked against
+    # app_sessions at most every AUTH_TOKEN_CACHE_TTL seconds
+    AUTH_SECRET_KEY = os.getenv('AUTH_SECRET_KEY', '')
+    AUTH_SESSION_HOURS = float(os.getenv('AUTH_SESSION_HOURS', '12'))
+    AUTH_TOKEN_CACHE_TTL = float(os.getenv('AUTH_TOKEN_CACHE_TTL', '60'))
+    AUTH_TOKEN_CACHE_SIZE = int(os.getenv('AUTH_TOKEN_CACHE_SIZE', '10000'))
+    # Most argon2 password hashes run at once per process (each takes ~64 MiB
+    # while it runs); further logins wait for a slot
+    AUTH_HASH_WORKERS = int(os.getenv('AUTH_HASH_WORKERS', '2'))
+    
+    # Notion Configuration
+    NOTION_API_KEY = os.getenv('NOTION_API_KEY', '')
+    NOTION_VERSION = os.getenv('NOTION_VERSION', '2022-06-28')
+    NOTION_SYNC_WORKERS = int(os.getenv('NOTION_SYNC_WORKERS', '4'))
+    
+    # Embedding Configuration ('openai' or 'local' for the offline hashing embedder)
+    EMBEDDING_PROVIDER = os.getenv('EMBEDDING_PROVIDER', 'openai')
+    EMBEDDING_API_URL = os.getenv('EMBEDDING_API_URL', 'https://api.openai.com/v1/embeddings')
+    EMBEDDING_API_KEY = os.getenv('EMBEDDING_API_KEY', '')
+    EMBEDDING_MODEL = os.getenv('EMBEDDING_MODEL', 'text-embedding-3-small')
+    EMBEDDING_DIM = int(os.getenv('EMBEDDING_DIM', '1536'))
+    EMBEDDING_BATCH_SIZE = int(os.getenv('EMBEDDING_BATCH_SIZE', '128'))
+    EMBEDDING_CONCURRENCY = int(os.getenv('EMBEDDING_CONCURRENCY', '4'))
+    
+    # Chunking (rag/chunking.py): tokens per chunk and shared between
+    # neighbours, tiktoken encoding, and processes for batch chunking
+    CHUNK_TOKENS = int(os.getenv('CHUNK_TOKENS', '512'))
+    CHUNK_OVERLAP_TOKENS = int(os.getenv('CHUNK_OVERLAP_TOKENS', '64'))
+    CHUNK_ENCODING = os.getenv('CHUNK_ENCODING', 'cl100k_base')
+    CHUNK_WORKERS = int(os.getenv('CHUNK_WORKERS', '4'))
+    
+    # Zillow fetch client (zillow/fetch.py): search endpoint and key, shared
+    # rate limit, ZIPs in flight, and the on-disk response cache
+    ZILLOW_API_URL = os.getenv('ZILLOW_API_URL', 'https://zillow56.p.rapidapi.com/search')
+    ZILLOW_API_KEY = os.getenv('ZILLOW_API_KEY', '')
+    ZILLOW_SEARCH_STATUS = os.getenv('ZILLOW_SEARCH_STATUS', 'forRent')
+    ZILLOW_RATE_LIMIT = float(os.getenv('ZILLOW_RATE_LIMIT', '2'))
+    ZILLOW_RATE_BURST = int(os.getenv('ZILLOW_RATE_BURST', '5'))
+    ZILLOW_FETCH_WORKERS = int(os.getenv('ZILLOW_FETCH_WORKERS', '4'))
+    ZILLOW_FETCH_TIMEOUT = float(os.getenv('ZILLOW_FETCH_TIMEOUT', '30'))
+    ZILLOW_CACHE_DIR = os.getenv(
+        'ZILLOW_CACHE_DIR',
+        os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'zillow_cache')
+    )
+    # Seconds a cached search page is reused before it is revalidated
+    ZILLOW_CACHE_TTL = float(os.getenv('ZILLOW_CACHE_TTL', '21600'))
+    # Seconds between checks for ZIPs moved to another market (zillow/markets.py)
+    ZILLOW_MARKET_CACHE_TTL = float(os.getenv('ZILLOW_MARKET_CACHE_TTL', '60'))
+    # Listing archive (zillow/archive.py): Parquet directory, ingestions of a
+    # ZIP without a listing before it is archived, and listings per batch
+    ZILLOW_ARCHIVE_DIR = os.getenv(
+        'ZILLOW_ARCHIVE_DIR',
+        os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'listing_archive')
+    )
+    ZILLOW_ARCHIVE_AFTER_INGESTIONS = int(os.getenv('ZILLOW_ARCHIVE_AFTER_INGESTIONS', '3'))
+    ZILLOW_ARCHIVE_BATCH_SIZE = int(os.getenv('ZILLOW_ARCHIVE_BATCH_SIZE', '5000'))
+    
+    # SOP market reports (analytics/market_report.py)
+    REPORT_DIR = os.getenv(
+        'REPORT_DIR',
+        os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'reports')
+    )
+    REPORT_WORKERS = int(os.getenv('REPORT_WORKERS', '4'))
+    
+    # Job Runner Configuration
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', '2'))
+    JOB_POLL_INTERVAL = float(os.getenv('JOB_POLL_INTERVAL', '2'))
+    JOB_LEASE_SECONDS = int(os.getenv('JOB_LEASE_SECONDS', '1800'))
+    
+    # Event Sink Configuration (write-behind app_events, see events/sink.py)
+    EVENT_SINK_ENABLED = os.getenv('EVENT_SINK_ENABLED', 'true').lower() == 'true'
+    EVENT_QUEUE_SIZE = int(os.getenv('EVENT_QUEUE_SIZE', '10000'))
+    EVENT_BATCH_SIZE = int(os.getenv('EVENT_BATCH_SIZE', '500'))
+    EVENT_FLUSH_INTERVAL_MS = float(os.getenv('EVENT_FLUSH_INTERVAL_MS', '250'))
+    EVENT_BLOCK_TIMEOUT_MS = float(os.getenv('EVENT_BLOCK_TIMEOUT_MS', '50'))
+    
+    # SQL scripts (schema/ at the repository root unless overridden)
+    SCHEMA_DIR = os.getenv(
+        'SCHEMA_DIR',
+        os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'schema')
+    )
     
     # Streamlit Configuration
     STREAMLIT_SERVER_PORT = int(os.getenv('STREAMLIT_SERVER_PORT', '8501'))
+    # Seconds between checks for new dashboard filter options (ZIPs, types, statuses)
+    FILTER_OPTIONS_TTL = float(os.getenv('FILTER_OPTIONS_TTL', '60'))
     
     # App Configuration
     APP_NAME = "Chat Hub & Rental Market Analytics"
@@ -3,17 +3,24 @@ Database connection and query utilities for PostgreSQL
 """
 import psycopg2
 from psycopg2.extras import RealDictCursor
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 import sys
 import os
+import threading
 import time
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Callable, Optional
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config import settings
 
+# Shared by every session, so concurrent panels cannot fan out into more than
+# POSTGRES_QUERY_WORKERS simultaneous connections per process
+_query_pool: Optional[ThreadPoolExecutor] = None
+_query_pool_lock = threading.Lock()
+
 
 @contextmanager
 def get_connection(max_retries=3, retry_delay=2):
@@ -149,3 +156,30 @@ def test_connection() -> bool:
     except Exception as e:
         print(f"[DB] Connection test failed: {str(e)}")
         return False
+
+
+def run_concurrently(tasks: Dict[str, Callable[[], Any]]) -> Dict[str, Any]:
+    """
+    Run independent fetches on the shared query pool and wait for all of them.
+    
+    Args:
+        tasks: Mapping of name to a zero-argument callable (e.g. a lambda
+            around fetch_data)
+        
+    Returns:
+        Mapping of name to result; the first failing task's exception is
+        re-raised once every task has finished
+    """
+    global _query_pool
+    if len(tasks) <= 1:
+        return {name: task() for name, task in tasks.items()}
+    with _query_pool_lock:
+        if _query_pool is None:
+            _query_pool = ThreadPoolExecutor(
+                max_workers=settings.POSTGRES_QUERY_WORKERS, thread_name_prefix="db-query"
+            )
+    futures = {name: _query_pool.submit(task) for name, task in tasks.items()}
+    errors = [f.exception() for f in futures.values() if f.exception() is not None]
+    if errors:
+        raise errors[0]
+    return {name: future.result() for name, future in futures.items()}
@@ -0,0 +1,4 @@
+# Events package
+from .sink import EventSink, get_event_sink, emit_event, write_events
+
+__all__ = ['EventSink', 'get_event_sink', 'emit_event', 'write_events']
@@ -0,0 +1,229 @@
+"""
+Write-behind sink for application events (table: app_events, see
+schema/events.sql).
+
+emit() only puts the event on a bounded in-process queue; one background
+thread drains it and writes batches of up to EVENT_BATCH_SIZE events, or
+whatever arrived within EVENT_FLUSH_INTERVAL_MS, in a single statement
+(execute_values, or COPY for large batches). The request path never opens
+a connection for an event.
+
+When the queue is full, emit() blocks for at most EVENT_BLOCK_TIMEOUT_MS
+(backpressure on the producer) and then drops the event and counts it, so
+a slow or unavailable database never stalls a user-facing rerun for long.
+The default sink flushes on interpreter shutdown.
+
+Usage:
+    from events import emit_event
+
+    emit_event('chat_message', {'role': 'user', 'content': prompt}, username='alice')
+"""
+import atexit
+import csv
+import io
+import json
+import queue
+import sys
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional, Tuple
+
+from psycopg2.extras import execute_values
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from db import database
+
+EVENT_COLUMNS = ('event_type', 'username', 'session_id', 'payload', 'created_at')
+
+# Batches at least this large are written with COPY instead of execute_values
+COPY_MIN_ROWS = 200
+
+WRITE_RETRIES = 3
+WRITE_RETRY_DELAY = 1.0
+
+EventRow = Tuple[str, Optional[str], Optional[str], str, datetime]
+
+
+class _FlushMarker:
+    """Queued by flush(); set once every event queued before it is written"""
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+class EventSink:
+    """Bounded queue plus one background writer thread"""
+
+    def __init__(self, max_queue: Optional[int] = None, batch_size: Optional[int] = None,
+                 flush_interval_ms: Optional[float] = None, block_timeout_ms: Optional[float] = None):
+        """
+        Args:
+            max_queue: Events held in memory before emit() applies backpressure
+            batch_size: Most events written per statement
+            flush_interval_ms: Longest an event waits for its batch to fill
+            block_timeout_ms: How long emit() blocks on a full queue before dropping
+        """
+        self.batch_size = batch_size or settings.EVENT_BATCH_SIZE
+        self.flush_interval = (flush_interval_ms or settings.EVENT_FLUSH_INTERVAL_MS) / 1000
+        self.block_timeout = (
+            block_timeout_ms if block_timeout_ms is not None else settings.EVENT_BLOCK_TIMEOUT_MS
+        ) / 1000
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue or settings.EVENT_QUEUE_SIZE)
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {'emitted': 0, 'written': 0, 'dropped': 0, 'failed': 0, 'batches': 0}
+
+    def start(self) -> 'EventSink':
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="event-sink", daemon=True)
+                self._thread.start()
+        return self
+
+    def emit(self, event_type: str, payload: Optional[Dict[str, Any]] = None,
+             username: Optional[str] = None, session_id: Optional[str] = None) -> bool:
+        """
+        Queue an event without touching the database.
+
+        Returns:
+            False if the queue stayed full for block_timeout and the event was dropped
+        """
+        row: EventRow = (
+            event_type, username, session_id,
+            json.dumps(payload or {}, default=str), datetime.now(timezone.utc)
+        )
+        try:
+            if self.block_timeout > 0:
+                self._queue.put(row, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(row)
+        except queue.Full:
+            with self._lock:
+                self.stats['dropped'] += 1
+            return False
+        with self._lock:
+            self.stats['emitted'] += 1
+        return True
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Wait until everything queued so far is written; returns False on timeout"""
+        if self._thread is None or not self._thread.is_alive():
+            return self._queue.empty()
+        marker = _FlushMarker()
+        try:
+            self._queue.put(marker, timeout=timeout)
+        except queue.Full:
+            return False
+        return marker.done.wait(timeout)
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Flush, then stop the writer thread"""
+        self.flush(timeout)
+        self._stop.set()
+        try:
+            # Wake the writer if it is waiting for events, instead of letting
+            # it sit out the rest of flush_interval
+            self._queue.put_nowait(_FlushMarker())
+        except queue.Full:
+            pass
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    # --------------------------------------------------------------------------
+    # Writer thread
+    # --------------------------------------------------------------------------
+
+    def _run(self) -> None:
+        while not (self._stop.is_set() and self._queue.empty()):
+            batch, markers = self._next_batch()
+            if batch:
+                self._write(batch)
+            for marker in markers:
+                marker.done.set()
+
+    def _next_batch(self) -> Tuple[List[EventRow], List[_FlushMarker]]:
+        """Collect up to batch_size events, or what arrives within flush_interval"""
+        batch: List[EventRow] = []
+        markers: List[_FlushMarker] = []
+        deadline = None
+        while len(batch) < self.batch_size:
+            timeout = self.flush_interval if deadline is None else deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if isinstance(item, _FlushMarker):
+                # Write what is queued ahead of the marker right away
+                markers.append(item)
+                break
+            batch.append(item)
+            if deadline is None:
+                deadline = time.monotonic() + self.flush_interval
+        return batch, markers
+
+    def _write(self, batch: List[EventRow]) -> None:
+        for attempt in range(WRITE_RETRIES):
+            try:
+                write_events(batch)
+                with self._lock:
+                    self.stats['written'] += len(batch)
+                    self.stats['batches'] += 1
+                return
+            except Exception as e:
+                print(f"[EVENTS] Writing {len(batch)} events failed: {str(e)}")
+                if attempt < WRITE_RETRIES - 1:
+                    time.sleep(WRITE_RETRY_DELAY * 2 ** attempt)
+        with self._lock:
+            self.stats['failed'] += len(batch)
+
+
+def write_events(rows: List[EventRow]) -> None:
+    """Insert event rows in one statement: COPY for large batches, execute_values otherwise"""
+    with database.get_connection() as conn:
+        with conn.cursor() as cur:
+            if len(rows) >= COPY_MIN_ROWS:
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(rows)
+                buffer.seek(0)
+                cur.copy_expert(
+                    f"COPY app_events ({', '.join(EVENT_COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buffer
+                )
+            else:
+                execute_values(cur, f"""
+                    INSERT INTO app_events ({', '.join(EVENT_COLUMNS)})
+                    VALUES %s
+                """, rows, template="(%s, %s, %s, %s::jsonb, %s)", page_size=len(rows))
+
+
+_default_sink: Optional[EventSink] = None
+_default_lock = threading.Lock()
+
+
+def get_event_sink() -> EventSink:
+    """Process-wide sink, started on first use and flushed at exit"""
+    global _default_sink
+    with _default_lock:
+        if _default_sink is None:
+            _default_sink = EventSink().start()
+            atexit.register(_default_sink.close)
+        return _default_sink
+
+
+def emit_event(event_type: str, payload: Optional[Dict[str, Any]] = None,
+               username: Optional[str] = None, session_id: Optional[str] = None) -> bool:
+    """Queue an event on the default sink (a no-op when EVENT_SINK_ENABLED is off)"""
+    if not settings.EVENT_SINK_ENABLED:
+        return False
+    return get_event_sink().emit(event_type, payload, username, session_id)
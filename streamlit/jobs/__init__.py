@@ -0,0 +1,4 @@
+# Jobs package
+from .queue import enqueue, claim, heartbeat, complete, fail, reap_stale, queue_stats
+
+__all__ = ['enqueue', 'claim', 'heartbeat', 'complete', 'fail', 'reap_stale', 'queue_stats']
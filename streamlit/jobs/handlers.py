@@ -0,0 +1,117 @@
+"""
+Job handlers. Each handler takes the job payload and returns a small
+JSON-serializable result that is stored on the job and in ingestion_log.
+
+Handlers must be idempotent: a job can run more than once after a crash or
+retry.
+"""
+import sys
+import os
+from typing import Callable, Dict, Any
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+HANDLERS: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {}
+
+
+def register(job_type: str):
+    """Decorator registering a handler for a job type"""
+    def decorator(fn):
+        HANDLERS[job_type] = fn
+        return fn
+    return decorator
+
+
+@register('zillow_ingest')
+def zillow_ingest(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Upsert a Zillow search payload.
+
+    Payload:
+        results: inline search results (as posted by n8n), or
+        file: path to a saved search payload
+        zip_code: optional ZIP restriction
+        run_id: id shared by every page of one paginated search, so the
+            ZIPs count as ingested once per run (see zillow/ingest.py)
+    """
+    from zillow import ingest_payload, load_payload
+
+    if 'results' in payload:
+        search = {'results': payload['results']}
+    elif 'file' in payload:
+        search = load_payload(payload['file'])
+    else:
+        raise ValueError("zillow_ingest payload needs 'results' or 'file'")
+    return {'listings': ingest_payload(search, payload.get('zip_code'), payload.get('run_id'))}
+
+
+@register('zillow_fetch')
+def zillow_fetch(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Fetch ZIP searches through the response cache and ingest the changed ones.
+
+    Payload:
+        zip_codes: ZIPs to fetch (default: every tracked ZIP)
+        replay: serve from the cache only (default False)
+        force: ingest unchanged ZIPs too (default False)
+    """
+    from zillow.fetch import fetch_and_ingest, tracked_zip_codes
+
+    summary = fetch_and_ingest(payload.get('zip_codes') or tracked_zip_codes(),
+                               payload.get('replay', False), payload.get('force', False))
+    if summary['errors']:
+        raise Exception(f"{len(summary['errors'])} ZIP(s) failed: {summary['errors']}")
+    return summary
+
+
+@register('notion_sync')
+def notion_sync(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Run an incremental Notion sync (payload: discover, default True)"""
+    from rag import NotionSync, get_default_pipeline
+
+    pipeline = get_default_pipeline()
+    sync = NotionSync(embed_texts=pipeline.embed, embedding_model=pipeline.model)
+    totals = sync.run(discover=payload.get('discover', True))
+    if totals['failed']:
+        raise Exception(f"{totals['failed']} Notion page(s) failed to sync")
+    return {**totals, 'embedding': pipeline.stats}
+
+
+@register('aggregate_metrics')
+def aggregate_metrics(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Run populate_zillow_metrics.sql blocks (payload: blocks, default all)"""
+    from zillow import run_aggregations
+
+    timings = run_aggregations(payload.get('blocks'))
+    return {'seconds': {name: round(elapsed, 3) for name, elapsed in timings.items()}}
+
+
+@register('market_report')
+def market_report(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Write the SOP market report for every tracked ZIP (unchanged ZIPs are skipped).
+
+    Payload:
+        out_dir, formats, zip_codes, force: see analytics.market_report.generate_reports
+    """
+    from analytics import REPORT_FORMATS, generate_market_reports
+
+    return generate_market_reports(
+        payload.get('out_dir'), payload.get('formats', REPORT_FORMATS),
+        payload.get('zip_codes'), payload.get('force', False)
+    )
+
+
+@register('zillow_archive')
+def zillow_archive(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Move delisted listings to the Parquet archive.
+
+    Payload:
+        after, batch_size, max_batches, markets: see zillow.archive.archive_delisted
+    """
+    from zillow.archive import archive_delisted
+
+    return archive_delisted(payload.get('after'), payload.get('batch_size'),
+                            payload.get('max_batches'), payload.get('markets'))
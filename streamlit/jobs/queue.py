@@ -0,0 +1,202 @@
+"""
+Postgres job queue operations (table: job_queue, see schema/jobs.sql)
+"""
+import json
+import random
+import sys
+import os
+from typing import List, Dict, Any, Optional
+
+from psycopg2.extras import RealDictCursor
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import database
+
+# Retry backoff: BACKOFF_BASE_SECONDS * 2^(attempt-1), capped, plus jitter
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 3600
+
+
+def enqueue(job_type: str, payload: Optional[Dict[str, Any]] = None,
+            dedupe_key: Optional[str] = None, max_attempts: int = 5,
+            force: bool = False) -> Optional[int]:
+    """
+    Add a job to the queue.
+
+    With a dedupe_key, enqueueing is idempotent: a key that already exists is
+    left alone (so reruns skip finished work) unless it is dead or force=True.
+
+    Returns:
+        Job id, or None if an existing job was kept
+    """
+    requeue_condition = "TRUE" if force else "job_queue.status = 'dead'"
+    row = database.fetch_one(f"""
+        INSERT INTO job_queue (job_type, payload, dedupe_key, max_attempts)
+        VALUES (%s, %s::jsonb, %s, %s)
+        ON CONFLICT (dedupe_key) DO UPDATE SET
+            status = 'queued',
+            payload = EXCLUDED.payload,
+            attempts = 0,
+            run_after = now(),
+            last_error = NULL,
+            updated_at = now()
+        WHERE job_queue.status <> 'running' AND {requeue_condition}
+        RETURNING id
+    """, (job_type, json.dumps(payload or {}), dedupe_key, max_attempts))
+    return row['id'] if row else None
+
+
+def claim(worker_id: str, job_types: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Atomically claim the next due job.
+
+    SKIP LOCKED lets concurrent workers pass over rows another worker is
+    claiming instead of blocking on them.
+    """
+    type_filter = "AND job_type = ANY(%s)" if job_types else ""
+    params = (worker_id,) + ((list(job_types),) if job_types else ())
+    return database.fetch_one(f"""
+        UPDATE job_queue SET
+            status = 'running',
+            locked_by = %s,
+            locked_at = now(),
+            attempts = attempts + 1,
+            updated_at = now()
+        WHERE id = (
+            SELECT id FROM job_queue
+            WHERE status = 'queued' AND run_after <= now() {type_filter}
+            ORDER BY run_after, id
+            FOR UPDATE SKIP LOCKED
+            LIMIT 1
+        )
+        RETURNING id, job_type, payload, dedupe_key, attempts, max_attempts, locked_by
+    """, params)
+
+
+# complete/fail/heartbeat only touch a job this worker still holds: once its
+# lease expires the reaper may hand it to another worker
+OWNED_SQL = "id = %s AND locked_by = %s AND status = 'running'"
+
+
+def heartbeat(job: Dict[str, Any]) -> bool:
+    """
+    Extend a running job's lease (locked_at) so reap_stale leaves it alone.
+
+    Returns:
+        False if the worker no longer holds the job
+    """
+    rows = database.fetch_data(f"""
+        UPDATE job_queue SET locked_at = now(), updated_at = now()
+        WHERE {OWNED_SQL}
+        RETURNING id
+    """, (job['id'], job['locked_by']))
+    return bool(rows)
+
+
+def complete(job: Dict[str, Any], result: Optional[Dict[str, Any]] = None) -> bool:
+    """
+    Mark a job done and checkpoint it into ingestion_log.
+
+    Returns:
+        False (and nothing is written) if the worker lost the job's lease
+    """
+    with database.get_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(f"""
+                UPDATE job_queue SET
+                    status = 'done', result = %s::jsonb, locked_by = NULL,
+                    finished_at = now(), updated_at = now()
+                WHERE {OWNED_SQL}
+            """, (json.dumps(result, default=str), job['id'], job['locked_by']))
+            if cur.rowcount == 0:
+                return False
+            _checkpoint(cur, job, 'ingested', None, result)
+    return True
+
+
+def fail(job: Dict[str, Any], error: str) -> str:
+    """
+    Record a failure: reschedule with exponential backoff, or mark the job
+    dead once max_attempts is reached.
+
+    Returns:
+        New status ('queued' or 'dead'), or 'lost' (nothing written) if the
+        worker lost the job's lease
+    """
+    attempts = job['attempts']
+    if attempts >= job['max_attempts']:
+        status, delay = 'dead', 0
+    else:
+        status = 'queued'
+        delay = min(BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), BACKOFF_MAX_SECONDS)
+        delay += random.uniform(0, delay * 0.1)
+
+    with database.get_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(f"""
+                UPDATE job_queue SET
+                    status = %s, last_error = %s, locked_by = NULL,
+                    run_after = now() + make_interval(secs => %s),
+                    finished_at = CASE WHEN %s = 'dead' THEN now() ELSE NULL END,
+                    updated_at = now()
+                WHERE {OWNED_SQL}
+            """, (status, error, delay, status, job['id'], job['locked_by']))
+            if cur.rowcount == 0:
+                return 'lost'
+            _checkpoint(cur, job, 'error', error, {'retry_in_seconds': round(delay), 'final': status == 'dead'})
+    return status
+
+
+def reap_stale(lease_seconds: int) -> Dict[str, int]:
+    """
+    Requeue jobs whose worker died mid-run (no heartbeat within the lease).
+
+    Jobs that have used all their attempts go dead instead, so a job that
+    kills its worker is not retried forever.
+
+    Returns:
+        {'queued': jobs requeued, 'dead': jobs marked dead}
+    """
+    error = 'lease expired'
+    with database.get_connection() as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute("""
+                UPDATE job_queue SET
+                    status = CASE WHEN attempts >= max_attempts THEN 'dead' ELSE 'queued' END,
+                    finished_at = CASE WHEN attempts >= max_attempts THEN now() ELSE NULL END,
+                    locked_by = NULL, run_after = now(), updated_at = now(),
+                    last_error = %s
+                WHERE status = 'running' AND locked_at < now() - make_interval(secs => %s)
+                RETURNING id, job_type, dedupe_key, attempts, status
+            """, (error, lease_seconds))
+            rows = cur.fetchall()
+            for row in rows:
+                if row['status'] == 'dead':
+                    _checkpoint(cur, row, 'error', error, {'final': True})
+    return {status: sum(1 for row in rows if row['status'] == status) for status in ('queued', 'dead')}
+
+
+def queue_stats() -> List[Dict[str, Any]]:
+    """Job counts per type and status"""
+    return database.fetch_data("""
+        SELECT job_type, status, COUNT(*) as count
+        FROM job_queue
+        GROUP BY job_type, status
+        ORDER BY job_type, status
+    """)
+
+
+def _checkpoint(cur, job: Dict[str, Any], status: str, error: Optional[str],
+                metadata: Optional[Dict[str, Any]]) -> None:
+    cur.execute("""
+        INSERT INTO ingestion_log (source, source_id, status, error_message, metadata)
+        VALUES (%s, %s, %s, %s, %s::jsonb)
+    """, (
+        job['job_type'],
+        job.get('dedupe_key') or str(job['id']),
+        status,
+        error,
+        json.dumps({'job_id': job['id'], 'attempt': job['attempts'], **(metadata or {})}, default=str),
+    ))
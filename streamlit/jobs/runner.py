@@ -0,0 +1,169 @@
+"""
+Multi-process job runner.
+
+Each worker process loops: claim a due job (FOR UPDATE SKIP LOCKED), run
+its handler, then checkpoint success or failure. While the handler runs, a
+heartbeat thread extends the job's lease every third of
+JOB_LEASE_SECONDS, so only jobs whose worker died are reaped. Scaling out
+is just starting more workers, here or on another host.
+
+Usage (from the streamlit/ directory):
+    python -m jobs.runner work --workers 4
+    python -m jobs.runner enqueue zillow_ingest --payload '{"file": "../mock_data/zillow_45223_mock.json"}' --key zillow:45223:2025-11-20
+    python -m jobs.runner stats
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+import traceback
+from typing import List, Optional
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from jobs import queue
+from jobs.handlers import HANDLERS
+
+
+def heartbeat_loop(job: dict, interval: float, stop: threading.Event) -> None:
+    """Extend the job's lease every interval seconds until stop is set or the lease is lost"""
+    while not stop.wait(interval):
+        try:
+            if not queue.heartbeat(job):
+                print(f"[JOBS] Lost the lease on job {job['id']}; its result will be discarded")
+                return
+        except Exception as e:
+            print(f"[JOBS] Heartbeat for job {job['id']} failed: {str(e)}")
+
+
+def worker_loop(worker_index: int, job_types: Optional[List[str]], poll_interval: float,
+                lease_seconds: int, max_jobs: Optional[int] = None) -> None:
+    """Claim and run jobs until SIGTERM/SIGINT (or max_jobs is reached)"""
+    worker_id = f"{socket.gethostname()}:{os.getpid()}:{worker_index}"
+    stopping = False
+
+    def request_stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    print(f"[JOBS] Worker {worker_id} started (types: {job_types or 'all'})")
+    processed = 0
+    last_reap = 0.0
+    while not stopping and (max_jobs is None or processed < max_jobs):
+        try:
+            # Any worker may reap; the UPDATE is idempotent
+            if time.monotonic() - last_reap > lease_seconds / 2:
+                reaped = queue.reap_stale(lease_seconds)
+                if reaped['queued'] or reaped['dead']:
+                    print(f"[JOBS] Expired leases: requeued {reaped['queued']} job(s), "
+                          f"{reaped['dead']} out of attempts marked dead")
+                last_reap = time.monotonic()
+
+            job = queue.claim(worker_id, job_types)
+        except Exception as e:
+            print(f"[JOBS] Worker {worker_id} queue error: {str(e)}")
+            time.sleep(poll_interval)
+            continue
+
+        if not job:
+            time.sleep(poll_interval)
+            continue
+
+        handler = HANDLERS.get(job['job_type'])
+        start = time.perf_counter()
+        stop_heartbeat = threading.Event()
+        heartbeat = threading.Thread(
+            target=heartbeat_loop, args=(job, lease_seconds / 3, stop_heartbeat),
+            name=f"job-heartbeat-{job['id']}", daemon=True
+        )
+        heartbeat.start()
+        try:
+            if handler is None:
+                raise ValueError(f"No handler registered for job type '{job['job_type']}'")
+            result = handler(job['payload'] or {})
+            stop_heartbeat.set()
+            if queue.complete(job, {**(result or {}), 'seconds': round(time.perf_counter() - start, 3)}):
+                print(f"[JOBS] {worker_id} finished job {job['id']} ({job['job_type']})")
+            else:
+                print(f"[JOBS] {worker_id} finished job {job['id']} after losing its lease; result discarded")
+        except Exception as e:
+            stop_heartbeat.set()
+            print(f"[JOBS] {worker_id} job {job['id']} ({job['job_type']}) failed: {str(e)}")
+            print(traceback.format_exc())
+            status = queue.fail(job, str(e))
+            print(f"[JOBS] Job {job['id']} -> {status} (attempt {job['attempts']}/{job['max_attempts']})")
+        finally:
+            stop_heartbeat.set()
+            heartbeat.join()
+        processed += 1
+
+    print(f"[JOBS] Worker {worker_id} stopped after {processed} job(s)")
+
+
+def run_workers(workers: int, job_types: Optional[List[str]] = None,
+                poll_interval: Optional[float] = None, lease_seconds: Optional[int] = None) -> None:
+    """Start worker processes and wait for them; SIGTERM is forwarded to children"""
+    poll_interval = poll_interval or settings.JOB_POLL_INTERVAL
+    lease_seconds = lease_seconds or settings.JOB_LEASE_SECONDS
+
+    processes = [
+        multiprocessing.Process(
+            target=worker_loop, args=(index, job_types, poll_interval, lease_seconds),
+            name=f"job-worker-{index}"
+        )
+        for index in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    def forward(signum, frame):
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    signal.signal(signal.SIGTERM, forward)
+    signal.signal(signal.SIGINT, forward)
+    for process in processes:
+        process.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Postgres-backed job runner")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    work = subparsers.add_parser("work", help="Run worker processes")
+    work.add_argument("--workers", type=int, default=settings.JOB_WORKERS)
+    work.add_argument("--types", nargs="*", help="Only claim these job types")
+
+    enqueue = subparsers.add_parser("enqueue", help="Add a job")
+    enqueue.add_argument("job_type", choices=sorted(HANDLERS))
+    enqueue.add_argument("--payload", default="{}", help="JSON payload")
+    enqueue.add_argument("--key", help="Dedupe key (idempotent enqueue)")
+    enqueue.add_argument("--max-attempts", type=int, default=5)
+    enqueue.add_argument("--force", action="store_true", help="Requeue even if the key already finished")
+
+    subparsers.add_parser("stats", help="Show queue counts")
+
+    args = parser.parse_args()
+    if args.command == "work":
+        run_workers(args.workers, args.types)
+    elif args.command == "enqueue":
+        job_id = queue.enqueue(args.job_type, json.loads(args.payload), args.key, args.max_attempts, args.force)
+        print(f"[JOBS] Enqueued job {job_id}" if job_id else f"[JOBS] Job '{args.key}' already exists, skipped")
+    else:
+        for row in queue.queue_stats():
+            print(f"{row['job_type']:<20} {row['status']:<8} {row['count']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+# Mock n8n webhook package
+from .server import MockN8nConfig, start_mock_server, render_body, SHAPES
+
+__all__ = ['MockN8nConfig', 'start_mock_server', 'render_body', 'SHAPES']
@@ -0,0 +1,241 @@
+"""
+Local mock of the n8n chat webhook for offline benchmarks and tests.
+
+Answers POST /webhook/<name> with every response shape that
+ControllerAgentChat.get_controller_response parses:
+
+    list_output    [{"output": "..."}]         (the default n8n shape)
+    list_response  [{"response": "..."}]
+    list_message   [{"message": "..."}]
+    dict_output    {"output": "..."}
+    dict_response  {"response": "..."}
+    dict_answer    {"answer": "..."}
+    dict_result    {"result": "..."}
+    plain_text     "..." as text/plain
+    empty          200 with an empty body
+
+Latency (base + uniform jitter), chunked streaming of the body and an error
+rate (random 500/401/404 answers) are configurable per server, and can be
+overridden per request with X-Mock-Shape, X-Mock-Latency and X-Mock-Error
+headers. GET /stats returns request counters, GET /health returns "ok".
+
+Usage (from the streamlit/ directory):
+    python -m mock_n8n.server --port 5679 --latency 1.5 --jitter 0.5 --error-rate 0.05
+    N8N_WEBHOOK_URL=http://127.0.0.1:5679/webhook/financial-controller-chatbot streamlit run app.py
+"""
+import argparse
+import base64
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Optional, Tuple
+
+SHAPES = [
+    'list_output', 'list_response', 'list_message',
+    'dict_output', 'dict_response', 'dict_answer', 'dict_result',
+    'plain_text', 'empty',
+]
+
+ERROR_STATUSES = [500, 401, 404]
+
+
+class MockN8nConfig:
+    """Behaviour of a mock webhook server"""
+
+    def __init__(self, shape: str = 'list_output', latency: float = 0.5, jitter: float = 0.0,
+                 error_rate: float = 0.0, error_statuses: Optional[List[int]] = None,
+                 stream: bool = False, chunk_size: int = 32, chunk_delay: float = 0.05,
+                 username: str = '', password: str = '', seed: Optional[int] = None):
+        """
+        Args:
+            shape: One of SHAPES, or 'random' to pick one per request
+            latency: Seconds before the first byte
+            jitter: Extra uniform random delay, 0..jitter seconds
+            error_rate: Probability of answering with an error status
+            error_statuses: Statuses to draw errors from
+            stream: Send the body in chunks (Transfer-Encoding: chunked)
+            chunk_size: Bytes per streamed chunk
+            chunk_delay: Seconds between streamed chunks
+            username: Require this basic-auth user (401 otherwise); '' disables auth
+            password: Basic-auth password
+            seed: RNG seed for reproducible shapes, jitter and errors
+        """
+        if shape != 'random' and shape not in SHAPES:
+            raise ValueError(f"Unknown shape: {shape}")
+        self.shape = shape
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_statuses = error_statuses or ERROR_STATUSES
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+        self.username = username
+        self.password = password
+        self.rng = random.Random(seed)
+
+
+def render_body(shape: str, text: str) -> Tuple[bytes, str]:
+    """Encode a reply in the given shape; returns (body, content type)"""
+    if shape == 'plain_text':
+        return text.encode('utf-8'), 'text/plain; charset=utf-8'
+    if shape == 'empty':
+        return b'', 'application/json'
+    container, key = shape.split('_', 1)
+    payload: Any = {key: text}
+    if container == 'list':
+        payload = [payload]
+    return json.dumps(payload).encode('utf-8'), 'application/json'
+
+
+class MockN8nHandler(BaseHTTPRequestHandler):
+    """Request handler; behaviour comes from self.server.config"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send(200, b'ok', 'text/plain')
+        elif self.path == '/stats':
+            with self.server.lock:
+                stats = dict(self.server.stats)
+            self._send(200, json.dumps(stats).encode('utf-8'), 'application/json')
+        else:
+            self._send(404, b'{"message": "not found"}', 'application/json')
+
+    def do_POST(self):
+        config: MockN8nConfig = self.server.config
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+
+        if not self.path.startswith('/webhook/'):
+            self._count('not_found')
+            self._send(404, b'{"code": 404, "message": "The requested webhook is not registered."}', 'application/json')
+            return
+        if config.username and not self._authorized(config):
+            self._count('unauthorized')
+            self._send(401, b'Authorization data is wrong!', 'text/plain')
+            return
+        try:
+            body = json.loads(raw or b'{}')
+        except json.JSONDecodeError:
+            self._count('bad_request')
+            self._send(400, b'{"message": "invalid JSON"}', 'application/json')
+            return
+
+        with self.server.lock:
+            latency = float(self.headers.get('X-Mock-Latency', config.latency))
+            latency += config.rng.uniform(0, config.jitter) if config.jitter else 0.0
+            forced_error = self.headers.get('X-Mock-Error')
+            error_status = (
+                int(forced_error) if forced_error
+                else config.rng.choice(config.error_statuses) if config.rng.random() < config.error_rate
+                else None
+            )
+            shape = self.headers.get('X-Mock-Shape', config.shape)
+            if shape == 'random':
+                shape = config.rng.choice(SHAPES)
+
+        time.sleep(latency)
+
+        if error_status:
+            self._count(f'error_{error_status}')
+            self._send(error_status, b'{"message": "Mock workflow error"}', 'application/json')
+            return
+        if shape not in SHAPES:
+            self._count('bad_request')
+            self._send(400, json.dumps({"message": f"unknown shape {shape}"}).encode('utf-8'), 'application/json')
+            return
+
+        reply = f"Mock controller reply to: {str(body.get('message', ''))[:200]}"
+        data, content_type = render_body(shape, reply)
+        self._count('ok')
+        if config.stream and data:
+            self._stream(data, content_type, config)
+        else:
+            self._send(200, data, content_type)
+
+    def _authorized(self, config: MockN8nConfig) -> bool:
+        expected = base64.b64encode(f"{config.username}:{config.password}".encode('utf-8')).decode('utf-8')
+        return self.headers.get('Authorization') == f"Basic {expected}"
+
+    def _count(self, key: str) -> None:
+        with self.server.lock:
+            self.server.stats['requests'] += 1
+            self.server.stats[key] = self.server.stats.get(key, 0) + 1
+
+    def _send(self, status: int, data: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream(self, data: bytes, content_type: str, config: MockN8nConfig) -> None:
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        for offset in range(0, len(data), config.chunk_size):
+            chunk = data[offset:offset + config.chunk_size]
+            self.wfile.write(f"{len(chunk):X}\r\n".encode('ascii') + chunk + b"\r\n")
+            self.wfile.flush()
+            time.sleep(config.chunk_delay)
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_mock_server(config: Optional[MockN8nConfig] = None, host: str = '127.0.0.1',
+                      port: int = 0) -> Tuple[ThreadingHTTPServer, str]:
+    """
+    Start the mock in a background thread (port 0 picks a free port).
+
+    Returns:
+        (server, base_url); webhooks live under base_url + '/webhook/<name>'.
+        Call server.shutdown() to stop it.
+    """
+    server = ThreadingHTTPServer((host, port), MockN8nHandler)
+    server.daemon_threads = True
+    server.config = config or MockN8nConfig()
+    server.lock = threading.Lock()
+    server.stats: Dict[str, int] = {'requests': 0}
+    threading.Thread(target=server.serve_forever, name="mock-n8n", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock of the n8n chat webhook")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5679)
+    parser.add_argument("--shape", default="list_output", choices=SHAPES + ['random'])
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds before each reply")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random delay, up to this many seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with an error")
+    parser.add_argument("--stream", action="store_true", help="Send bodies with chunked transfer encoding")
+    parser.add_argument("--chunk-delay", type=float, default=0.05)
+    parser.add_argument("--username", default="", help="Require basic auth with this user")
+    parser.add_argument("--password", default="")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    config = MockN8nConfig(
+        shape=args.shape, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        stream=args.stream, chunk_delay=args.chunk_delay,
+        username=args.username, password=args.password, seed=args.seed
+    )
+    server, url = start_mock_server(config, args.host, args.port)
+    print(f"[MOCK N8N] Listening on {url}/webhook/<name> "
+          f"(shape {args.shape}, latency {args.latency}s, error rate {args.error_rate:.0%})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
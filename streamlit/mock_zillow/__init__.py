@@ -0,0 +1,4 @@
+# Mock Zillow search API package
+from .server import MockZillowConfig, start_mock_server
+
+__all__ = ['MockZillowConfig', 'start_mock_server']
@@ -0,0 +1,209 @@
+"""
+Local stub of the Zillow search API, serving the saved payloads in
+mock_data/ (zillow_<zip>_mock.json) for offline fetch-client runs.
+
+GET /search?location=<zip>&page=<n> answers with one page of that ZIP's
+results in the search payload format (results, resultsPerPage, totalPages,
+totalResultCount). Each page carries an ETag and a Last-Modified (the
+file's mtime) and honours If-None-Match / If-Modified-Since with 304.
+Unknown ZIPs get an empty result set.
+
+Latency, page size, a server-side rate limit (429 with Retry-After once
+exceeded) and an API key check are configurable. GET /stats returns
+request counters, GET /health returns "ok".
+
+Usage (from the streamlit/ directory):
+    python -m mock_zillow.server --port 5680 --page-size 5 --rate-limit 10
+    ZILLOW_API_URL=http://127.0.0.1:5680/search python -m zillow.fetch 45223 45224
+"""
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional, Tuple
+from urllib.parse import urlsplit, parse_qs
+
+MOCK_DATA_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'mock_data'
+)
+
+
+class MockZillowConfig:
+    """Behaviour of a stub search server"""
+
+    def __init__(self, data_dir: str = MOCK_DATA_DIR, page_size: Optional[int] = None,
+                 latency: float = 0.0, rate_limit: float = 0.0, api_key: str = ''):
+        """
+        Args:
+            data_dir: Directory holding zillow_<zip>_mock.json files
+            page_size: Results per page (default: the file's resultsPerPage)
+            latency: Seconds before each reply
+            rate_limit: Requests per second before answering 429; 0 disables
+            api_key: Require this value in X-RapidAPI-Key (401 otherwise); '' disables
+        """
+        self.data_dir = data_dir
+        self.page_size = page_size
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.api_key = api_key
+
+
+class MockZillowHandler(BaseHTTPRequestHandler):
+    """Request handler; behaviour comes from self.server.config"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        config: MockZillowConfig = self.server.config
+        url = urlsplit(self.path)
+        if url.path == '/health':
+            self._send(200, b'ok', 'text/plain')
+            return
+        if url.path == '/stats':
+            with self.server.lock:
+                stats = dict(self.server.stats)
+            self._send(200, json.dumps(stats).encode('utf-8'), 'application/json')
+            return
+        if url.path != '/search':
+            self._count('not_found')
+            self._send(404, b'{"message": "not found"}', 'application/json')
+            return
+        if config.api_key and self.headers.get('X-RapidAPI-Key') != config.api_key:
+            self._count('unauthorized')
+            self._send(401, b'{"message": "invalid API key"}', 'application/json')
+            return
+        retry_after = self._rate_limited(config)
+        if retry_after:
+            self._count('rate_limited')
+            self._send(429, b'{"message": "Too many requests"}', 'application/json',
+                       {'Retry-After': f"{retry_after:.2f}"})
+            return
+
+        query = parse_qs(url.query)
+        zip_code = query.get('location', [''])[0]
+        try:
+            page = max(int(query.get('page', ['1'])[0]), 1)
+        except ValueError:
+            self._count('bad_request')
+            self._send(400, b'{"message": "invalid page"}', 'application/json')
+            return
+
+        time.sleep(config.latency)
+        data, mtime = self._page(config, zip_code, page)
+        etag = f'"{hashlib.sha256(data).hexdigest()[:32]}"'
+        last_modified = formatdate(mtime, usegmt=True)
+        if self._not_modified(etag, mtime):
+            self._count('not_modified')
+            self._send(304, b'', 'application/json', {'ETag': etag, 'Last-Modified': last_modified})
+            return
+        self._count('ok')
+        self._send(200, data, 'application/json', {'ETag': etag, 'Last-Modified': last_modified})
+
+    def _page(self, config: MockZillowConfig, zip_code: str, page: int) -> Tuple[bytes, float]:
+        path = os.path.join(config.data_dir, f"zillow_{os.path.basename(zip_code)}_mock.json")
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+            mtime = os.path.getmtime(path)
+        except OSError:
+            payload, mtime = {'results': []}, 0.0
+        results = payload.get('results', [])
+        page_size = config.page_size or payload.get('resultsPerPage') or max(len(results), 1)
+        body = {
+            'results': results[(page - 1) * page_size:page * page_size],
+            'resultsPerPage': page_size,
+            'totalPages': max((len(results) + page_size - 1) // page_size, 1),
+            'totalResultCount': len(results),
+        }
+        return json.dumps(body).encode('utf-8'), mtime
+
+    def _not_modified(self, etag: str, mtime: float) -> bool:
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match:
+            return etag in [tag.strip() for tag in if_none_match.split(',')]
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since:
+            try:
+                return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def _rate_limited(self, config: MockZillowConfig) -> float:
+        """Sliding one-second window; returns seconds to wait, 0 if allowed"""
+        if not config.rate_limit:
+            return 0.0
+        now = time.monotonic()
+        with self.server.lock:
+            window = self.server.window
+            while window and now - window[0] >= 1.0:
+                window.pop(0)
+            if len(window) >= config.rate_limit:
+                return 1.0 - (now - window[0])
+            window.append(now)
+        return 0.0
+
+    def _count(self, key: str) -> None:
+        with self.server.lock:
+            self.server.stats['requests'] += 1
+            self.server.stats[key] = self.server.stats.get(key, 0) + 1
+
+    def _send(self, status: int, data: bytes, content_type: str,
+              headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_mock_server(config: Optional[MockZillowConfig] = None, host: str = '127.0.0.1',
+                      port: int = 0) -> Tuple[ThreadingHTTPServer, str]:
+    """
+    Start the stub in a background thread (port 0 picks a free port).
+
+    Returns:
+        (server, search_url). Call server.shutdown() to stop it.
+    """
+    server = ThreadingHTTPServer((host, port), MockZillowHandler)
+    server.daemon_threads = True
+    server.config = config or MockZillowConfig()
+    server.lock = threading.Lock()
+    server.window = []
+    server.stats: Dict[str, Any] = {'requests': 0}
+    threading.Thread(target=server.serve_forever, name="mock-zillow", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/search"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stub of the Zillow search API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5680)
+    parser.add_argument("--data-dir", default=MOCK_DATA_DIR)
+    parser.add_argument("--page-size", type=int, help="Results per page (default: the file's resultsPerPage)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds before each reply")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Requests per second before 429")
+    parser.add_argument("--api-key", default="", help="Require this X-RapidAPI-Key")
+    args = parser.parse_args()
+
+    config = MockZillowConfig(args.data_dir, args.page_size, args.latency, args.rate_limit, args.api_key)
+    server, url = start_mock_server(config, args.host, args.port)
+    print(f"[MOCK ZILLOW] Serving {args.data_dir} at {url}?location=<zip>&page=<n>")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,9 @@
 """
 Rental Market Dashboard - Zillow Data Analytics
+
+Only the selected view is rendered, and each view is a fragment: widget
+changes inside a view rerun that view alone. Independent queries within a
+view are fetched together on the shared query pool.
 """
 import streamlit as st
 import sys
@@ -12,6 +16,21 @@ from datetime import datetime, timedelta
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from db import database
+from zillow import get_filter_options, invalidate_filter_options, markets_for_zips
+from analytics import (
+    listing_filter_params,
+    fetch_listing_extent,
+    fetch_clusters,
+    fit_zoom,
+    build_cluster_deck,
+    MIN_MAP_ZOOM,
+    MAX_MAP_ZOOM,
+    get_zip_trends,
+    TREND_GRANULARITIES,
+    ANOMALY_Z_THRESHOLD,
+    UNIT_BUCKETS,
+    fetch_unit_bucket_table,
+)
 
 # Page configuration
 st.set_page_config(
@@ -20,6 +39,10 @@ st.set_page_config(
     layout="wide"
 )
 
+CLUSTERED_MAP = "All filtered listings (clustered)"
+DEFAULT_STATUSES = ['FOR_RENT', 'FOR_SALE']
+DEFAULT_TREND_PERIOD = list(TREND_GRANULARITIES)[2]
+
 # Helper function to safely convert to float
 def safe_float(value, default=0.0):
     """Safely convert value to float, return default if conversion fails"""
@@ -36,21 +59,21 @@ def safe_int(value, default=0):
     except (ValueError, TypeError):
         return default
 
-# Sidebar
 # Sidebar
 with st.sidebar:
     st.markdown("**📊 Rental Market Dashboard**")
     st.caption("Zillow data analytics for Cincinnati")
-    
+
     st.divider()
-    
+
     # Refresh button
     if st.button("🔄 Refresh Data", use_container_width=True, type="primary"):
         st.cache_data.clear()
+        invalidate_filter_options()
         st.rerun()
-    
+
     st.divider()
-    
+
     # Test database connection
     try:
         if database.test_connection():
@@ -59,39 +82,29 @@ with st.sidebar:
             st.error("🔴 Database Disconnected")
     except Exception as e:
         st.error(f"🔴 DB Error: {str(e)[:50]}")
-    
+
     st.divider()
-    
+
     # Navigation
     if st.button("🏠 Back to Hub", use_container_width=True):
         st.switch_page("app.py")
 
-# Main content
-st.title("📊 Rental Market Dashboard")
-st.caption("Real-time insights from Zillow rental data")
-
-# Create tabs
-tab1, tab2, tab3, tab4 = st.tabs([
-    "📈 Market Overview",
-    "🗺️ ZIP Code Analysis", 
-    "🏠 Property Listings",
-    "📊 Metrics Trends"
-])
 
 # ============================================================
-# TAB 1: MARKET OVERVIEW
+# VIEW 1: MARKET OVERVIEW
 # ============================================================
-with tab1:
+@st.fragment
+def render_market_overview():
     st.header("Market Overview")
-    
+
     try:
-        # Fetch summary statistics
+        # Fetch summary statistics and distributions together
         summary_query = """
-            SELECT 
+            SELECT
                 COUNT(*) as total_listings,
                 COUNT(DISTINCT zip_code) as active_zips,
-                AVG(CASE WHEN time_on_zillow > 0 THEN time_on_zillow::NUMERIC / 86400000 ELSE NULL END) as avg_dom,
-                PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY CASE WHEN time_on_zillow > 0 THEN time_on_zillow::NUMERIC / 86400000 ELSE NULL END) as median_dom,
+                AVG(days_on_market) as avg_dom,
+                PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY days_on_market) as median_dom,
                 AVG(price) as avg_rent,
                 PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY price) as median_rent,
                 MIN(price) as min_rent,
@@ -100,62 +113,82 @@ with tab1:
                 COUNT(*) FILTER (WHERE home_status = 'FOR_SALE') as for_sale_count
             FROM zillow_listings
         """
-        summary_data = database.fetch_one(summary_query)
-        
+        type_query = """
+            SELECT home_type, COUNT(*) as count
+            FROM zillow_listings
+            WHERE home_type IS NOT NULL
+            GROUP BY home_type
+            ORDER BY count DESC
+        """
+        bed_query = """
+            SELECT bedrooms, COUNT(*) as count
+            FROM zillow_listings
+            WHERE bedrooms IS NOT NULL
+            GROUP BY bedrooms
+            ORDER BY bedrooms
+        """
+        status_query = """
+            SELECT home_status, COUNT(*) as count
+            FROM zillow_listings
+            WHERE home_status IS NOT NULL
+            GROUP BY home_status
+            ORDER BY count DESC
+        """
+        results = database.run_concurrently({
+            'summary': lambda: database.fetch_one(summary_query),
+            'types': lambda: database.fetch_data(type_query),
+            'bedrooms': lambda: database.fetch_data(bed_query),
+            'statuses': lambda: database.fetch_data(status_query),
+        })
+        summary_data = results['summary']
+
         if summary_data:
             # KPI Cards
             col1, col2, col3, col4 = st.columns(4)
-            
+
             with col1:
                 st.metric(
-                    "Total Listings", 
+                    "Total Listings",
                     f"{safe_int(summary_data.get('total_listings', 0)):,}"
                 )
                 st.caption(f"📍 {safe_int(summary_data.get('active_zips', 0))} ZIP codes")
-            
+
             with col2:
                 median_dom = safe_float(summary_data.get('median_dom', 0))
                 st.metric(
-                    "Median Days on Market", 
+                    "Median Days on Market",
                     f"{median_dom:.1f} days"
                 )
                 avg_dom = safe_float(summary_data.get('avg_dom', 0))
                 st.caption(f"Average: {avg_dom:.1f} days")
-            
+
             with col3:
                 median_rent = safe_float(summary_data.get('median_rent', 0))
                 st.metric(
-                    "Median Rent", 
+                    "Median Rent",
                     f"${median_rent:,.0f}"
                 )
                 avg_rent = safe_float(summary_data.get('avg_rent', 0))
                 st.caption(f"Average: ${avg_rent:,.0f}")
-            
+
             with col4:
                 for_rent = safe_int(summary_data.get('for_rent_count', 0))
                 for_sale = safe_int(summary_data.get('for_sale_count', 0))
                 st.metric(
-                    "For Rent", 
+                    "For Rent",
                     f"{for_rent:,}"
                 )
                 st.caption(f"For Sale: {for_sale:,}")
-            
+
             st.divider()
-            
+
             # Distribution charts
             col1, col2 = st.columns(2)
-            
+
             with col1:
                 st.subheader("Listings by Property Type")
-                type_query = """
-                    SELECT home_type, COUNT(*) as count
-                    FROM zillow_listings
-                    WHERE home_type IS NOT NULL
-                    GROUP BY home_type
-                    ORDER BY count DESC
-                """
-                type_data = database.fetch_data(type_query)
-                
+                type_data = results['types']
+
                 if type_data:
                     df_type = pd.DataFrame(type_data)
                     chart = alt.Chart(df_type).mark_bar().encode(
@@ -167,18 +200,11 @@ with tab1:
                     st.altair_chart(chart, use_container_width=True)
                 else:
                     st.info("No property type data available")
-            
+
             with col2:
                 st.subheader("Listings by Bedrooms")
-                bed_query = """
-                    SELECT bedrooms, COUNT(*) as count
-                    FROM zillow_listings
-                    WHERE bedrooms IS NOT NULL
-                    GROUP BY bedrooms
-                    ORDER BY bedrooms
-                """
-                bed_data = database.fetch_data(bed_query)
-                
+                bed_data = results['bedrooms']
+
                 if bed_data:
                     df_bed = pd.DataFrame(bed_data)
                     chart = alt.Chart(df_bed).mark_bar().encode(
@@ -190,18 +216,11 @@ with tab1:
                     st.altair_chart(chart, use_container_width=True)
                 else:
                     st.info("No bedroom data available")
-            
+
             # Status distribution
             st.subheader("Listings by Status")
-            status_query = """
-                SELECT home_status, COUNT(*) as count
-                FROM zillow_listings
-                WHERE home_status IS NOT NULL
-                GROUP BY home_status
-                ORDER BY count DESC
-            """
-            status_data = database.fetch_data(status_query)
-            
+            status_data = results['statuses']
+
             if status_data:
                 df_status = pd.DataFrame(status_data)
                 chart = alt.Chart(df_status).mark_arc(innerRadius=50).encode(
@@ -214,365 +233,520 @@ with tab1:
                 st.info("No status data available")
         else:
             st.warning("No data available in the database")
-            
+
     except Exception as e:
         st.error(f"Error loading market overview: {str(e)}")
         st.info("Please ensure the database is populated with data")
-    
-    # ============================================================
-    # TAB 2: ZIP CODE ANALYSIS
-    # ============================================================
-    with tab2:
-        st.header("ZIP Code Analysis")
-        
-        try:
-            # Get available ZIP codes
-            zip_query = "SELECT DISTINCT zip_code FROM zillow_listings ORDER BY zip_code"
-            zip_data = database.fetch_data(zip_query)
-            
-            if zip_data:
-                available_zips = [row['zip_code'] for row in zip_data]
-                
-                # ZIP code selector
-                col1, col2 = st.columns([1, 3])
-                with col1:
-                    selected_zips = st.multiselect(
-                        "Select ZIP Codes to Compare",
-                        options=available_zips,
-                        default=available_zips[:2] if len(available_zips) >= 2 else available_zips
-                    )
-                
-                if selected_zips:
-                    # ZIP comparison metrics
-                    st.subheader("ZIP Code Comparison")
-                    
-                    zip_metrics_query = """
-                        SELECT 
-                            zip_code,
-                            COUNT(*) as total_listings,
-                            AVG(CASE WHEN time_on_zillow > 0 THEN time_on_zillow::NUMERIC / 86400000 ELSE NULL END) as avg_dom,
-                            PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY CASE WHEN time_on_zillow > 0 THEN time_on_zillow::NUMERIC / 86400000 ELSE NULL END) as median_dom,
-                            PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY price) as median_rent,
-                            AVG(price) as avg_rent,
-                            AVG(CASE WHEN living_area > 0 THEN price::NUMERIC / living_area ELSE NULL END) as avg_price_per_sqft
-                        FROM zillow_listings
-                        WHERE zip_code = ANY(%s)
-                        GROUP BY zip_code
-                        ORDER BY zip_code
-                    """
-                    zip_metrics = database.fetch_data(zip_metrics_query, (selected_zips,))
-                    
-                    if zip_metrics:
-                        df_zip = pd.DataFrame(zip_metrics)
-                        
-                        # Format for display - reorder columns to prioritize median
-                        df_display = df_zip[['zip_code', 'total_listings', 'median_dom', 'avg_dom', 'median_rent', 'avg_rent', 'avg_price_per_sqft']].copy()
-                        df_display['total_listings'] = df_display['total_listings'].astype(int)
-                        df_display['median_dom'] = df_display['median_dom'].apply(lambda x: f"{safe_float(x):.1f}")
-                        df_display['avg_dom'] = df_display['avg_dom'].apply(lambda x: f"{safe_float(x):.1f}")
-                        df_display['median_rent'] = df_display['median_rent'].apply(lambda x: f"${safe_float(x):,.0f}")
-                        df_display['avg_rent'] = df_display['avg_rent'].apply(lambda x: f"${safe_float(x):,.0f}")
-                        df_display['avg_price_per_sqft'] = df_display['avg_price_per_sqft'].apply(lambda x: f"${safe_float(x):.2f}")
-                        
-                        df_display.columns = ['ZIP Code', 'Total Listings', 'Median DOM', 'Avg DOM', 'Median Rent', 'Avg Rent', 'Avg $/sqft']
-                        st.dataframe(df_display, use_container_width=True, hide_index=True)
-                        
-                        # Charts
-                        col1, col2 = st.columns(2)
-                        
-                        with col1:
-                            st.subheader("Median Days on Market")
-                            chart = alt.Chart(df_zip).mark_bar().encode(
-                                x=alt.X('zip_code:N', title='ZIP Code'),
-                                y=alt.Y('median_dom:Q', title='Median DOM'),
-                                color=alt.Color('zip_code:N', legend=None),
-                                tooltip=['zip_code', alt.Tooltip('median_dom:Q', format='.1f')]
-                            ).properties(height=300)
-                            st.altair_chart(chart, use_container_width=True)
-                        
-                        with col2:
-                            st.subheader("Median Rent Comparison")
-                            chart = alt.Chart(df_zip).mark_bar().encode(
-                                x=alt.X('zip_code:N', title='ZIP Code'),
-                                y=alt.Y('median_rent:Q', title='Median Rent ($)'),
-                                color=alt.Color('zip_code:N', legend=None),
-                                tooltip=['zip_code', alt.Tooltip('median_rent:Q', format='$,.0f')]
-                            ).properties(height=300)
-                            st.altair_chart(chart, use_container_width=True)
-                    
-                    # Rolling metrics from aggregated table
-                    st.divider()
-                    st.subheader("Rolling Metrics Trends")
-                    
-                    agg_query = """
-                        SELECT 
-                            aggregation_type,
-                            period_start_date,
-                            zip_code,
-                            avg(average_days_on_market) as avg_dom,
-                            avg(median_price) as median_rent,
-                            sum(total_listings) as total_listings
-                        FROM zillow_metrics_aggregated
-                        WHERE zip_code = ANY(%s)
-                            AND aggregation_type IN ('daily', 'weekly', 'monthly')
-                        GROUP BY aggregation_type, period_start_date, zip_code
-                        ORDER BY period_start_date DESC, aggregation_type
-                        LIMIT 50
-                    """
-                    
-                    agg_data = database.fetch_data(agg_query, (selected_zips,))
-                    
-                    if agg_data:
-                        df_agg = pd.DataFrame(agg_data)
-                        
-                        # Format for display
-                        df_agg_display = df_agg.copy()
-                        df_agg_display['avg_dom'] = df_agg_display['avg_dom'].apply(lambda x: f"{safe_float(x):.1f}")
-                        df_agg_display['median_rent'] = df_agg_display['median_rent'].apply(lambda x: f"${safe_float(x):,.0f}")
-                        df_agg_display['total_listings'] = df_agg_display['total_listings'].astype(int)
-                        
-                        df_agg_display.columns = ['Period Type', 'Start Date', 'ZIP Code', 'Avg DOM', 'Median Rent', 'Total Listings']
-                        st.dataframe(df_agg_display, use_container_width=True, hide_index=True)
-                    else:
-                        st.info("No aggregated metrics available yet. Run the populate_zillow_metrics.sql queries to generate rolling metrics.")
-                else:
-                    st.info("Please select at least one ZIP code to analyze")
-            else:
-                st.warning("No ZIP codes found in the database")
-                
-        except Exception as e:
-            st.error(f"Error loading ZIP code analysis: {str(e)}")
-        
-        # ============================================================
-        # TAB 3: PROPERTY LISTINGS
-        # ============================================================
-    with tab3:
-        st.header("Property Listings")
-        
-        try:
-            # Filters
-            col1, col2, col3, col4 = st.columns(4)
-            
-            # Get filter options
-            zip_query = "SELECT DISTINCT zip_code FROM zillow_listings WHERE zip_code IS NOT NULL ORDER BY zip_code"
-            available_zips = [row['zip_code'] for row in database.fetch_data(zip_query)]
-            
-            type_query = "SELECT DISTINCT home_type FROM zillow_listings WHERE home_type IS NOT NULL ORDER BY home_type"
-            available_types = [row['home_type'] for row in database.fetch_data(type_query)]
-            
-            with col1:
-                filter_zip = st.multiselect("ZIP Code", options=available_zips, default=available_zips)
-            
-            with col2:
-                filter_beds = st.multiselect("Bedrooms", options=[0, 1, 2, 3, 4, 5], default=[0, 1, 2, 3, 4, 5])
-            
-            with col3:
-                filter_type = st.multiselect("Property Type", options=available_types, default=available_types)
-            
-            with col4:
-                filter_status = st.multiselect("Status", options=['FOR_RENT', 'FOR_SALE', 'PENDING', 'SOLD'], default=['FOR_RENT', 'FOR_SALE'])
-            
-            # Price range
-            col1, col2 = st.columns(2)
+
+
+# ============================================================
+# VIEW 2: ZIP CODE ANALYSIS
+# ============================================================
+@st.fragment
+def render_zip_analysis():
+    st.header("ZIP Code Analysis")
+
+    try:
+        # Available ZIP codes (cached filter metadata)
+        available_zips = list(get_filter_options()['zip_codes'])
+
+        if available_zips:
+
+            # ZIP code selector
+            col1, col2 = st.columns([1, 3])
             with col1:
-                min_price = st.number_input("Min Price ($)", min_value=0, value=0, step=100)
-            with col2:
-                max_price = st.number_input("Max Price ($)", min_value=0, value=10000, step=100)
-            
-            # Fetch listings with filters
-            listings_query = """
-                SELECT 
-                    zpid,
-                    street_address,
-                    city,
-                    zip_code,
-                    bedrooms,
-                    bathrooms,
-                    living_area,
-                    home_type,
-                    home_status,
-                    price,
-                    CASE WHEN time_on_zillow > 0 THEN ROUND((time_on_zillow::NUMERIC / 86400000)::NUMERIC, 0) ELSE NULL END as days_on_zillow,
-                    latitude,
-                    longitude,
-                    CASE WHEN living_area > 0 THEN ROUND((price::NUMERIC / living_area)::NUMERIC, 2) ELSE NULL END as price_per_sqft
-                FROM zillow_listings
-                WHERE zip_code = ANY(%s)
-                    AND bedrooms = ANY(%s)
-                    AND home_type = ANY(%s)
-                    AND home_status = ANY(%s)
-                    AND price >= %s
-                    AND price <= %s
-                ORDER BY CASE WHEN time_on_zillow > 0 THEN time_on_zillow ELSE NULL END ASC NULLS LAST
-                LIMIT 100
-            """
-            
-            listings = database.fetch_data(
-                listings_query, 
-                (filter_zip, filter_beds, filter_type, filter_status, min_price, max_price)
-            )
-            
-            if listings:
-                st.success(f"Found {len(listings)} listings")
-                
-                # Display table
-                df_listings = pd.DataFrame(listings)
-                
-                # Format for display
-                df_display = df_listings[[
-                    'street_address', 'zip_code', 'bedrooms', 'bathrooms', 
-                    'living_area', 'home_type', 'home_status', 'price', 
-                    'days_on_zillow', 'price_per_sqft'
-                ]].copy()
-                
-                df_display['price'] = df_display['price'].apply(lambda x: f"${safe_float(x):,.0f}")
-                df_display['price_per_sqft'] = df_display['price_per_sqft'].apply(
-                    lambda x: f"${safe_float(x):.2f}" if x else "N/A"
+                selected_zips = st.multiselect(
+                    "Select ZIP Codes to Compare",
+                    options=available_zips,
+                    default=available_zips[:2] if len(available_zips) >= 2 else available_zips
                 )
-                
-                df_display.columns = [
-                    'Address', 'ZIP', 'Beds', 'Baths', 'Sqft', 
-                    'Type', 'Status', 'Price', 'DOM', '$/Sqft'
-                ]
-                
-                st.dataframe(df_display, use_container_width=True, hide_index=True)
-                
-                # Map visualization
-                st.subheader("Property Locations")
-                
-                # Filter out listings without coordinates
-                df_map = df_listings[
-                    (df_listings['latitude'].notna()) & 
-                    (df_listings['longitude'].notna())
-                ].copy()
-                
-                if not df_map.empty:
-                    # Convert Decimal to float for map display
-                    df_map['lat'] = df_map['latitude'].astype(float)
-                    df_map['lon'] = df_map['longitude'].astype(float)
-                    st.map(df_map[['lat', 'lon']], zoom=11)
-                else:
-                    st.info("No properties with coordinates available for map display")
-            else:
-                st.info("No listings found matching your filters")
-                
-        except Exception as e:
-            st.error(f"Error loading property listings: {str(e)}")
-        
-        # ============================================================
-        # TAB 4: METRICS TRENDS
-        # ============================================================
-    with tab4:
-        st.header("Metrics Trends")
-        
-        try:
-            # Check if aggregated data exists
-            check_query = "SELECT COUNT(*) as count FROM zillow_metrics_aggregated"
-            check_result = database.fetch_one(check_query)
-            
-            if check_result and check_result['count'] > 0:
-                # Aggregation type selector
-                agg_type = st.selectbox(
-                    "Select Period Type",
-                    options=['daily', 'weekly', 'monthly', 'quarterly', 'zip_level'],
-                    index=2
-                )
-                
-                # Fetch trend data
-                trend_query = """
-                    SELECT 
-                        period_start_date,
+
+            if selected_zips:
+                zip_metrics_query = """
+                    SELECT
                         zip_code,
+                        COUNT(*) as total_listings,
+                        AVG(days_on_market) as avg_dom,
+                        PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY days_on_market) as median_dom,
+                        PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY price) as median_rent,
+                        AVG(price) as avg_rent,
+                        AVG(price_per_sqft) as avg_price_per_sqft
+                    FROM zillow_listings
+                    WHERE market = ANY(%s) AND zip_code = ANY(%s)
+                    GROUP BY zip_code
+                    ORDER BY zip_code
+                """
+                agg_query = """
+                    SELECT
                         aggregation_type,
-                        AVG(average_days_on_market) as avg_dom,
-                        AVG(median_price) as median_rent,
-                        AVG(average_price) as avg_rent,
-                        SUM(total_listings) as total_listings,
-                        SUM(new_listings) as new_listings
+                        period_start_date,
+                        zip_code,
+                        avg(average_days_on_market) as avg_dom,
+                        avg(median_price) as median_rent,
+                        sum(total_listings) as total_listings
                     FROM zillow_metrics_aggregated
-                    WHERE aggregation_type = %s
-                    GROUP BY period_start_date, zip_code, aggregation_type
-                    ORDER BY period_start_date DESC
-                    LIMIT 100
+                    WHERE zip_code = ANY(%s)
+                        AND aggregation_type IN ('daily', 'weekly', 'monthly')
+                    GROUP BY aggregation_type, period_start_date, zip_code
+                    ORDER BY period_start_date DESC, aggregation_type
+                    LIMIT 50
                 """
-                
-                trend_data = database.fetch_data(trend_query, (agg_type,))
-                
-                if trend_data:
-                    df_trend = pd.DataFrame(trend_data)
-                    df_trend['period_start_date'] = pd.to_datetime(df_trend['period_start_date'])
-                    
-                    # Time series charts
+                results = database.run_concurrently({
+                    'zip_metrics': lambda: database.fetch_data(
+                        zip_metrics_query, (markets_for_zips(selected_zips), selected_zips)
+                    ),
+                    'aggregates': lambda: database.fetch_data(agg_query, (selected_zips,)),
+                })
+
+                # ZIP comparison metrics
+                st.subheader("ZIP Code Comparison")
+                zip_metrics = results['zip_metrics']
+
+                if zip_metrics:
+                    df_zip = pd.DataFrame(zip_metrics)
+
+                    # Format for display - reorder columns to prioritize median
+                    df_display = df_zip[['zip_code', 'total_listings', 'median_dom', 'avg_dom', 'median_rent', 'avg_rent', 'avg_price_per_sqft']].copy()
+                    df_display['total_listings'] = df_display['total_listings'].astype(int)
+                    df_display['median_dom'] = df_display['median_dom'].apply(lambda x: f"{safe_float(x):.1f}")
+                    df_display['avg_dom'] = df_display['avg_dom'].apply(lambda x: f"{safe_float(x):.1f}")
+                    df_display['median_rent'] = df_display['median_rent'].apply(lambda x: f"${safe_float(x):,.0f}")
+                    df_display['avg_rent'] = df_display['avg_rent'].apply(lambda x: f"${safe_float(x):,.0f}")
+                    df_display['avg_price_per_sqft'] = df_display['avg_price_per_sqft'].apply(lambda x: f"${safe_float(x):.2f}")
+
+                    df_display.columns = ['ZIP Code', 'Total Listings', 'Median DOM', 'Avg DOM', 'Median Rent', 'Avg Rent', 'Avg $/sqft']
+                    st.dataframe(df_display, use_container_width=True, hide_index=True)
+
+                    # Charts
                     col1, col2 = st.columns(2)
-                    
+
                     with col1:
-                        st.subheader("Days on Market Trend")
-                        chart = alt.Chart(df_trend).mark_line(point=True).encode(
-                            x=alt.X('period_start_date:T', title='Date'),
-                            y=alt.Y('avg_dom:Q', title='Avg DOM'),
-                            color=alt.Color('zip_code:N', title='ZIP Code'),
-                            tooltip=[
-                                alt.Tooltip('period_start_date:T', title='Date'),
-                                alt.Tooltip('zip_code:N', title='ZIP'),
-                                alt.Tooltip('avg_dom:Q', title='Avg DOM', format='.1f')
-                            ]
-                        ).properties(height=350)
+                        st.subheader("Median Days on Market")
+                        chart = alt.Chart(df_zip).mark_bar().encode(
+                            x=alt.X('zip_code:N', title='ZIP Code'),
+                            y=alt.Y('median_dom:Q', title='Median DOM'),
+                            color=alt.Color('zip_code:N', legend=None),
+                            tooltip=['zip_code', alt.Tooltip('median_dom:Q', format='.1f')]
+                        ).properties(height=300)
                         st.altair_chart(chart, use_container_width=True)
-                    
+
                     with col2:
-                        st.subheader("Median Rent Trend")
-                        chart = alt.Chart(df_trend).mark_line(point=True).encode(
-                            x=alt.X('period_start_date:T', title='Date'),
+                        st.subheader("Median Rent Comparison")
+                        chart = alt.Chart(df_zip).mark_bar().encode(
+                            x=alt.X('zip_code:N', title='ZIP Code'),
                             y=alt.Y('median_rent:Q', title='Median Rent ($)'),
-                            color=alt.Color('zip_code:N', title='ZIP Code'),
-                            tooltip=[
-                                alt.Tooltip('period_start_date:T', title='Date'),
-                                alt.Tooltip('zip_code:N', title='ZIP'),
-                                alt.Tooltip('median_rent:Q', title='Median Rent', format='$,.0f')
-                            ]
-                        ).properties(height=350)
+                            color=alt.Color('zip_code:N', legend=None),
+                            tooltip=['zip_code', alt.Tooltip('median_rent:Q', format='$,.0f')]
+                        ).properties(height=300)
                         st.altair_chart(chart, use_container_width=True)
-                    
-                    # Listings trend
-                    st.subheader("Total Listings Trend")
-                    chart = alt.Chart(df_trend).mark_area(opacity=0.7).encode(
+
+                # Rolling metrics from aggregated table
+                st.divider()
+                st.subheader("Rolling Metrics Trends")
+                agg_data = results['aggregates']
+
+                if agg_data:
+                    df_agg = pd.DataFrame(agg_data)
+
+                    # Format for display
+                    df_agg_display = df_agg.copy()
+                    df_agg_display['avg_dom'] = df_agg_display['avg_dom'].apply(lambda x: f"{safe_float(x):.1f}")
+                    df_agg_display['median_rent'] = df_agg_display['median_rent'].apply(lambda x: f"${safe_float(x):,.0f}")
+                    df_agg_display['total_listings'] = df_agg_display['total_listings'].astype(int)
+
+                    df_agg_display.columns = ['Period Type', 'Start Date', 'ZIP Code', 'Avg DOM', 'Median Rent', 'Total Listings']
+                    st.dataframe(df_agg_display, use_container_width=True, hide_index=True)
+                else:
+                    st.info("No aggregated metrics available yet. Run the populate_zillow_metrics.sql queries to generate rolling metrics.")
+            else:
+                st.info("Please select at least one ZIP code to analyze")
+        else:
+            st.warning("No ZIP codes found in the database")
+
+    except Exception as e:
+        st.error(f"Error loading ZIP code analysis: {str(e)}")
+
+
+# ============================================================
+# VIEW 3: PROPERTY LISTINGS
+# ============================================================
+@st.fragment
+def render_property_listings():
+    st.header("Property Listings")
+
+    try:
+        # Filters
+        col1, col2, col3, col4 = st.columns(4)
+
+        # Get filter options (one cached call, refreshed after ingest)
+        options = get_filter_options()
+        available_zips = list(options['zip_codes'])
+        available_beds = list(options['bedrooms'])
+        available_types = list(options['home_types'])
+        available_statuses = list(options['home_statuses'])
+
+        with col1:
+            filter_zip = st.multiselect("ZIP Code", options=available_zips, default=available_zips)
+
+        with col2:
+            filter_beds = st.multiselect("Bedrooms", options=available_beds, default=available_beds)
+
+        with col3:
+            filter_type = st.multiselect("Property Type", options=available_types, default=available_types)
+
+        with col4:
+            filter_status = st.multiselect(
+                "Status",
+                options=available_statuses,
+                default=[status for status in DEFAULT_STATUSES if status in available_statuses]
+            )
+
+        # Price range
+        col1, col2 = st.columns(2)
+        with col1:
+            min_price = st.number_input("Min Price ($)", min_value=0, value=0, step=100)
+        with col2:
+            max_price = st.number_input("Max Price ($)", min_value=0, value=10000, step=100)
+
+        # Fetch listings with filters
+        listings_query = """
+            SELECT
+                zpid,
+                street_address,
+                city,
+                zip_code,
+                bedrooms,
+                bathrooms,
+                living_area,
+                home_type,
+                home_status,
+                price,
+                ROUND(days_on_market)::INT as days_on_zillow,
+                latitude::float8 as latitude,
+                longitude::float8 as longitude,
+                price_per_sqft
+            FROM zillow_listings
+            WHERE market = ANY(%s)
+                AND zip_code = ANY(%s)
+                AND bedrooms = ANY(%s)
+                AND home_type = ANY(%s)
+                AND home_status = ANY(%s)
+                AND price >= %s
+                AND price <= %s
+            ORDER BY days_on_market ASC NULLS LAST
+            LIMIT 100
+        """
+        filter_params = listing_filter_params(
+            filter_zip, filter_beds, filter_type, filter_status, min_price, max_price
+        )
+
+        # The clustered map (the default mode) needs the extent too, so fetch it alongside
+        tasks = {
+            'listings': lambda: database.fetch_data(listings_query, filter_params),
+        }
+        if st.session_state.get('listing_map_mode', CLUSTERED_MAP) == CLUSTERED_MAP:
+            tasks['extent'] = lambda: fetch_listing_extent(filter_params)
+        results = database.run_concurrently(tasks)
+        listings = results['listings']
+
+        if listings:
+            st.success(f"Found {len(listings)} listings")
+
+            # Display table
+            df_listings = pd.DataFrame(listings)
+
+            # Format for display
+            df_display = df_listings[[
+                'street_address', 'zip_code', 'bedrooms', 'bathrooms',
+                'living_area', 'home_type', 'home_status', 'price',
+                'days_on_zillow', 'price_per_sqft'
+            ]].copy()
+
+            df_display['price'] = df_display['price'].apply(lambda x: f"${safe_float(x):,.0f}")
+            df_display['price_per_sqft'] = df_display['price_per_sqft'].apply(
+                lambda x: f"${safe_float(x):.2f}" if pd.notna(x) else "N/A"
+            )
+
+            df_display.columns = [
+                'Address', 'ZIP', 'Beds', 'Baths', 'Sqft',
+                'Type', 'Status', 'Price', 'DOM', '$/Sqft'
+            ]
+
+            st.dataframe(df_display, use_container_width=True, hide_index=True)
+
+            # Map visualization
+            st.subheader("Property Locations")
+
+            map_mode = st.radio(
+                "Map Mode",
+                options=[CLUSTERED_MAP, "Listed properties"],
+                horizontal=True,
+                key="listing_map_mode"
+            )
+
+            if map_mode == "Listed properties":
+                # Coordinates are cast to float8 in SQL, no Decimal conversion needed
+                df_map = df_listings[
+                    (df_listings['latitude'].notna()) &
+                    (df_listings['longitude'].notna())
+                ].rename(columns={'latitude': 'lat', 'longitude': 'lon'})
+
+                if not df_map.empty:
+                    st.map(df_map[['lat', 'lon']], zoom=11)
+                else:
+                    st.info("No properties with coordinates available for map display")
+            else:
+                # Only missing when the mode was switched during this run
+                extent = results['extent'] if 'extent' in results else fetch_listing_extent(filter_params)
+
+                if extent:
+                    map_zoom = st.slider(
+                        "Map Zoom",
+                        min_value=MIN_MAP_ZOOM,
+                        max_value=MAX_MAP_ZOOM,
+                        value=int(fit_zoom(extent))
+                    )
+                    clusters = fetch_clusters(
+                        filter_params, extent['center_lat'], extent['center_lon'], map_zoom
+                    )
+                    st.caption(
+                        f"{safe_int(extent['total']):,} listings with coordinates "
+                        f"grouped into {len(clusters):,} clusters. Only the area around the "
+                        f"listings' center is clustered at this zoom; narrow the ZIP filter "
+                        f"to see other areas up close."
+                    )
+                    st.pydeck_chart(
+                        build_cluster_deck(clusters, extent['center_lat'], extent['center_lon'], map_zoom),
+                        use_container_width=True
+                    )
+                else:
+                    st.info("No properties with coordinates available for map display")
+        else:
+            st.info("No listings found matching your filters")
+
+    except Exception as e:
+        st.error(f"Error loading property listings: {str(e)}")
+
+
+# ============================================================
+# VIEW 4: METRICS TRENDS
+# ============================================================
+@st.fragment
+def render_metrics_trends():
+    st.header("Metrics Trends")
+
+    try:
+        # Check if aggregated data exists, and load the ZIPs of the current period type with it
+        check_query = "SELECT COUNT(*) as count FROM zillow_metrics_aggregated"
+        zip_query = """
+            SELECT DISTINCT zip_code FROM zillow_metrics_aggregated
+            WHERE aggregation_type = %s ORDER BY zip_code
+        """
+        current_type = st.session_state.get('trend_period', DEFAULT_TREND_PERIOD)
+        results = database.run_concurrently({
+            'check': lambda: database.fetch_one(check_query),
+            'zips': lambda: database.fetch_data(zip_query, (current_type,)),
+        })
+        check_result = results['check']
+
+        if check_result and check_result['count'] > 0:
+            # Aggregation type selector
+            agg_type = st.selectbox(
+                "Select Period Type",
+                options=list(TREND_GRANULARITIES),
+                index=2,
+                key="trend_period"
+            )
+
+            zip_rows = results['zips'] if agg_type == current_type else database.fetch_data(zip_query, (agg_type,))
+            zip_options = [row['zip_code'] for row in zip_rows]
+            selected_zips = st.multiselect("ZIP Codes", options=zip_options, default=zip_options)
+            selected_buckets = st.multiselect(
+                "Unit Types",
+                options=list(UNIT_BUCKETS),
+                default=list(UNIT_BUCKETS),
+                format_func=UNIT_BUCKETS.get
+            )
+
+            # SOP unit-type table (precomputed unit_bucket aggregates) and the
+            # series, cached per (zip, granularity, unit types, data version)
+            tasks = {'buckets': lambda: fetch_unit_bucket_table(selected_zips or None)}
+            if selected_zips and selected_buckets:
+                tasks['trends'] = lambda: get_zip_trends(selected_zips, agg_type, selected_buckets)
+            results = database.run_concurrently(tasks)
+
+            bucket_rows = [
+                row for row in results['buckets']
+                if row['unit_bucket'] in selected_buckets
+            ]
+            if bucket_rows:
+                st.subheader("Unit Types (Current Month)")
+                df_buckets = pd.DataFrame(bucket_rows)
+                df_sop = pd.DataFrame({
+                    'ZIP Code': df_buckets['zip_code'],
+                    'Unit Type': df_buckets['unit_label'],
+                    'Active Rentals': df_buckets['active_listings'].fillna(0).astype(int),
+                    'Median Rent': df_buckets['median_price'].apply(lambda x: f"${safe_float(x):,.0f}"),
+                    'Median $/sqft': df_buckets['median_price_per_sqft'].apply(lambda x: f"${safe_float(x):,.2f}"),
+                    'Median DOM': df_buckets['median_days_on_market'].apply(lambda x: f"{safe_float(x):.1f}"),
+                })
+                st.dataframe(df_sop, use_container_width=True, hide_index=True)
+
+            trends = results.get('trends') or {}
+
+            if trends:
+                df_trend = pd.concat(
+                    [pd.DataFrame(series).assign(zip_code=zip_code) for zip_code, series in trends.items()],
+                    ignore_index=True
+                ).rename(columns={'dates': 'period_start_date'})
+                df_observed = df_trend.dropna(subset=['total_listings'])
+
+                # Latest period per ZIP with period-over-period change
+                st.subheader("Latest Period")
+                df_latest = df_observed.sort_values('period_start_date').groupby('zip_code').tail(1)
+                if df_latest.empty:
+                    st.info("No metrics yet for the selected ZIP codes")
+                else:
+                    latest_cols = st.columns(min(len(df_latest), 4))
+                    for i, (_, row) in enumerate(df_latest.iterrows()):
+                        change = row.get('median_rent_wow', row.get('median_rent_mom', row['median_rent_pct_change']))
+                        with latest_cols[i % len(latest_cols)]:
+                            st.metric(
+                                f"ZIP {row['zip_code']} Median Rent",
+                                f"${safe_float(row['median_rent']):,.0f}",
+                                f"{change:+.1f}%" if pd.notna(change) else None
+                            )
+
+                # Time series charts
+                col1, col2 = st.columns(2)
+
+                with col1:
+                    st.subheader("Median Rent Trend")
+                    base = alt.Chart(df_observed).encode(
                         x=alt.X('period_start_date:T', title='Date'),
-                        y=alt.Y('total_listings:Q', title='Total Listings'),
-                        color=alt.Color('zip_code:N', title='ZIP Code'),
+                        color=alt.Color('zip_code:N', title='ZIP Code')
+                    )
+                    actual = base.mark_line(point=True).encode(
+                        y=alt.Y('median_rent:Q', title='Median Rent ($)'),
                         tooltip=[
                             alt.Tooltip('period_start_date:T', title='Date'),
                             alt.Tooltip('zip_code:N', title='ZIP'),
-                            alt.Tooltip('total_listings:Q', title='Total Listings'),
-                            alt.Tooltip('new_listings:Q', title='New Listings')
+                            alt.Tooltip('median_rent:Q', title='Median Rent', format='$,.0f'),
+                            alt.Tooltip('median_rent_rolling:Q', title='Rolling Mean', format='$,.0f'),
+                            alt.Tooltip('median_rent_pct_change:Q', title='Change %', format='+.1f')
                         ]
-                    ).properties(height=350)
-                    st.altair_chart(chart, use_container_width=True)
-                    
-                    # Data table
-                    st.subheader("Detailed Metrics")
-                    df_display = df_trend.copy()
-                    df_display['period_start_date'] = df_display['period_start_date'].dt.strftime('%Y-%m-%d')
-                    df_display['avg_dom'] = df_display['avg_dom'].apply(lambda x: f"{safe_float(x):.1f}")
-                    df_display['median_rent'] = df_display['median_rent'].apply(lambda x: f"${safe_float(x):,.0f}")
-                    df_display['avg_rent'] = df_display['avg_rent'].apply(lambda x: f"${safe_float(x):,.0f}")
-                    df_display['total_listings'] = df_display['total_listings'].astype(int)
-                    df_display['new_listings'] = df_display['new_listings'].astype(int)
-                    
-                    df_display.columns = [
-                        'Period Start', 'ZIP Code', 'Type', 'Avg DOM', 
-                        'Median Rent', 'Avg Rent', 'Total Listings', 'New Listings'
+                    )
+                    rolling = base.mark_line(strokeDash=[4, 4]).encode(y='median_rent_rolling:Q')
+                    st.altair_chart((actual + rolling).properties(height=350), use_container_width=True)
+                    st.caption("Dashed lines: rolling mean")
+
+                with col2:
+                    st.subheader("Days on Market Trend")
+                    base = alt.Chart(df_observed).encode(
+                        x=alt.X('period_start_date:T', title='Date'),
+                        color=alt.Color('zip_code:N', title='ZIP Code')
+                    )
+                    actual = base.mark_line(point=True).encode(
+                        y=alt.Y('avg_dom:Q', title='Avg DOM'),
+                        tooltip=[
+                            alt.Tooltip('period_start_date:T', title='Date'),
+                            alt.Tooltip('zip_code:N', title='ZIP'),
+                            alt.Tooltip('avg_dom:Q', title='Avg DOM', format='.1f'),
+                            alt.Tooltip('avg_dom_seasonal_adjusted:Q', title='Seasonally Adjusted', format='.1f')
+                        ]
+                    )
+                    adjusted = base.mark_line(strokeDash=[4, 4]).encode(y='avg_dom_seasonal_adjusted:Q')
+                    st.altair_chart((actual + adjusted).properties(height=350), use_container_width=True)
+                    st.caption("Dashed lines: seasonally adjusted DOM")
+
+                # Listings trend
+                st.subheader("Total Listings Trend")
+                chart = alt.Chart(df_observed).mark_area(opacity=0.7).encode(
+                    x=alt.X('period_start_date:T', title='Date'),
+                    y=alt.Y('total_listings:Q', title='Total Listings'),
+                    color=alt.Color('zip_code:N', title='ZIP Code'),
+                    tooltip=[
+                        alt.Tooltip('period_start_date:T', title='Date'),
+                        alt.Tooltip('zip_code:N', title='ZIP'),
+                        alt.Tooltip('total_listings:Q', title='Total Listings'),
+                        alt.Tooltip('new_listings:Q', title='New Listings')
                     ]
-                    st.dataframe(df_display, use_container_width=True, hide_index=True)
+                ).properties(height=350)
+                st.altair_chart(chart, use_container_width=True)
+
+                # Anomalies
+                anomaly_cols = ['median_rent_anomaly', 'avg_dom_anomaly', 'total_listings_anomaly']
+                df_anomalies = df_observed[df_observed[anomaly_cols].any(axis=1)]
+                st.subheader(f"Anomalies (|z| ≥ {ANOMALY_Z_THRESHOLD:g})")
+                if not df_anomalies.empty:
+                    df_flags = pd.DataFrame({
+                        'Period Start': df_anomalies['period_start_date'].dt.strftime('%Y-%m-%d'),
+                        'ZIP Code': df_anomalies['zip_code'],
+                        'Median Rent z': df_anomalies['median_rent_zscore'].round(2),
+                        'Avg DOM z': df_anomalies['avg_dom_zscore'].round(2),
+                        'Listings z': df_anomalies['total_listings_zscore'].round(2),
+                    })
+                    st.dataframe(df_flags, use_container_width=True, hide_index=True)
                 else:
-                    st.info(f"No {agg_type} metrics available yet")
+                    st.caption("No anomalies in the selected periods")
+
+                # Data table
+                st.subheader("Detailed Metrics")
+                df_display = df_observed.sort_values('period_start_date', ascending=False)[[
+                    'period_start_date', 'zip_code', 'avg_dom', 'avg_dom_seasonal_adjusted',
+                    'median_rent', 'median_rent_rolling', 'median_rent_pct_change',
+                    'avg_rent', 'total_listings', 'new_listings'
+                ]].copy()
+                df_display['period_start_date'] = df_display['period_start_date'].dt.strftime('%Y-%m-%d')
+                df_display['avg_dom'] = df_display['avg_dom'].apply(lambda x: f"{safe_float(x):.1f}")
+                df_display['avg_dom_seasonal_adjusted'] = df_display['avg_dom_seasonal_adjusted'].apply(lambda x: f"{safe_float(x):.1f}")
+                df_display['median_rent'] = df_display['median_rent'].apply(lambda x: f"${safe_float(x):,.0f}")
+                df_display['median_rent_rolling'] = df_display['median_rent_rolling'].apply(lambda x: f"${safe_float(x):,.0f}")
+                df_display['median_rent_pct_change'] = df_display['median_rent_pct_change'].apply(
+                    lambda x: f"{x:+.1f}%" if pd.notna(x) else "—"
+                )
+                df_display['avg_rent'] = df_display['avg_rent'].apply(lambda x: f"${safe_float(x):,.0f}")
+                df_display['total_listings'] = df_display['total_listings'].astype(int)
+                df_display['new_listings'] = df_display['new_listings'].fillna(0).astype(int)
+
+                df_display.columns = [
+                    'Period Start', 'ZIP Code', 'Avg DOM', 'Adj. DOM',
+                    'Median Rent', 'Rolling Median', 'Change', 'Avg Rent',
+                    'Total Listings', 'New Listings'
+                ]
+                st.dataframe(df_display, use_container_width=True, hide_index=True)
             else:
-                st.warning("No aggregated metrics available")
-                st.info("""
-                    **To generate metrics:**
-                    1. Ensure listings data is in the `zillow_listings` table
-                    2. Run the SQL queries from `schema/populate_zillow_metrics.sql`
-                    3. Refresh this dashboard
-                """)
-                
-        except Exception as e:
-            st.error(f"Error loading metrics trends: {str(e)}")
+                st.info(f"No {agg_type} metrics available yet")
+        else:
+            st.warning("No aggregated metrics available")
+            st.info("""
+                **To generate metrics:**
+                1. Ensure listings data is in the `zillow_listings` table
+                2. Run the SQL queries from `schema/populate_zillow_metrics.sql`
+                3. Refresh this dashboard
+            """)
+
+    except Exception as e:
+        st.error(f"Error loading metrics trends: {str(e)}")
+
+
+# Main content
+st.title("📊 Rental Market Dashboard")
+st.caption("Real-time insights from Zillow rental data")
+
+# Unlike st.tabs, which runs every tab body on each rerun, only the selected view is rendered
+VIEWS = {
+    "📈 Market Overview": render_market_overview,
+    "🗺️ ZIP Code Analysis": render_zip_analysis,
+    "🏠 Property Listings": render_property_listings,
+    "📊 Metrics Trends": render_metrics_trends,
+}
+
+view = st.radio(
+    "View",
+    options=list(VIEWS),
+    horizontal=True,
+    key="dashboard_view",
+    label_visibility="collapsed"
+)
+VIEWS[view]()
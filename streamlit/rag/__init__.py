@@ -0,0 +1,37 @@
+# RAG package
+from .qdrant import QdrantClient
+from .collections import CollectionSpec, default_spec, ensure_collection
+from .filters import ChunkFilter, query_chunks
+from .retrieval import HybridRetriever, reciprocal_rank_fusion
+from .embeddings import (
+    EmbeddingPipeline,
+    EmbeddingCache,
+    InMemoryEmbeddingCache,
+    HashingEmbedder,
+    HttpEmbedder,
+    get_default_pipeline,
+)
+from .chunking import Chunk, TokenChunker, chunk_documents
+from .notion_sync import NotionClient, NotionSync
+
+__all__ = [
+    'QdrantClient',
+    'CollectionSpec',
+    'default_spec',
+    'ensure_collection',
+    'ChunkFilter',
+    'query_chunks',
+    'HybridRetriever',
+    'reciprocal_rank_fusion',
+    'EmbeddingPipeline',
+    'EmbeddingCache',
+    'InMemoryEmbeddingCache',
+    'HashingEmbedder',
+    'HttpEmbedder',
+    'get_default_pipeline',
+    'Chunk',
+    'TokenChunker',
+    'chunk_documents',
+    'NotionClient',
+    'NotionSync',
+]
@@ -0,0 +1,278 @@
+"""
+Token-budget chunking for RAG ingestion.
+
+Input is a stream of segments (transcript lines, Markdown, or Notion blocks).
+Headings start a new section, so a chunk never spans two sections. Each
+chunk carries its heading and the section_type_enum value mapped from it.
+Segments are packed into chunks of at most CHUNK_TOKENS tokens, counted
+with the embedding model's tokenizer (tiktoken). Consecutive chunks in a
+section share CHUNK_OVERLAP_TOKENS tokens. A chunk's heading is repeated
+at its start and counts toward the budget.
+
+chunk_id is a hash of the document id and the normalized chunk text, so
+re-chunking unchanged text yields the same ids (see NotionSync.sync_page).
+
+Large batches (e.g. meeting transcripts) are chunked across a process pool
+with chunk_documents().
+
+Usage (from the streamlit/ directory):
+    python -m rag.chunking transcript.txt --document-id meeting-2025-06-02
+"""
+import argparse
+import re
+import sys
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+
+import tiktoken
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from .hashing import normalize_text, sha256_text
+
+HEADING_TYPES = ('heading_1', 'heading_2', 'heading_3')
+
+# Heading keywords -> section_type_enum
+SECTION_KEYWORDS = [
+    ('rent roll', 'rent_roll'),
+    ('check-in', 'team_check_in'),
+    ('check in', 'team_check_in'),
+    ('financ', 'financials'),
+    ('budget', 'financials'),
+    ('mainten', 'maintenance'),
+    ('repair', 'maintenance'),
+    ('acquisition', 'acquisitions'),
+    ('investor', 'investor_updates'),
+    ('operation', 'operations'),
+]
+
+MARKDOWN_HEADING = re.compile(r"^#{1,6}\s+(.*)$")
+
+# chunk_documents(): documents submitted ahead per worker process
+IN_FLIGHT_PER_WORKER = 4
+
+# (text, is_heading)
+Segment = Tuple[str, bool]
+
+
+def section_type_for_heading(heading: str) -> str:
+    """Map a heading to a section_type_enum value"""
+    lowered = heading.lower()
+    for keyword, section_type in SECTION_KEYWORDS:
+        if keyword in lowered:
+            return section_type
+    return 'general'
+
+
+def block_text(block: Dict[str, Any]) -> str:
+    """Plain text of a Notion block's rich_text (empty for non-text blocks)"""
+    body = block.get(block.get('type'), {}) or {}
+    return "".join(part.get('plain_text', '') for part in body.get('rich_text', []))
+
+
+def block_segments(blocks: Iterable[Dict[str, Any]]) -> Iterator[Segment]:
+    """Notion blocks as segments; heading_1-3 blocks start sections"""
+    for block in blocks:
+        yield block_text(block), block.get('type') in HEADING_TYPES
+
+
+def text_segments(lines: Iterable[str]) -> Iterator[Segment]:
+    """Lines of text (a file object works) as segments; Markdown headings start sections"""
+    for line in lines:
+        line = line.rstrip("\n")
+        match = MARKDOWN_HEADING.match(line)
+        if match:
+            yield match.group(1).strip(), True
+        else:
+            yield line, False
+
+
+@lru_cache(maxsize=None)
+def get_encoding(name: Optional[str] = None) -> tiktoken.Encoding:
+    return tiktoken.get_encoding(name or settings.CHUNK_ENCODING)
+
+
+@dataclass
+class Chunk:
+    chunk_id: str
+    document_id: str
+    chunk_index: int
+    content: str
+    section_type: str
+    heading: str
+    token_count: int
+
+
+class TokenChunker:
+    """Packs a segment stream into token-budget chunks; holds at most one chunk of tokens"""
+
+    def __init__(self, max_tokens: Optional[int] = None, overlap_tokens: Optional[int] = None,
+                 encoding: Optional[tiktoken.Encoding] = None):
+        """
+        Args:
+            max_tokens: Tokens per chunk, heading included (default settings.CHUNK_TOKENS)
+            overlap_tokens: Tokens repeated from the end of the previous chunk
+                in the same section (default settings.CHUNK_OVERLAP_TOKENS)
+            encoding: tiktoken encoding (default settings.CHUNK_ENCODING)
+        """
+        self.max_tokens = max_tokens or settings.CHUNK_TOKENS
+        self.overlap_tokens = settings.CHUNK_OVERLAP_TOKENS if overlap_tokens is None else overlap_tokens
+        if not 0 <= self.overlap_tokens < self.max_tokens // 2:
+            raise ValueError("overlap_tokens must be at least 0 and under half of max_tokens")
+        self.encoding = encoding or get_encoding()
+
+    def _decode(self, tokens: List[int]) -> str:
+        # A split can fall inside a multi-byte character; drop the partial bytes
+        return self.encoding.decode_bytes(tokens).decode('utf-8', errors='ignore').strip()
+
+    def chunk_segments(self, document_id: str, segments: Iterable[Segment]) -> Iterator[Chunk]:
+        """Yield chunks as soon as they fill up"""
+        encode = self.encoding.encode_ordinary
+        index = 0
+        heading = ''
+        section_type = 'general'
+        heading_tokens: List[int] = []
+        body: List[int] = []
+        fresh = 0  # body tokens not yet emitted in any chunk
+
+        def emit(tokens: List[int]) -> Optional[Chunk]:
+            nonlocal index
+            content = self._decode(heading_tokens + tokens)
+            if not content:
+                return None
+            chunk = Chunk(
+                chunk_id=sha256_text(f"{document_id}:{normalize_text(content)}"),
+                document_id=document_id,
+                chunk_index=index,
+                content=content,
+                section_type=section_type,
+                heading=heading,
+                token_count=len(heading_tokens) + len(tokens),
+            )
+            index += 1
+            return chunk
+
+        for text, is_heading in segments:
+            if is_heading:
+                if fresh:
+                    chunk = emit(body)
+                    if chunk:
+                        yield chunk
+                heading = text.strip()
+                section_type = section_type_for_heading(heading)
+                # Cap so a runaway heading still leaves room for body text
+                heading_tokens = encode(f"{heading}\n")[:self.max_tokens // 2] if heading else []
+                body, fresh = [], 0
+                continue
+            if not text.strip():
+                continue
+
+            room = self.max_tokens - len(heading_tokens)
+            tokens = encode(f"{text}\n")
+            # Start a new chunk at the segment boundary, unless the segment
+            # would be split anyway
+            if fresh and len(body) + len(tokens) > room and len(tokens) <= room - self.overlap_tokens:
+                chunk = emit(body)
+                if chunk:
+                    yield chunk
+                body = body[-self.overlap_tokens:] if self.overlap_tokens else []
+                fresh = 0
+            body.extend(tokens)
+            fresh += len(tokens)
+            # Split segments longer than a chunk at token boundaries
+            while len(body) > room:
+                chunk = emit(body[:room])
+                if chunk:
+                    yield chunk
+                body = body[room - self.overlap_tokens:]
+                fresh = len(body) - self.overlap_tokens
+
+        if fresh > 0:
+            chunk = emit(body)
+            if chunk:
+                yield chunk
+
+    def chunk_text(self, document_id: str, lines: Iterable[str]) -> Iterator[Chunk]:
+        return self.chunk_segments(document_id, text_segments(lines))
+
+    def chunk_blocks(self, document_id: str, blocks: Iterable[Dict[str, Any]]) -> Iterator[Chunk]:
+        return self.chunk_segments(document_id, block_segments(blocks))
+
+
+# ==============================================================================
+# Batches
+# ==============================================================================
+
+_worker_chunker: Optional[TokenChunker] = None
+
+
+def _init_worker(max_tokens: int, overlap_tokens: int, encoding_name: str) -> None:
+    global _worker_chunker
+    _worker_chunker = TokenChunker(max_tokens, overlap_tokens, get_encoding(encoding_name))
+
+
+def _chunk_document(document: Tuple[str, str]) -> List[Chunk]:
+    document_id, text = document
+    return list(_worker_chunker.chunk_text(document_id, text.splitlines()))
+
+
+def chunk_documents(documents: Iterable[Tuple[str, str]], max_tokens: Optional[int] = None,
+                    overlap_tokens: Optional[int] = None, workers: Optional[int] = None,
+                    encoding_name: Optional[str] = None) -> Iterator[List[Chunk]]:
+    """
+    Chunk many documents across a process pool.
+
+    At most IN_FLIGHT_PER_WORKER documents per worker are submitted ahead of
+    the one being yielded, so memory stays bounded however long the input is.
+
+    Args:
+        documents: (document_id, text) pairs, consumed lazily
+        workers: Processes (default settings.CHUNK_WORKERS); 1 chunks in this process
+
+    Yields:
+        Each document's chunks, in input order
+    """
+    max_tokens = max_tokens or settings.CHUNK_TOKENS
+    overlap_tokens = settings.CHUNK_OVERLAP_TOKENS if overlap_tokens is None else overlap_tokens
+    encoding_name = encoding_name or settings.CHUNK_ENCODING
+    workers = workers or settings.CHUNK_WORKERS
+
+    if workers <= 1:
+        _init_worker(max_tokens, overlap_tokens, encoding_name)
+        yield from map(_chunk_document, documents)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(max_tokens, overlap_tokens, encoding_name)) as pool:
+        pending = deque()
+        for document in documents:
+            if len(pending) >= workers * IN_FLIGHT_PER_WORKER:
+                yield pending.popleft().result()
+            pending.append(pool.submit(_chunk_document, document))
+        while pending:
+            yield pending.popleft().result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chunk a text or Markdown file")
+    parser.add_argument("path")
+    parser.add_argument("--document-id", help="Defaults to the file name")
+    parser.add_argument("--max-tokens", type=int, default=settings.CHUNK_TOKENS)
+    parser.add_argument("--overlap", type=int, default=settings.CHUNK_OVERLAP_TOKENS)
+    args = parser.parse_args()
+
+    chunker = TokenChunker(args.max_tokens, args.overlap)
+    with open(args.path, 'r', encoding='utf-8') as f:
+        for chunk in chunker.chunk_text(args.document_id or os.path.basename(args.path), f):
+            print(f"[{chunk.chunk_index}] {chunk.section_type} / {chunk.heading or '-'} "
+                  f"({chunk.token_count} tokens) {chunk.chunk_id[:12]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""
+Creation and in-place migration of the RAG Qdrant collections.
+
+A CollectionSpec is the desired state of a collection:
+  - quantization: 'scalar' (int8, 4x smaller), 'product' (x16) or 'none'.
+    Quantized copies are kept in RAM (always_ram), and searches rescore
+    the top candidates against the original vectors (see search_params()).
+  - on_disk: original float32 vectors are memory-mapped instead of held
+    in RAM.
+  - HNSW graph parameters (m, ef_construct).
+  - payload indexes on the fields mirrored from chunk_metadata and
+    document_chunks, so filtered searches (rag/filters.py) avoid payload
+    scans.
+
+ensure_collection() creates a missing collection. For an existing one it
+PATCHes whatever differs (Qdrant re-optimizes segments in the background)
+and adds missing payload indexes. Vector size and distance cannot change
+in place; that needs recreate=True and a full re-sync of the points.
+
+Usage (from the streamlit/ directory):
+    python -m rag.collections status
+    python -m rag.collections ensure --quantization scalar --dry-run
+"""
+import argparse
+import sys
+import os
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from .qdrant import QdrantClient
+
+QUANTIZATION_MODES = ('none', 'scalar', 'product')
+
+# Payload field -> Qdrant index type, for the fields filters and sync write
+PAYLOAD_INDEXES = {
+    'chunk_id': 'keyword',
+    'document_id': 'keyword',
+    'source_type': 'keyword',
+    'section_type': 'keyword',
+    'sentiment': 'keyword',
+    'topics': 'keyword',
+    'tags': 'keyword',
+    'entities.properties': 'keyword',
+    'entities.tenants': 'keyword',
+    'created_at': 'datetime',
+}
+
+
+@dataclass
+class CollectionSpec:
+    name: str
+    size: int
+    distance: str = 'Cosine'
+    quantization: str = 'scalar'
+    on_disk: bool = True
+    hnsw_m: int = 16
+    hnsw_ef_construct: int = 128
+    on_disk_payload: bool = True
+    payload_indexes: Dict[str, str] = field(default_factory=lambda: dict(PAYLOAD_INDEXES))
+
+    def __post_init__(self):
+        if self.quantization not in QUANTIZATION_MODES:
+            raise ValueError(f"Unknown quantization '{self.quantization}' "
+                             f"(expected one of {', '.join(QUANTIZATION_MODES)})")
+
+    def quantization_config(self) -> Optional[Dict[str, Any]]:
+        if self.quantization == 'scalar':
+            return {'scalar': {'type': 'int8', 'quantile': 0.99, 'always_ram': True}}
+        if self.quantization == 'product':
+            return {'product': {'compression': 'x16', 'always_ram': True}}
+        return None
+
+    def to_config(self) -> Dict[str, Any]:
+        """Body of a create-collection request"""
+        config = {
+            'vectors': {'size': self.size, 'distance': self.distance, 'on_disk': self.on_disk},
+            'hnsw_config': {'m': self.hnsw_m, 'ef_construct': self.hnsw_ef_construct},
+            'on_disk_payload': self.on_disk_payload,
+        }
+        quantization = self.quantization_config()
+        if quantization:
+            config['quantization_config'] = quantization
+        return config
+
+
+def default_spec(name: Optional[str] = None) -> CollectionSpec:
+    """Spec of a RAG collection from settings (RAG_* and EMBEDDING_DIM)"""
+    return CollectionSpec(
+        name=name or settings.RAG_COLLECTION,
+        size=settings.EMBEDDING_DIM,
+        quantization=settings.RAG_QUANTIZATION,
+        on_disk=settings.RAG_VECTORS_ON_DISK,
+        hnsw_m=settings.RAG_HNSW_M,
+        hnsw_ef_construct=settings.RAG_HNSW_EF_CONSTRUCT,
+    )
+
+
+def search_params(quantization: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Search parameters for a collection quantized with the given mode
+    (default settings.RAG_QUANTIZATION): candidates are found on the
+    quantized vectors, then oversampled and rescored with the originals.
+    """
+    quantization = quantization or settings.RAG_QUANTIZATION
+    params: Dict[str, Any] = {'hnsw_ef': settings.RAG_HNSW_EF}
+    if quantization != 'none':
+        params['quantization'] = {'rescore': True, 'oversampling': settings.RAG_RESCORE_OVERSAMPLING}
+    return params
+
+
+def _quantization_matches(current: Optional[Dict[str, Any]], wanted: Optional[Dict[str, Any]]) -> bool:
+    if not current or not wanted:
+        return not current and not wanted
+    mode = next(iter(wanted))
+    if mode not in current:
+        return False
+    return all(current[mode].get(key) == value for key, value in wanted[mode].items())
+
+
+def plan_changes(spec: CollectionSpec, info: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Compare an existing collection (get_collection result) with a spec.
+
+    Returns:
+        {'patch': body for update_collection or {}, 'indexes': {field: type}
+        to create, 'changes': human-readable list}
+
+    Raises:
+        ValueError: vector size or distance differ, or the collection uses named vectors
+    """
+    config = info['config']
+    vectors = config['params']['vectors']
+    if 'size' not in vectors:
+        raise ValueError(f"Collection '{spec.name}' uses named vectors, which are not managed here")
+    if vectors['size'] != spec.size or vectors['distance'] != spec.distance:
+        raise ValueError(
+            f"Collection '{spec.name}' has {vectors['size']}-d {vectors['distance']} vectors, "
+            f"spec wants {spec.size}-d {spec.distance}; recreate it and re-sync the points"
+        )
+
+    patch: Dict[str, Any] = {}
+    changes: List[str] = []
+    if bool(vectors.get('on_disk')) != spec.on_disk:
+        patch['vectors'] = {'': {'on_disk': spec.on_disk}}
+        changes.append(f"vectors on_disk -> {spec.on_disk}")
+    hnsw = config.get('hnsw_config', {})
+    if hnsw.get('m') != spec.hnsw_m or hnsw.get('ef_construct') != spec.hnsw_ef_construct:
+        patch['hnsw_config'] = {'m': spec.hnsw_m, 'ef_construct': spec.hnsw_ef_construct}
+        changes.append(f"hnsw m={spec.hnsw_m} ef_construct={spec.hnsw_ef_construct}")
+    wanted = spec.quantization_config()
+    if not _quantization_matches(config.get('quantization_config'), wanted):
+        patch['quantization_config'] = wanted or 'Disabled'
+        changes.append(f"quantization -> {spec.quantization}")
+    if bool(config['params'].get('on_disk_payload')) != spec.on_disk_payload:
+        patch['params'] = {'on_disk_payload': spec.on_disk_payload}
+        changes.append(f"on_disk_payload -> {spec.on_disk_payload}")
+
+    existing = info.get('payload_schema', {})
+    indexes = {
+        field_name: schema for field_name, schema in spec.payload_indexes.items()
+        if existing.get(field_name, {}).get('data_type') != schema
+    }
+    changes.extend(f"index {field_name} ({schema})" for field_name, schema in indexes.items())
+    return {'patch': patch, 'indexes': indexes, 'changes': changes}
+
+
+def ensure_collection(spec: Optional[CollectionSpec] = None, client: Optional[QdrantClient] = None,
+                      dry_run: bool = False, recreate: bool = False) -> Dict[str, Any]:
+    """
+    Create or migrate a collection to match spec (default: default_spec()).
+
+    Args:
+        dry_run: Only report what would change
+        recreate: Drop and recreate the collection (its points are lost)
+
+    Returns:
+        {'collection', 'created': bool, 'changes': list of applied (or planned) changes}
+    """
+    spec = spec or default_spec()
+    client = client or QdrantClient()
+
+    exists = client.collection_exists(spec.name)
+    if exists and recreate:
+        if not dry_run:
+            client.delete_collection(spec.name)
+        exists = False
+    if not exists:
+        changes = ['create'] + [f"index {name} ({schema})" for name, schema in spec.payload_indexes.items()]
+        if not dry_run:
+            client.create_collection(spec.name, spec.to_config())
+            for field_name, schema in spec.payload_indexes.items():
+                client.create_payload_index(spec.name, field_name, schema)
+        return {'collection': spec.name, 'created': True, 'changes': changes}
+
+    plan = plan_changes(spec, client.get_collection(spec.name))
+    if not dry_run:
+        if plan['patch']:
+            client.update_collection(spec.name, plan['patch'])
+        for field_name, schema in plan['indexes'].items():
+            client.create_payload_index(spec.name, field_name, schema)
+    return {'collection': spec.name, 'created': False, 'changes': plan['changes']}
+
+
+def collection_status(name: Optional[str] = None, client: Optional[QdrantClient] = None) -> Dict[str, Any]:
+    """Summary of a collection's storage settings, size and payload indexes"""
+    client = client or QdrantClient()
+    info = client.get_collection(name or settings.RAG_COLLECTION)
+    config = info['config']
+    quantization = config.get('quantization_config') or {}
+    return {
+        'status': info.get('status'),
+        'points': info.get('points_count'),
+        'indexed_vectors': info.get('indexed_vectors_count'),
+        'segments': info.get('segments_count'),
+        'vectors': config['params']['vectors'],
+        'on_disk_payload': config['params'].get('on_disk_payload'),
+        'hnsw': {key: config['hnsw_config'].get(key) for key in ('m', 'ef_construct')},
+        'quantization': next(iter(quantization), 'none'),
+        'payload_indexes': {name: schema.get('data_type') for name, schema in info.get('payload_schema', {}).items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create, migrate or inspect a RAG Qdrant collection")
+    parser.add_argument("command", choices=["ensure", "status"])
+    parser.add_argument("--name", default=settings.RAG_COLLECTION)
+    parser.add_argument("--quantization", choices=QUANTIZATION_MODES, default=settings.RAG_QUANTIZATION)
+    parser.add_argument("--in-ram", action="store_true", help="Keep original vectors in RAM")
+    parser.add_argument("--dry-run", action="store_true", help="Only print the planned changes")
+    parser.add_argument("--recreate", action="store_true", help="Drop and recreate (points are lost)")
+    args = parser.parse_args()
+
+    if args.command == "status":
+        for key, value in collection_status(args.name).items():
+            print(f"{key}: {value}")
+        return
+
+    spec = default_spec(args.name)
+    spec.quantization = args.quantization
+    spec.on_disk = spec.on_disk and not args.in_ram
+    result = ensure_collection(spec, dry_run=args.dry_run, recreate=args.recreate)
+    verb = "Would apply" if args.dry_run else "Applied"
+    print(f"[QDRANT] {result['collection']}: {verb} {len(result['changes'])} change(s)")
+    for change in result['changes']:
+        print(f"  - {change}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""
+Batched embedding pipeline with a content-addressed embedding cache.
+
+Texts are normalized and hashed, duplicates collapse to one request, and
+vectors already computed for the same (model, text_hash) are read from the
+cache. Only misses are sent to the embedder, in large batches with bounded
+concurrency, and vectors are upserted to Qdrant in bulk.
+
+Usage:
+    pipeline = get_default_pipeline()
+    vectors = pipeline.embed(["first chunk", "second chunk"])
+
+    # Plugs into the Notion sync
+    NotionSync(embed_texts=pipeline.embed, embedding_model=pipeline.model)
+"""
+import array
+import hashlib
+import math
+import re
+import sys
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Iterable
+
+import requests
+from psycopg2.extras import execute_values
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from db import database
+from .hashing import normalize_text, text_hash
+from .qdrant import QdrantClient
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def _batched(items: List[Any], size: int) -> Iterable[List[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+# ==============================================================================
+# Embedders
+# ==============================================================================
+
+class HashingEmbedder:
+    """
+    Deterministic local embedder for offline tests and benchmarks.
+
+    Unigrams and bigrams are feature-hashed into a signed, L2-normalized
+    vector, so identical text always yields an identical vector and
+    overlapping text yields similar ones. Not a semantic model.
+    """
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+        self.model = f"local-hashing-{dim}"
+
+    def _embed_one(self, text: str) -> List[float]:
+        vector = [0.0] * self.dim
+        tokens = TOKEN_PATTERN.findall(text.lower())
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        for feature in features:
+            digest = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+            vector[digest % self.dim] += 1.0 if digest >> 63 else -1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed_one(text) for text in texts]
+
+
+class HttpEmbedder:
+    """Client for an OpenAI-compatible /embeddings endpoint"""
+
+    def __init__(self, model: Optional[str] = None, api_url: Optional[str] = None,
+                 api_key: Optional[str] = None, timeout: int = 60):
+        self.model = model or settings.EMBEDDING_MODEL
+        self.api_url = api_url or settings.EMBEDDING_API_URL
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Authorization": f"Bearer {api_key or settings.EMBEDDING_API_KEY}",
+            "Content-Type": "application/json",
+        })
+
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        response = self.session.post(
+            self.api_url, json={"model": self.model, "input": texts}, timeout=self.timeout
+        )
+        if response.status_code != 200:
+            raise Exception(f"Embedding error: Status {response.status_code} - {response.text[:200]}")
+        data = sorted(response.json()['data'], key=lambda item: item['index'])
+        return [item['embedding'] for item in data]
+
+
+# ==============================================================================
+# Caches
+# ==============================================================================
+
+def _pack(vector: List[float]) -> bytes:
+    return array.array('f', vector).tobytes()
+
+
+def _unpack(blob: Any) -> List[float]:
+    values = array.array('f')
+    values.frombytes(bytes(blob))
+    return values.tolist()
+
+
+class EmbeddingCache:
+    """Persistent (model, text_hash) -> vector cache in the embedding_cache table"""
+
+    def get_many(self, model: str, hashes: List[str]) -> Dict[str, List[float]]:
+        if not hashes:
+            return {}
+        rows = database.fetch_data(
+            "SELECT text_hash, vector FROM embedding_cache WHERE model = %s AND text_hash = ANY(%s)",
+            (model, list(hashes))
+        )
+        return {row['text_hash']: _unpack(row['vector']) for row in rows}
+
+    def put_many(self, model: str, vectors: Dict[str, List[float]]) -> None:
+        if not vectors:
+            return
+        with database.get_connection() as conn:
+            with conn.cursor() as cur:
+                execute_values(cur, """
+                    INSERT INTO embedding_cache (model, text_hash, dim, vector)
+                    VALUES %s
+                    ON CONFLICT (model, text_hash) DO NOTHING
+                """, [(model, h, len(v), _pack(v)) for h, v in vectors.items()], page_size=500)
+
+
+class InMemoryEmbeddingCache:
+    """Process-local cache with the same interface, for offline use"""
+
+    def __init__(self):
+        self._vectors: Dict[tuple, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def get_many(self, model: str, hashes: List[str]) -> Dict[str, List[float]]:
+        with self._lock:
+            return {h: self._vectors[(model, h)] for h in hashes if (model, h) in self._vectors}
+
+    def put_many(self, model: str, vectors: Dict[str, List[float]]) -> None:
+        with self._lock:
+            for h, v in vectors.items():
+                self._vectors[(model, h)] = v
+
+
+# ==============================================================================
+# Pipeline
+# ==============================================================================
+
+class EmbeddingPipeline:
+    """Dedupe -> cache lookup -> batched, concurrent embedding of misses"""
+
+    def __init__(self, embedder, cache=None, batch_size: Optional[int] = None,
+                 max_concurrency: Optional[int] = None):
+        """
+        Args:
+            embedder: Object with .model and .embed_batch(texts)
+            cache: EmbeddingCache (default) or InMemoryEmbeddingCache
+            batch_size: Texts per embedder request
+            max_concurrency: Embedder requests in flight at once
+        """
+        self.embedder = embedder
+        self.model = embedder.model
+        self.cache = cache if cache is not None else EmbeddingCache()
+        self.batch_size = batch_size or settings.EMBEDDING_BATCH_SIZE
+        self.max_concurrency = max_concurrency or settings.EMBEDDING_CONCURRENCY
+        self.stats = {'requested': 0, 'unique': 0, 'cache_hits': 0, 'embedded': 0}
+        self._stats_lock = threading.Lock()
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed texts, returning vectors aligned with the input order.
+
+        Identical texts (after whitespace normalization) are embedded once.
+        """
+        hashes = [text_hash(text) for text in texts]
+        unique = {}
+        for h, text in zip(hashes, texts):
+            unique.setdefault(h, normalize_text(text))
+
+        vectors = self.cache.get_many(self.model, list(unique))
+        misses = [h for h in unique if h not in vectors]
+
+        if misses:
+            batches = list(_batched(misses, self.batch_size))
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(batches)),
+                                    thread_name_prefix="embed") as pool:
+                results = pool.map(
+                    lambda batch: self.embedder.embed_batch([unique[h] for h in batch]), batches
+                )
+                new_vectors = {}
+                for batch, batch_vectors in zip(batches, results):
+                    new_vectors.update(zip(batch, batch_vectors))
+            self.cache.put_many(self.model, new_vectors)
+            vectors.update(new_vectors)
+
+        with self._stats_lock:
+            self.stats['requested'] += len(texts)
+            self.stats['unique'] += len(unique)
+            self.stats['cache_hits'] += len(unique) - len(misses)
+            self.stats['embedded'] += len(misses)
+        return [vectors[h] for h in hashes]
+
+    def embed_and_upsert(self, points: List[Dict[str, Any]], text_key: str = 'content',
+                         client: Optional[QdrantClient] = None, collection: Optional[str] = None,
+                         upsert_batch_size: int = 256) -> int:
+        """
+        Embed point texts and upsert them to Qdrant in bulk batches.
+
+        Args:
+            points: Dictionaries with 'id', 'payload' and the text under text_key
+            text_key: Key holding the text to embed
+            client: Qdrant client (defaults to settings.QDRANT_URL)
+            collection: Qdrant collection (defaults to settings.RAG_COLLECTION)
+            upsert_batch_size: Points per Qdrant upsert request
+
+        Returns:
+            Number of points upserted
+
+        Each batch waits for Qdrant to apply it, so a failed upsert raises
+        here before the caller records the chunks as indexed.
+        """
+        if not points:
+            return 0
+        client = client or QdrantClient()
+        collection = collection or settings.RAG_COLLECTION
+        vectors = self.embed([point[text_key] for point in points])
+        qdrant_points = [
+            {"id": point['id'], "vector": vector, "payload": point.get('payload', {})}
+            for point, vector in zip(points, vectors)
+        ]
+        batches = list(_batched(qdrant_points, upsert_batch_size))
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(batches)),
+                                thread_name_prefix="qdrant-upsert") as pool:
+            list(pool.map(lambda batch: client.upsert(collection, batch), batches))
+        return len(qdrant_points)
+
+
+def get_default_pipeline() -> EmbeddingPipeline:
+    """Pipeline configured from settings (EMBEDDING_PROVIDER='local' works offline)"""
+    if settings.EMBEDDING_PROVIDER == 'local':
+        return EmbeddingPipeline(HashingEmbedder(settings.EMBEDDING_DIM))
+    return EmbeddingPipeline(HttpEmbedder())
@@ -0,0 +1,265 @@
+"""
+Typed, index-friendly filters over document_chunks and chunk_metadata.
+
+Every predicate is written with an operator that the GIN indexes in
+schema/migrations/001_chunk_metadata_gin_indexes.sql can serve:
+
+    topics / future_topics   &&, @>      (array GIN)
+    entities / custom_tags /
+    action_items             @>          (jsonb_path_ops GIN)
+    content / summary        @@          (tsvector GIN)
+
+Usage:
+    chunk_filter = (ChunkFilter()
+                    .section_types(['rent_roll'])
+                    .entity('tenants', 'Jane Doe'))
+    where_sql, params = chunk_filter.to_sql()
+"""
+import json
+import sys
+import os
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import database
+
+SECTION_TYPES = (
+    'team_check_in', 'operations', 'financials', 'rent_roll',
+    'maintenance', 'acquisitions', 'investor_updates', 'general'
+)
+SENTIMENTS = ('positive', 'neutral', 'negative', 'concerned', 'mixed', 'urgent')
+TEXT_SEARCH_CONFIG = 'english'
+
+
+def _validate(values: Iterable[str], allowed: tuple, field: str) -> List[str]:
+    values = list(values)
+    unknown = [v for v in values if v not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown {field} value(s): {', '.join(unknown)}")
+    return values
+
+
+class ChunkFilter:
+    """
+    Builder for predicates over document_chunks (alias dc) joined with
+    chunk_metadata (alias cm).
+
+    Each method appends one predicate and returns the filter, so calls can
+    be chained. Predicates are ANDed together.
+    """
+
+    def __init__(self):
+        self._sql: List[str] = []
+        self._params: List[Any] = []
+        self._qdrant: List[Dict[str, Any]] = []
+
+    def _add(self, sql: str, *params: Any, qdrant: Optional[Dict[str, Any]] = None) -> 'ChunkFilter':
+        self._sql.append(sql)
+        self._params.extend(params)
+        if qdrant is not None:
+            self._qdrant.append(qdrant)
+        return self
+
+    def is_empty(self) -> bool:
+        return not self._sql
+
+    # -- enum columns -------------------------------------------------------
+
+    def section_types(self, values: Iterable[str]) -> 'ChunkFilter':
+        values = _validate(values, SECTION_TYPES, 'section_type')
+        return self._add(
+            "cm.section_type = ANY(%s::section_type_enum[])", values,
+            qdrant={"key": "section_type", "match": {"any": values}}
+        )
+
+    def sentiments(self, values: Iterable[str]) -> 'ChunkFilter':
+        values = _validate(values, SENTIMENTS, 'sentiment')
+        return self._add(
+            "cm.sentiment = ANY(%s::sentiment_enum[])", values,
+            qdrant={"key": "sentiment", "match": {"any": values}}
+        )
+
+    # -- TEXT[] columns -----------------------------------------------------
+
+    def topics_any(self, values: Iterable[str]) -> 'ChunkFilter':
+        """Chunks tagged with at least one of the topics (&&)"""
+        values = list(values)
+        return self._add(
+            "cm.topics && %s::text[]", values,
+            qdrant={"key": "topics", "match": {"any": values}}
+        )
+
+    def topics_all(self, values: Iterable[str]) -> 'ChunkFilter':
+        """Chunks tagged with every one of the topics (@>)"""
+        values = list(values)
+        self._add("cm.topics @> %s::text[]", values)
+        for value in values:
+            self._qdrant.append({"key": "topics", "match": {"value": value}})
+        return self
+
+    def future_topics_any(self, values: Iterable[str]) -> 'ChunkFilter':
+        return self._add("cm.future_topics && %s::text[]", list(values))
+
+    # -- JSONB columns ------------------------------------------------------
+
+    def entity(self, entity_type: str, value: str) -> 'ChunkFilter':
+        """Chunks whose entities[entity_type] array contains value, e.g. entity('tenants', 'Jane Doe')"""
+        return self._add(
+            "cm.entities @> %s::jsonb", json.dumps({entity_type: [value]}),
+            qdrant={"key": f"entities.{entity_type}", "match": {"value": value}}
+        )
+
+    def custom_tag(self, tag: Any) -> 'ChunkFilter':
+        """Chunks whose custom_tags array contains tag (a string or an object subset)"""
+        return self._add("cm.custom_tags @> %s::jsonb", json.dumps([tag]))
+
+    def action_item(self, item: Any) -> 'ChunkFilter':
+        """Chunks whose action_items array contains item (a string or an object subset)"""
+        return self._add("cm.action_items @> %s::jsonb", json.dumps([item]))
+
+    # -- full text ----------------------------------------------------------
+
+    def content_matches(self, query: str) -> 'ChunkFilter':
+        """Full-text match on document_chunks.content_tsv (web search syntax)"""
+        return self._add(
+            f"dc.content_tsv @@ websearch_to_tsquery('{TEXT_SEARCH_CONFIG}', %s)", query
+        )
+
+    def summary_matches(self, query: str) -> 'ChunkFilter':
+        """Full-text match on chunk_metadata.summary_tsv (web search syntax)"""
+        return self._add(
+            f"cm.summary_tsv @@ websearch_to_tsquery('{TEXT_SEARCH_CONFIG}', %s)", query
+        )
+
+    # -- tags and dates -----------------------------------------------------
+
+    def tags(self, tag_names: Iterable[str]) -> 'ChunkFilter':
+        """Chunks linked through chunk_tags to any of the tag names"""
+        tag_names = list(tag_names)
+        return self._add(
+            """EXISTS (
+                SELECT 1 FROM chunk_tags ct
+                JOIN tags t ON t.tag_id = ct.tag_id
+                WHERE ct.chunk_id::text = dc.chunk_id AND t.tag_name = ANY(%s)
+            )""",
+            tag_names,
+            qdrant={"key": "tags", "match": {"any": tag_names}}
+        )
+
+    def created_between(self, date_from: Optional[datetime] = None,
+                        date_to: Optional[datetime] = None) -> 'ChunkFilter':
+        date_range = {}
+        if date_from:
+            self._add("dc.created_at >= %s", date_from)
+            date_range["gte"] = date_from.isoformat()
+        if date_to:
+            self._add("dc.created_at <= %s", date_to)
+            date_range["lte"] = date_to.isoformat()
+        if date_range:
+            self._qdrant.append({"key": "created_at", "range": date_range})
+        return self
+
+    # -- output -------------------------------------------------------------
+
+    def to_sql(self) -> Tuple[str, tuple]:
+        """Return (where_sql, params); where_sql is 'TRUE' for an empty filter"""
+        if not self._sql:
+            return "TRUE", ()
+        return " AND ".join(self._sql), tuple(self._params)
+
+    def to_qdrant(self) -> Optional[Dict[str, Any]]:
+        """
+        Return the Qdrant payload filter for the predicates mirrored in the
+        point payload (see qdrant_payload). Full-text, future_topics,
+        custom_tags and action_items predicates are SQL-only.
+        """
+        return {"must": list(self._qdrant)} if self._qdrant else None
+
+
+def query_chunks(chunk_filter: ChunkFilter, limit: int = 100) -> List[Dict[str, Any]]:
+    """
+    Fetch chunks with their metadata matching a filter.
+
+    Args:
+        chunk_filter: Filter to apply
+        limit: Maximum number of rows
+
+    Returns:
+        List of chunk dictionaries, newest first
+    """
+    where_sql, params = chunk_filter.to_sql()
+    query = f"""
+        SELECT
+            dc.chunk_id,
+            dc.document_id,
+            dc.chunk_index,
+            dc.content,
+            dc.created_at,
+            cm.section_type::text as section_type,
+            cm.sentiment::text as sentiment,
+            cm.topics,
+            cm.entities,
+            cm.summary
+        FROM document_chunks dc
+        JOIN chunk_metadata cm ON cm.chunk_id = dc.chunk_id
+        WHERE {where_sql}
+        ORDER BY dc.created_at DESC
+        LIMIT %s
+    """
+    return database.fetch_data(query, params + (limit,))
+
+
+def qdrant_payload(chunk_id: str, document_id: str, source_type: str, title: Optional[str],
+                   created_at: Optional[datetime], section_type: Optional[str] = None,
+                   sentiment: Optional[str] = None, topics: Optional[List[str]] = None,
+                   entities: Optional[Dict[str, Any]] = None,
+                   tags: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Point payload mirroring a chunk's row data, with every field that
+    ChunkFilter.to_qdrant() filters on (and rag/collections.py indexes).
+    """
+    return {
+        "chunk_id": chunk_id,
+        "document_id": document_id,
+        "source_type": source_type,
+        "title": title,
+        "created_at": created_at.isoformat() if created_at else None,
+        "section_type": section_type,
+        "sentiment": sentiment,
+        "topics": list(topics or []),
+        "entities": dict(entities or {}),
+        "tags": list(tags or []),
+    }
+
+
+def fetch_qdrant_payloads(chunk_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """Current payload of each stored chunk (see qdrant_payload), keyed by chunk_id"""
+    chunk_ids = list(chunk_ids)
+    if not chunk_ids:
+        return {}
+    rows = database.fetch_data("""
+        SELECT
+            dc.chunk_id,
+            dc.document_id,
+            sd.source_type,
+            sd.title,
+            dc.created_at,
+            cm.section_type::text as section_type,
+            cm.sentiment::text as sentiment,
+            cm.topics,
+            cm.entities,
+            ARRAY(
+                SELECT t.tag_name FROM chunk_tags ct
+                JOIN tags t ON t.tag_id = ct.tag_id
+                WHERE ct.chunk_id::text = dc.chunk_id
+                ORDER BY t.tag_name
+            ) as tags
+        FROM document_chunks dc
+        LEFT JOIN source_documents sd ON sd.document_id = dc.document_id
+        LEFT JOIN chunk_metadata cm ON cm.chunk_id = dc.chunk_id
+        WHERE dc.chunk_id = ANY(%s)
+    """, (chunk_ids,))
+    return {row['chunk_id']: qdrant_payload(**row) for row in rows}
@@ -0,0 +1,24 @@
+"""
+Text normalization and content hashing shared by the RAG modules
+"""
+import hashlib
+import uuid
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so formatting-only edits don't change hashes"""
+    return " ".join(text.split())
+
+
+def sha256_text(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def text_hash(text: str) -> str:
+    """Content address of a piece of text after normalization"""
+    return sha256_text(normalize_text(text))
+
+
+def point_id_for_chunk(chunk_id: str) -> str:
+    """Deterministic Qdrant point UUID derived from a chunk id"""
+    return str(uuid.UUID(hex=sha256_text(chunk_id)[:32]))
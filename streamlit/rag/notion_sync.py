@@ -0,0 +1,380 @@
+"""
+Incremental Notion -> RAG sync.
+
+Only pages edited since the last sync are fetched. A page whose block
+content hash is unchanged is marked ingested without re-chunking. For
+changed pages, chunks are content-addressed, so only chunks whose text
+changed are embedded; chunks that disappeared are deleted from
+document_chunks and their Qdrant points removed. Points carry the payload
+fields ChunkFilter mirrors (rag/filters.py qdrant_payload); surviving
+chunks get theirs refreshed from chunk_metadata and chunk_tags.
+"""
+import json
+import sys
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional, Callable
+
+import requests
+from psycopg2.extras import execute_values, Json
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from db import database
+from .chunking import TokenChunker, block_text
+from .collections import default_spec, ensure_collection
+from .filters import qdrant_payload, fetch_qdrant_payloads
+from .hashing import normalize_text, sha256_text, point_id_for_chunk
+from .qdrant import QdrantClient
+
+NOTION_API_URL = "https://api.notion.com/v1"
+
+
+class NotionClient:
+    """Small Notion REST client with 429 back-off"""
+
+    def __init__(self, api_key: Optional[str] = None, timeout: int = 30, max_retries: int = 5):
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Authorization": f"Bearer {api_key or settings.NOTION_API_KEY}",
+            "Notion-Version": settings.NOTION_VERSION,
+            "Content-Type": "application/json",
+        })
+        self.timeout = timeout
+        self.max_retries = max_retries
+
+    def _request(self, method: str, path: str, payload: Optional[Dict[str, Any]] = None,
+                 params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        for attempt in range(self.max_retries):
+            response = self.session.request(
+                method, f"{NOTION_API_URL}{path}", json=payload, params=params, timeout=self.timeout
+            )
+            if response.status_code == 429 or response.status_code >= 500:
+                delay = float(response.headers.get('Retry-After', 2 ** attempt))
+                print(f"[NOTION] {response.status_code} on {path}, retrying in {delay}s...")
+                time.sleep(delay)
+                continue
+            if response.status_code >= 400:
+                raise Exception(f"Notion error: Status {response.status_code} - {response.text[:200]}")
+            return response.json()
+        raise Exception(f"Notion request failed after {self.max_retries} attempts: {path}")
+
+    def iter_recently_edited_pages(self, since: Optional[datetime]):
+        """
+        Yield pages newest-edit first, stopping at the first page edited before 'since'.
+
+        Notion's last_edited_time is rounded to the minute, so pages edited in
+        the watermark's minute are yielded again; re-discovering them is
+        idempotent and an unchanged page is skipped by its content_hash.
+        """
+        cursor = None
+        while True:
+            payload = {
+                "filter": {"property": "object", "value": "page"},
+                "sort": {"timestamp": "last_edited_time", "direction": "descending"},
+                "page_size": 100,
+            }
+            if cursor:
+                payload["start_cursor"] = cursor
+            result = self._request("POST", "/search", payload)
+            for page in result.get('results', []):
+                if since and _parse_time(page['last_edited_time']) < since:
+                    return
+                yield page
+            if not result.get('has_more'):
+                return
+            cursor = result.get('next_cursor')
+
+    def get_blocks(self, block_id: str) -> List[Dict[str, Any]]:
+        """Return all blocks under block_id, depth-first, children after their parent"""
+        blocks = []
+        cursor = None
+        while True:
+            params = {"page_size": 100}
+            if cursor:
+                params["start_cursor"] = cursor
+            result = self._request("GET", f"/blocks/{block_id}/children", params=params)
+            for block in result.get('results', []):
+                blocks.append(block)
+                if block.get('has_children') and block['type'] != 'child_page':
+                    blocks.extend(self.get_blocks(block['id']))
+            if not result.get('has_more'):
+                return blocks
+            cursor = result.get('next_cursor')
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def page_title(page: Dict[str, Any]) -> str:
+    for prop in page.get('properties', {}).values():
+        if prop.get('type') == 'title':
+            return "".join(part.get('plain_text', '') for part in prop.get('title', []))
+    return ''
+
+
+class NotionSync:
+    """Sync engine whose cost scales with the number of edited blocks"""
+
+    def __init__(self, embed_texts: Callable[[List[str]], List[List[float]]],
+                 embedding_model: str,
+                 notion: Optional[NotionClient] = None,
+                 qdrant: Optional[QdrantClient] = None,
+                 collection: Optional[str] = None,
+                 max_workers: Optional[int] = None,
+                 chunker: Optional[TokenChunker] = None):
+        """
+        Args:
+            embed_texts: Function embedding a batch of texts
+            embedding_model: Name recorded in document_chunks.embedding_model
+            notion: Notion client (defaults to settings.NOTION_API_KEY)
+            qdrant: Qdrant client (defaults to settings.QDRANT_URL)
+            collection: Qdrant collection (defaults to settings.RAG_COLLECTION)
+            max_workers: Pages processed concurrently
+            chunker: Token chunker (defaults to settings.CHUNK_TOKENS / CHUNK_OVERLAP_TOKENS)
+        """
+        self.embed_texts = embed_texts
+        self.embedding_model = embedding_model
+        self.notion = notion or NotionClient()
+        self.qdrant = qdrant or QdrantClient()
+        self.collection = collection or settings.RAG_COLLECTION
+        self.max_workers = max_workers or settings.NOTION_SYNC_WORKERS
+        self.chunker = chunker or TokenChunker()
+
+    # -- discovery ----------------------------------------------------------
+
+    def discover_changes(self) -> int:
+        """
+        Upsert notion_page rows for pages edited since the newest stored
+        last_edited_time and flag them 'needs_update'.
+
+        Returns:
+            Number of pages flagged
+        """
+        row = database.fetch_one("SELECT MAX(last_edited_time) as watermark FROM notion_page")
+        watermark = row['watermark'] if row else None
+
+        rows = []
+        for page in self.notion.iter_recently_edited_pages(watermark):
+            parent = page.get('parent', {})
+            rows.append((
+                page['id'],
+                parent.get(parent.get('type')) if parent.get('type') == 'page_id' else None,
+                parent.get('type'),
+                page_title(page),
+                page.get('url'),
+                (page.get('icon') or {}).get('emoji'),
+                page.get('archived', False),
+                _parse_time(page.get('created_time')),
+                _parse_time(page.get('last_edited_time')),
+                Json(page),
+            ))
+
+        if rows:
+            with database.get_connection() as conn:
+                with conn.cursor() as cur:
+                    execute_values(cur, """
+                        INSERT INTO notion_page (
+                            notion_page_id, parent_page_id, parent_type, title, url, icon_emoji,
+                            is_archived, created_time, last_edited_time, raw
+                        ) VALUES %s
+                        ON CONFLICT (notion_page_id) DO UPDATE SET
+                            parent_page_id = EXCLUDED.parent_page_id,
+                            parent_type = EXCLUDED.parent_type,
+                            title = EXCLUDED.title,
+                            url = EXCLUDED.url,
+                            icon_emoji = EXCLUDED.icon_emoji,
+                            is_archived = EXCLUDED.is_archived,
+                            last_edited_time = EXCLUDED.last_edited_time,
+                            raw = EXCLUDED.raw,
+                            last_synced_at = now(),
+                            updated_at = now(),
+                            ingest_status = CASE
+                                WHEN notion_page.ingest_status = 'ignored' THEN 'ignored'
+                                ELSE 'needs_update'
+                            END
+                    """, rows)
+        print(f"[NOTION SYNC] {len(rows)} page(s) edited since {watermark}")
+        return len(rows)
+
+    # -- per-page sync ------------------------------------------------------
+
+    def sync_page(self, page: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Re-ingest one page, touching only chunks whose content changed.
+
+        Args:
+            page: notion_page row (notion_page_id, title, url, content_hash, is_archived)
+
+        Returns:
+            Counts of added, kept and removed chunks
+        """
+        page_id = page['notion_page_id']
+        existing = database.fetch_data(
+            "SELECT chunk_id, qdrant_point_id FROM document_chunks WHERE document_id = %s",
+            (page_id,)
+        )
+        existing_ids = {row['chunk_id']: row['qdrant_point_id'] for row in existing}
+
+        if page['is_archived']:
+            chunks = []
+            content_hash = None
+        else:
+            blocks = self.notion.get_blocks(page_id)
+            block_hashes = [sha256_text(normalize_text(block_text(b))) for b in blocks]
+            content_hash = sha256_text("".join(block_hashes))
+            if content_hash == page.get('content_hash') and existing_ids:
+                self._mark_ingested(page_id, content_hash)
+                return {'added': 0, 'kept': len(existing_ids), 'removed': 0}
+            chunks = self.chunker.chunk_blocks(page_id, blocks)
+
+        # Content-addressed ids: identical text in the same page keeps its id
+        new_chunks = {}
+        for chunk in chunks:
+            new_chunks.setdefault(chunk.chunk_id, vars(chunk))
+
+        to_add = [cid for cid in new_chunks if cid not in existing_ids]
+        to_remove = [cid for cid in existing_ids if cid not in new_chunks]
+        kept = [cid for cid in new_chunks if cid in existing_ids]
+
+        if to_add:
+            vectors = self.embed_texts([new_chunks[cid]['content'] for cid in to_add])
+            now = datetime.now(timezone.utc)
+            # New chunks have no topics, sentiment, entities or tags yet
+            self.qdrant.upsert(self.collection, [
+                {
+                    "id": point_id_for_chunk(cid),
+                    "vector": vector,
+                    "payload": qdrant_payload(cid, page_id, 'notion', page.get('title'), now,
+                                              new_chunks[cid]['section_type']),
+                }
+                for cid, vector in zip(to_add, vectors)
+            ])
+
+        self._write_chunks(page, new_chunks, to_add, kept, to_remove)
+        # Picks up the page title and any metadata written since the points were created
+        self.qdrant.set_payloads(self.collection, {
+            existing_ids[cid]: payload for cid, payload in fetch_qdrant_payloads(kept).items()
+        })
+        self.qdrant.delete_points(self.collection, [existing_ids[cid] for cid in to_remove])
+
+        if page['is_archived']:
+            database.execute_query(
+                "UPDATE notion_page SET ingest_status = 'ignored', updated_at = now() WHERE notion_page_id = %s",
+                (page_id,)
+            )
+        else:
+            self._mark_ingested(page_id, content_hash)
+        return {'added': len(to_add), 'kept': len(kept), 'removed': len(to_remove)}
+
+    def _write_chunks(self, page: Dict[str, Any], new_chunks: Dict[str, Dict[str, Any]],
+                      to_add: List[str], kept: List[str], to_remove: List[str]) -> None:
+        """Apply chunk inserts, index shifts and deletions in one transaction"""
+        page_id = page['notion_page_id']
+        with database.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    INSERT INTO source_documents (document_id, source_type, source_id, title, url)
+                    VALUES (%s, 'notion', %s, %s, %s)
+                    ON CONFLICT (document_id) DO UPDATE SET title = EXCLUDED.title, url = EXCLUDED.url
+                """, (page_id, page_id, page.get('title'), page.get('url')))
+
+                if to_remove:
+                    cur.execute(
+                        "DELETE FROM document_chunks WHERE chunk_id = ANY(%s)", (to_remove,)
+                    )
+                    cur.execute(
+                        "DELETE FROM chunk_metadata WHERE chunk_id = ANY(%s)", (to_remove,)
+                    )
+                if to_add:
+                    execute_values(cur, """
+                        INSERT INTO document_chunks (
+                            chunk_id, document_id, qdrant_point_id, chunk_index, content, embedding_model
+                        ) VALUES %s
+                        ON CONFLICT (chunk_id) DO NOTHING
+                    """, [
+                        (cid, page_id, point_id_for_chunk(cid), new_chunks[cid]['chunk_index'],
+                         new_chunks[cid]['content'], self.embedding_model)
+                        for cid in to_add
+                    ])
+                    execute_values(cur, """
+                        INSERT INTO chunk_metadata (chunk_id, source_type, source_id, root_document_id, section_type)
+                        VALUES %s
+                        ON CONFLICT (chunk_id) DO NOTHING
+                    """, [
+                        (cid, 'document', page_id, page_id, new_chunks[cid]['section_type'])
+                        for cid in to_add
+                    ], template="(%s, %s::source_type_enum, %s, %s, %s::section_type_enum)")
+                if kept:
+                    # Surviving chunks may have moved within the page
+                    execute_values(cur, """
+                        UPDATE document_chunks dc SET chunk_index = v.chunk_index
+                        FROM (VALUES %s) AS v(chunk_id, chunk_index)
+                        WHERE dc.chunk_id = v.chunk_id AND dc.chunk_index IS DISTINCT FROM v.chunk_index
+                    """, [(cid, new_chunks[cid]['chunk_index']) for cid in kept])
+
+    def _mark_ingested(self, page_id: str, content_hash: Optional[str]) -> None:
+        database.execute_query("""
+            UPDATE notion_page
+            SET ingest_status = 'ingested', content_hash = %s,
+                last_ingested_at = now(), updated_at = now()
+            WHERE notion_page_id = %s
+        """, (content_hash, page_id))
+
+    def _log(self, page: Dict[str, Any], status: str, error: Optional[str] = None,
+             metadata: Optional[Dict[str, Any]] = None) -> None:
+        database.execute_query("""
+            INSERT INTO ingestion_log (source, source_id, document_title, document_url, status, error_message, metadata)
+            VALUES ('notion', %s, %s, %s, %s, %s, %s)
+        """, (page['notion_page_id'], page.get('title'), page.get('url'), status, error,
+              json.dumps(metadata) if metadata else None))
+
+    # -- entry point --------------------------------------------------------
+
+    def run(self, discover: bool = True) -> Dict[str, int]:
+        """
+        Discover edited pages and sync every page flagged 'needs_update' or
+        'pending' through a bounded worker pool.
+
+        Returns:
+            Totals of pages, failures and chunk changes
+        """
+        if discover:
+            self.discover_changes()
+
+        pages = database.fetch_data("""
+            SELECT notion_page_id, title, url, content_hash, is_archived
+            FROM notion_page
+            WHERE ingest_status IN ('needs_update', 'pending')
+            ORDER BY last_edited_time
+        """)
+        totals = {'pages': len(pages), 'failed': 0, 'added': 0, 'kept': 0, 'removed': 0}
+        if not pages:
+            return totals
+
+        # Create the collection on first sync; later runs apply spec changes
+        ensure_collection(default_spec(self.collection), self.qdrant)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="notion-sync") as pool:
+            futures = {pool.submit(self.sync_page, page): page for page in pages}
+            for future in as_completed(futures):
+                page = futures[future]
+                try:
+                    counts = future.result()
+                    for key in ('added', 'kept', 'removed'):
+                        totals[key] += counts[key]
+                    self._log(page, 'ingested', metadata=counts)
+                except Exception as e:
+                    totals['failed'] += 1
+                    print(f"[NOTION SYNC] Failed {page['notion_page_id']}: {str(e)}")
+                    self._log(page, 'error', error=str(e))
+
+        print(f"[NOTION SYNC] Done: {totals}")
+        return totals
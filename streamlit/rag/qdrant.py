@@ -0,0 +1,141 @@
+"""
+Minimal Qdrant REST client used by the RAG modules
+"""
+import requests
+import sys
+import os
+from typing import List, Dict, Any, Optional
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+
+
+class QdrantClient:
+    """Thin wrapper around the Qdrant HTTP API with a pooled session"""
+
+    def __init__(self, url: Optional[str] = None, api_key: Optional[str] = None, timeout: int = 30):
+        self.url = (url or settings.QDRANT_URL).rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update({"Content-Type": "application/json"})
+        api_key = api_key if api_key is not None else settings.QDRANT_API_KEY
+        if api_key:
+            self.session.headers.update({"api-key": api_key})
+
+    def _request(self, method: str, path: str, payload: Optional[Dict[str, Any]] = None,
+                 params: Optional[Dict[str, Any]] = None) -> Any:
+        """Send a request and return the 'result' field of the response"""
+        try:
+            response = self.session.request(
+                method, f"{self.url}{path}", json=payload, params=params, timeout=self.timeout
+            )
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"Qdrant request failed: {str(e)}")
+
+        if response.status_code >= 400:
+            raise Exception(f"Qdrant error: Status {response.status_code} - {response.text[:200]}")
+        return response.json().get('result')
+
+    def collection_exists(self, collection: str) -> bool:
+        """Check whether a collection exists"""
+        return self._request("GET", f"/collections/{collection}/exists")['exists']
+
+    def get_collection(self, collection: str) -> Dict[str, Any]:
+        """Return collection info (config, status, point counts)"""
+        return self._request("GET", f"/collections/{collection}")
+
+    def create_collection(self, collection: str, config: Dict[str, Any]) -> None:
+        """Create a collection from a raw Qdrant collection config"""
+        self._request("PUT", f"/collections/{collection}", config)
+
+    def update_collection(self, collection: str, config: Dict[str, Any]) -> None:
+        """Change parameters of an existing collection (HNSW, quantization, on-disk flags)"""
+        self._request("PATCH", f"/collections/{collection}", config)
+
+    def delete_collection(self, collection: str) -> None:
+        """Drop a collection"""
+        self._request("DELETE", f"/collections/{collection}")
+
+    def create_payload_index(self, collection: str, field_name: str, field_schema: Any) -> None:
+        """Create a payload index so filters on field_name avoid full payload scans"""
+        self._request(
+            "PUT", f"/collections/{collection}/index",
+            {"field_name": field_name, "field_schema": field_schema}, params={"wait": "true"}
+        )
+
+    def count(self, collection: str, exact: bool = False) -> int:
+        """Number of points in a collection"""
+        return self._request("POST", f"/collections/{collection}/points/count", {"exact": exact})['count']
+
+    def metrics(self) -> str:
+        """Prometheus metrics of the Qdrant process (plain text)"""
+        try:
+            response = self.session.get(f"{self.url}/metrics", timeout=self.timeout)
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"Qdrant request failed: {str(e)}")
+        if response.status_code >= 400:
+            raise Exception(f"Qdrant error: Status {response.status_code} - {response.text[:200]}")
+        return response.text
+
+    def search(self, collection: str, vector: List[float], query_filter: Optional[Dict[str, Any]] = None,
+               limit: int = 10, with_payload: Any = False,
+               search_params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Nearest-neighbour search.
+
+        Args:
+            collection: Collection name
+            vector: Query vector
+            query_filter: Qdrant payload filter applied during the HNSW search
+            limit: Number of hits to return
+            with_payload: False, True or a list of payload keys to return
+            search_params: Optional HNSW/quantization search parameters
+
+        Returns:
+            List of hits with 'id', 'score' and optionally 'payload'
+        """
+        payload = {"vector": vector, "limit": limit, "with_payload": with_payload}
+        if query_filter:
+            payload["filter"] = query_filter
+        if search_params:
+            payload["params"] = search_params
+        return self._request("POST", f"/collections/{collection}/points/search", payload)
+
+    def upsert(self, collection: str, points: List[Dict[str, Any]], wait: bool = True) -> None:
+        """
+        Upsert points ({'id', 'vector', 'payload'}) in a single request.
+
+        With wait=True the call returns only once Qdrant has applied the
+        points, and raises if it did not. wait=False only confirms receipt.
+        """
+        result = self._request(
+            "PUT", f"/collections/{collection}/points",
+            {"points": points}, params={"wait": str(wait).lower()}
+        )
+        status = (result or {}).get('status')
+        if wait and status != 'completed':
+            raise Exception(f"Qdrant upsert into '{collection}' not completed (status: {status})")
+
+    def set_payloads(self, collection: str, payloads: Dict[str, Dict[str, Any]], wait: bool = True) -> None:
+        """Overwrite the payload of existing points ({point_id: payload}) in a single request"""
+        if not payloads:
+            return
+        self._request(
+            "POST", f"/collections/{collection}/points/batch",
+            {"operations": [
+                {"overwrite_payload": {"payload": payload, "points": [point_id]}}
+                for point_id, payload in payloads.items()
+            ]},
+            params={"wait": str(wait).lower()}
+        )
+
+    def delete_points(self, collection: str, point_ids: List[str], wait: bool = True) -> None:
+        """Delete points by id"""
+        if not point_ids:
+            return
+        self._request(
+            "POST", f"/collections/{collection}/points/delete",
+            {"points": list(point_ids)}, params={"wait": str(wait).lower()}
+        )
@@ -0,0 +1,202 @@
+"""
+Hybrid retrieval over the RAG schema.
+
+Vector search runs in Qdrant with metadata filters pushed into the payload
+filter, full-text search runs in PostgreSQL with the same filters, and the
+two rankings are merged with reciprocal rank fusion. Chunk content is
+hydrated from PostgreSQL in a single query, which also applies the
+predicates that have no payload mirror to the vector hits.
+"""
+import sys
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Callable
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from db import database
+from .collections import search_params
+from .filters import ChunkFilter
+from .qdrant import QdrantClient
+
+# Standard RRF damping constant (Cormack et al.)
+RRF_K = 60
+
+
+def build_chunk_filter(section_types: Optional[List[str]] = None,
+                       tags: Optional[List[str]] = None,
+                       date_from: Optional[datetime] = None,
+                       date_to: Optional[datetime] = None) -> ChunkFilter:
+    """
+    Build the metadata filter shared by the Qdrant and PostgreSQL sides.
+
+    Expects points to carry 'section_type', 'tags' and 'created_at' payload
+    fields mirrored from chunk_metadata / document_chunks.
+    """
+    chunk_filter = ChunkFilter()
+    if section_types:
+        chunk_filter.section_types(section_types)
+    if tags:
+        chunk_filter.tags(tags)
+    if date_from or date_to:
+        chunk_filter.created_between(date_from, date_to)
+    return chunk_filter
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = RRF_K) -> Dict[str, float]:
+    """
+    Fuse several ranked id lists into one score per id.
+
+    score(id) = sum over rankings of 1 / (k + rank), rank starting at 1.
+    """
+    scores = {}
+    for ranking in rankings:
+        for rank, item_id in enumerate(ranking, start=1):
+            scores[item_id] = scores.get(item_id, 0.0) + 1.0 / (k + rank)
+    return scores
+
+
+def full_text_search(query: str, chunk_filter: ChunkFilter, limit: int) -> List[str]:
+    """Rank chunk ids by PostgreSQL full-text relevance over the content_tsv column"""
+    where_sql, where_params = chunk_filter.to_sql()
+    text_query = f"""
+        SELECT dc.chunk_id,
+               ts_rank(dc.content_tsv, plainto_tsquery('english', %s)) as text_score
+        FROM document_chunks dc
+        LEFT JOIN chunk_metadata cm ON cm.chunk_id = dc.chunk_id
+        WHERE dc.content_tsv @@ plainto_tsquery('english', %s)
+            AND {where_sql}
+        ORDER BY text_score DESC
+        LIMIT %s
+    """
+    rows = database.fetch_data(text_query, (query, query) + where_params + (limit,))
+    return [row['chunk_id'] for row in rows]
+
+
+def hydrate_chunks(point_ids: List[str], chunk_ids: List[str],
+                   chunk_filter: Optional[ChunkFilter] = None) -> List[Dict[str, Any]]:
+    """
+    Load chunk content and metadata for Qdrant point ids and chunk ids in one query.
+
+    chunk_filter is re-applied to the point ids: the Qdrant payload only
+    mirrors part of it (see ChunkFilter.to_qdrant), so vector hits failing
+    a SQL-only predicate are not returned. chunk_ids are expected to come
+    from full_text_search with the same filter.
+    """
+    if not point_ids and not chunk_ids:
+        return []
+    where_sql, where_params = (chunk_filter or ChunkFilter()).to_sql()
+    hydrate_query = f"""
+        SELECT
+            dc.chunk_id,
+            dc.qdrant_point_id,
+            dc.document_id,
+            dc.chunk_index,
+            dc.content,
+            sd.title,
+            sd.url,
+            sd.source_type,
+            cm.section_type::text as section_type,
+            cm.sentiment::text as sentiment,
+            cm.topics,
+            cm.summary
+        FROM document_chunks dc
+        LEFT JOIN source_documents sd ON sd.document_id = dc.document_id
+        LEFT JOIN chunk_metadata cm ON cm.chunk_id = dc.chunk_id
+        WHERE (dc.qdrant_point_id = ANY(%s) AND {where_sql})
+            OR dc.chunk_id = ANY(%s)
+    """
+    return database.fetch_data(hydrate_query, (list(point_ids),) + where_params + (list(chunk_ids),))
+
+
+class HybridRetriever:
+    """Vector + full-text retrieval fused with reciprocal rank fusion"""
+
+    def __init__(self, embed_query: Callable[[str], List[float]],
+                 client: Optional[QdrantClient] = None,
+                 collection: Optional[str] = None,
+                 candidate_multiplier: int = 4):
+        """
+        Args:
+            embed_query: Function turning query text into a vector
+            client: Qdrant client (defaults to settings.QDRANT_URL)
+            collection: Qdrant collection (defaults to settings.RAG_COLLECTION)
+            candidate_multiplier: Candidates fetched per side relative to limit
+        """
+        self.embed_query = embed_query
+        self.client = client or QdrantClient()
+        self.collection = collection or settings.RAG_COLLECTION
+        self.candidate_multiplier = candidate_multiplier
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="hybrid-retrieval")
+
+    def vector_search(self, query_vector: List[float], qdrant_filter: Optional[Dict[str, Any]],
+                      limit: int) -> List[Dict[str, Any]]:
+        """Filtered nearest-neighbour search returning Qdrant hits"""
+        return self.client.search(
+            self.collection, query_vector, query_filter=qdrant_filter, limit=limit,
+            search_params=search_params()
+        )
+
+    def search(self, query: str, limit: int = 10,
+               section_types: Optional[List[str]] = None,
+               tags: Optional[List[str]] = None,
+               date_from: Optional[datetime] = None,
+               date_to: Optional[datetime] = None,
+               query_vector: Optional[List[float]] = None,
+               chunk_filter: Optional[ChunkFilter] = None) -> List[Dict[str, Any]]:
+        """
+        Run hybrid retrieval.
+
+        Args:
+            query: Natural-language query
+            limit: Number of fused results to return
+            section_types: Restrict to these section_type_enum values
+            tags: Restrict to chunks carrying any of these tag names
+            date_from: Earliest chunk created_at
+            date_to: Latest chunk created_at
+            query_vector: Precomputed query embedding (skips embed_query)
+            chunk_filter: Prebuilt filter; replaces the keyword filters above
+
+        Returns:
+            Chunks ordered by fused score, each with 'score', 'vector_rank'
+            and 'text_rank' (None when absent from that ranking)
+        """
+        candidates = limit * self.candidate_multiplier
+        if chunk_filter is None:
+            chunk_filter = build_chunk_filter(section_types, tags, date_from, date_to)
+        qdrant_filter = chunk_filter.to_qdrant()
+
+        if query_vector is None:
+            query_vector = self.embed_query(query)
+
+        # Qdrant and PostgreSQL are independent, so query them concurrently
+        vector_future = self._executor.submit(self.vector_search, query_vector, qdrant_filter, candidates)
+        text_future = self._executor.submit(full_text_search, query, chunk_filter, candidates)
+        vector_hits = vector_future.result()
+        text_ranking = text_future.result()
+
+        point_ids = [str(hit['id']) for hit in vector_hits]
+        rows = hydrate_chunks(point_ids, text_ranking, chunk_filter)
+        by_point = {row['qdrant_point_id']: row for row in rows}
+        by_chunk = {row['chunk_id']: row for row in rows}
+
+        # Points without a matching chunk row are stale or fail a SQL-only predicate, and are dropped here
+        vector_ranking = [by_point[pid]['chunk_id'] for pid in point_ids if pid in by_point]
+        scores = reciprocal_rank_fusion([vector_ranking, text_ranking])
+
+        vector_ranks = {cid: rank for rank, cid in enumerate(vector_ranking, start=1)}
+        text_ranks = {cid: rank for rank, cid in enumerate(text_ranking, start=1)}
+
+        results = []
+        for chunk_id in sorted(scores, key=scores.get, reverse=True)[:limit]:
+            if chunk_id not in by_chunk:
+                continue
+            result = dict(by_chunk[chunk_id])
+            result['score'] = scores[chunk_id]
+            result['vector_rank'] = vector_ranks.get(chunk_id)
+            result['text_rank'] = text_ranks.get(chunk_id)
+            results.append(result)
+        return results
@@ -0,0 +1,117 @@
+"""
+Shared test setup.
+
+The suite runs from the streamlit/ directory without PostgreSQL, Qdrant or
+the n8n webhook: tests that touch the database use the fake_db fixture,
+which replaces the db.database helpers with an in-memory recorder.
+"""
+import os
+import sys
+from contextlib import contextmanager
+from typing import Any, Callable, List, Optional, Tuple, Union
+
+import pytest
+
+# Import app modules the same way the app does (streamlit/ on sys.path)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import database
+
+Response = Union[List[Any], Callable[[Any], List[Any]]]
+
+
+class FakeCursor:
+    """Cursor that hands each statement to its FakeDatabase"""
+
+    def __init__(self, db: 'FakeDatabase'):
+        self.db = db
+        self._rows: List[Any] = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query: str, params: Any = None) -> None:
+        self._rows = self.db.run(query, params)
+
+    def copy_expert(self, sql: str, file) -> None:
+        self._rows = self.db.run(sql, file.read())
+
+    def fetchall(self) -> List[Any]:
+        return list(self._rows)
+
+    def fetchone(self) -> Optional[Any]:
+        return self._rows[0] if self._rows else None
+
+
+class FakeConnection:
+    def __init__(self, db: 'FakeDatabase'):
+        self.db = db
+
+    def cursor(self, *args, **kwargs) -> FakeCursor:
+        return FakeCursor(self.db)
+
+    def commit(self) -> None:
+        self.db.commits += 1
+
+    def rollback(self) -> None:
+        pass
+
+
+class FakeDatabase:
+    """
+    Records every statement as (query, params) and answers it from the
+    first registered response whose fragment occurs in the query.
+    """
+
+    def __init__(self):
+        self.statements: List[Tuple[str, Any]] = []
+        self.commits = 0
+        self._responses: List[Tuple[str, Response]] = []
+
+    def respond(self, fragment: str, response: Response) -> None:
+        """Answer queries containing fragment with rows, or with response(params)"""
+        self._responses.append((fragment, response))
+
+    def run(self, query: str, params: Any = None) -> List[Any]:
+        self.statements.append((query, params))
+        for fragment, response in self._responses:
+            if fragment in query:
+                return list(response(params) if callable(response) else response)
+        return []
+
+    def queries(self, fragment: str) -> List[Tuple[str, Any]]:
+        """Recorded statements containing fragment"""
+        return [(query, params) for query, params in self.statements if fragment in query]
+
+    # -- db.database replacements -------------------------------------------
+
+    @contextmanager
+    def get_connection(self, *args, **kwargs):
+        conn = FakeConnection(self)
+        yield conn
+        conn.commit()
+
+    def fetch_data(self, query: str, params: Optional[tuple] = None) -> List[Any]:
+        return self.run(query, params)
+
+    def fetch_one(self, query: str, params: Optional[tuple] = None) -> Optional[Any]:
+        rows = self.run(query, params)
+        return rows[0] if rows else None
+
+    def execute_query(self, query: str, params: Optional[tuple] = None) -> None:
+        self.run(query, params)
+
+    def execute_values(self, cur: FakeCursor, query: str, rows, template=None, page_size=100, **kwargs):
+        """Stand-in for psycopg2.extras.execute_values (rows recorded as one list)"""
+        cur.execute(query, list(rows))
+
+
+@pytest.fixture
+def fake_db(monkeypatch) -> FakeDatabase:
+    db = FakeDatabase()
+    for name in ('get_connection', 'fetch_data', 'fetch_one', 'execute_query'):
+        monkeypatch.setattr(database, name, getattr(db, name))
+    return db
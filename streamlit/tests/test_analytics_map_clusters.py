@@ -0,0 +1,108 @@
+"""Geohash grid used to cluster listings server-side"""
+import math
+import random
+
+import pytest
+
+from analytics.map_clusters import (
+    MAX_MAP_ZOOM, MAX_PRECISION, MIN_CELL_PX, MIN_MAP_ZOOM,
+    degrees_per_pixel, encode_geohash, fetch_clusters, fit_zoom, geohash_cell_size,
+    precision_for_zoom,
+)
+
+
+@pytest.mark.parametrize('lat, lon, expected', [
+    (57.64911, 10.40744, 'u4pruydqqvj'),
+    (42.6, -5.6, 'ezs42'),
+    (-25.382708, -49.265506, '6gkzwgjz'),
+    (0.0, 0.0, 's0000'),
+    (-90.0, -180.0, '00000'),
+])
+def test_encode_geohash_known_vectors(lat, lon, expected):
+    assert encode_geohash(lat, lon, len(expected)) == expected
+
+
+def test_longer_geohashes_extend_shorter_ones():
+    full = encode_geohash(39.1031, -84.5120, MAX_PRECISION)
+    for precision in range(1, MAX_PRECISION):
+        assert encode_geohash(39.1031, -84.5120, precision) == full[:precision]
+
+
+@pytest.mark.parametrize('precision, expected', [
+    (1, (45.0, 45.0)),
+    (2, (5.625, 11.25)),
+    (5, (180.0 / 2 ** 12, 360.0 / 2 ** 13)),
+])
+def test_geohash_cell_size(precision, expected):
+    assert geohash_cell_size(precision) == expected
+
+
+def _grid_cell_geohash(lat, lon, precision):
+    """The cell fetch_clusters() buckets a listing into, named as fetch_clusters() names it"""
+    cell_lat, cell_lon = geohash_cell_size(precision)
+    cell_x = math.floor((lon + 180) / cell_lon)
+    cell_y = math.floor((lat + 90) / cell_lat)
+    return encode_geohash((cell_y + 0.5) * cell_lat - 90, (cell_x + 0.5) * cell_lon - 180, precision)
+
+
+def _sample_points():
+    rng = random.Random(20251019)
+    points = [(rng.uniform(-89.9, 89.9), rng.uniform(-179.9, 179.9)) for _ in range(200)]
+    # Listings around Cincinnati, where neighbouring cells are close together
+    points += [(39.1 + rng.uniform(-0.2, 0.2), -84.5 + rng.uniform(-0.2, 0.2)) for _ in range(200)]
+    return points
+
+
+@pytest.mark.parametrize('precision', range(1, MAX_PRECISION + 1))
+def test_floor_grid_cells_are_geohash_cells(precision):
+    for lat, lon in _sample_points():
+        assert _grid_cell_geohash(lat, lon, precision) == encode_geohash(lat, lon, precision)
+
+
+@pytest.mark.parametrize('precision', range(1, MAX_PRECISION + 1))
+def test_points_on_cell_edges_fall_in_the_same_cell(precision):
+    cell_lat, cell_lon = geohash_cell_size(precision)
+    for lat, lon in [(39.1, -84.5), (-33.9, 151.2), (0.0, 0.0)]:
+        edge_lat = math.floor((lat + 90) / cell_lat) * cell_lat - 90
+        edge_lon = math.floor((lon + 180) / cell_lon) * cell_lon - 180
+        assert _grid_cell_geohash(edge_lat, edge_lon, precision) == encode_geohash(edge_lat, edge_lon, precision)
+
+
+def test_fetch_clusters_names_cells_by_geohash(fake_db):
+    zoom = 12
+    precision = precision_for_zoom(zoom)
+    cell_lat, cell_lon = geohash_cell_size(precision)
+    lat, lon = 39.1031, -84.5120
+    fake_db.respond("GROUP BY cell_x, cell_y", [{
+        'cell_x': math.floor((lon + 180) / cell_lon), 'cell_y': math.floor((lat + 90) / cell_lat),
+        'listing_count': 3, 'lat': lat, 'lon': lon, 'median_price': None, 'avg_price': 1200.0,
+    }])
+    filter_params = ('filters',)
+
+    cluster, = fetch_clusters(filter_params, lat, lon, zoom)
+
+    assert cluster['geohash'] == encode_geohash(lat, lon, precision)
+    assert cluster['median_price'] == 0.0
+    (_, params), = fake_db.statements
+    assert params[:3] == (cell_lon, cell_lat, 'filters')
+
+
+def test_precision_keeps_cells_at_least_min_cell_px_wide():
+    precisions = [precision_for_zoom(zoom) for zoom in range(0, 21)]
+    assert precisions == sorted(precisions)
+    assert 1 <= precisions[0] and precisions[-1] <= MAX_PRECISION
+    for zoom, precision in zip(range(0, 21), precisions):
+        if precision > 1:
+            assert geohash_cell_size(precision)[1] / degrees_per_pixel(zoom) >= MIN_CELL_PX
+
+
+@pytest.mark.parametrize('span, expected', [(1e-6, MAX_MAP_ZOOM), (300.0, MIN_MAP_ZOOM)])
+def test_fit_zoom_stays_within_slider_range(span, expected):
+    extent = {'center_lat': 39.1, 'min_lat': 39.1 - span / 4, 'max_lat': 39.1 + span / 4,
+              'min_lon': -84.5 - span / 2, 'max_lon': -84.5 + span / 2}
+    assert fit_zoom(extent) == expected
+
+
+def test_fit_zoom_for_a_metro_area():
+    extent = {'center_lat': 39.1, 'min_lat': 38.9, 'max_lat': 39.3, 'min_lon': -84.8, 'max_lon': -84.2}
+    assert MIN_MAP_ZOOM < fit_zoom(extent) < MAX_MAP_ZOOM
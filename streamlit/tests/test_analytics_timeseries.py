@@ -0,0 +1,171 @@
+"""Rolling-window trend analytics and their per-version cache"""
+from datetime import date
+
+import numpy as np
+import pytest
+
+from analytics import timeseries
+from analytics.timeseries import (
+    build_matrix, get_zip_trends, pct_change, rolling_mean, rolling_std, zscore, _period_index,
+)
+
+nan = np.nan
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    timeseries.clear_cache()
+    yield
+    timeseries.clear_cache()
+
+
+# -- rolling windows over gaps ------------------------------------------------
+
+def test_rolling_mean_skips_gaps():
+    values = np.array([1.0, nan, 3.0, nan, nan, 6.0])
+    np.testing.assert_allclose(rolling_mean(values, 3), [1, 1, 2, 3, 3, 6])
+    np.testing.assert_allclose(rolling_mean(values, 3, min_periods=2), [nan, nan, 2, nan, nan, nan])
+
+
+def test_rolling_mean_of_an_empty_window_is_nan():
+    np.testing.assert_allclose(rolling_mean(np.array([nan, nan, 4.0]), 2), [nan, nan, 4])
+
+
+def test_rolling_mean_works_row_by_row():
+    values = np.array([[1.0, 2.0, 3.0], [nan, 10.0, 20.0]])
+    np.testing.assert_allclose(rolling_mean(values, 2), [[1, 1.5, 2.5], [nan, 10, 15]])
+
+
+def test_rolling_std_matches_nanstd_over_each_window():
+    values = np.array([2.0, 4.0, nan, 8.0, 5.0, nan, nan, 1.0])
+    window = 3
+    expected = []
+    for end in range(1, len(values) + 1):
+        chunk = values[max(0, end - window):end]
+        expected.append(np.nanstd(chunk) if np.count_nonzero(~np.isnan(chunk)) >= 2 else nan)
+    np.testing.assert_allclose(rolling_std(values, window), expected, atol=1e-12)
+
+
+def test_pct_change_is_nan_across_gaps_and_zero_bases():
+    values = np.array([100.0, 110.0, nan, 121.0, 0.0, 5.0])
+    np.testing.assert_allclose(pct_change(values), [nan, 10, nan, nan, -100, nan])
+    np.testing.assert_allclose(pct_change(values, 3), [nan, nan, nan, 21, -100, nan])
+
+
+def test_zscore_compares_against_the_preceding_window_only():
+    values = np.array([10.0, 12.0, 10.0, 12.0, 30.0])
+    z = zscore(values, 4)
+    assert np.isnan(z[:2]).all()
+    assert z[4] == pytest.approx((30 - 11) / 1)
+
+
+# -- granularity resampling ---------------------------------------------------
+
+@pytest.mark.parametrize('granularity, dates, expected_index, expected_slots', [
+    ('daily', ['2025-03-01', '2025-03-04'],
+     ['2025-03-01', '2025-03-02', '2025-03-03', '2025-03-04'], [0, 3]),
+    ('weekly', ['2025-01-06', '2025-01-13', '2025-01-27'],
+     ['2025-01-06', '2025-01-13', '2025-01-20', '2025-01-27'], [0, 1, 3]),
+    ('monthly', ['2025-01-01', '2025-04-01'],
+     ['2025-01-01', '2025-02-01', '2025-03-01', '2025-04-01'], [0, 3]),
+    ('quarterly', ['2024-10-01', '2025-04-01'],
+     ['2024-10-01', '2025-01-01', '2025-04-01'], [0, 2]),
+])
+def test_period_index_fills_gaps_at_each_granularity(granularity, dates, expected_index, expected_slots):
+    index, slots = _period_index(np.array(dates, dtype='datetime64[D]'), granularity)
+    assert list(index.astype('datetime64[D]').astype(str)) == expected_index
+    assert list(slots) == expected_slots
+
+
+def _row(zip_code, period, median_rent, total_listings=10.0):
+    return {'zip_code': zip_code, 'period_start_date': period, 'median_rent': median_rent,
+            'avg_rent': median_rent, 'avg_dom': 20.0, 'total_listings': total_listings,
+            'new_listings': 1.0}
+
+
+def test_build_matrix_puts_zips_on_a_shared_index():
+    rows = [
+        _row('45223', date(2025, 1, 1), 1000.0),
+        _row('45223', date(2025, 3, 1), 1100.0),
+        _row('45202', date(2025, 2, 1), None),
+    ]
+    matrix = build_matrix(rows, ['45202', '45223'], 'monthly')
+    assert list(matrix['dates'].astype(str)) == ['2025-01-01', '2025-02-01', '2025-03-01']
+    np.testing.assert_allclose(matrix['median_rent'], [[nan, nan, nan], [1000, nan, 1100]])
+    np.testing.assert_allclose(matrix['total_listings'], [[nan, 10, nan], [10, nan, 10]])
+
+
+# -- cached entry point -------------------------------------------------------
+
+class FakeMetrics:
+    """zillow_metrics_aggregated behind fake_db: a version stamp and rows per ZIP"""
+
+    def __init__(self, fake_db, rows):
+        self.rows = rows
+        self.versions = {zip_code: 'v1' for zip_code in {row['zip_code'] for row in rows}}
+        self.loads = []
+        fake_db.respond("MAX(updated_at)", self.version_rows)
+        fake_db.respond("GROUP BY zip_code, period_start_date", self.metric_rows)
+
+    def version_rows(self, params):
+        zip_codes, _ = params
+        return [{'zip_code': z, 'last_updated': self.versions[z], 'row_count': 1}
+                for z in zip_codes if z in self.versions]
+
+    def metric_rows(self, params):
+        zip_codes = params[0]
+        self.loads.append(sorted(zip_codes))
+        return [row for row in self.rows if row['zip_code'] in zip_codes]
+
+
+@pytest.fixture
+def metrics(fake_db):
+    return FakeMetrics(fake_db, [
+        _row('45223', date(2025, 1, 6), 1000.0),
+        _row('45223', date(2025, 1, 13), 1050.0),
+        _row('45223', date(2025, 1, 27), 1100.0),
+        _row('45202', date(2025, 1, 13), 1500.0),
+        _row('45202', date(2025, 1, 20), 1550.0),
+    ])
+
+
+def test_trends_are_trimmed_to_each_zips_span(metrics):
+    trends = get_zip_trends(['45223', '45202'], 'weekly')
+    assert list(trends['45223']['dates'].astype(str)) == [
+        '2025-01-06', '2025-01-13', '2025-01-20', '2025-01-27']
+    np.testing.assert_allclose(trends['45223']['median_rent'], [1000, 1050, nan, 1100])
+    assert list(trends['45202']['dates'].astype(str)) == ['2025-01-13', '2025-01-20']
+    np.testing.assert_allclose(trends['45202']['median_rent_rolling'], [1500, 1525])
+
+
+def test_unchanged_versions_are_served_from_cache(metrics):
+    first = get_zip_trends(['45223', '45202'], 'weekly')
+    second = get_zip_trends(['45223', '45202'], 'weekly')
+    assert metrics.loads == [['45202', '45223']]
+    assert second['45223'] is first['45223']
+
+
+def test_version_bump_reloads_only_that_zip(metrics):
+    first = get_zip_trends(['45223', '45202'], 'weekly')
+    metrics.versions['45223'] = 'v2'
+    metrics.rows.append(_row('45223', date(2025, 2, 3), 1200.0))
+
+    second = get_zip_trends(['45223', '45202'], 'weekly')
+
+    assert metrics.loads == [['45202', '45223'], ['45223']]
+    assert second['45202'] is first['45202']
+    assert str(second['45223']['dates'][-1]) == '2025-02-03'
+
+
+def test_cache_is_keyed_by_granularity_and_unit_buckets(metrics):
+    get_zip_trends(['45223'], 'weekly')
+    get_zip_trends(['45223'], 'weekly', unit_buckets=['2br', '1br'])
+    get_zip_trends(['45223'], 'weekly', unit_buckets=['1br', '2br'])
+    get_zip_trends(['45223'], 'daily')
+    assert metrics.loads == [['45223'], ['45223'], ['45223']]
+
+
+def test_unknown_granularity_is_rejected(fake_db):
+    with pytest.raises(ValueError, match="Unsupported granularity: hourly"):
+        get_zip_trends(['45223'], 'hourly')
+    assert fake_db.statements == []
@@ -0,0 +1,188 @@
+"""Background chat turns: per-session ordering and answer placement"""
+import threading
+import time
+from collections import Counter
+from types import SimpleNamespace
+
+import pytest
+
+from chat import chat_interface, turns
+from chat.turns import CANCELLED, DONE, QUEUED, RUNNING
+
+
+class FakeWebhook:
+    """
+    Turn handler standing in for the n8n webhook. Prompts look like 'a1':
+    the letter names the session, and prompts listed in hold wait until
+    release() is called.
+    """
+
+    def __init__(self, hold=()):
+        self.hold = set(hold)
+        self.gate = threading.Event()
+        self.calls = []
+        self.histories = {}
+        self._lock = threading.Lock()
+        self._running = Counter()
+        self.max_running = Counter()
+
+    def release(self):
+        self.gate.set()
+
+    def __call__(self, prompt, history):
+        session = prompt[0]
+        with self._lock:
+            self.calls.append(prompt)
+            self.histories[prompt] = [(m['role'], m['content']) for m in history]
+            self._running[session] += 1
+            self.max_running[session] = max(self.max_running[session], self._running[session])
+        if prompt in self.hold:
+            assert self.gate.wait(5), "test never released the webhook"
+        with self._lock:
+            self._running[session] -= 1
+        if prompt == 'boom':
+            raise RuntimeError("webhook returned 502")
+        return f"answer to {prompt}"
+
+
+class SessionState(dict):
+    """Dict with attribute access, like st.session_state"""
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        self[name] = value
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out waiting for chat turns"
+        time.sleep(0.005)
+
+
+def is_done(job_id):
+    turn = turns.get_turn(job_id)
+    return turn is not None and turn.done
+
+
+@pytest.fixture(autouse=True)
+def no_turns():
+    yield
+    with turns._lock:
+        turns._turns.clear()
+
+
+def _user(content):
+    return {'role': 'user', 'content': content}
+
+
+def test_turns_of_one_session_run_one_at_a_time_in_order():
+    webhook = FakeWebhook(hold={'a1'})
+    a1 = turns.submit_turn('A', webhook, 'a1', [_user('a1')])
+    a2 = turns.submit_turn('A', webhook, 'a2', [_user('a1'), _user('a2')])
+    a3 = turns.submit_turn('A', webhook, 'a3', [_user('a1'), _user('a2'), _user('a3')])
+    b1 = turns.submit_turn('B', webhook, 'b1', [_user('b1')])
+
+    # Session B is not held up by session A's slow turn
+    wait_until(lambda: is_done(b1))
+    wait_until(lambda: turns.get_turn(a1).status == RUNNING)
+    assert turns.get_turn(a2).status == QUEUED and turns.get_turn(a3).status == QUEUED
+    assert (turns.queue_position(a2), turns.queue_position(a3)) == (1, 2)
+
+    webhook.release()
+    wait_until(lambda: all(is_done(job_id) for job_id in (a1, a2, a3)))
+
+    assert [call for call in webhook.calls if call[0] == 'a'] == ['a1', 'a2', 'a3']
+    assert webhook.max_running['a'] == 1
+    assert [turns.get_turn(job_id).response for job_id in (a1, a2, a3)] == [
+        'answer to a1', 'answer to a2', 'answer to a3']
+
+
+def test_queued_turns_see_earlier_answers_after_their_questions():
+    webhook = FakeWebhook(hold={'a1'})
+    turns.submit_turn('A', webhook, 'a1', [_user('a1')])
+    a2 = turns.submit_turn('A', webhook, 'a2', [_user('a1'), _user('a2')])
+    a3 = turns.submit_turn('A', webhook, 'a3', [_user('a1'), _user('a2'), _user('a3')])
+    webhook.release()
+    wait_until(lambda: is_done(a2) and is_done(a3))
+
+    assert webhook.histories['a2'] == [
+        ('user', 'a1'), ('assistant', 'answer to a1'), ('user', 'a2')]
+    assert webhook.histories['a3'] == [
+        ('user', 'a1'), ('assistant', 'answer to a1'),
+        ('user', 'a2'), ('assistant', 'answer to a2'), ('user', 'a3')]
+
+
+def test_cancelled_turns_never_reach_the_webhook():
+    webhook = FakeWebhook(hold={'a1'})
+    a1 = turns.submit_turn('A', webhook, 'a1', [])
+    a2 = turns.submit_turn('A', webhook, 'a2', [])
+    a3 = turns.submit_turn('A', webhook, 'a3', [])
+    wait_until(lambda: turns.get_turn(a1).status == RUNNING)
+    queued = turns.get_turn(a2)
+
+    turns.cancel_turns([a2])
+    webhook.release()
+    wait_until(lambda: is_done(a3))
+
+    assert queued.status == CANCELLED
+    assert turns.get_turn(a2) is None
+    assert webhook.calls == ['a1', 'a3']
+
+
+def test_failed_webhook_call_becomes_the_answer():
+    job_id = turns.submit_turn('A', FakeWebhook(), 'boom', [])
+    wait_until(lambda: is_done(job_id))
+    turn = turns.pop_turn(job_id)
+    assert turn.status == DONE
+    assert turn.response == "💥 Unexpected error: webhook returned 502"
+    assert turn.latency_ms is not None
+    assert turns.get_turn(job_id) is None
+
+
+@pytest.fixture
+def chat(monkeypatch):
+    """ChatInterface on a fake st.session_state, with the event sink stubbed out"""
+    monkeypatch.setattr(chat_interface, 'st', SimpleNamespace(session_state=SessionState()))
+    monkeypatch.setattr(chat_interface, 'emit_event', lambda *args, **kwargs: True)
+    return chat_interface.ChatInterface('controller')
+
+
+def _transcript(chat):
+    return [(m['role'], m['content']) for m in chat_interface.st.session_state[chat.messages_key]]
+
+
+def test_collect_answers_inserts_each_answer_after_its_question(chat):
+    webhook = FakeWebhook(hold={'a2'})
+    first = chat.submit_message('a1', webhook)
+    second = chat.submit_message('a2', webhook)
+    wait_until(lambda: is_done(first) and turns.get_turn(second).status == RUNNING)
+
+    # Only the first answer is ready; the second question stays last
+    assert chat.collect_answers() == 1
+    chat.add_message('user', 'a3')
+    assert _transcript(chat) == [
+        ('user', 'a1'), ('assistant', 'answer to a1'), ('user', 'a2'), ('user', 'a3')]
+
+    webhook.release()
+    wait_until(lambda: is_done(second))
+    assert chat.collect_answers() == 1
+    assert _transcript(chat) == [
+        ('user', 'a1'), ('assistant', 'answer to a1'),
+        ('user', 'a2'), ('assistant', 'answer to a2'), ('user', 'a3')]
+    assert chat_interface.st.session_state[chat.pending_key] == []
+
+
+def test_collect_answers_leaves_unfinished_turns_pending(chat):
+    webhook = FakeWebhook(hold={'a1'})
+    job_id = chat.submit_message('a1', webhook)
+    assert chat.collect_answers() == 0
+    assert chat_interface.st.session_state[chat.pending_key] == [job_id]
+    webhook.release()
+    wait_until(lambda: is_done(job_id))
+    assert chat.collect_answers() == 1
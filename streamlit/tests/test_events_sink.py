@@ -0,0 +1,126 @@
+"""Write-behind event sink: backpressure, batching and shutdown flush"""
+import csv
+import io
+import json
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from config import settings
+from events import sink
+from events.sink import COPY_MIN_ROWS, EventSink, emit_event, write_events
+
+
+@pytest.fixture
+def event_db(fake_db, monkeypatch):
+    monkeypatch.setattr(sink, 'execute_values', fake_db.execute_values)
+    monkeypatch.setattr(sink, 'WRITE_RETRY_DELAY', 0)
+    return fake_db
+
+
+def _batches(db):
+    """Rows of each INSERT batch written so far"""
+    return [params for _, params in db.queries("INSERT INTO app_events")]
+
+
+def _row(i):
+    return (f'event_{i}', 'alice', 's1', '{}', datetime(2025, 10, 1, tzinfo=timezone.utc))
+
+
+def test_full_queue_drops_without_blocking():
+    events = EventSink(max_queue=2, block_timeout_ms=0)
+    assert events.emit('a') and events.emit('b')
+    assert events.emit('c') is False
+    assert events.stats['emitted'] == 2 and events.stats['dropped'] == 1
+    assert events.queue_depth() == 2
+
+
+def test_full_queue_blocks_for_block_timeout_then_drops():
+    events = EventSink(max_queue=1, block_timeout_ms=50)
+    events.emit('a')
+    started = time.monotonic()
+    assert events.emit('b') is False
+    assert time.monotonic() - started >= 0.04
+    assert events.stats['dropped'] == 1
+
+
+def test_emit_serializes_the_payload():
+    events = EventSink(max_queue=1)
+    events.emit('chat_message', {'role': 'user', 'at': datetime(2025, 1, 1)}, username='alice', session_id='s1')
+    event_type, username, session_id, payload, created_at = events._queue.get_nowait()
+    assert (event_type, username, session_id) == ('chat_message', 'alice', 's1')
+    assert json.loads(payload) == {'role': 'user', 'at': '2025-01-01 00:00:00'}
+    assert created_at.tzinfo is timezone.utc
+
+
+def test_queued_events_are_written_in_batches_of_batch_size(event_db):
+    events = EventSink(batch_size=3, flush_interval_ms=5000)
+    for i in range(7):
+        events.emit(f'event_{i}')
+
+    events.start()
+    assert events.flush(timeout=5)
+
+    batches = _batches(event_db)
+    assert [len(batch) for batch in batches] == [3, 3, 1]
+    assert [row[0] for batch in batches for row in batch] == [f'event_{i}' for i in range(7)]
+    assert events.stats['written'] == 7 and events.stats['batches'] == 3
+    events.close(timeout=5)
+
+
+def test_close_flushes_a_partial_batch_without_waiting_for_the_interval(event_db):
+    events = EventSink(batch_size=100, flush_interval_ms=10000).start()
+    for i in range(5):
+        events.emit(f'event_{i}')
+
+    started = time.monotonic()
+    events.close(timeout=5)
+
+    assert time.monotonic() - started < 5
+    assert [len(batch) for batch in _batches(event_db)] == [5]
+    assert not events._thread.is_alive()
+
+
+def test_failed_writes_are_retried_then_counted(event_db, monkeypatch):
+    attempts = []
+
+    def failing_write(rows):
+        attempts.append(len(rows))
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(sink, 'write_events', failing_write)
+    events = EventSink(batch_size=10, flush_interval_ms=10).start()
+    events.emit('a')
+    events.emit('b')
+    events.close(timeout=5)
+
+    assert attempts == [2] * sink.WRITE_RETRIES
+    assert events.stats['failed'] == 2 and events.stats['written'] == 0
+
+
+def test_small_batches_use_execute_values(event_db):
+    rows = [_row(i) for i in range(COPY_MIN_ROWS - 1)]
+    write_events(rows)
+    assert _batches(event_db) == [rows]
+    assert event_db.queries("COPY app_events") == []
+
+
+def test_batches_from_copy_min_rows_use_copy(event_db):
+    rows = [_row(i) for i in range(COPY_MIN_ROWS)]
+    write_events(rows)
+
+    (query, data), = event_db.queries("COPY app_events")
+    assert "(event_type, username, session_id, payload, created_at)" in query
+    assert "FORMAT csv" in query
+    copied = list(csv.reader(io.StringIO(data)))
+    assert len(copied) == COPY_MIN_ROWS
+    assert copied[0][:4] == ['event_0', 'alice', 's1', '{}']
+    assert _batches(event_db) == []
+
+
+def test_emit_event_is_a_no_op_when_disabled(monkeypatch):
+    monkeypatch.setattr(settings, 'EVENT_SINK_ENABLED', False)
+    monkeypatch.setattr(sink, '_default_sink', None)
+    assert emit_event('page_view') is False
+    assert sink._default_sink is None
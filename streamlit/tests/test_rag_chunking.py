@@ -0,0 +1,88 @@
+"""chunk_documents(): bounded fan-out over the worker pool"""
+from concurrent.futures import Future
+
+import pytest
+
+from rag import chunking
+from rag.chunking import IN_FLIGHT_PER_WORKER, chunk_documents
+
+
+class FakePool:
+    """ProcessPoolExecutor stand-in that runs each task on submit and counts tasks in flight"""
+
+    instances = []
+
+    def __init__(self, max_workers, initializer=None, initargs=()):
+        self.max_workers = max_workers
+        self.initargs = initargs
+        self.submitted = 0
+        self.collected = 0
+        self.max_in_flight = 0
+        FakePool.instances.append(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def submit(self, fn, *args):
+        self.submitted += 1
+        self.max_in_flight = max(self.max_in_flight, self.submitted - self.collected)
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    FakePool.instances.clear()
+    monkeypatch.setattr(chunking, 'ProcessPoolExecutor', FakePool)
+    monkeypatch.setattr(chunking, '_chunk_document', lambda document: [document[0]])
+    return FakePool
+
+
+@pytest.mark.parametrize('workers', [2, 3])
+def test_documents_in_flight_stay_within_the_bound(pool, workers):
+    bound = workers * IN_FLIGHT_PER_WORKER
+    consumed = []
+
+    def documents():
+        for i in range(100):
+            consumed.append(i)
+            yield f'doc-{i}', 'text'
+
+    results = []
+    for chunks in chunk_documents(documents(), max_tokens=64, overlap_tokens=8,
+                                  workers=workers, encoding_name='cl100k_base'):
+        fake_pool, = pool.instances
+        # Everything read so far is yielded, in flight, or the one document
+        # waiting for a free slot
+        assert len(consumed) <= len(results) + bound + 1
+        fake_pool.collected += 1
+        results.append(chunks)
+
+    fake_pool, = pool.instances
+    assert fake_pool.max_in_flight == bound
+    assert fake_pool.max_workers == workers
+    assert fake_pool.initargs == (64, 8, 'cl100k_base')
+    assert results == [[f'doc-{i}'] for i in range(100)]
+
+
+def test_input_shorter_than_the_bound_is_drained_in_order(pool):
+    documents = [(f'doc-{i}', 'text') for i in range(3)]
+    assert list(chunk_documents(documents, workers=4)) == [['doc-0'], ['doc-1'], ['doc-2']]
+    assert pool.instances[0].submitted == 3
+
+
+def test_documents_are_read_lazily(pool):
+    consumed = []
+
+    def documents():
+        for i in range(1000):
+            consumed.append(i)
+            yield f'doc-{i}', 'text'
+
+    first = next(chunk_documents(documents(), workers=2))
+    assert first == ['doc-0']
+    assert len(consumed) == 2 * IN_FLIGHT_PER_WORKER + 1
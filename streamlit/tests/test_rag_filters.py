@@ -0,0 +1,182 @@
+"""ChunkFilter SQL and Qdrant filters, and the point payload the Qdrant side matches"""
+from datetime import datetime
+
+import pytest
+
+from rag.filters import ChunkFilter, fetch_qdrant_payloads, qdrant_payload
+
+
+def test_empty_filter_matches_everything():
+    chunk_filter = ChunkFilter()
+    assert chunk_filter.is_empty()
+    assert chunk_filter.to_sql() == ("TRUE", ())
+    assert chunk_filter.to_qdrant() is None
+
+
+def test_mirrored_predicates_appear_in_both_filters():
+    created_from = datetime(2025, 1, 1)
+    created_to = datetime(2025, 6, 30, 23, 59)
+    chunk_filter = (ChunkFilter()
+                    .section_types(['rent_roll', 'financials'])
+                    .sentiments(['urgent'])
+                    .topics_any(['vacancy', 'turnover'])
+                    .entity('tenants', 'Jane Doe')
+                    .tags(['q2'])
+                    .created_between(created_from, created_to))
+
+    where_sql, params = chunk_filter.to_sql()
+    assert "cm.section_type = ANY(%s::section_type_enum[])" in where_sql
+    assert "cm.sentiment = ANY(%s::sentiment_enum[])" in where_sql
+    assert "cm.topics && %s::text[]" in where_sql
+    assert "cm.entities @> %s::jsonb" in where_sql
+    assert "dc.created_at >= %s" in where_sql and "dc.created_at <= %s" in where_sql
+    assert params == (
+        ['rent_roll', 'financials'], ['urgent'], ['vacancy', 'turnover'],
+        '{"tenants": ["Jane Doe"]}', ['q2'], created_from, created_to,
+    )
+
+    assert chunk_filter.to_qdrant() == {"must": [
+        {"key": "section_type", "match": {"any": ['rent_roll', 'financials']}},
+        {"key": "sentiment", "match": {"any": ['urgent']}},
+        {"key": "topics", "match": {"any": ['vacancy', 'turnover']}},
+        {"key": "entities.tenants", "match": {"value": 'Jane Doe'}},
+        {"key": "tags", "match": {"any": ['q2']}},
+        {"key": "created_at", "range": {"gte": created_from.isoformat(), "lte": created_to.isoformat()}},
+    ]}
+
+
+def test_topics_all_needs_one_payload_match_per_topic():
+    chunk_filter = ChunkFilter().topics_all(['hvac', 'roof'])
+    assert chunk_filter.to_sql() == ("cm.topics @> %s::text[]", (['hvac', 'roof'],))
+    assert chunk_filter.to_qdrant() == {"must": [
+        {"key": "topics", "match": {"value": 'hvac'}},
+        {"key": "topics", "match": {"value": 'roof'}},
+    ]}
+
+
+def test_created_between_with_one_bound():
+    created_from = datetime(2025, 3, 1)
+    chunk_filter = ChunkFilter().created_between(date_from=created_from)
+    assert chunk_filter.to_sql() == ("dc.created_at >= %s", (created_from,))
+    assert chunk_filter.to_qdrant() == {"must": [
+        {"key": "created_at", "range": {"gte": created_from.isoformat()}},
+    ]}
+    assert ChunkFilter().created_between().is_empty()
+
+
+@pytest.mark.parametrize('build', [
+    lambda f: f.future_topics_any(['expansion']),
+    lambda f: f.custom_tag('priority'),
+    lambda f: f.action_item({'owner': 'ops'}),
+    lambda f: f.content_matches('late rent'),
+    lambda f: f.summary_matches('roof leak'),
+], ids=['future_topics_any', 'custom_tag', 'action_item', 'content_matches', 'summary_matches'])
+def test_sql_only_predicates_are_not_mirrored(build):
+    chunk_filter = build(ChunkFilter())
+    where_sql, params = chunk_filter.to_sql()
+    assert where_sql != "TRUE" and len(params) == 1
+    assert chunk_filter.to_qdrant() is None
+
+
+def test_sql_only_predicates_leave_mirrored_ones_in_qdrant_filter():
+    chunk_filter = ChunkFilter().content_matches('late rent').section_types(['operations'])
+    where_sql, params = chunk_filter.to_sql()
+    assert where_sql.startswith("dc.content_tsv @@ websearch_to_tsquery('english', %s) AND ")
+    assert params == ('late rent', ['operations'])
+    assert chunk_filter.to_qdrant() == {"must": [
+        {"key": "section_type", "match": {"any": ['operations']}},
+    ]}
+
+
+def test_json_predicates_serialize_their_value():
+    chunk_filter = ChunkFilter().custom_tag({'name': 'audit'}).action_item('call plumber')
+    assert chunk_filter.to_sql()[1] == ('[{"name": "audit"}]', '["call plumber"]')
+
+
+@pytest.mark.parametrize('method, values, message', [
+    ('section_types', ['rent_roll', 'lease_terms'], "Unknown section_type value(s): lease_terms"),
+    ('sentiments', ['angry', 'bored'], "Unknown sentiment value(s): angry, bored"),
+])
+def test_unknown_enum_values_are_rejected(method, values, message):
+    chunk_filter = ChunkFilter()
+    with pytest.raises(ValueError) as excinfo:
+        getattr(chunk_filter, method)(values)
+    assert str(excinfo.value) == message
+    assert chunk_filter.is_empty()
+    assert chunk_filter.to_qdrant() is None
+
+
+def _matches(payload, condition):
+    """Evaluate one Qdrant 'must' condition against a point payload"""
+    value = payload
+    for part in condition['key'].split('.'):
+        value = (value or {}).get(part)
+    values = value if isinstance(value, list) else [value]
+    if 'range' in condition:
+        bounds = condition['range']
+        return value is not None and bounds.get('gte', value) <= value <= bounds.get('lte', value)
+    match = condition['match']
+    if 'any' in match:
+        return any(v in match['any'] for v in values)
+    return match['value'] in values
+
+
+def test_qdrant_payload_mirrors_filtered_fields():
+    created_at = datetime(2025, 4, 2, 9, 30)
+    payload = qdrant_payload('c1', 'd1', 'notion', 'Q2 ops review', created_at,
+                             section_type='rent_roll', sentiment='urgent', topics=('vacancy',),
+                             entities={'tenants': ['Jane Doe']}, tags=['q2'])
+    assert payload == {
+        "chunk_id": 'c1', "document_id": 'd1', "source_type": 'notion', "title": 'Q2 ops review',
+        "created_at": '2025-04-02T09:30:00', "section_type": 'rent_roll', "sentiment": 'urgent',
+        "topics": ['vacancy'], "entities": {'tenants': ['Jane Doe']}, "tags": ['q2'],
+    }
+
+    matching = (ChunkFilter()
+                .section_types(['rent_roll'])
+                .sentiments(['urgent', 'concerned'])
+                .topics_all(['vacancy'])
+                .entity('tenants', 'Jane Doe')
+                .tags(['q1', 'q2'])
+                .created_between(datetime(2025, 4, 1), datetime(2025, 4, 30)))
+    assert all(_matches(payload, condition) for condition in matching.to_qdrant()['must'])
+
+    for other in (ChunkFilter().section_types(['financials']),
+                  ChunkFilter().entity('tenants', 'John Roe'),
+                  ChunkFilter().tags(['q3']),
+                  ChunkFilter().created_between(date_from=datetime(2025, 5, 1))):
+        assert not all(_matches(payload, condition) for condition in other.to_qdrant()['must'])
+
+
+def test_qdrant_payload_defaults_for_missing_metadata():
+    payload = qdrant_payload('c1', 'd1', 'notion', None, None)
+    assert payload['created_at'] is None
+    assert payload['section_type'] is None and payload['sentiment'] is None
+    assert payload['topics'] == [] and payload['entities'] == {} and payload['tags'] == []
+
+
+def test_fetch_qdrant_payloads_without_ids_skips_the_query(fake_db):
+    assert fetch_qdrant_payloads([]) == {}
+    assert fake_db.statements == []
+
+
+def test_fetch_qdrant_payloads_keys_rows_by_chunk(fake_db):
+    created_at = datetime(2025, 4, 2)
+    fake_db.respond("FROM document_chunks dc", [
+        {'chunk_id': 'c1', 'document_id': 'd1', 'source_type': 'notion', 'title': 'Ops',
+         'created_at': created_at, 'section_type': 'operations', 'sentiment': None,
+         'topics': ['hvac'], 'entities': None, 'tags': ['q2']},
+        {'chunk_id': 'c2', 'document_id': 'd1', 'source_type': 'notion', 'title': 'Ops',
+         'created_at': created_at, 'section_type': None, 'sentiment': None,
+         'topics': None, 'entities': {'vendors': ['Acme']}, 'tags': []},
+    ])
+
+    payloads = fetch_qdrant_payloads(iter(['c1', 'c2']))
+
+    (query, params), = fake_db.statements
+    assert "WHERE dc.chunk_id = ANY(%s)" in query
+    assert params == (['c1', 'c2'],)
+    assert set(payloads) == {'c1', 'c2'}
+    assert payloads['c1']['topics'] == ['hvac'] and payloads['c1']['entities'] == {}
+    assert payloads['c2']['topics'] == [] and payloads['c2']['entities'] == {'vendors': ['Acme']}
+    assert payloads['c2']['created_at'] == created_at.isoformat()
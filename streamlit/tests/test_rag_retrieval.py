@@ -0,0 +1,49 @@
+"""Reciprocal rank fusion and chunk hydration"""
+import pytest
+
+from rag.filters import ChunkFilter
+from rag.retrieval import RRF_K, hydrate_chunks, reciprocal_rank_fusion
+
+
+def test_rrf_scores_sum_over_rankings():
+    scores = reciprocal_rank_fusion([['a', 'b', 'c'], ['b', 'd']])
+    assert scores['a'] == pytest.approx(1 / (RRF_K + 1))
+    assert scores['b'] == pytest.approx(1 / (RRF_K + 2) + 1 / (RRF_K + 1))
+    assert scores['c'] == pytest.approx(1 / (RRF_K + 3))
+    assert scores['d'] == pytest.approx(1 / (RRF_K + 2))
+
+
+def test_rrf_rewards_agreement_between_rankings():
+    scores = reciprocal_rank_fusion([['a', 'b'], ['b', 'a'], ['b']])
+    assert sorted(scores, key=scores.get, reverse=True) == ['b', 'a']
+
+
+def test_rrf_custom_k_and_empty_input():
+    assert reciprocal_rank_fusion([['x']], k=0) == {'x': 1.0}
+    assert reciprocal_rank_fusion([]) == {}
+    assert reciprocal_rank_fusion([[], []]) == {}
+
+
+def test_hydrate_without_ids_skips_the_query(fake_db):
+    assert hydrate_chunks([], []) == []
+    assert fake_db.statements == []
+
+
+def test_hydrate_reapplies_filter_to_vector_hits_only(fake_db):
+    fake_db.respond("FROM document_chunks dc", [{'chunk_id': 'c1'}])
+    chunk_filter = ChunkFilter().section_types(['rent_roll']).content_matches('late rent')
+
+    assert hydrate_chunks(['p1', 'p2'], ['c1'], chunk_filter) == [{'chunk_id': 'c1'}]
+
+    (query, params), = fake_db.statements
+    where_sql, where_params = chunk_filter.to_sql()
+    assert f"(dc.qdrant_point_id = ANY(%s) AND {where_sql})" in query
+    assert "OR dc.chunk_id = ANY(%s)" in query
+    assert params == (['p1', 'p2'],) + where_params + (['c1'],)
+
+
+def test_hydrate_without_filter(fake_db):
+    hydrate_chunks(['p1'], [])
+    (query, params), = fake_db.statements
+    assert "(dc.qdrant_point_id = ANY(%s) AND TRUE)" in query
+    assert params == (['p1'], [])
@@ -0,0 +1,117 @@
+"""Listing upserts and how ingestion runs are counted per ZIP"""
+import pytest
+
+from zillow import ingest
+from zillow.ingest import LISTING_COLUMNS, ingest_payload, upsert_listings
+
+
+class FakeZipCodes:
+    """
+    zillow_zip_codes behind fake_db, applying the ingestion_count update the
+    way PostgreSQL would, and collecting the listing rows written.
+    """
+
+    def __init__(self, fake_db):
+        self.counts = {}
+        self.last_run = {}
+        self.listing_rows = []
+        fake_db.respond("INSERT INTO zillow_zip_codes", self.register)
+        fake_db.respond("SELECT zip_code, market FROM zillow_zip_codes", self.markets)
+        fake_db.respond("UPDATE zillow_zip_codes", self.count_run)
+        fake_db.respond("INSERT INTO zillow_listings", self.write_listings)
+
+    def register(self, rows):
+        for zip_code, *_ in rows:
+            self.counts.setdefault(zip_code, 0)
+            self.last_run.setdefault(zip_code, None)
+        return []
+
+    def markets(self, params):
+        zip_codes, = params
+        return [(zip_code, f'market-{zip_code[:3]}') for zip_code in zip_codes]
+
+    def count_run(self, params):
+        run_id, new_last_run, zip_codes = params
+        for zip_code in zip_codes:
+            # ingestion_count + CASE WHEN last_ingestion_run IS DISTINCT FROM run_id THEN 1 ELSE 0 END
+            if self.last_run[zip_code] != run_id:
+                self.counts[zip_code] += 1
+            self.last_run[zip_code] = new_last_run
+        return [(zip_code, self.counts[zip_code]) for zip_code in zip_codes]
+
+    def write_listings(self, rows):
+        self.listing_rows.extend(rows)
+        return []
+
+    def seen_ingestion(self):
+        """seen_ingestion of the last row written per zpid"""
+        return {row[0]: row[-1] for row in self.listing_rows}
+
+
+@pytest.fixture
+def zip_codes(fake_db, monkeypatch):
+    monkeypatch.setattr(ingest, 'execute_values', fake_db.execute_values)
+    monkeypatch.setattr(ingest, 'record_dimensions', lambda cur, results: None)
+    return FakeZipCodes(fake_db)
+
+
+def _listing(zpid, zip_code):
+    return {'zpid': str(zpid), 'zipcode': zip_code, 'city': 'Cincinnati', 'state': 'OH',
+            'country': 'USA', 'price': 1200, 'homeStatus': 'FOR_RENT'}
+
+
+def test_multi_page_run_counts_each_zip_once(zip_codes):
+    pages = [
+        [_listing(1, '45223'), _listing(2, '45202')],
+        [_listing(3, '45223')],
+        [_listing(4, '45223'), _listing(5, '45202')],
+    ]
+    for page in pages:
+        ingest_payload({'results': page}, run_id='run-1')
+
+    assert zip_codes.counts == {'45223': 1, '45202': 1}
+    assert zip_codes.seen_ingestion() == {1: 1, 2: 1, 3: 1, 4: 1, 5: 1}
+
+
+def test_next_run_counts_again(zip_codes):
+    ingest_payload({'results': [_listing(1, '45223')]}, run_id='run-1')
+    ingest_payload({'results': [_listing(1, '45223')]}, run_id='run-1')
+    ingest_payload({'results': [_listing(1, '45223')]}, run_id='run-2')
+    ingest_payload({'results': [_listing(1, '45223')]}, run_id='run-2')
+
+    assert zip_codes.counts == {'45223': 2}
+    assert zip_codes.seen_ingestion() == {1: 2}
+
+
+def test_upserts_without_a_run_id_are_runs_of_their_own(zip_codes):
+    upsert_listings([_listing(1, '45223')])
+    upsert_listings([_listing(1, '45223')])
+    assert zip_codes.counts == {'45223': 2}
+
+
+def test_run_id_is_passed_to_every_page(zip_codes, fake_db):
+    for page in ([_listing(1, '45223')], [_listing(2, '45223')]):
+        ingest_payload({'results': page}, run_id='run-1')
+
+    updates = fake_db.queries("UPDATE zillow_zip_codes")
+    assert [params for _, params in updates] == [('run-1', 'run-1', ['45223'])] * 2
+    # The statement FakeZipCodes.count_run() emulates
+    for query, _ in updates:
+        assert "CASE WHEN last_ingestion_run IS DISTINCT FROM %s THEN 1 ELSE 0 END" in query
+
+
+def test_zip_without_listings_still_counts_for_the_run(zip_codes):
+    written = ingest_payload({'results': [_listing(1, '45202')]}, zip_code='45223', run_id='run-1')
+    assert written == 0
+    assert zip_codes.counts == {'45223': 1}
+    assert zip_codes.listing_rows == []
+
+
+def test_repeated_zpid_keeps_the_last_occurrence(zip_codes):
+    first, last = _listing(1, '45223'), dict(_listing(1, '45223'), price=1350)
+    assert upsert_listings([first, last, {'zpid': None}]) == 1
+
+    row, = zip_codes.listing_rows
+    price_column = [column for column, _ in LISTING_COLUMNS].index('price')
+    assert row[price_column] == 1350
+    assert row[-2:] == ('market-452', 1)
@@ -0,0 +1,12 @@
+# Zillow package
+from .ingest import upsert_listings, ingest_payload, load_payload
+from .aggregate import load_aggregation_blocks, run_aggregations
+from .dimensions import get_filter_options, invalidate_filter_options, refresh_dimensions
+from .fetch import ZillowFetchClient, fetch_and_ingest
+from .markets import markets_for_zips, add_market, invalidate_market_map
+
+__all__ = [
+    'upsert_listings', 'ingest_payload', 'load_payload', 'load_aggregation_blocks', 'run_aggregations',
+    'get_filter_options', 'invalidate_filter_options', 'refresh_dimensions',
+    'ZillowFetchClient', 'fetch_and_ingest', 'markets_for_zips', 'add_market', 'invalidate_market_map',
+]
@@ -0,0 +1,74 @@
+"""
+Runs the aggregation blocks of schema/populate_zillow_metrics.sql.
+
+The SQL file stays the single source of truth; this module splits it on its
+numbered section headers so each block (daily, weekly, monthly, quarterly,
+zip_level, unit_bucket) can be run, scheduled or timed on its own.
+"""
+import os
+import re
+import sys
+import time
+from typing import Dict, List, Optional
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from db import database
+
+AGGREGATION_SQL_FILE = "populate_zillow_metrics.sql"
+
+# Matches e.g. "-- 2. WEEKLY AGGREGATION (ROLLING) - ..." and "-- 5. ZIP-LEVEL AGGREGATION ..."
+BLOCK_HEADER = re.compile(r"^-- \d+\. ([A-Z][A-Z-]*) AGGREGATION", re.MULTILINE)
+
+
+def load_aggregation_blocks(path: Optional[str] = None) -> Dict[str, str]:
+    """
+    Split the aggregation script into named SQL blocks.
+
+    Returns:
+        Ordered mapping of block name ('daily', 'weekly', ...) to SQL
+    """
+    path = path or os.path.join(settings.SCHEMA_DIR, AGGREGATION_SQL_FILE)
+    with open(path, 'r', encoding='utf-8') as f:
+        script = f.read()
+
+    headers = list(BLOCK_HEADER.finditer(script))
+    blocks = {}
+    for index, header in enumerate(headers):
+        end = headers[index + 1].start() if index + 1 < len(headers) else len(script)
+        name = header.group(1).lower().replace('-', '_')
+        lines = script[header.start():end].strip().splitlines()
+        # Drop the next section's '-- ====' banner line
+        while lines and lines[-1].startswith('--'):
+            lines.pop()
+        blocks[name] = "\n".join(lines).strip()
+    return blocks
+
+
+def run_aggregations(names: Optional[List[str]] = None, path: Optional[str] = None) -> Dict[str, float]:
+    """
+    Run aggregation blocks, each in its own transaction.
+
+    Args:
+        names: Blocks to run (default: all, in file order)
+        path: Override path to populate_zillow_metrics.sql
+
+    Returns:
+        Mapping of block name to elapsed seconds
+    """
+    blocks = load_aggregation_blocks(path)
+    unknown = set(names or []) - set(blocks)
+    if unknown:
+        raise ValueError(f"Unknown aggregation block(s): {', '.join(sorted(unknown))}")
+
+    timings = {}
+    for name, sql in blocks.items():
+        if names and name not in names:
+            continue
+        start = time.perf_counter()
+        database.execute_query(sql)
+        timings[name] = time.perf_counter() - start
+        print(f"[AGGREGATE] {name}: {timings[name]:.2f}s")
+    return timings
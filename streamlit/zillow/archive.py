@@ -0,0 +1,450 @@
+"""
+Hot/cold tiering of zillow_listings.
+
+A listing is delisted once its ZIP has been covered by
+ZILLOW_ARCHIVE_AFTER_INGESTIONS ingestion runs without the listing in them
+(seen_ingestion vs. zillow_zip_codes.ingestion_count, see zillow/ingest.py).
+archive_delisted() moves delisted listings from zillow_listings into
+Parquet files under ZILLOW_ARCHIVE_DIR, partitioned by market and by the
+day each listing was last seen:
+
+    <ZILLOW_ARCHIVE_DIR>/market=cincinnati/last_seen_on=2026-03-14/part-<time>-<id>.parquet
+
+Each batch of up to ZILLOW_ARCHIVE_BATCH_SIZE listings is locked, written
+to Parquet and then, in one transaction, registered in
+zillow_listing_archive_files and deleted from zillow_listings. Readers only
+open files in that manifest: a file whose transaction did not commit is
+ignored, and a retry archives its listings again. remove_orphans() deletes
+such files.
+
+read_archived() reads archived listings back; read_listings() returns hot
+and archived listings together for historical queries.
+
+This module imports pyarrow, so it is not loaded by `import zillow`.
+
+Usage (from the streamlit/ directory):
+    python -m zillow.archive status
+    python -m zillow.archive run --after 3 --dry-run
+    python -m zillow.archive orphans --delete
+"""
+import argparse
+import sys
+import os
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from typing import List, Dict, Any, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from psycopg2.extras import RealDictCursor, execute_values
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from db import database
+from zillow.dimensions import refresh_dimensions
+from zillow.markets import UNASSIGNED_MARKET, markets_for_zips
+
+# (column, Parquet type, SELECT expression over zillow_listings l); the
+# archive keeps every listing column, generated ones included
+ARCHIVE_COLUMNS = [
+    ('id', pa.int64(), 'l.id'),
+    ('market', pa.string(), 'l.market'),
+    ('zpid', pa.int64(), 'l.zpid'),
+    ('zip_code', pa.string(), 'l.zip_code'),
+    ('street_address', pa.string(), 'l.street_address'),
+    ('city', pa.string(), 'l.city'),
+    ('state', pa.string(), 'l.state'),
+    ('country', pa.string(), 'l.country'),
+    ('latitude', pa.float64(), 'l.latitude::float8'),
+    ('longitude', pa.float64(), 'l.longitude::float8'),
+    ('bedrooms', pa.int32(), 'l.bedrooms'),
+    ('bathrooms', pa.int32(), 'l.bathrooms'),
+    ('living_area', pa.int32(), 'l.living_area'),
+    ('home_type', pa.string(), 'l.home_type'),
+    ('unit_bucket', pa.string(), 'l.unit_bucket'),
+    ('home_status', pa.string(), 'l.home_status'),
+    ('home_status_for_hdp', pa.string(), 'l.home_status_for_hdp'),
+    ('days_on_zillow', pa.int32(), 'l.days_on_zillow'),
+    ('time_on_zillow', pa.int64(), 'l.time_on_zillow'),
+    ('price', pa.int64(), 'l.price'),
+    ('price_for_hdp', pa.int64(), 'l.price_for_hdp'),
+    ('currency', pa.string(), 'l.currency'),
+    ('price_change', pa.int32(), 'l.price_change'),
+    ('date_price_changed', pa.int64(), 'l.date_price_changed'),
+    ('price_reduction', pa.string(), 'l.price_reduction'),
+    ('days_on_market', pa.float32(), 'l.days_on_market'),
+    ('price_per_sqft', pa.float32(), 'l.price_per_sqft'),
+    ('zestimate', pa.int64(), 'l.zestimate'),
+    ('rent_zestimate', pa.int32(), 'l.rent_zestimate'),
+    ('tax_assessed_value', pa.int64(), 'l.tax_assessed_value'),
+    ('img_src', pa.string(), 'l.img_src'),
+    ('video_count', pa.int32(), 'l.video_count'),
+    ('is_featured', pa.bool_(), 'l.is_featured'),
+    ('is_non_owner_occupied', pa.bool_(), 'l.is_non_owner_occupied'),
+    ('is_preforeclosure_auction', pa.bool_(), 'l.is_preforeclosure_auction'),
+    ('is_premier_builder', pa.bool_(), 'l.is_premier_builder'),
+    ('is_showcase_listing', pa.bool_(), 'l.is_showcase_listing'),
+    ('is_unmappable', pa.bool_(), 'l.is_unmappable'),
+    ('is_zillow_owned', pa.bool_(), 'l.is_zillow_owned'),
+    ('should_highlight', pa.bool_(), 'l.should_highlight'),
+    ('listing_sub_type', pa.string(), 'l.listing_sub_type::text'),  # JSON text
+    ('open_house', pa.string(), 'l.open_house'),
+    ('open_house_info', pa.string(), 'l.open_house_info::text'),  # JSON text
+    ('unit', pa.string(), 'l.unit'),
+    ('seen_ingestion', pa.int32(), 'l.seen_ingestion'),
+    ('created_at', pa.timestamp('us'), 'l.created_at'),
+    ('updated_at', pa.timestamp('us'), 'l.updated_at'),
+    # Listings are re-stamped on every upsert, so updated_at is when it was last seen
+    ('last_seen_on', pa.date32(), 'l.updated_at::date'),
+]
+ARCHIVE_SCHEMA = pa.schema(
+    [(column, arrow_type) for column, arrow_type, _ in ARCHIVE_COLUMNS] + [('archived_at', pa.timestamp('us'))]
+)
+SELECT_COLUMNS = ",\n        ".join(f"{expr} as {column}" for column, _, expr in ARCHIVE_COLUMNS)
+
+# Only hot listings whose ZIP moved on at least `after` ingestions ago
+DELISTED_SQL = """
+    FROM zillow_listings l
+    JOIN zillow_zip_codes z ON z.zip_code = l.zip_code
+    WHERE l.market = %s AND l.seen_ingestion <= z.ingestion_count - %s
+"""
+
+
+def archive_root(root: Optional[str] = None) -> str:
+    return root or settings.ZILLOW_ARCHIVE_DIR
+
+
+def _select_list(columns: Optional[List[str]]) -> str:
+    if not columns:
+        return SELECT_COLUMNS
+    known = {column: expr for column, _, expr in ARCHIVE_COLUMNS}
+    unknown = [column for column in columns if column not in known]
+    if unknown:
+        raise ValueError(f"Unknown listing columns: {', '.join(unknown)}")
+    return ", ".join(f"{known[column]} as {column}" for column in columns)
+
+
+def archive_markets() -> List[str]:
+    """Every market, plus the default partition"""
+    rows = database.fetch_data("SELECT market FROM zillow_markets ORDER BY market")
+    return [row['market'] for row in rows] + [UNASSIGNED_MARKET]
+
+
+# ==============================================================================
+# Archiving
+# ==============================================================================
+
+def _write_file(root: str, market: str, day: date, rows: List[Dict[str, Any]], archived_at: datetime) -> str:
+    """Write one Parquet file atomically; returns its path relative to root"""
+    relative = os.path.join(
+        f"market={market}", f"last_seen_on={day.isoformat()}",
+        f"part-{archived_at:%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:12]}.parquet"
+    )
+    path = os.path.join(root, relative)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    table = pa.Table.from_pylist([{**row, 'archived_at': archived_at} for row in rows], schema=ARCHIVE_SCHEMA)
+    pq.write_table(table, path + '.tmp', compression='zstd')
+    os.replace(path + '.tmp', path)
+    return relative
+
+
+def _archive_batch(market: str, after: int, batch_size: int, root: str) -> Dict[str, int]:
+    """Move one batch of a market's delisted listings to Parquet"""
+    written: List[str] = []
+    try:
+        with database.get_connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                # SKIP LOCKED: listings being upserted right now are left for the next run
+                cur.execute(f"""
+                    SELECT {SELECT_COLUMNS}
+                    {DELISTED_SQL}
+                    ORDER BY l.id
+                    LIMIT %s
+                    FOR UPDATE OF l SKIP LOCKED
+                """, (market, after, batch_size))
+                rows = cur.fetchall()
+                if not rows:
+                    return {'listings': 0, 'files': 0}
+
+                by_day: Dict[date, List[Dict[str, Any]]] = {}
+                for row in rows:
+                    by_day.setdefault(row['last_seen_on'], []).append(row)
+                archived_at = datetime.now()
+                manifest = []
+                for day, day_rows in sorted(by_day.items()):
+                    relative = _write_file(root, market, day, day_rows, archived_at)
+                    written.append(relative)
+                    zip_codes = sorted({row['zip_code'] for row in day_rows})
+                    manifest.append((relative, market, day, len(day_rows), zip_codes, archived_at))
+
+                execute_values(cur, """
+                    INSERT INTO zillow_listing_archive_files
+                        (path, market, last_seen_on, row_count, zip_codes, archived_at)
+                    VALUES %s
+                """, manifest)
+                cur.execute("DELETE FROM zillow_listings WHERE market = %s AND id = ANY(%s)",
+                            (market, [row['id'] for row in rows]))
+                return {'listings': len(rows), 'files': len(written)}
+    except Exception:
+        # Not committed: the files are not in the manifest, drop them now
+        for relative in written:
+            try:
+                os.remove(os.path.join(root, relative))
+            except OSError:
+                pass
+        raise
+
+
+def count_delisted(after: Optional[int] = None, markets: Optional[List[str]] = None) -> Dict[str, int]:
+    """Delisted listings still in the hot table, per market"""
+    after = after or settings.ZILLOW_ARCHIVE_AFTER_INGESTIONS
+    return {
+        market: database.fetch_one(f"SELECT COUNT(*) as listings {DELISTED_SQL}", (market, after))['listings']
+        for market in markets or archive_markets()
+    }
+
+
+def archive_delisted(after: Optional[int] = None, batch_size: Optional[int] = None,
+                     max_batches: Optional[int] = None, markets: Optional[List[str]] = None,
+                     root: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Move delisted listings to Parquet and delete them from zillow_listings.
+
+    Args:
+        after: Ingestions of a ZIP without a listing before it counts as
+            delisted (default settings.ZILLOW_ARCHIVE_AFTER_INGESTIONS)
+        batch_size: Listings per transaction (default settings.ZILLOW_ARCHIVE_BATCH_SIZE)
+        max_batches: Stop after this many batches per market (default: until done)
+        markets: Markets to archive (default: all, including 'unassigned')
+        root: Archive directory (default settings.ZILLOW_ARCHIVE_DIR)
+
+    Returns:
+        {'archived': listings, 'files': Parquet files, 'markets': {market: listings}, 'seconds': float}
+    """
+    after = after or settings.ZILLOW_ARCHIVE_AFTER_INGESTIONS
+    batch_size = batch_size or settings.ZILLOW_ARCHIVE_BATCH_SIZE
+    if after < 1:
+        raise ValueError("after must be at least 1 ingestion")
+    root = archive_root(root)
+
+    start = time.perf_counter()
+    summary: Dict[str, Any] = {'archived': 0, 'files': 0, 'markets': {}}
+    for market in markets or archive_markets():
+        batches = 0
+        while not max_batches or batches < max_batches:
+            result = _archive_batch(market, after, batch_size, root)
+            batches += 1
+            summary['archived'] += result['listings']
+            summary['files'] += result['files']
+            if result['listings']:
+                summary['markets'][market] = summary['markets'].get(market, 0) + result['listings']
+            if result['listings'] < batch_size:
+                break
+
+    if summary['archived']:
+        # Values only archived listings had must leave the filter options
+        refresh_dimensions()
+    summary['seconds'] = round(time.perf_counter() - start, 3)
+    print(f"[ARCHIVE] Archived {summary['archived']:,} listings into {summary['files']} file(s) "
+          f"in {summary['seconds']:.1f}s")
+    return summary
+
+
+def remove_orphans(root: Optional[str] = None, min_age_seconds: float = 3600,
+                   delete: bool = False) -> List[str]:
+    """
+    Parquet files under the archive that are not in the manifest (left by
+    batches that failed to commit), older than min_age_seconds so batches
+    in flight are not touched.
+
+    Returns:
+        Orphan paths relative to the archive root (deleted if delete=True)
+    """
+    root = archive_root(root)
+    known = {row['path'] for row in database.fetch_data("SELECT path FROM zillow_listing_archive_files")}
+    cutoff = time.time() - min_age_seconds
+    orphans = []
+    for directory, _, files in os.walk(root):
+        for name in files:
+            if not name.endswith(('.parquet', '.parquet.tmp')):
+                continue
+            path = os.path.join(directory, name)
+            relative = os.path.relpath(path, root)
+            if relative not in known and os.path.getmtime(path) < cutoff:
+                orphans.append(relative)
+                if delete:
+                    os.remove(path)
+    return sorted(orphans)
+
+
+# ==============================================================================
+# Reading
+# ==============================================================================
+
+def archived_files(zip_codes: Optional[List[str]] = None, markets: Optional[List[str]] = None,
+                   since: Optional[date] = None, until: Optional[date] = None) -> List[Dict[str, Any]]:
+    """Manifest rows of the files that can hold matching listings"""
+    conditions, params = [], []
+    if markets:
+        conditions.append("market = ANY(%s)")
+        params.append(list(markets))
+    if zip_codes:
+        conditions.append("zip_codes && %s::TEXT[]")
+        params.append(list(zip_codes))
+    if since:
+        conditions.append("last_seen_on >= %s")
+        params.append(since)
+    if until:
+        conditions.append("last_seen_on <= %s")
+        params.append(until)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return database.fetch_data(f"""
+        SELECT path, market, last_seen_on, row_count, zip_codes, archived_at
+        FROM zillow_listing_archive_files
+        {where}
+        ORDER BY market, last_seen_on, path
+    """, tuple(params) or None)
+
+
+def read_archived(zip_codes: Optional[List[str]] = None, markets: Optional[List[str]] = None,
+                  since: Optional[date] = None, until: Optional[date] = None,
+                  columns: Optional[List[str]] = None, root: Optional[str] = None) -> pd.DataFrame:
+    """
+    Archived listings as a DataFrame.
+
+    Args:
+        zip_codes: Only these ZIPs (default: all)
+        markets: Only these markets (default: all)
+        since, until: Inclusive bounds on the day listings were last seen
+        columns: Columns to read (default: all of ARCHIVE_SCHEMA)
+        root: Archive directory (default settings.ZILLOW_ARCHIVE_DIR)
+    """
+    root = archive_root(root)
+    columns = columns or ARCHIVE_SCHEMA.names
+    files = archived_files(zip_codes, markets, since, until)
+    if not files:
+        return ARCHIVE_SCHEMA.empty_table().select(columns).to_pandas()
+
+    dataset = ds.dataset([os.path.join(root, row['path']) for row in files],
+                         schema=ARCHIVE_SCHEMA, format='parquet')
+    # Files are pruned by the manifest; rows are filtered inside them
+    condition = None
+    for expression in (
+        ds.field('zip_code').isin(list(zip_codes)) if zip_codes else None,
+        ds.field('last_seen_on') >= since if since else None,
+        ds.field('last_seen_on') <= until if until else None,
+    ):
+        if expression is not None:
+            condition = expression if condition is None else condition & expression
+    return dataset.to_table(columns=columns, filter=condition).to_pandas()
+
+
+def read_listings(zip_codes: List[str], since: Optional[date] = None, until: Optional[date] = None,
+                  columns: Optional[List[str]] = None, include_archived: bool = True) -> pd.DataFrame:
+    """
+    Hot and archived listings of some ZIPs in one DataFrame, for historical
+    queries that should not care where a listing lives.
+
+    Args:
+        zip_codes: ZIPs to read
+        since, until: Inclusive bounds on the day listings were last seen
+        columns: Listing columns (default: all archived columns)
+        include_archived: Also read the Parquet archive
+
+    Returns:
+        The requested columns plus 'tier' ('hot' or 'archived')
+    """
+    conditions = ["l.market = ANY(%s)", "l.zip_code = ANY(%s)"]
+    params: List[Any] = [markets_for_zips(zip_codes), list(zip_codes)]
+    if since:
+        conditions.append("l.updated_at >= %s")
+        params.append(since)
+    if until:
+        conditions.append("l.updated_at < %s")
+        params.append(until + timedelta(days=1))
+    hot = pd.DataFrame(database.fetch_data(f"""
+        SELECT {_select_list(columns)}
+        FROM zillow_listings l
+        WHERE {' AND '.join(conditions)}
+    """, tuple(params)), columns=columns or [column for column, _, _ in ARCHIVE_COLUMNS])
+    hot['tier'] = 'hot'
+    if not include_archived:
+        return hot
+
+    archived = read_archived(zip_codes, since=since, until=until,
+                             columns=columns or [column for column, _, _ in ARCHIVE_COLUMNS])
+    archived['tier'] = 'archived'
+    if archived.empty:
+        return hot
+    if hot.empty:
+        return archived
+    return pd.concat([hot, archived], ignore_index=True)
+
+
+def archive_status() -> List[Dict[str, Any]]:
+    """Per market: hot listings, delisted ones awaiting archiving, and the archive"""
+    hot = {row['market']: row['listings'] for row in database.fetch_data(
+        "SELECT market, COUNT(*) as listings FROM zillow_listings GROUP BY market"
+    )}
+    archived = {row['market']: row for row in database.fetch_data("""
+        SELECT market, SUM(row_count) as listings, COUNT(*) as files, MAX(archived_at) as last_archived_at
+        FROM zillow_listing_archive_files
+        GROUP BY market
+    """)}
+    delisted = count_delisted()
+    return [
+        {
+            'market': market,
+            'hot': hot.get(market, 0),
+            'delisted': delisted.get(market, 0),
+            'archived': int(archived.get(market, {}).get('listings') or 0),
+            'files': archived.get(market, {}).get('files', 0),
+            'last_archived_at': archived.get(market, {}).get('last_archived_at'),
+        }
+        for market in archive_markets()
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive delisted Zillow listings to Parquet")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("status")
+    run = subparsers.add_parser("run")
+    run.add_argument("--after", type=int, default=settings.ZILLOW_ARCHIVE_AFTER_INGESTIONS,
+                     help="Ingestions without a listing before it is archived")
+    run.add_argument("--batch-size", type=int, default=settings.ZILLOW_ARCHIVE_BATCH_SIZE)
+    run.add_argument("--max-batches", type=int, help="Per market")
+    run.add_argument("--market", nargs="+", help="Only these markets")
+    run.add_argument("--dry-run", action="store_true", help="Only count delisted listings")
+    orphans = subparsers.add_parser("orphans")
+    orphans.add_argument("--min-age", type=float, default=3600, help="Seconds")
+    orphans.add_argument("--delete", action="store_true")
+    args = parser.parse_args()
+
+    if args.command == "status":
+        for row in archive_status():
+            print(f"{row['market']:<20} hot {row['hot']:>10,}  delisted {row['delisted']:>8,}  "
+                  f"archived {row['archived']:>10,} in {row['files']:>5} file(s)  "
+                  f"last {row['last_archived_at'] or '-'}")
+    elif args.command == "run":
+        if args.dry_run:
+            counts = count_delisted(args.after, args.market)
+            for market, listings in counts.items():
+                print(f"[ARCHIVE] {market}: would archive {listings:,} listings")
+            return
+        archive_delisted(args.after, args.batch_size, args.max_batches, args.market)
+    else:
+        found = remove_orphans(min_age_seconds=args.min_age, delete=args.delete)
+        verb = "Deleted" if args.delete else "Found"
+        print(f"[ARCHIVE] {verb} {len(found)} orphan file(s)")
+        for path in found:
+            print(f"  - {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Filter-option metadata for the listing dimensions.
+
+ZIP codes come from zillow_zip_codes (those that have listings); home types,
+statuses and bedroom counts from zillow_dimension_values, which ingest keeps
+current through record_dimensions(). get_filter_options() serves all of
+them from one cached result. Ingest in this process drops the cache with
+invalidate_filter_options(); otherwise it is revalidated against a cheap
+version stamp at most every FILTER_OPTIONS_TTL seconds, so ingests run by
+the jobs container show up as well.
+"""
+import sys
+import os
+import threading
+import time
+from typing import List, Dict, Any, Tuple
+
+from psycopg2.extras import execute_values
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from db import database
+
+# zillow_dimension_values.dimension -> search result key
+DIMENSIONS = {
+    'home_type': 'homeType',
+    'home_status': 'homeStatus',
+    'bedrooms': 'bedrooms',
+}
+
+INTEGER_DIMENSIONS = {'bedrooms'}
+
+_cache: Dict[str, Any] = {}
+_cache_lock = threading.Lock()
+
+
+def record_dimensions(cur, results: List[Dict[str, Any]]) -> None:
+    """Register the dimension values of search results, on the caller's cursor"""
+    values = {
+        (dimension, str(result[key]))
+        for result in results
+        for dimension, key in DIMENSIONS.items()
+        if result.get(key) is not None
+    }
+    if values:
+        execute_values(cur, """
+            INSERT INTO zillow_dimension_values (dimension, value)
+            VALUES %s
+            ON CONFLICT (dimension, value) DO NOTHING
+        """, sorted(values))
+
+
+def refresh_dimensions() -> int:
+    """
+    Rebuild zillow_dimension_values from zillow_listings (one full scan).
+
+    Needed after bulk loads that bypass upsert_listings() or after deleting
+    listings; regular ingest keeps the table current on its own.
+
+    Returns:
+        Number of dimension values
+    """
+    selects = " UNION ".join(
+        f"SELECT DISTINCT '{dimension}', {dimension}::TEXT FROM zillow_listings WHERE {dimension} IS NOT NULL"
+        for dimension in DIMENSIONS
+    )
+    with database.get_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("DELETE FROM zillow_dimension_values")
+            cur.execute(f"INSERT INTO zillow_dimension_values (dimension, value) {selects}")
+            count = cur.rowcount
+    invalidate_filter_options()
+    return count
+
+
+def filter_options_version() -> Tuple:
+    """Cheap version stamp: row counts and newest rows of both tables"""
+    row = database.fetch_one("""
+        SELECT
+            (SELECT COUNT(*) FROM zillow_zip_codes) as zip_count,
+            (SELECT MAX(created_at) FROM zillow_zip_codes) as zip_created,
+            (SELECT COUNT(*) FROM zillow_dimension_values) as value_count,
+            (SELECT MAX(created_at) FROM zillow_dimension_values) as value_created
+    """)
+    return tuple(row.values()) if row else ()
+
+
+def load_filter_options() -> Dict[str, Tuple]:
+    """Read every filter option in one round trip"""
+    rows = database.fetch_data("""
+        SELECT 'zip_code' as dimension, z.zip_code as value
+        FROM zillow_zip_codes z
+        WHERE EXISTS (SELECT 1 FROM zillow_listings l WHERE l.zip_code = z.zip_code)
+        UNION ALL
+        SELECT dimension, value FROM zillow_dimension_values
+    """)
+    grouped: Dict[str, list] = {'zip_code': [], **{dimension: [] for dimension in DIMENSIONS}}
+    for row in rows:
+        value = int(row['value']) if row['dimension'] in INTEGER_DIMENSIONS else row['value']
+        grouped.setdefault(row['dimension'], []).append(value)
+    return {
+        'zip_codes': tuple(sorted(grouped['zip_code'])),
+        'home_types': tuple(sorted(grouped['home_type'])),
+        'home_statuses': tuple(sorted(grouped['home_status'])),
+        'bedrooms': tuple(sorted(grouped['bedrooms'])),
+    }
+
+
+def get_filter_options() -> Dict[str, Tuple]:
+    """
+    All listing filter options, cached.
+
+    Returns:
+        Mapping with 'zip_codes', 'home_types', 'home_statuses' and
+        'bedrooms', each a sorted tuple
+    """
+    now = time.monotonic()
+    with _cache_lock:
+        if _cache and now - _cache['checked_at'] < settings.FILTER_OPTIONS_TTL:
+            return _cache['options']
+
+    version = filter_options_version()
+    with _cache_lock:
+        if _cache and _cache['version'] == version:
+            _cache['checked_at'] = now
+            return _cache['options']
+
+    options = load_filter_options()
+    with _cache_lock:
+        _cache.update(version=version, options=options, checked_at=now)
+    return options
+
+
+def invalidate_filter_options() -> None:
+    with _cache_lock:
+        _cache.clear()
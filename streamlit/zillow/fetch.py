@@ -0,0 +1,370 @@
+"""
+Zillow search fetch client with a rate limiter and an on-disk response cache.
+
+Fetches the search payload format of mock_data/zillow_api_response_format.json
+(results, resultsPerPage, totalPages, totalResultCount) one ZIP at a time,
+page by page, with up to ZILLOW_FETCH_WORKERS ZIPs in flight. Every request
+takes a token from a shared token bucket (ZILLOW_RATE_LIMIT requests/s,
+bursts of ZILLOW_RATE_BURST); a 429 drains the bucket for its Retry-After.
+
+Responses are kept in a content-addressed cache under ZILLOW_CACHE_DIR:
+
+    objects/ab/<sha256>.json.gz   gzip-compressed bodies, one per distinct body
+    refs/<request key>.json       request -> body hash, ETag, Last-Modified, times
+
+A page fetched within ZILLOW_CACHE_TTL seconds is served from disk. After
+that it is revalidated with If-None-Match / If-Modified-Since when the
+server sent validators (a 304 costs no body), or fetched again. With
+replay=True the client never touches the network, so re-ingestion runs
+entirely from the cache.
+
+Usage (from the streamlit/ directory):
+    python -m zillow.fetch 45223 45224 --ingest
+    python -m zillow.fetch --all --replay --ingest
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import sys
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+
+FETCH_RETRIES = 4
+RETRY_DELAY = 1.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Thread-safe token bucket: rate tokens per second, up to burst banked"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> float:
+        """Block until a token is available; returns the seconds waited"""
+        if self.rate <= 0:
+            return 0.0
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill(time.monotonic())
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+    def pause(self, seconds: float) -> None:
+        """Hold every caller back for about this long (e.g. a 429's Retry-After)"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, 0.0) - seconds * self.rate
+
+
+class ResponseCache:
+    """Content-addressed, gzip-compressed response bodies plus per-request refs"""
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(os.path.join(root, 'objects'), exist_ok=True)
+        os.makedirs(os.path.join(root, 'refs'), exist_ok=True)
+
+    @staticmethod
+    def request_key(url: str, params: Dict[str, Any]) -> str:
+        return hashlib.sha256(json.dumps([url, sorted(params.items())], default=str).encode('utf-8')).hexdigest()
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.root, 'objects', digest[:2], f"{digest}.json.gz")
+
+    def _ref_path(self, key: str) -> str:
+        return os.path.join(self.root, 'refs', f"{key}.json")
+
+    @staticmethod
+    def _write_atomic(path: str, data: bytes) -> None:
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def get_ref(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._ref_path(key), 'r', encoding='utf-8') as f:
+                ref = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return ref if os.path.exists(self._object_path(ref['sha256'])) else None
+
+    def put_ref(self, key: str, ref: Dict[str, Any]) -> None:
+        self._write_atomic(self._ref_path(key), json.dumps(ref).encode('utf-8'))
+
+    def read_body(self, digest: str) -> bytes:
+        with gzip.open(self._object_path(digest), 'rb') as f:
+            return f.read()
+
+    def store_body(self, body: bytes) -> str:
+        """Store a body once per distinct content; returns its sha256"""
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._write_atomic(path, gzip.compress(body, compresslevel=6))
+        return digest
+
+
+class ZillowFetchClient:
+    """Fetches ZIP searches through the rate limiter and the response cache"""
+
+    def __init__(self, url: Optional[str] = None, api_key: Optional[str] = None,
+                 cache_dir: Optional[str] = None, cache_ttl: Optional[float] = None,
+                 rate_limit: Optional[float] = None, burst: Optional[int] = None,
+                 max_workers: Optional[int] = None, replay: bool = False):
+        """
+        Args:
+            url: Search endpoint (default: settings.ZILLOW_API_URL)
+            api_key: Sent as X-RapidAPI-Key when set
+            cache_dir: Response cache root (default: settings.ZILLOW_CACHE_DIR)
+            cache_ttl: Seconds a cached page is used without asking the server
+            rate_limit: Requests per second across all threads; 0 disables
+            burst: Requests allowed back to back before the rate applies
+            max_workers: ZIPs fetched concurrently
+            replay: Serve only from the cache; a missing page raises LookupError
+        """
+        self.url = url or settings.ZILLOW_API_URL
+        self.api_key = settings.ZILLOW_API_KEY if api_key is None else api_key
+        self.cache = ResponseCache(cache_dir or settings.ZILLOW_CACHE_DIR)
+        self.cache_ttl = settings.ZILLOW_CACHE_TTL if cache_ttl is None else cache_ttl
+        self.bucket = TokenBucket(
+            settings.ZILLOW_RATE_LIMIT if rate_limit is None else rate_limit,
+            burst or settings.ZILLOW_RATE_BURST
+        )
+        self.max_workers = max_workers or settings.ZILLOW_FETCH_WORKERS
+        self.replay = replay
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'cache_hits': 0, 'not_modified': 0, 'downloaded': 0,
+                      'unchanged': 0, 'retries': 0, 'bytes': 0, 'throttled_s': 0.0}
+
+    def _count(self, key: str, amount: float = 1) -> None:
+        with self._lock:
+            self.stats[key] += amount
+
+    def _session(self) -> requests.Session:
+        # requests.Session is not thread-safe; one per fetch thread
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.headers['Accept-Encoding'] = 'gzip'
+            if self.api_key:
+                session.headers['X-RapidAPI-Key'] = self.api_key
+                session.headers['X-RapidAPI-Host'] = urlsplit(self.url).netloc
+            self._local.session = session
+        return session
+
+    def _request(self, params: Dict[str, Any], headers: Dict[str, str]) -> requests.Response:
+        """GET through the rate limiter, retrying 429/5xx and connection errors"""
+        attempt = 0
+        while True:
+            self._count('throttled_s', self.bucket.acquire())
+            self._count('requests')
+            last_attempt = attempt == FETCH_RETRIES - 1
+            try:
+                response = self._session().get(self.url, params=params, headers=headers,
+                                               timeout=settings.ZILLOW_FETCH_TIMEOUT)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if last_attempt:
+                    raise
+                print(f"[ZILLOW] {params['location']} page {params['page']}: {str(e)}, retrying")
+                response = None
+            if response is not None and (response.status_code not in RETRY_STATUSES or last_attempt):
+                return response
+
+            self._count('retries')
+            try:
+                delay = float(response.headers.get('Retry-After', '')) if response is not None else None
+            except ValueError:
+                delay = None
+            delay = RETRY_DELAY * 2 ** attempt if delay is None else delay
+            if response is not None and response.status_code == 429:
+                # Everyone backs off, not just this thread
+                self.bucket.pause(delay)
+            else:
+                time.sleep(delay)
+            attempt += 1
+
+    def fetch_page(self, zip_code: str, page: int = 1) -> Tuple[Dict[str, Any], bool]:
+        """
+        One search page.
+
+        Returns:
+            (payload, changed): changed is False when the body is the one
+            already in the cache
+        """
+        params = {'location': zip_code, 'page': page}
+        if settings.ZILLOW_SEARCH_STATUS:
+            params['status'] = settings.ZILLOW_SEARCH_STATUS
+        key = self.cache.request_key(self.url, params)
+        ref = self.cache.get_ref(key)
+        now = time.time()
+
+        if self.replay:
+            if ref is None:
+                raise LookupError(f"ZIP {zip_code} page {page} is not in the response cache")
+            self._count('cache_hits')
+            return json.loads(self.cache.read_body(ref['sha256'])), False
+        if ref is not None and now - ref['validated_at'] < self.cache_ttl:
+            self._count('cache_hits')
+            return json.loads(self.cache.read_body(ref['sha256'])), False
+
+        headers = {}
+        if ref is not None and ref.get('etag'):
+            headers['If-None-Match'] = ref['etag']
+        if ref is not None and ref.get('last_modified'):
+            headers['If-Modified-Since'] = ref['last_modified']
+        response = self._request(params, headers)
+
+        if response.status_code == 304 and ref is not None:
+            self._count('not_modified')
+            ref['validated_at'] = now
+            self.cache.put_ref(key, ref)
+            return json.loads(self.cache.read_body(ref['sha256'])), False
+        response.raise_for_status()
+
+        body = response.content
+        payload = json.loads(body)
+        digest = self.cache.store_body(body)
+        changed = ref is None or ref['sha256'] != digest
+        self._count('downloaded')
+        self._count('bytes', len(body))
+        if not changed:
+            self._count('unchanged')
+        self.cache.put_ref(key, {
+            'url': self.url,
+            'params': params,
+            'sha256': digest,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'fetched_at': now if changed else ref['fetched_at'],
+            'validated_at': now,
+        })
+        return payload, changed
+
+    def fetch_zip(self, zip_code: str) -> Tuple[Dict[str, Any], bool]:
+        """
+        Every page of a ZIP search, merged into one payload.
+
+        Returns:
+            (payload, changed): changed if any page differs from the cache
+        """
+        first, changed = self.fetch_page(zip_code, 1)
+        results = list(first.get('results', []))
+        total_pages = int(first.get('totalPages') or 1)
+        for page in range(2, total_pages + 1):
+            payload, page_changed = self.fetch_page(zip_code, page)
+            results.extend(payload.get('results', []))
+            changed = changed or page_changed
+        return {
+            'results': results,
+            'resultsPerPage': first.get('resultsPerPage'),
+            'totalPages': total_pages,
+            'totalResultCount': first.get('totalResultCount', len(results)),
+            'fetchedAt': datetime.now(timezone.utc).isoformat(),
+        }, changed
+
+    def fetch_zips(self, zip_codes: List[str]) -> Tuple[Dict[str, Tuple[Dict[str, Any], bool]], Dict[str, str]]:
+        """
+        Fetch ZIPs concurrently (max_workers at a time, all sharing the rate limit).
+
+        Returns:
+            (fetched, errors): zip_code -> (payload, changed), and
+            zip_code -> error message for ZIPs that failed
+        """
+        fetched, errors = {}, {}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="zillow-fetch") as pool:
+            futures = {zip_code: pool.submit(self.fetch_zip, zip_code) for zip_code in dict.fromkeys(zip_codes)}
+            for zip_code, future in futures.items():
+                try:
+                    fetched[zip_code] = future.result()
+                except Exception as e:
+                    print(f"[ZILLOW] Fetching {zip_code} failed: {str(e)}")
+                    errors[zip_code] = str(e)
+        return fetched, errors
+
+
+def tracked_zip_codes() -> List[str]:
+    from db import database
+    return [row['zip_code'] for row in database.fetch_data("SELECT zip_code FROM zillow_zip_codes ORDER BY zip_code")]
+
+
+def fetch_and_ingest(zip_codes: List[str], replay: bool = False, force: bool = False,
+                     client: Optional[ZillowFetchClient] = None) -> Dict[str, Any]:
+    """
+    Fetch ZIP searches and upsert them into zillow_listings.
+
+    ZIPs whose pages all match the cache are not re-ingested (that would only
+    bump updated_at), unless replay or force is set.
+
+    Returns:
+        Listings written per ZIP, skipped and failed ZIPs, and client stats
+    """
+    from zillow.ingest import ingest_payload
+
+    client = client or ZillowFetchClient(replay=replay)
+    fetched, errors = client.fetch_zips(zip_codes)
+    listings, skipped = {}, []
+    for zip_code, (payload, changed) in fetched.items():
+        if not (changed or replay or force):
+            skipped.append(zip_code)
+            continue
+        listings[zip_code] = ingest_payload(payload, zip_code)
+    return {'listings': listings, 'skipped': skipped, 'errors': errors, 'stats': dict(client.stats)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fetch Zillow ZIP searches through the response cache")
+    parser.add_argument("zip_codes", nargs="*", help="ZIP codes to fetch")
+    parser.add_argument("--all", action="store_true", help="Every ZIP in zillow_zip_codes")
+    parser.add_argument("--replay", action="store_true", help="Serve from the cache only, no network")
+    parser.add_argument("--ingest", action="store_true", help="Upsert the results into zillow_listings")
+    parser.add_argument("--force", action="store_true", help="Ingest ZIPs even if unchanged")
+    parser.add_argument("--url", help="Search endpoint (default: ZILLOW_API_URL)")
+    args = parser.parse_args()
+
+    zip_codes = args.zip_codes + (tracked_zip_codes() if args.all else [])
+    if not zip_codes:
+        parser.error("give ZIP codes or --all")
+    client = ZillowFetchClient(url=args.url, replay=args.replay)
+    if args.ingest:
+        summary = fetch_and_ingest(zip_codes, args.replay, args.force, client)
+        print(f"[ZILLOW] Ingested {sum(summary['listings'].values())} listings from {len(summary['listings'])} ZIP(s), "
+              f"{len(summary['skipped'])} unchanged, {len(summary['errors'])} failed")
+    else:
+        fetched, errors = client.fetch_zips(zip_codes)
+        for zip_code, (payload, changed) in fetched.items():
+            print(f"[ZILLOW] {zip_code}: {len(payload['results'])} results{'' if changed else ' (unchanged)'}")
+    print(f"[ZILLOW] {client.stats}")
+
+
+if __name__ == "__main__":
+    main()
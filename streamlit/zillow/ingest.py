@@ -0,0 +1,196 @@
+"""
+Zillow search payload ingestion into zillow_listings.
+
+Accepts the 'results' array of the search payload described in
+mock_data/zillow_api_response_format.json and upserts it by (market, zpid),
+so re-ingesting the same payload is idempotent. The market (the partition
+key, see zillow/markets.py) is the one zillow_zip_codes holds for the
+listing's ZIP.
+
+Every ingestion run counts once for the ZIPs it covers: their
+ingestion_count goes up and each listing records the new count as
+seen_ingestion. zillow/archive.py uses the gap between the two to find
+delisted listings. A paginated search posted as several upserts passes the
+same run id with each page, so only its first page bumps the count.
+"""
+import json
+import sys
+import os
+import uuid
+from typing import List, Dict, Any, Optional
+
+from psycopg2.extras import execute_values, Json
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import database
+from zillow.dimensions import record_dimensions, invalidate_filter_options
+from zillow.markets import UNASSIGNED_MARKET
+
+# (column, payload key) in insert order
+LISTING_COLUMNS = [
+    ('zpid', 'zpid'),
+    ('zip_code', 'zipcode'),
+    ('street_address', 'streetAddress'),
+    ('city', 'city'),
+    ('state', 'state'),
+    ('country', 'country'),
+    ('latitude', 'latitude'),
+    ('longitude', 'longitude'),
+    ('bedrooms', 'bedrooms'),
+    ('bathrooms', 'bathrooms'),
+    ('living_area', 'livingArea'),
+    ('home_type', 'homeType'),
+    ('home_status', 'homeStatus'),
+    ('home_status_for_hdp', 'homeStatusForHDP'),
+    ('days_on_zillow', 'daysOnZillow'),
+    ('time_on_zillow', 'timeOnZillow'),
+    ('price', 'price'),
+    ('price_for_hdp', 'priceForHDP'),
+    ('currency', 'currency'),
+    ('price_change', 'priceChange'),
+    ('date_price_changed', 'datePriceChanged'),
+    ('price_reduction', 'priceReduction'),
+    ('zestimate', 'zestimate'),
+    ('rent_zestimate', 'rentZestimate'),
+    ('tax_assessed_value', 'taxAssessedValue'),
+    ('img_src', 'imgSrc'),
+    ('video_count', 'videoCount'),
+    ('is_featured', 'isFeatured'),
+    ('is_non_owner_occupied', 'isNonOwnerOccupied'),
+    ('is_preforeclosure_auction', 'isPreforeclosureAuction'),
+    ('is_premier_builder', 'isPremierBuilder'),
+    ('is_showcase_listing', 'isShowcaseListing'),
+    ('is_unmappable', 'isUnmappable'),
+    ('is_zillow_owned', 'isZillowOwned'),
+    ('should_highlight', 'shouldHighlight'),
+    ('listing_sub_type', 'listing_sub_type'),
+    ('open_house', 'openHouse'),
+    ('open_house_info', 'open_house_info'),
+    ('unit', 'unit'),
+]
+
+JSONB_COLUMNS = {'listing_sub_type', 'open_house_info'}
+BOOLEAN_COLUMNS = {col for col, _ in LISTING_COLUMNS if col.startswith(('is_', 'should_'))}
+
+
+def listing_row(result: Dict[str, Any]) -> tuple:
+    """Map one search result to a zillow_listings row tuple"""
+    row = []
+    for column, key in LISTING_COLUMNS:
+        value = result.get(key)
+        if column in JSONB_COLUMNS and value is not None:
+            value = Json(value)
+        elif column in BOOLEAN_COLUMNS and value is None:
+            value = False
+        elif column == 'zpid':
+            value = int(value)
+        row.append(value)
+    return tuple(row)
+
+
+def ensure_zip_codes(results: List[Dict[str, Any]]) -> Dict[str, str]:
+    """
+    Register every ZIP in the payload (zillow_listings.zip_code is a foreign
+    key), stamping new ZIPs with their market.
+
+    Returns:
+        Mapping of each ZIP in the payload to its market
+    """
+    zips = {}
+    for result in results:
+        if result.get('zipcode'):
+            zips.setdefault(result['zipcode'], (result.get('city'), result.get('state'), result.get('country')))
+    if not zips:
+        return {}
+    with database.get_connection() as conn:
+        with conn.cursor() as cur:
+            execute_values(cur, """
+                INSERT INTO zillow_zip_codes (zip_code, market, city, state, country)
+                VALUES %s
+                ON CONFLICT (zip_code) DO NOTHING
+            """, [(zip_code, zip_code) + info for zip_code, info in zips.items()],
+                template="(%s, zillow_market_for_zip(%s), %s, %s, %s)")
+            cur.execute(
+                "SELECT zip_code, market FROM zillow_zip_codes WHERE zip_code = ANY(%s)", (list(zips),)
+            )
+            return dict(cur.fetchall())
+
+
+def upsert_listings(results: List[Dict[str, Any]], page_size: int = 500,
+                    zip_codes: Optional[List[str]] = None, run_id: Optional[str] = None) -> int:
+    """
+    Upsert search results into zillow_listings by (market, zpid).
+
+    Args:
+        results: The 'results' array of a Zillow search payload
+        page_size: Rows per INSERT statement
+        zip_codes: ZIPs the search covered, counted as ingested even when
+            they returned no listings (default: the ZIPs in results)
+        run_id: Ingestion run these results belong to; ZIPs already counted
+            for it are not counted again (default: a run of its own)
+
+    Returns:
+        Number of listings written
+    """
+    results = [r for r in results if r.get('zpid') is not None]
+    covered = sorted(set(zip_codes or ()) | {r['zipcode'] for r in results if r.get('zipcode')})
+    if not results and not covered:
+        return 0
+
+    markets = ensure_zip_codes(results + [{'zipcode': zip_code} for zip_code in covered])
+    run_id = run_id or uuid.uuid4().hex
+
+    columns = [column for column, _ in LISTING_COLUMNS]
+    updates = ",\n                    ".join(
+        f"{column} = EXCLUDED.{column}" for column in columns if column != 'zpid'
+    )
+    query = f"""
+        INSERT INTO zillow_listings ({', '.join(columns)}, market, seen_ingestion)
+        VALUES %s
+        ON CONFLICT (market, zpid) DO UPDATE SET
+            {updates},
+            seen_ingestion = EXCLUDED.seen_ingestion,
+            updated_at = CURRENT_TIMESTAMP
+    """
+    with database.get_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("""
+                UPDATE zillow_zip_codes
+                SET ingestion_count = ingestion_count
+                        + CASE WHEN last_ingestion_run IS DISTINCT FROM %s THEN 1 ELSE 0 END,
+                    last_ingestion_run = %s,
+                    last_ingested_at = CURRENT_TIMESTAMP
+                WHERE zip_code = ANY(%s)
+                RETURNING zip_code, ingestion_count
+            """, (run_id, run_id, covered))
+            seen = dict(cur.fetchall())
+            # Last occurrence wins when a payload repeats a zpid
+            rows = list({
+                int(r['zpid']): listing_row(r) + (
+                    markets.get(r.get('zipcode'), UNASSIGNED_MARKET), seen.get(r.get('zipcode'), 0)
+                )
+                for r in results
+            }.values())
+            if rows:
+                execute_values(cur, query, rows, page_size=page_size)
+                record_dimensions(cur, results)
+    invalidate_filter_options()
+    print(f"[ZILLOW] Upserted {len(rows)} listings")
+    return len(rows)
+
+
+def load_payload(path: str) -> Dict[str, Any]:
+    """Read a saved search payload (e.g. mock_data/zillow_45223_mock.json)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def ingest_payload(payload: Dict[str, Any], zip_code: Optional[str] = None,
+                   run_id: Optional[str] = None) -> int:
+    """Ingest a search payload (or one page of a run), optionally restricted to one ZIP"""
+    results = payload.get('results', [])
+    if zip_code:
+        results = [r for r in results if r.get('zipcode') == zip_code]
+    return upsert_listings(results, zip_codes=[zip_code] if zip_code else None, run_id=run_id)
@@ -0,0 +1,208 @@
+"""
+Markets and the market partitions of zillow_listings.
+
+zillow_listings is partitioned BY LIST (market). A market is a metro area
+defined by the ZIP prefixes it covers (zillow_markets); ZIPs that match no
+market fall in the 'unassigned' default partition. Ingest stamps each ZIP
+with its market (zillow_zip_codes.market) and each listing with the market
+of its ZIP.
+
+Queries prune to the relevant partitions by filtering on market as well as
+zip_code. The planner can only prune on values it knows at plan time, so
+markets_for_zips() resolves the markets in Python from a cached copy of the
+ZIP -> market map. The cache is revalidated against a cheap version stamp
+at most every ZILLOW_MARKET_CACHE_TTL seconds, and at once when a ZIP is
+missing from it.
+
+add_market() creates a market's partition and moves its ZIPs and listings
+out of the default partition. Other processes see the move after at most
+ZILLOW_MARKET_CACHE_TTL seconds.
+
+Usage (from the streamlit/ directory):
+    python -m zillow.markets list
+    python -m zillow.markets add columbus --name "Columbus" --prefixes 430 431 432
+"""
+import argparse
+import re
+import sys
+import os
+import threading
+import time
+from typing import List, Dict, Any, Iterable, Tuple
+
+from psycopg2 import sql
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from db import database
+
+UNASSIGNED_MARKET = 'unassigned'
+
+# Market ids become partition names (zillow_listings_<market>)
+MARKET_ID = re.compile(r"^[a-z][a-z0-9_]{0,39}$")
+ZIP_PREFIX = re.compile(r"^[0-9]{1,5}$")
+
+_cache: Dict[str, Any] = {}
+_cache_lock = threading.Lock()
+
+
+def partition_name(market: str) -> str:
+    return f"zillow_listings_{market}"
+
+
+def market_map_version() -> Tuple:
+    """Cheap version stamp of zillow_zip_codes (add_market() touches updated_at)"""
+    row = database.fetch_one("SELECT COUNT(*) as zips, MAX(updated_at) as updated FROM zillow_zip_codes")
+    return tuple(row.values()) if row else ()
+
+
+def load_market_map() -> Dict[str, str]:
+    rows = database.fetch_data("SELECT zip_code, market FROM zillow_zip_codes")
+    return {row['zip_code']: row['market'] for row in rows}
+
+
+def get_market_map(revalidate: bool = False) -> Dict[str, str]:
+    """
+    ZIP -> market for every registered ZIP, cached.
+
+    Args:
+        revalidate: Check the version stamp now instead of after the TTL
+    """
+    now = time.monotonic()
+    with _cache_lock:
+        if _cache and not revalidate and now - _cache['checked_at'] < settings.ZILLOW_MARKET_CACHE_TTL:
+            return _cache['markets']
+
+    version = market_map_version()
+    with _cache_lock:
+        if _cache and _cache['version'] == version:
+            _cache['checked_at'] = now
+            return _cache['markets']
+
+    markets = load_market_map()
+    with _cache_lock:
+        _cache.update(version=version, markets=markets, checked_at=now)
+    return markets
+
+
+def invalidate_market_map() -> None:
+    with _cache_lock:
+        _cache.clear()
+
+
+def markets_for_zips(zip_codes: Iterable[str]) -> List[str]:
+    """
+    Markets (partition keys) holding the listings of these ZIPs, sorted.
+
+    ZIPs that are not registered have no listings (zillow_listings.zip_code
+    is a foreign key) and add no market, so an unknown selection yields an
+    empty list and the query matches nothing, as it would without markets.
+    """
+    zip_codes = set(zip_codes)
+    markets = get_market_map()
+    if not zip_codes <= markets.keys():
+        markets = get_market_map(revalidate=True)
+    return sorted({markets[zip_code] for zip_code in zip_codes if zip_code in markets})
+
+
+def list_markets() -> List[Dict[str, Any]]:
+    """Markets with their prefixes, ZIP count and listings per partition"""
+    return database.fetch_data("""
+        WITH counts AS (
+            SELECT market, COUNT(*) as listings FROM zillow_listings GROUP BY market
+        ),
+        zips AS (
+            SELECT market, COUNT(*) as zip_codes FROM zillow_zip_codes GROUP BY market
+        )
+        SELECT
+            COALESCE(m.market, c.market) as market,
+            m.name,
+            m.zip_prefixes,
+            COALESCE(z.zip_codes, 0) as zip_codes,
+            COALESCE(c.listings, 0) as listings
+        FROM zillow_markets m
+        FULL JOIN counts c ON c.market = m.market
+        LEFT JOIN zips z ON z.market = COALESCE(m.market, c.market)
+        ORDER BY 1
+    """)
+
+
+def add_market(market: str, name: str, zip_prefixes: List[str]) -> Dict[str, int]:
+    """
+    Create (or re-prefix) a market and its zillow_listings partition.
+
+    ZIPs matching the prefixes are re-stamped with the market and their
+    listings move into its partition, all in one transaction. Moving rows
+    out of a large default partition locks and rewrites them; run big moves
+    in a maintenance window.
+
+    Returns:
+        {'zip_codes': ZIPs re-stamped, 'listings': listings moved}
+
+    Raises:
+        ValueError: Invalid market id or ZIP prefix
+    """
+    if not MARKET_ID.match(market) or market == UNASSIGNED_MARKET:
+        raise ValueError(f"Invalid market id '{market}' (lowercase letters, digits and _, "
+                         f"at most 40, not '{UNASSIGNED_MARKET}')")
+    bad = [prefix for prefix in zip_prefixes if not ZIP_PREFIX.match(prefix)]
+    if bad or not zip_prefixes:
+        raise ValueError(f"Invalid ZIP prefixes: {', '.join(bad) or 'none given'}")
+
+    with database.get_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("""
+                INSERT INTO zillow_markets (market, name, zip_prefixes)
+                VALUES (%s, %s, %s)
+                ON CONFLICT (market) DO UPDATE SET
+                    name = EXCLUDED.name,
+                    zip_prefixes = EXCLUDED.zip_prefixes
+            """, (market, name, sorted(set(zip_prefixes))))
+            # The default partition is scanned to check it holds no rows of the new market
+            cur.execute(sql.SQL("CREATE TABLE IF NOT EXISTS {} PARTITION OF zillow_listings FOR VALUES IN ({})").format(
+                sql.Identifier(partition_name(market)), sql.Literal(market)
+            ))
+            cur.execute("""
+                UPDATE zillow_zip_codes
+                SET market = zillow_market_for_zip(zip_code), updated_at = CURRENT_TIMESTAMP
+                WHERE market IS DISTINCT FROM zillow_market_for_zip(zip_code)
+            """)
+            zip_codes = cur.rowcount
+            # Changing the partition key moves each row to its new partition
+            cur.execute("""
+                UPDATE zillow_listings l
+                SET market = z.market
+                FROM zillow_zip_codes z
+                WHERE z.zip_code = l.zip_code AND l.market <> z.market
+            """)
+            listings = cur.rowcount
+    invalidate_market_map()
+    return {'zip_codes': zip_codes, 'listings': listings}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List markets or add a market partition")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("list")
+    add = subparsers.add_parser("add")
+    add.add_argument("market", help="Market id, e.g. columbus")
+    add.add_argument("--name", required=True)
+    add.add_argument("--prefixes", nargs="+", required=True, help="ZIP prefixes, e.g. 430 431 432")
+    args = parser.parse_args()
+
+    if args.command == "add":
+        moved = add_market(args.market, args.name, args.prefixes)
+        print(f"[MARKETS] {args.market}: {moved['zip_codes']} ZIP(s) and {moved['listings']} listing(s) moved "
+              f"to {partition_name(args.market)}")
+        return
+
+    for row in list_markets():
+        prefixes = ", ".join(row['zip_prefixes'] or []) or "-"
+        print(f"{row['market']:<20} {row['name'] or '(default partition)':<28} prefixes: {prefixes:<24} "
+              f"{row['zip_codes']:>5} ZIPs {row['listings']:>10,} listings")
+
+
+if __name__ == "__main__":
+    main()